@@ -14,7 +14,8 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, Any, List, Tuple
 
-from fastapi import APIRouter, Query, Body
+from fastapi import APIRouter, Query, Body, Request, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 DB_PATH = Path(os.getenv("METRICS_DB_PATH", "data/metrics.db"))
@@ -314,23 +315,89 @@ def rag_top_chunks(window: str = Query("24h"), limit: int = Query(20, ge=1, le=1
     return {"rows": rows}
 
 
+@dash_router.get("/pipeline")
+def pipeline_metrics(request: Request):
+    """
+    수집 파이프라인 지표
+    - events: 커밋 지연 / 발행 지연 / 큐 깊이
+    - audit : 그룹 커밋 배치 크기 / write·fsync 지연
+    - embedding_cache: 임베딩 캐시 적중률 (메모리/디스크)
+    - vector_search: 검색 마이크로 배치 크기 / 대기·처리 지연
+    """
+    from app.memory.embedding_cache import cache_metrics
+    from app.memory.vectorstore import vector_search_metrics
+    collector = getattr(request.app.state, "collector", None)
+    audit_writer = getattr(request.app.state, "audit_writer", None)
+    return {
+        "events": collector.metrics() if collector else {},
+        "audit": audit_writer.metrics() if audit_writer else {},
+        "embedding_cache": cache_metrics(),
+        "vector_search": vector_search_metrics(),
+    }
+
+
+def _parse_ts(value: str | None) -> float | None:
+    """epoch 초 또는 ISO 8601 문자열"""
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"invalid timestamp: {value}")
+
+@dash_router.get("/audit")
+def audit_range(
+    request: Request,
+    from_: str | None = Query(None, alias="from"),
+    to: str | None = Query(None),
+    action: str | None = Query(None, description="action 접두어 (예: API:POST:/aurora)"),
+    limit: int = Query(1000, ge=1, le=100000),
+):
+    """
+    시간 범위의 감사 항목을 NDJSON으로 스트리밍합니다.
+    시간 인덱스('<log>.tidx')로 해당 구간의 바이트 오프셋으로 바로 이동하여 필요한 부분만 읽습니다.
+    (워커별 체인이 있으면 모든 체인의 결과를 ts 순서로 병합)
+    """
+    from app.security.audit_chains import iter_range_chains
+    t_from, t_to = _parse_ts(from_), _parse_ts(to)
+    writer = getattr(request.app.state, "audit_writer", None)
+    log_path = writer.chain_base if writer else "data/audit.log"
+    archive_dir = writer.cfg.archive_dir if writer else None
+
+    def _lines():
+        # 동기 제너레이터: StreamingResponse가 스레드풀에서 순회합니다.
+        for i, raw in enumerate(iter_range_chains(log_path, t_from, t_to, action, archive_dir=archive_dir)):
+            if i >= limit:
+                break
+            yield raw + b"\n"
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
+
+
 class AuditVerifyReq(BaseModel):
-    path: str = "data/audit.log"
+    full: bool = False  # True면 체크포인트를 무시하고 전체 재검증
 
 @dash_router.post("/audit/verify")
-def audit_verify(req: AuditVerifyReq):
-    # audit_verify.py 스크립트를 직접 호출합니다.
-    from subprocess import run, PIPE
-    
-    # app/main.py가 있는 루트에서 scripts/audit_verify.py를 찾도록 경로 수정
-    script_path = "scripts/audit_verify.py"
-    if not Path(script_path).exists():
-        script_path = Path(__file__).parent.parent / "scripts" / "audit_verify.py"
-        if not script_path.exists():
-            return {"returncode": -1, "stdout": "", "stderr": "audit_verify.py not found"}
-            
-    # 'python' 대신 sys.executable을 사용하여 현재 venv의 Python을 사용
-    import sys
-    
-    p = run([sys.executable, str(script_path), req.path], stdout=PIPE, stderr=PIPE, text=True, encoding='utf-8')
-    return {"returncode": p.returncode, "stdout": p.stdout, "stderr": p.stderr}
\ No newline at end of file
+async def audit_verify(req: AuditVerifyReq, request: Request):
+    """
+    해시체인 검증 작업을 시작하고 작업 상태를 즉시 반환합니다.
+    (증분 검증: 마지막 체크포인트 이후 항목만, 진행률은 GET /dash/audit/verify/{job_id})
+    검증 대상은 감사 기록기에 설정된 로그뿐입니다. (요청으로 경로를 받지 않음 → 임의 파일 읽기/쓰기 방지)
+    """
+    from app.security.audit_verify import get_verify_jobs
+    writer = getattr(request.app.state, "audit_writer", None)
+    log_path = writer.chain_base if writer else "data/audit.log"
+    kwargs = {"archive_dir": writer.cfg.archive_dir} if writer else {}
+    return get_verify_jobs().start(log_path, full=req.full, **kwargs)
+
+@dash_router.get("/audit/verify/{job_id}")
+def audit_verify_status(job_id: str):
+    from app.security.audit_verify import get_verify_jobs
+    job = get_verify_jobs().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="verify job not found")
+    return job
\ No newline at end of file
@@ -1,13 +1,42 @@
 """
 Aurora EventBus (in-proc async broadcast)
-- (app/main.py [cite: vivleon/aurora/AURORA-main/aurora-win/app/main.py]에서 사용되지 않음. RedisEventBus로 대체됨)
-- (event_sse_push_router.py [cite: vivleon/aurora/AURORA-main/aurora-win/event_sse_push_router.py]가 이 파일을 사용)
+- BaseEventBus: 모든 버스 구현(in-proc / Redis)이 따르는 공통 인터페이스
+- InProcEventBus: 단일 프로세스용 팬아웃 버스 (네트워크 홉 없음)
+- (app/event_bus_select.py가 EVENT_BUS 모드에 따라 구현체를 선택합니다)
+- 주의: in-proc 버스는 워커 프로세스 간에 이벤트를 공유하지 않습니다. 멀티워커는 Redis를 사용하세요.
 """
 from __future__ import annotations
 import asyncio, json
 from typing import AsyncGenerator, Dict, Any, List
 
-class _EventBus:
+class BaseEventBus:
+    """
+    이벤트 버스 인터페이스.
+    - publish / publish_batch: 이벤트 발행
+    - subscribe: 비동기 제너레이터로 이벤트 수신
+    - ping: 백엔드 가용성 확인 (자동 선택 시 사용)
+    """
+    name: str = "base"
+
+    async def publish(self, event: Dict[str, Any]):
+        raise NotImplementedError
+
+    async def publish_batch(self, events: List[Dict[str, Any]]):
+        for e in events:
+            await self.publish(e)
+
+    def subscribe(self) -> AsyncGenerator[Dict[str, Any], None]:
+        raise NotImplementedError
+
+    async def ping(self) -> bool:
+        return True
+
+    async def close(self):
+        pass
+
+class InProcEventBus(BaseEventBus):
+    name = "inproc"
+
     def __init__(self, max_queue: int = 5000):
         self._subscribers: List[asyncio.Queue] = []
         self._max_queue = max_queue
@@ -38,4 +67,6 @@ class _EventBus:
         for e in events:
             await self.publish(e)
 
-EventBus = _EventBus()
\ No newline at end of file
+# 하위 호환: 기존 코드는 _EventBus / EventBus 싱글톤을 사용합니다.
+_EventBus = InProcEventBus
+EventBus = InProcEventBus()
@@ -0,0 +1,63 @@
+"""
+Event Bus Backend Selector
+- EVENT_BUS 환경 변수로 버스 구현을 선택합니다: auto | redis | inproc
+  - inproc: 프로세스 내부 팬아웃 (단일 노드, 네트워크 홉 없음)
+  - redis : Redis Pub/Sub (멀티워커/멀티노드)
+  - auto  : 시작 시 Redis를 한 번 프로브하고, 실패하면 inproc으로 강등
+- (app/main.py의 startup 훅에서 사용됨)
+"""
+from __future__ import annotations
+import os
+
+from app.event_bus import BaseEventBus, EventBus
+
+EVENT_BUS_MODE = os.getenv("EVENT_BUS", "auto")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+CHANNEL = os.getenv("REDIS_CHANNEL", "aurora.events")
+PROBE_TIMEOUT = float(os.getenv("EVENT_BUS_PROBE_TIMEOUT", "0.5"))
+
+BUS_MODES = ("auto", "redis", "inproc")
+
+def _make_redis_bus(redis_url: str, channel: str) -> BaseEventBus:
+    # redis 패키지가 없으면 ImportError (auto 모드에서 inproc 폴백 사유)
+    from app.redis_event_bus import get_redis_bus
+    return get_redis_bus(redis_url, channel)
+
+async def select_event_bus(
+    mode: str = EVENT_BUS_MODE,
+    redis_url: str = REDIS_URL,
+    channel: str = CHANNEL,
+    probe_timeout: float = PROBE_TIMEOUT,
+) -> BaseEventBus:
+    """
+    모드에 맞는 버스 인스턴스를 반환합니다.
+    - redis 모드는 프로브 없이 Redis 버스를 반환합니다. (연결 실패는 버스가 자체 재시도)
+    - auto 모드는 Redis 패키지 부재/연결 실패 시 in-proc 싱글톤으로 강등합니다.
+    """
+    mode = (mode or "auto").lower()
+    if mode not in BUS_MODES:
+        print(f"[EventBus WARN] Unknown EVENT_BUS mode '{mode}'. Falling back to 'auto'.")
+        mode = "auto"
+
+    if mode == "inproc":
+        print("[EventBus] Using in-process bus (EVENT_BUS=inproc).")
+        return EventBus
+
+    if mode == "redis":
+        bus = _make_redis_bus(redis_url, channel)
+        print(f"[EventBus] Using Redis bus (EVENT_BUS=redis): {redis_url}")
+        return bus
+
+    # auto
+    try:
+        bus = _make_redis_bus(redis_url, channel)
+    except ImportError as e:
+        print(f"[EventBus] Redis unavailable ({e}). Falling back to in-process bus.")
+        return EventBus
+
+    if await bus.ping(timeout=probe_timeout):
+        print(f"[EventBus] Redis probe OK. Using Redis bus: {redis_url}")
+        return bus
+
+    print(f"[EventBus] Redis probe failed ({redis_url}). Falling back to in-process bus.")
+    return EventBus
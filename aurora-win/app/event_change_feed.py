@@ -0,0 +1,81 @@
+"""
+SQLite Change Feed (events_raw tail)
+- events_raw를 id 기준으로 tail하는 비동기 소스입니다. 동기 SQLite 호출은 워커 스레드에서 실행됩니다.
+- PRAGMA data_version이 그대로면(다른 연결의 커밋 없음) SELECT를 건너뜁니다.
+- (app/event_sse_router.py가 EventHub의 업스트림으로 사용)
+"""
+from __future__ import annotations
+import asyncio, os, sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Dict, Any, List
+
+DB_PATH = Path(os.getenv("METRICS_DB_PATH", "data/metrics.db"))
+POLL_INTERVAL = float(os.getenv("EVENT_POLL_INTERVAL", "1.0"))
+POLL_LIMIT = 500
+
+def _summary(r: sqlite3.Row) -> Dict[str, Any]:
+    # compact summary for UI toast
+    return {
+        "id": r["id"],
+        "ts": datetime.utcfromtimestamp(r["ts"]).isoformat()+"Z" if r["ts"] else None,
+        "type": r["type"],
+        "tool": r["tool"],
+        "intent": r["intent"],
+        "outcome": r["outcome"],
+        "risk": r["risk"],
+        "latency_ms": r["latency_ms"],
+    }
+
+class SQLiteChangeFeed:
+    """
+    events_raw 테이블 체인지 피드 (동기 메서드는 워커 스레드에서 실행)
+    - 시작 시점의 MAX(id) 이후 행만 전달합니다.
+    """
+    def __init__(self, db_path: Path = DB_PATH, interval: float = POLL_INTERVAL, limit: int = POLL_LIMIT):
+        self.db_path = db_path
+        self.interval = interval
+        self.limit = limit
+        self.polls = 0
+        self.skipped = 0
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path.as_posix(), check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _head(self, conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT COALESCE(MAX(id), 0) FROM events_raw").fetchone()[0]
+
+    def _data_version(self, conn: sqlite3.Connection) -> int:
+        return conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _fetch(self, conn: sqlite3.Connection, last_id: int) -> List[sqlite3.Row]:
+        return conn.execute(
+            "SELECT id, ts, type, tool, intent, outcome, risk, latency_ms FROM events_raw WHERE id > ? ORDER BY id ASC LIMIT ?",
+            (last_id, self.limit),
+        ).fetchall()
+
+    async def tail(self) -> AsyncIterator[Dict[str, Any]]:
+        conn = await asyncio.to_thread(self._open)
+        try:
+            last_version = await asyncio.to_thread(self._data_version, conn)
+            last_id = await asyncio.to_thread(self._head, conn)
+            while True:
+                await asyncio.sleep(self.interval)
+                version = await asyncio.to_thread(self._data_version, conn)
+                if version == last_version:
+                    self.skipped += 1
+                    continue
+                last_version = version
+                # LIMIT만큼 가득 찼으면 바로 이어서 읽습니다 (버스트 따라잡기)
+                while True:
+                    self.polls += 1
+                    rows = await asyncio.to_thread(self._fetch, conn, last_id)
+                    for r in rows:
+                        last_id = max(last_id, r["id"])
+                        yield _summary(r)
+                    if len(rows) < self.limit:
+                        break
+        finally:
+            conn.close()
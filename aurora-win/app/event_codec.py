@@ -0,0 +1,97 @@
+"""
+Aurora Event Codec
+- 버스 페이로드 직렬화 계층. 이벤트는 발행 시 한 번만 인코딩되고,
+  JSON 와이어 포맷이면 수신 측에서 파싱 없이 바이트 그대로 SSE 프레임이 됩니다.
+- EVENT_CODEC: json (기본, orjson 설치 시 orjson 사용) | msgpack (더 작은 와이어 포맷)
+  - msgpack은 워커(허브)당 한 번 디코드 후 JSON으로 재인코딩합니다. (클라이언트 수와 무관)
+- 선택 의존성: orjson, msgpack (없으면 표준 json으로 폴백)
+"""
+from __future__ import annotations
+import json
+import os
+from typing import Any, Dict, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+EVENT_CODEC = os.getenv("EVENT_CODEC", "json")
+
+def dumps_json(obj: Any) -> bytes:
+    """컴팩트 JSON (UTF-8 bytes)"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def loads_json(data: bytes | str) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def sse_data_frame(json_bytes: bytes) -> bytes:
+    return b"data: " + json_bytes + b"\n\n"
+
+class EventCodec:
+    name = "json"
+    is_json = True
+
+    def encode(self, event: Dict[str, Any]) -> bytes:
+        return dumps_json(event)
+
+    def decode(self, data: bytes) -> Dict[str, Any]:
+        return loads_json(data)
+
+class MsgpackCodec(EventCodec):
+    name = "msgpack"
+    is_json = False
+
+    def encode(self, event: Dict[str, Any]) -> bytes:
+        return msgpack.packb(event, use_bin_type=True)
+
+    def decode(self, data: bytes) -> Dict[str, Any]:
+        return msgpack.unpackb(data, raw=False)
+
+def get_codec(name: str = EVENT_CODEC) -> EventCodec:
+    name = (name or "json").lower()
+    if name == "msgpack":
+        if msgpack is not None:
+            return MsgpackCodec()
+        print("[EventCodec WARN] 'msgpack' not installed. Falling back to JSON. (pip install msgpack)")
+    elif name != "json":
+        print(f"[EventCodec WARN] Unknown EVENT_CODEC '{name}'. Falling back to JSON.")
+    return EventCodec()
+
+class EncodedEvent:
+    """
+    와이어에서 받은 인코딩된 이벤트. 필요할 때만 디코드/재인코딩합니다.
+    """
+    __slots__ = ("raw", "codec", "_event", "_json")
+
+    def __init__(self, raw: bytes, codec: EventCodec):
+        self.raw = raw
+        self.codec = codec
+        self._event: Optional[Dict[str, Any]] = None
+        self._json: Optional[bytes] = None
+
+    def decode(self) -> Dict[str, Any]:
+        if self._event is None:
+            self._event = self.codec.decode(self.raw)
+        return self._event
+
+    def json_bytes(self) -> bytes:
+        if self._json is None:
+            # JSON 와이어면 그대로 통과 (파싱 없음)
+            self._json = self.raw if self.codec.is_json else dumps_json(self.decode())
+        return self._json
+
+def event_frame(event: Dict[str, Any] | EncodedEvent) -> bytes:
+    """이벤트(dict 또는 EncodedEvent)를 SSE data 프레임으로 변환합니다."""
+    if isinstance(event, EncodedEvent):
+        return sse_data_frame(event.json_bytes())
+    return sse_data_frame(dumps_json(event))
@@ -9,11 +9,14 @@ import math
 import sqlite3
 import statistics
 import os
+import time
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, Optional, List, Set
 
+from app.utils.metrics import LatencyStat
+
 DB_PATH = Path(os.getenv("METRICS_DB_PATH", "data/metrics.db"))
 
 @dataclass
@@ -32,6 +35,7 @@ class EventCollector:
         self._rollup_task: Optional[asyncio.Task] = None
         self._stop = asyncio.Event()
         self._known_tables: Set[str] = set() # DB 테이블 캐시
+        self.commit_stat = LatencyStat() # 배치 쓰기(커밋) 지연 ms
         self._ensure_db()
 
     # ------------- public API -------------
@@ -44,18 +48,20 @@ Flush: {self.cfg.flush_interval}s, Rollup: {self.cfg.rollup_interval}s")
 
     async def stop(self):
         self._stop.set()
+
+        # 진행 중인 배치 쓰기가 끝나도록 기다립니다 (루프는 flush_interval 내에 종료).
+        # 쓰기 도중 취소하면 커밋 이후의 후처리(발행 등)가 누락됩니다.
+        if self._flush_task:
+            try:
+                await asyncio.wait_for(self._flush_task, timeout=self.cfg.flush_interval + 10.0)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                pass
         
         # 큐에 남은 항목 플러시 시도
         if not self._q.empty():
             print(f"[EventCollector] Stopping... flushing {self._q.qsize()} remaining events.")
             await self._flush_remaining()
             
-        if self._flush_task:
-            try:
-                self._flush_task.cancel()
-                await self._flush_task
-            except asyncio.CancelledError:
-                pass
         if self._rollup_task:
             try:
                 self._rollup_task.cancel()
@@ -88,6 +94,13 @@ Flush: {self.cfg.flush_interval}s, Rollup: {self.cfg.rollup_interval}s")
         except asyncio.QueueFull:
             print(f"[WARN] EventCollector queue full. Discarding event: {e.get('type')}")
 
+    def metrics(self) -> Dict[str, Any]:
+        """플러시 파이프라인 지표 (/dash/pipeline)"""
+        return {
+            "queue_depth": self._q.qsize(),
+            "commit_ms": self.commit_stat.snapshot(),
+        }
+
     # ------------- internals -------------
     def _ensure_db(self):
         self.cfg.db_path.parent.mkdir(parents=True, exist_ok=True)
@@ -137,18 +150,17 @@ It will be created, but 'schema.sql' must be run.")
             try:
                 first_item = await asyncio.wait_for(self._q.get(), self.cfg.flush_interval)
                 batch = [first_item]
-                while len(batch) < self.cfg.batch_size:
+                # [FIX] 큐가 비면 모은 만큼만 쓰기 (이전에는 QueueEmpty 시 배치를 버렸음)
+                while len(batch) < self.cfg.batch_size and not self._q.empty():
                     batch.append(self._q.get_nowait())
             except asyncio.TimeoutError:
                 continue 
-            except asyncio.QueueEmpty:
-                continue 
             except asyncio.CancelledError:
                 break 
                 
             if batch:
                 try:
-                    await asyncio.to_thread(self._write_batch, batch)
+                    await self._persist_batch(batch)
                 except Exception as e:
                     print(f"[EventCollector ERROR] Flusher failed to write batch: {e}")
 
@@ -163,10 +175,18 @@ It will be created, but 'schema.sql' must be run.")
         if batch:
             print(f"[EventCollector] Writing final {len(batch)} events.")
             try:
-                await asyncio.to_thread(self._write_batch, batch)
+                await self._persist_batch(batch)
             except Exception as e:
                 print(f"[EventCollector ERROR] Final flush failed: {e}")
 
+    async def _persist_batch(self, batch: List[Dict[str, Any]]):
+        """
+        배치를 워커 스레드에서 DB에 씁니다. (하위 클래스가 발행 등 후처리를 덧붙이는 확장 지점)
+        """
+        t0 = time.perf_counter()
+        await asyncio.to_thread(self._write_batch, batch)
+        self.commit_stat.observe((time.perf_counter() - t0) * 1000)
+
     def _write_batch(self, batch: List[Dict[str, Any]]):
         """
         이벤트를 DB에 씁니다. (동기)
@@ -1,24 +1,56 @@
 """
 EventCollector with EventBus publishing
-- (app/main.py [cite: vivleon/aurora/AURORA-main/aurora-win/app/main.py]에서 사용되지 않음. Redis 패치로 대체됨)
+- 버스 구현(in-proc / Redis)에 독립적인 수집기입니다. 버스는 시작 시 주입됩니다.
+- 발행은 이벤트 루프의 전용 퍼블리셔 태스크가 담당합니다. 플러셔는 요약 배치를 큐에 넣기만 하므로
+  SQLite 쓰기 스레드가 버스 지연에 묶이지 않습니다.
+  - 기본값: 커밋 후 큐잉 (UI에는 영속화된 이벤트만 노출, 다음 배치 쓰기와 발행이 병렬 진행)
+  - EVENT_PUBLISH_BEFORE_COMMIT=1: 커밋 전 큐잉 (저지연 UI, 발행과 DB 쓰기가 동시에 진행)
+- (app/main.py에서 app/event_bus_select.py가 고른 버스와 함께 사용됨)
 """
 from __future__ import annotations
-from typing import Any, Dict, List
+import asyncio
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
+from pathlib import Path
 
-from app.event_collector import EventCollector
-from app.event_bus import EventBus
+from app.event_collector import EventCollector, DB_PATH
+from app.event_bus import BaseEventBus, EventBus
+from app.utils.metrics import LatencyStat
+
+PUBLISH_BEFORE_COMMIT = os.getenv("EVENT_PUBLISH_BEFORE_COMMIT", "0") == "1"
+PUBLISH_QUEUE_SIZE = int(os.getenv("EVENT_PUBLISH_QUEUE_SIZE", "1000")) # 배치 단위
 
 class EventCollectorWithBus(EventCollector):
-    def _write_batch(self, batch: List[Dict[str, Any]]):
-        # call parent to persist
-        super()._write_batch(batch)
-        # publish compact summaries
+    def __init__(
+        self,
+        db_path: str | Path = DB_PATH,
+        bus: Optional[BaseEventBus] = None,
+        publish_before_commit: bool = PUBLISH_BEFORE_COMMIT,
+        publish_queue_size: int = PUBLISH_QUEUE_SIZE,
+    ):
+        super().__init__(db_path)
+        self.bus: BaseEventBus = bus or EventBus
+        self.publish_before_commit = publish_before_commit
+        self._pub_q: asyncio.Queue = asyncio.Queue(maxsize=publish_queue_size)
+        self._pub_task: Optional[asyncio.Task] = None
+        self.publish_stat = LatencyStat()     # bus.publish_batch 소요 ms
+        self.publish_lag_stat = LatencyStat() # 큐잉 -> 발행 완료 ms
+        self.publish_dropped = 0
+
+    def set_bus(self, bus: BaseEventBus):
+        """startup 훅에서 선택된 버스로 교체합니다."""
+        self.bus = bus
+        print(f"[EventCollectorWithBus] Publishing to '{bus.name}' bus.")
+
+    def _summaries(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # compact summaries for UI toasts
         summaries = []
         now_iso = datetime.utcnow().isoformat()+"Z"
         for e in batch:
             summaries.append({
-                "ts": now_iso if not e.get("ts") else None,
+                "ts": e.get("ts") or now_iso,
                 "type": e.get("type"),
                 "tool": e.get("tool"),
                 "intent": e.get("intent"),
@@ -26,6 +58,76 @@ class EventCollectorWithBus(EventCollector):
                 "risk": e.get("risk"),
                 "latency_ms": e.get("latency_ms"),
             })
-        # async publish (fire-and-forget)
-        import anyio
-        anyio.from_thread.run(EventBus.publish_batch, summaries)
\ No newline at end of file
+        return summaries
+
+    async def start(self):
+        await super().start()
+        self._pub_task = asyncio.create_task(self._publisher())
+
+    async def stop(self):
+        # 부모가 남은 이벤트를 플러시하며 발행 큐를 채우므로, 그 다음에 퍼블리셔를 정리합니다.
+        await super().stop()
+        if self._pub_task:
+            try:
+                await asyncio.wait_for(self._pub_q.join(), timeout=2.0)
+            except asyncio.TimeoutError:
+                print(f"[EventCollectorWithBus WARN] Dropping {self._pub_q.qsize()} unpublished batches on shutdown.")
+            self._pub_task.cancel()
+            try:
+                await self._pub_task
+            except asyncio.CancelledError:
+                pass
+            self._pub_task = None
+
+    def metrics(self) -> Dict[str, Any]:
+        m = super().metrics()
+        m.update({
+            "bus": self.bus.name,
+            "publish_before_commit": self.publish_before_commit,
+            "publish_queue_depth": self._pub_q.qsize(),
+            "publish_dropped": self.publish_dropped,
+            "publish_ms": self.publish_stat.snapshot(),
+            "publish_lag_ms": self.publish_lag_stat.snapshot(),
+        })
+        return m
+
+    async def _persist_batch(self, batch: List[Dict[str, Any]]):
+        summaries = self._summaries(batch)
+        if self.publish_before_commit:
+            self._offer(summaries)
+            await super()._persist_batch(batch)
+        else:
+            await super()._persist_batch(batch)
+            self._offer(summaries)
+
+    def _offer(self, summaries: List[Dict[str, Any]]):
+        """퍼블리셔 큐에 배치를 넣습니다. (논블로킹, 가득 차면 드롭)"""
+        try:
+            self._pub_q.put_nowait((time.perf_counter(), summaries))
+        except asyncio.QueueFull:
+            self.publish_dropped += len(summaries)
+            print(f"[EventCollectorWithBus WARN] Publish queue full. Dropping {len(summaries)} events.")
+
+    async def _publisher(self):
+        """
+        백그라운드 태스크: 발행 큐를 비우며 버스에 발행합니다.
+        대기 중인 배치가 여러 개면 한 번의 publish_batch로 합쳐 보냅니다.
+        """
+        while True:
+            items: List[Tuple[float, List[Dict[str, Any]]]] = [await self._pub_q.get()]
+            while not self._pub_q.empty():
+                items.append(self._pub_q.get_nowait())
+            events = [e for _, summaries in items for e in summaries]
+            t0 = time.perf_counter()
+            try:
+                await self.bus.publish_batch(events)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[EventCollectorWithBus ERROR] Failed to publish batch to '{self.bus.name}' bus: {e}")
+            finally:
+                now = time.perf_counter()
+                self.publish_stat.observe((now - t0) * 1000)
+                for enq_ts, _ in items:
+                    self.publish_lag_stat.observe((now - enq_ts) * 1000)
+                    self._pub_q.task_done()
@@ -0,0 +1,131 @@
+"""
+Aurora Event Hub (per-worker fan-out)
+- 워커 프로세스당 하나의 업스트림 소스(SQLite 체인지 피드, 버스 구독 등)를 열고
+  N개의 로컬 SSE 클라이언트 큐로 팬아웃합니다.
+- 이벤트는 허브에서 한 번만 SSE 프레임(bytes)으로 직렬화되고, 모든 클라이언트가 같은 프레임을 공유합니다.
+  버스에서 받은 EncodedEvent(JSON 와이어)는 파싱 없이 그대로 프레임이 됩니다. (app/event_codec.py)
+- 리플레이 링 버퍼: 최근 replay_size개 / replay_seconds초 이내의 프레임을 보관하여
+  새로 접속한 클라이언트에게 DB 조회 없이 즉시 백필(burst)합니다.
+- 첫 구독자가 붙을 때 펌프 태스크를 시작하고, 마지막 구독자가 떠나면 정지합니다.
+  (start()로 고정 시작하면 구독자가 없어도 링 버퍼를 계속 채웁니다)
+- 느린 클라이언트의 큐가 가득 차면 해당 클라이언트에 대해서만 이벤트를 드롭합니다 (best-effort).
+"""
+from __future__ import annotations
+import asyncio
+import os
+import time
+from collections import deque
+from typing import AsyncGenerator, AsyncIterator, Callable, Deque, Dict, Any, List, Optional, Tuple, Union
+
+from app.event_codec import EncodedEvent, event_frame
+
+SourceFactory = Callable[[], AsyncIterator[Union[Dict[str, Any], EncodedEvent]]]
+
+REPLAY_SIZE = int(os.getenv("EVENT_REPLAY_SIZE", "200"))
+REPLAY_SECONDS = float(os.getenv("EVENT_REPLAY_SECONDS", "300"))
+
+PING_FRAME = b"event: ping\ndata: {}\n\n"
+REPLAY_END_FRAME = b"event: replay-end\ndata: {}\n\n"
+
+class EventHub:
+    def __init__(
+        self,
+        source: SourceFactory,
+        name: str = "hub",
+        max_queue: int = 1000,
+        replay_size: int = REPLAY_SIZE,
+        replay_seconds: float = REPLAY_SECONDS,
+    ):
+        self._source = source
+        self.name = name
+        self._max_queue = max_queue
+        self._subscribers: List[asyncio.Queue] = []
+        self._pump_task: Optional[asyncio.Task] = None
+        self._pinned = False
+        self.replay_seconds = replay_seconds
+        self._replay: Deque[Tuple[float, bytes]] = deque(maxlen=max(replay_size, 0))
+        self.dropped = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    # ------------- lifecycle -------------
+    def start(self):
+        """구독자 유무와 관계없이 업스트림을 유지합니다 (리플레이 버퍼용)."""
+        self._pinned = True
+        self._ensure_pump()
+
+    async def stop(self):
+        self._pinned = False
+        await self._stop_pump()
+
+    # ------------- clients -------------
+    def replay_frames(self) -> List[bytes]:
+        """링 버퍼에서 replay_seconds 이내의 프레임을 오래된 순서로 반환합니다."""
+        cutoff = time.monotonic() - self.replay_seconds
+        return [frame for ts, frame in list(self._replay) if ts >= cutoff]
+
+    async def subscribe(self, replay: bool = True) -> AsyncGenerator[bytes, None]:
+        """
+        SSE 프레임(bytes)을 생성합니다.
+        replay=True면 백필 프레임과 replay-end 마커를 먼저 보냅니다.
+        """
+        q: asyncio.Queue = asyncio.Queue(self._max_queue)
+        # 스냅샷과 등록 사이에 await가 없으므로 백필과 실시간 프레임이 겹치거나 빠지지 않습니다.
+        backlog = self.replay_frames() if replay else []
+        self._subscribers.append(q)
+        self._ensure_pump()
+        try:
+            if replay:
+                for frame in backlog:
+                    yield frame
+                yield REPLAY_END_FRAME
+            while True:
+                yield await q.get()
+        finally:
+            if q in self._subscribers:
+                self._subscribers.remove(q)
+            if not self._subscribers and not self._pinned:
+                await self._stop_pump()
+
+    # ------------- internals -------------
+    def _ensure_pump(self):
+        if self._pump_task is None or self._pump_task.done():
+            self._pump_task = asyncio.create_task(self._pump())
+            print(f"[EventHub:{self.name}] Upstream started.")
+
+    async def _stop_pump(self):
+        task, self._pump_task = self._pump_task, None
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            print(f"[EventHub:{self.name}] Upstream stopped.")
+
+    def _broadcast(self, event: Dict[str, Any] | EncodedEvent):
+        try:
+            frame = event_frame(event)
+        except (TypeError, ValueError) as e:
+            print(f"[EventHub:{self.name} WARN] Unserializable event dropped: {e}")
+            return
+        if self._replay.maxlen:
+            self._replay.append((time.monotonic(), frame))
+        for q in list(self._subscribers):
+            try:
+                q.put_nowait(frame)
+            except asyncio.QueueFull:
+                self.dropped += 1
+
+    async def _pump(self):
+        while True:
+            try:
+                async for ev in self._source():
+                    self._broadcast(ev)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[EventHub:{self.name} ERROR] Upstream failed: {e}. Restarting in 1s...")
+            await asyncio.sleep(1.0)
@@ -1,29 +1,38 @@
 """
 Aurora Event SSE Router (Push)
-- (app/main.py [cite: vivleon/aurora/AURORA-main/aurora-win/app/main.py]에서 사용되지 않음. Redis 라우터로 대체됨)
+- app.state.event_hub (선택된 버스를 워커당 한 번 구독하는 EventHub)를 통해 팬아웃합니다.
+  Redis 모드에서도 클라이언트마다 구독을 열지 않습니다. 허브가 없으면 in-proc EventBus 허브를 사용합니다.
+- 새 클라이언트는 허브의 리플레이 링 버퍼로 최근 이벤트를 즉시 백필받습니다.
+- (app/main.py에서 /events 프리픽스로 마운트됨)
 """
 from __future__ import annotations
-import asyncio, json
-from datetime import datetime
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Query, Request
 from fastapi.responses import StreamingResponse
 
 from app.event_bus import EventBus
+from app.event_hub import EventHub, PING_FRAME
 
 event_router = APIRouter()
 
-async def _gen() -> AsyncGenerator[str, None]:
+_default_hub: Optional[EventHub] = None
+
+def _get_hub(request: Request) -> EventHub:
+    global _default_hub
+    hub = getattr(request.app.state, "event_hub", None)
+    if hub is not None:
+        return hub
+    if _default_hub is None:
+        _default_hub = EventHub(EventBus.subscribe, name=EventBus.name)
+    return _default_hub
+
+async def _gen(hub: EventHub, replay: bool) -> AsyncGenerator[bytes, None]:
     # initial ping so clients start
-    yield "event: ping\ndata: {}\n\n"
-    async for ev in EventBus.subscribe():
-        try:
-            yield f"data: {json.dumps(ev, separators=(',',':'))}\n\n"
-        except Exception:
-            # keep stream alive
-            yield "event: ping\ndata: {}\n\n"
+    yield PING_FRAME
+    async for frame in hub.subscribe(replay=replay):
+        yield frame
 
 @event_router.get("/stream")
-def stream():
-    return StreamingResponse(_gen(), media_type="text/event-stream")
\ No newline at end of file
+def stream(request: Request, replay: bool = Query(True)):
+    return StreamingResponse(_gen(_get_hub(request), replay), media_type="text/event-stream")
@@ -1,11 +1,10 @@
 """
 SSE Router backed by Redis Pub/Sub
 - 멀티워커 호환. 각 클라이언트는 고유한 Redis 구독을 엽니다.
-- (app/main.py (통합본)에서 사용됨)
+- (레거시) app/main.py는 워커당 1개 구독을 공유하는 app/event_sse_push_router.py를 사용합니다.
 """
 from __future__ import annotations
 import os
-import json
 from typing import AsyncGenerator
 from fastapi import APIRouter
 from fastapi.responses import StreamingResponse
@@ -17,12 +16,14 @@ except ImportError:
     print("[ERROR] event_sse_redis_router: Failed to import redis_event_bus.")
     get_redis_bus = None
 
+from app.event_codec import event_frame
+
 sse_router = APIRouter()
 
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 CHANNEL = os.getenv("REDIS_CHANNEL", "aurora.events")
 
-async def _gen() -> AsyncGenerator[str, None]:
+async def _gen() -> AsyncGenerator[str | bytes, None]:
     """
     Redis 채널을 구독하고 SSE 이벤트를 생성하는 비동기 제너레이터
     """
@@ -37,8 +38,8 @@ async def _gen() -> AsyncGenerator[str, None]:
     
     async for ev in bus.subscribe():
         try:
-            # data: {"type": "tool", ...}
-            yield f"data: {json.dumps(ev, separators=(',',':'))}\n\n"
+            # data: {"type": "tool", ...} (JSON 와이어면 수신 바이트 그대로)
+            yield event_frame(ev)
         except Exception:
             # 스트림이 끊기지 않도록 오류 발생 시 핑(ping) 전송
             yield "event: ping\ndata: {}\n\n"
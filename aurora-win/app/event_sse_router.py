@@ -1,59 +1,33 @@
 """
 Aurora Event SSE Router (Polling)
-- (app/main.py [cite: vivleon/aurora/AURORA-main/aurora-win/app/main.py]에서 사용되지 않음. Redis 라우터로 대체됨)
-- metrics.db를 1초마다 폴링(polling)합니다.
+- Redis 없이 멀티워커에서 동작하는 폴링 모드입니다. (app/main.py: EVENT_STREAM=sqlite)
+- 워커당 하나의 체인지 피드(app/event_change_feed.py)가 events_raw를 tail하고,
+  EventHub가 모든 클라이언트에 팬아웃합니다. 클라이언트 수와 무관하게 폴링 쿼리는 워커당 1개입니다.
+- 새 클라이언트는 허브의 리플레이 링 버퍼로 최근 이벤트를 즉시 백필받습니다.
 """
 from __future__ import annotations
-import asyncio, json, sqlite3
-from datetime import datetime
-from pathlib import Path
 from typing import AsyncGenerator
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 from fastapi.responses import StreamingResponse
 
-DB_PATH = Path("data/metrics.db")
+from app.event_change_feed import SQLiteChangeFeed
+from app.event_hub import EventHub, PING_FRAME
 
 event_router = APIRouter()
 
-def _connect():
-    conn = sqlite3.connect(DB_PATH.as_posix(), check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    return conn
+change_feed = SQLiteChangeFeed()
+hub = EventHub(change_feed.tail, name="sqlite")
 
-async def _stream_events() -> AsyncGenerator[str, None]:
-    last_id = 0
-    conn = _connect()
-    cur = conn.cursor()
-    yield "event: ping\ndata: {}\n\n"
-    while True:
-        await asyncio.sleep(1.0)
-        try:
-            cur.execute(
-                "SELECT id, ts, type, tool, intent, outcome, risk, latency_ms FROM events_raw WHERE id > ? ORDER BY id ASC LIMIT 100",
-                (last_id,),
-            )
-            rows = cur.fetchall()
-            if not rows:
-                continue
-            for r in rows:
-                last_id = max(last_id, r["id"]) if r["id"] else last_id
-                # compact summary for UI toast
-                summary = {
-                    "id": r["id"],
-                    "ts": datetime.utcfromtimestamp(r["ts"]).isoformat()+"Z" if r["ts"] else None,
-                    "type": r["type"],
-                    "tool": r["tool"],
-                    "intent": r["intent"],
-                    "outcome": r["outcome"],
-                    "risk": r["risk"],
-                    "latency_ms": r["latency_ms"],
-                }
-                yield f"data: {json.dumps(summary, separators=(',',':'))}\n\n"
-        except Exception:
-            # keep-alive on error
-            yield "event: ping\ndata: {}\n\n"
+async def _stream_events(replay: bool) -> AsyncGenerator[bytes, None]:
+    yield PING_FRAME
+    # 허브가 직렬화한 프레임(bytes)을 그대로 전달 (클라이언트별 직렬화 없음)
+    async for frame in hub.subscribe(replay=replay):
+        yield frame
 
 @event_router.get("/stream")
-def sse_stream():
-    return StreamingResponse(_stream_events(), media_type="text/event-stream")
\ No newline at end of file
+def sse_stream(replay: bool = Query(True)):
+    """
+    실시간 이벤트 스트림. replay=true면 최근 이벤트 링 버퍼를 먼저 백필합니다.
+    """
+    return StreamingResponse(_stream_events(replay), media_type="text/event-stream")
@@ -7,10 +7,14 @@ from typing import Dict, Any
 # --- 고급 서비스 임포트 ---
 from app.aurora_dashboard_api_stub import dash_router
 from app.security.audit_middleware import AuditMiddleware
-from app.event_collector_redis_patch import EventCollectorRedis
+from app.security.audit_writer import get_audit_writer
+from app.event_collector_bus_patch import EventCollectorWithBus
+from app.event_bus_select import select_event_bus
 from app.consent_collector import ConsentCollector
 from app.consent_api import consent_router, _issue_pending_token, ConsentRequest as ConsentRequestModel
-from app.event_sse_redis_router import sse_router as events_router
+from app.event_sse_push_router import event_router as bus_events_router
+from app.event_sse_router import event_router as sqlite_events_router, hub as sqlite_hub
+from app.event_hub import EventHub
 from app.rag_preview_router import preview_router
 
 # --- 핵심 인지 기능 임포트 ---
@@ -19,6 +23,7 @@ from app.core.planner_consent_gate import evaluate_consent, Plan
 from app.security.policy import Policy
 from app.memory.bandit import Bandit
 from app.memory.store import DB
+from app.memory.vectorstore import close_vectorstore
 
 # --- [신규] Routine Builder 임포트 ---
 from app.core.routine import load_routine_data
@@ -27,6 +32,9 @@ from app.core import smart_inbox
 
 # --- 환경 설정 ---
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+REDIS_CHANNEL = os.getenv("REDIS_CHANNEL", "aurora.events")
+EVENT_BUS_MODE = os.getenv("EVENT_BUS", "auto") # auto | redis | inproc
+EVENT_STREAM_SOURCE = os.getenv("EVENT_STREAM", "bus") # bus | sqlite (공유 체인지 피드 폴링)
 POLICY_PATH = os.getenv("POLICY_PATH", "data/policy.json")
 AUDIT_LOG_PATH = os.getenv("AUDIT_LOG_PATH", "data/audit.log")
 METRICS_DB_PATH = os.getenv("METRICS_DB_PATH", "data/metrics.db")
@@ -62,22 +70,34 @@ db = DB(METRICS_DB_PATH)
 # --- 고급 서비스 및 미들웨어 로드 ---
 app.add_middleware(AuditMiddleware, log_path=AUDIT_LOG_PATH)
 
-collector = EventCollectorRedis(METRICS_DB_PATH, redis_url=REDIS_URL)
+# 버스는 startup 훅에서 선택됩니다 (auto: Redis 프로브 실패 시 in-proc으로 강등)
+collector = EventCollectorWithBus(METRICS_DB_PATH)
 consent_collector = ConsentCollector(METRICS_DB_PATH)
 app.state.collector = collector
 app.state.consent = consent_collector
 app.state.policy = policy
 app.state.bandit = bandit
+app.state.audit_writer = get_audit_writer(AUDIT_LOG_PATH)
 
 # --- 라우터 마운트 ---
 app.include_router(dash_router, prefix="/dash")
 app.include_router(consent_router, prefix="/consent")
+events_router = sqlite_events_router if EVENT_STREAM_SOURCE == "sqlite" else bus_events_router
 app.include_router(events_router,  prefix="/events")
 app.include_router(preview_router)
 
 # --- FastAPI 라이프사이클 이벤트 ---
 @app.on_event("startup")
 async def _boot():
+    bus = await select_event_bus(EVENT_BUS_MODE, REDIS_URL, REDIS_CHANNEL)
+    app.state.bus = bus
+    collector.set_bus(bus)
+    # 워커당 하나의 팬아웃 허브 (리플레이 버퍼를 채우기 위해 구독자 없이도 유지)
+    if EVENT_STREAM_SOURCE == "sqlite":
+        app.state.event_hub = sqlite_hub
+    else:
+        app.state.event_hub = EventHub(bus.subscribe, name=bus.name)
+    app.state.event_hub.start()
     await collector.start()
     await consent_collector.start()
 
@@ -85,6 +105,10 @@ async def _boot():
 async def _stop():
     await consent_collector.stop()
     await collector.stop()
+    await app.state.event_hub.stop()
+    await app.state.bus.close()
+    await close_vectorstore()  # 남은 WAL 변경을 FAISS 스냅샷으로 저장
+    await app.state.audit_writer.stop()
 
 # --- 핵심 인지 API 엔드포인트 ---
 
@@ -0,0 +1,248 @@
+# app/memory/ann_index.py
+# FAISS 인덱스 종류 선택 / 학습 / 검색 파라미터
+# - flat : IndexFlatL2, 정확한 전수 검색 (작은 인덱스에 적합, 비용이 ntotal에 선형)
+# - ivf  : IndexIVFFlat, k-means(nlist)로 학습 후 nprobe개 리스트만 검색 (근사)
+# - hnsw : IndexHNSWFlat, 그래프 탐색 (학습 불필요, efSearch로 recall/지연 조절)
+# VectorStore는 flat으로 시작해 ntotal이 VECTOR_ANN_THRESHOLD를 넘으면 VECTOR_INDEX 종류로 승격합니다.
+# VectorStore의 인덱스는 항상 IndexIDMap2로 감쌉니다 (문서 단위 upsert/delete를 위한 안정적인 ID).
+# 압축 (VECTOR_COMPRESSION, 승격/압축 재빌드 때 적용 — 384차원 기준 벡터당 바이트):
+# - none : float32 원본 (1536 B)
+# - fp16 : 스칼라 양자화 float16 (768 B, recall 손실 거의 없음, 학습 불필요)
+# - sq8  : 스칼라 양자화 int8 (384 B, 차원별 min/max 학습)
+# - pq   : 곱 양자화 VECTOR_PQ_M개 서브벡터 × VECTOR_PQ_NBITS (기본 48 B, 학습 필요, 손실 큼 → 재순위 권장)
+# 압축 인덱스는 상위 후보를 원본 벡터로 다시 정렬할 수 있습니다 (rerank, VectorStore의 VECTOR_RERANK).
+# 설정 검증: python scripts/bench_vector_index.py
+
+import math
+import os
+from typing import Callable, Optional
+
+import numpy as np
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+VECTOR_INDEX = os.getenv("VECTOR_INDEX", "ivf").lower()                 # flat | ivf | hnsw (승격 대상)
+VECTOR_ANN_THRESHOLD = int(os.getenv("VECTOR_ANN_THRESHOLD", "20000"))   # 이 개수를 넘으면 flat → ANN
+VECTOR_IVF_NLIST = int(os.getenv("VECTOR_IVF_NLIST", "0"))              # 0 = 4*sqrt(n) 자동
+VECTOR_IVF_NPROBE = int(os.getenv("VECTOR_IVF_NPROBE", "16"))
+VECTOR_IVF_TRAIN_MAX = int(os.getenv("VECTOR_IVF_TRAIN_MAX", "100000"))  # 학습 샘플 상한
+VECTOR_HNSW_M = int(os.getenv("VECTOR_HNSW_M", "32"))
+VECTOR_HNSW_EF_CONSTRUCTION = int(os.getenv("VECTOR_HNSW_EF_CONSTRUCTION", "80"))
+VECTOR_HNSW_EF_SEARCH = int(os.getenv("VECTOR_HNSW_EF_SEARCH", "64"))
+VECTOR_COMPRESSION = os.getenv("VECTOR_COMPRESSION", "none").lower()   # none | fp16 | sq8 | pq
+VECTOR_PQ_M = int(os.getenv("VECTOR_PQ_M", "0"))                        # 0 = dim/8 (384 → 48 B/벡터)
+VECTOR_PQ_NBITS = int(os.getenv("VECTOR_PQ_NBITS", "8"))
+
+INDEX_KINDS = ("flat", "ivf", "hnsw")
+COMPRESSIONS = ("none", "fp16", "sq8", "pq")
+
+def base_index(index):
+    """IndexIDMap(2)이면 내부 인덱스, 아니면 그대로"""
+    return faiss.downcast_index(index.index) if hasattr(index, "id_map") else index
+
+def index_kind(index) -> str:
+    """인덱스 객체의 종류 (flat/ivf/hnsw/기타 클래스명)"""
+    base = base_index(index)
+    if isinstance(base, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(base, faiss.IndexIVF):
+        return "ivf"
+    if isinstance(base, (faiss.IndexFlat, faiss.IndexScalarQuantizer, faiss.IndexPQ)):
+        return "flat"
+    return type(base).__name__
+
+def _sq_name(qtype: int) -> str:
+    if qtype == faiss.ScalarQuantizer.QT_fp16:
+        return "fp16"
+    if qtype == faiss.ScalarQuantizer.QT_8bit:
+        return "sq8"
+    return f"sq{qtype}"
+
+def compression_of(index) -> str:
+    """인덱스가 벡터를 저장하는 형식 (none/fp16/sq8/pq)"""
+    base = base_index(index)
+    if isinstance(base, faiss.IndexHNSW):
+        base = faiss.downcast_index(base.storage)
+    if isinstance(base, (faiss.IndexPQ, faiss.IndexIVFPQ)):
+        return "pq"
+    if isinstance(base, (faiss.IndexScalarQuantizer, faiss.IndexIVFScalarQuantizer)):
+        return _sq_name(base.sq.qtype)
+    return "none"
+
+def pq_m(dim: int) -> int:
+    """PQ 서브벡터 수 (dim의 약수여야 함)"""
+    m = VECTOR_PQ_M or max(1, dim // 8)
+    while dim % m:
+        m -= 1
+    return m
+
+def ivf_nlist(n: int) -> int:
+    """벡터 n개에 대한 IVF 리스트 수 (리스트당 학습 샘플이 최소 39개가 되도록 제한)"""
+    if VECTOR_IVF_NLIST > 0:
+        nlist = VECTOR_IVF_NLIST
+    else:
+        nlist = int(4 * math.sqrt(max(n, 1)))
+    return max(1, min(nlist, n // 39 or 1))
+
+def set_search_params(index, nprobe: Optional[int] = None, ef_search: Optional[int] = None):
+    """로드/빌드된 인덱스에 검색 파라미터 적용 (파일에는 저장되지 않는 값)"""
+    kind = index_kind(index)
+    if kind == "ivf":
+        faiss.extract_index_ivf(index).nprobe = nprobe or VECTOR_IVF_NPROBE
+    elif kind == "hnsw":
+        base_index(index).hnsw.efSearch = ef_search or VECTOR_HNSW_EF_SEARCH
+    return index
+
+def search_params(index, exclude: Optional[np.ndarray] = None):
+    """
+    exclude(삭제 표시된 ID)를 건너뛰는 검색 파라미터. 없으면 None (인덱스 기본값 사용)
+    제외는 검색 중에 적용되므로 top-k 자리를 낭비하지 않습니다. (IndexIDMap은 외부 ID로 변환해 적용)
+    """
+    if exclude is None or len(exclude) == 0:
+        return None
+    sel = faiss.IDSelectorNot(faiss.IDSelectorBatch(np.ascontiguousarray(exclude, dtype="int64")))
+    kind = index_kind(index)
+    if kind == "ivf":
+        return faiss.SearchParametersIVF(sel=sel, nprobe=faiss.extract_index_ivf(index).nprobe)
+    if kind == "hnsw":
+        return faiss.SearchParametersHNSW(sel=sel, efSearch=base_index(index).hnsw.efSearch)
+    return faiss.SearchParameters(sel=sel)
+
+def new_index(kind: str, dim: int, nlist: int = 1, compression: str = "none"):
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression: {compression} (expected one of {COMPRESSIONS})")
+    qtype = faiss.ScalarQuantizer.QT_fp16 if compression == "fp16" else faiss.ScalarQuantizer.QT_8bit
+    if kind == "flat":
+        if compression == "pq":
+            return faiss.IndexPQ(dim, pq_m(dim), VECTOR_PQ_NBITS, faiss.METRIC_L2)
+        if compression != "none":
+            return faiss.IndexScalarQuantizer(dim, qtype, faiss.METRIC_L2)
+        return faiss.IndexFlatL2(dim)
+    if kind == "ivf":
+        quantizer = faiss.IndexFlatL2(dim)
+        if compression == "pq":
+            return faiss.IndexIVFPQ(quantizer, dim, nlist, pq_m(dim), VECTOR_PQ_NBITS)
+        if compression != "none":
+            return faiss.IndexIVFScalarQuantizer(quantizer, dim, nlist, qtype, faiss.METRIC_L2)
+        return faiss.IndexIVFFlat(quantizer, dim, nlist, faiss.METRIC_L2)
+    if kind == "hnsw":
+        if compression == "pq":
+            index = faiss.IndexHNSWPQ(dim, pq_m(dim), VECTOR_HNSW_M)
+        elif compression != "none":
+            index = faiss.IndexHNSWSQ(dim, qtype, VECTOR_HNSW_M)
+        else:
+            index = faiss.IndexHNSWFlat(dim, VECTOR_HNSW_M)
+        index.hnsw.efConstruction = VECTOR_HNSW_EF_CONSTRUCTION
+        return index
+    raise ValueError(f"Unknown index kind: {kind} (expected one of {INDEX_KINDS})")
+
+def build_index(kind: str, vectors: np.ndarray, ids: Optional[np.ndarray] = None,
+                nlist: Optional[int] = None, seed: int = 1234, compression: str = "none"):
+    """
+    벡터 전체로 새 인덱스를 만들고 (필요하면 학습 후) 추가합니다.
+    ids를 주면 IndexIDMap2로 감싸 같은 ID로 추가합니다 (doc_id_map 키 유지).
+    CPU를 오래 쓰므로 이벤트 루프가 아닌 스레드에서 호출하세요.
+    """
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    n, dim = vectors.shape
+    if compression == "pq" and n < (1 << VECTOR_PQ_NBITS):
+        # PQ 코드북(2^nbits 중심) 학습에 벡터가 부족하면 int8로
+        print(f"[ANN WARN] {n} vectors are too few to train PQ. Using 'sq8' instead.")
+        compression = "sq8"
+    index = new_index(kind, dim, nlist or ivf_nlist(n), compression)
+    if not index.is_trained:
+        sample = vectors
+        if n > VECTOR_IVF_TRAIN_MAX:
+            rng = np.random.default_rng(seed)
+            sample = vectors[rng.choice(n, VECTOR_IVF_TRAIN_MAX, replace=False)]
+        index.train(sample)
+    if ids is not None:
+        index = faiss.IndexIDMap2(index)
+        if n:
+            index.add_with_ids(vectors, np.ascontiguousarray(ids, dtype="int64"))
+    elif n:
+        index.add(vectors)
+    return set_search_params(index)
+
+def with_ids(index):
+    """
+    ID 매핑이 없는 이전 형식 인덱스를 IndexIDMap2로 변환 (기존 순번을 ID로 사용)
+    비어 있으면 새 flat 인덱스를 감싸고, 벡터가 있으면 같은 종류로 다시 빌드합니다.
+    """
+    if hasattr(index, "id_map"):
+        return index
+    if index.ntotal == 0:
+        return faiss.IndexIDMap2(faiss.IndexFlatL2(index.d))
+    kind = index_kind(index)
+    print(f"[ANN] Converting legacy '{kind}' index ({index.ntotal}) to IndexIDMap2.")
+    return build_index(kind if kind in INDEX_KINDS else "flat", all_vectors(index),
+                       ids=np.arange(index.ntotal, dtype="int64"))
+
+def all_vectors(index, start: int = 0) -> np.ndarray:
+    """인덱스에 저장된 벡터를 추가 순서대로 복원 (flat/hnsw 직접, ivf는 direct map 생성 후)"""
+    base = base_index(index)
+    if base.ntotal <= start:
+        return np.zeros((0, index.d), dtype="float32")
+    if index_kind(base) == "ivf":
+        ivf = faiss.extract_index_ivf(base)
+        if ivf.direct_map.type == faiss.DirectMap.NoMap:
+            ivf.make_direct_map()
+    return base.reconstruct_n(start, base.ntotal - start)
+
+def id_vectors(index, start: int = 0):
+    """(ids, vectors) — 추가 순서 기준 start번째부터. ID 매핑이 없으면 순번이 ID"""
+    vectors = all_vectors(index, start)
+    if hasattr(index, "id_map"):
+        ids = faiss.vector_to_array(index.id_map)[start:]
+    else:
+        ids = np.arange(start, index.ntotal, dtype="int64")
+    return ids, vectors
+
+def promotion_target(index, target: str = VECTOR_INDEX, threshold: int = VECTOR_ANN_THRESHOLD,
+                     compression: str = VECTOR_COMPRESSION) -> Optional[str]:
+    """
+    재빌드할 인덱스 종류 (필요 없으면 None)
+    ntotal이 threshold 이상일 때: flat → target 승격, 또는 저장 형식이 compression과 다르면 같은 종류로 재빌드
+    """
+    if index.ntotal < max(1, threshold):
+        return None
+    kind = index_kind(index)
+    if target != "flat" and kind == "flat":
+        return target
+    if compression_of(index) != compression:
+        return kind if kind in INDEX_KINDS else target
+    return None
+
+def should_promote(index, target: str = VECTOR_INDEX, threshold: int = VECTOR_ANN_THRESHOLD,
+                   compression: str = VECTOR_COMPRESSION) -> bool:
+    return promotion_target(index, target, threshold, compression) is not None
+
+def rerank(query_vectors: np.ndarray, distances: np.ndarray, ids: np.ndarray,
+           fetch: Callable[[np.ndarray], np.ndarray], k: int):
+    """
+    압축 인덱스의 후보(distances, ids: (nq, k')를 원본 벡터로 정확한 L2 거리를 다시 계산해 상위 k만 남깁니다.
+    fetch(ids) → (len(ids), dim) 원본 벡터 (없는 행은 0 벡터 → 근사 거리 유지)
+    """
+    flat = ids[ids >= 0]
+    vecs = fetch(flat) if len(flat) else np.zeros((0, query_vectors.shape[1]), dtype="float32")
+    exact = {int(i): v for i, v in zip(flat, vecs) if v.any()}
+    out_d = np.full((len(ids), k), np.inf, dtype="float32")
+    out_i = np.full((len(ids), k), -1, dtype="int64")
+    for row, q in enumerate(query_vectors):
+        cand = [(float(((exact[int(i)] - q) ** 2).sum()) if int(i) in exact else float(d), int(i))
+                for d, i in zip(distances[row], ids[row]) if i >= 0]
+        cand.sort()
+        for j, (d, i) in enumerate(cand[:k]):
+            out_d[row, j], out_i[row, j] = d, i
+    return out_d, out_i
+
+def merge_results(distances: np.ndarray, ids: np.ndarray, more_d: np.ndarray, more_i: np.ndarray, k: int):
+    """두 인덱스(예: 매핑된 스냅샷 + 메모리 델타)의 검색 결과를 L2 거리순으로 합쳐 상위 k (빈 자리는 -1)"""
+    d = np.concatenate([distances, more_d], axis=1)
+    i = np.concatenate([ids, more_i], axis=1)
+    d = np.where(i >= 0, d, np.inf)
+    order = np.argsort(d, axis=1, kind="stable")[:, :k]
+    return np.take_along_axis(d, order, axis=1), np.take_along_axis(i, order, axis=1)
@@ -0,0 +1,84 @@
+# app/memory/chunker.py
+# 토큰 기준 겹침(overlap) 청크 분할
+# - 임베딩 모델의 토크나이저(tokenizer.json)가 있으면 그 토큰 오프셋으로, 없으면 단어/문장부호 근사로 셉니다.
+# - CHUNK_TOKENS 토큰 창을 (CHUNK_TOKENS - CHUNK_OVERLAP) 간격으로 밀고,
+#   창의 뒤쪽 40% 안에 문단/문장 경계가 있으면 그 경계에서 자릅니다.
+# - 각 청크는 원문 문자 오프셋(start, end)을 함께 가집니다 (RAG 미리보기/하이라이트용).
+
+import os
+import re
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from app.memory.local_embedder import EMBED_TOKENIZER_PATH, Tokenizer
+
+CHUNK_TOKENS = int(os.getenv("CHUNK_TOKENS", "256"))    # e5-small 최대 512 토큰의 절반
+CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "32"))
+
+_APPROX_TOKEN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+_BOUNDARY = re.compile(r"\n\s*\n|[.!?。！？]\s|\n")
+
+Span = Tuple[int, int]
+
+@dataclass
+class Chunk:
+    idx: int
+    text: str
+    start: int
+    end: int
+    tokens: int
+
+def _approx_spans(text: str) -> List[Span]:
+    return [m.span() for m in _APPROX_TOKEN.finditer(text)]
+
+_token_spans: Optional[Callable[[str], List[Span]]] = None
+
+def token_spans(text: str) -> List[Span]:
+    """토큰별 (start, end) 문자 오프셋"""
+    global _token_spans
+    if _token_spans is None:
+        _token_spans = _approx_spans
+        if Tokenizer is not None and os.path.exists(EMBED_TOKENIZER_PATH):
+            try:
+                tok = Tokenizer.from_file(EMBED_TOKENIZER_PATH)
+                tok.no_truncation()
+                tok.no_padding()
+                _token_spans = lambda t: [s for s in tok.encode(t, add_special_tokens=False).offsets if s[1] > s[0]]
+            except Exception as e:
+                print(f"[Chunker WARN] Failed to load tokenizer ({e}). Using approximate token counts.")
+    return _token_spans(text)
+
+def _snap_end(text: str, lo: int, hi: int) -> int:
+    """[lo, hi) 안의 마지막 문단/문장 경계 (없으면 hi)"""
+    best = hi
+    for m in _BOUNDARY.finditer(text, lo, hi):
+        best = m.end()
+    return best
+
+def chunk_text(text: str, max_tokens: int = CHUNK_TOKENS, overlap: int = CHUNK_OVERLAP) -> List[Chunk]:
+    text = text or ""
+    spans = token_spans(text)
+    if not spans:
+        return []
+    max_tokens = max(8, max_tokens)
+    overlap = max(0, min(overlap, max_tokens // 2))
+    if len(spans) <= max_tokens:
+        return [Chunk(0, text.strip(), spans[0][0], spans[-1][1], len(spans))]
+
+    chunks: List[Chunk] = []
+    i = 0
+    while i < len(spans):
+        j = min(i + max_tokens, len(spans))
+        start, end = spans[i][0], spans[j - 1][1]
+        if j < len(spans):
+            # 창의 뒤쪽 40%에서 경계를 찾고, 그 경계까지의 토큰 수로 j를 줄임
+            snap = _snap_end(text, spans[i + int(max_tokens * 0.6)][0], end)
+            if snap < end:
+                while j > i + 1 and spans[j - 1][1] > snap:
+                    j -= 1
+                end = spans[j - 1][1]
+        chunks.append(Chunk(len(chunks), text[start:end].strip(), start, end, j - i))
+        if j >= len(spans):
+            break
+        i = max(j - overlap, i + 1)
+    return chunks
@@ -0,0 +1,159 @@
+# app/memory/embedding_cache.py
+# 콘텐츠 주소 기반 임베딩 캐시
+# - 키: (모델 URI, sha256(정규화된 텍스트))  → 같은 텍스트는 모델이 같으면 다시 임베딩하지 않습니다.
+#   (반복되는 RAG 쿼리, 다시 저장된 노트, 동일한 메일 본문 등)
+# - 1차: 메모리 LRU (EMBED_CACHE_LRU개), 2차: SQLite BLOB 테이블 (EMBED_CACHE_DB, float32 원본 바이트)
+# - 적중률 지표는 metrics()로 노출됩니다 (GET /dash/pipeline)
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+EMBED_CACHE_ENABLED = os.getenv("EMBED_CACHE", "1") != "0"
+EMBED_CACHE_DB = os.getenv("EMBED_CACHE_DB", "data/embeddings/embed_cache.db")
+EMBED_CACHE_LRU = int(os.getenv("EMBED_CACHE_LRU", "10000"))
+
+_WS = re.compile(r"\s+")
+_SQL_BATCH = 500  # IN (...) 파라미터 수 제한
+
+def normalize_text(text: str) -> str:
+    """유니코드 NFC + 공백 정리 (의미가 같은 입력이 같은 키를 갖도록)"""
+    return _WS.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+def cache_key(model: str, text: str) -> bytes:
+    h = hashlib.sha256()
+    h.update(model.encode("utf-8"))
+    h.update(b"\x00")
+    h.update(normalize_text(text).encode("utf-8"))
+    return h.digest()
+
+class EmbeddingCache:
+    def __init__(self, db_path: Optional[str] = EMBED_CACHE_DB, lru_size: int = EMBED_CACHE_LRU):
+        self.lru_size = max(0, lru_size)
+        self._lru: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.hits_mem = 0
+        self.hits_disk = 0
+        self.misses = 0
+        self.puts = 0
+        if db_path:
+            try:
+                Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+                self._conn = sqlite3.connect(db_path, check_same_thread=False)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS embedding_cache ("
+                    " key BLOB PRIMARY KEY, model TEXT NOT NULL, dim INTEGER NOT NULL,"
+                    " vec BLOB NOT NULL, created_at REAL NOT NULL)"
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"[EmbedCache ERROR] Failed to open {db_path}: {e}. Using memory tier only.")
+                self._conn = None
+
+    # ------------- public API (동기, 디스크 접근이 있으므로 루프에서는 to_thread로 호출) -------------
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        keys = [cache_key(model, t) for t in texts]
+        out: List[Optional[np.ndarray]] = [None] * len(keys)
+        missing: Dict[bytes, List[int]] = {}
+        with self._lock:
+            for i, k in enumerate(keys):
+                vec = self._lru.get(k)
+                if vec is not None:
+                    self._lru.move_to_end(k)
+                    out[i] = vec
+                    self.hits_mem += 1
+                else:
+                    missing.setdefault(k, []).append(i)
+            if missing and self._conn is not None:
+                found = self._select(list(missing))
+                for k, vec in found.items():
+                    for i in missing.pop(k):
+                        out[i] = vec
+                        self.hits_disk += 1
+                    self._remember(k, vec)
+            self.misses += sum(len(v) for v in missing.values())
+        return out
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[np.ndarray]):
+        rows = []
+        now = time.time()
+        with self._lock:
+            for text, vec in zip(texts, vectors):
+                k = cache_key(model, text)
+                vec = np.asarray(vec, dtype="float32")
+                self._remember(k, vec)
+                rows.append((k, model, int(vec.shape[-1]), vec.tobytes(), now))
+            self.puts += len(rows)
+            if rows and self._conn is not None:
+                try:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO embedding_cache (key, model, dim, vec, created_at)"
+                        " VALUES (?, ?, ?, ?, ?)", rows)
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    print(f"[EmbedCache ERROR] Failed to persist {len(rows)} embeddings: {e}")
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.hits_mem + self.hits_disk + self.misses
+        return {
+            "lookups": lookups,
+            "hits_mem": self.hits_mem,
+            "hits_disk": self.hits_disk,
+            "misses": self.misses,
+            "hit_rate": round((self.hits_mem + self.hits_disk) / lookups, 4) if lookups else 0.0,
+            "puts": self.puts,
+            "lru_entries": len(self._lru),
+        }
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # ------------- internals -------------
+    def _remember(self, key: bytes, vec: np.ndarray):
+        if self.lru_size == 0:
+            return
+        self._lru[key] = vec
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def _select(self, keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        found = {}
+        try:
+            for i in range(0, len(keys), _SQL_BATCH):
+                chunk = keys[i:i + _SQL_BATCH]
+                q = "SELECT key, vec FROM embedding_cache WHERE key IN (%s)" % ",".join("?" * len(chunk))
+                for k, blob in self._conn.execute(q, chunk):
+                    found[bytes(k)] = np.frombuffer(blob, dtype="float32").copy()
+        except sqlite3.Error as e:
+            print(f"[EmbedCache ERROR] Lookup failed: {e}")
+        return found
+
+# --- 싱글톤 인스턴스 ---
+_cache_instance: Optional[EmbeddingCache] = None
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """EMBED_CACHE=0이면 None"""
+    global _cache_instance
+    if not EMBED_CACHE_ENABLED:
+        return None
+    if _cache_instance is None:
+        _cache_instance = EmbeddingCache()
+    return _cache_instance
+
+def cache_metrics() -> Dict[str, Any]:
+    return _cache_instance.metrics() if _cache_instance else {}
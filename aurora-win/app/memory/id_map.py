@@ -0,0 +1,158 @@
+# app/memory/id_map.py
+# FAISS ID → "doc_id:chunk_idx" 매핑 (SQLite, 필요할 때만 조회)
+# - 이전: '<index>.map.json' 전체를 시작 시 파싱해 파이썬 dict로 보관 (워커마다 사본, 스냅샷마다 전체 재작성)
+# - 현재: '<index>.map.db' (id INTEGER PRIMARY KEY → key, doc, dead) 에서 검색 결과 ID만 조회
+#   새 매핑/삭제 표시는 메모리(pending)에 두었다가 인덱스 스냅샷 때 한 번에 커밋합니다 (VectorStore.snapshot)
+# - 문서 단위 upsert/delete: doc 컬럼으로 문서의 현재 ID를 찾고, 지운 ID는 dead=1 (압축 때 purge)
+# - meta 테이블: 스냅샷 시점의 WAL 세대(wal_gen)와 다음 ID(next_id)
+# - 기존 map.json이 있으면 처음 열 때 한 번 가져오고 '.bak'으로 이름을 바꿉니다.
+
+import json
+import sqlite3
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+_SQL_BATCH = 500  # IN (...) 파라미터 수 제한
+
+def doc_of(key: str) -> str:
+    """'note:12:0' → 'note:12' (doc_id 자체에 ':'가 있으므로 마지막 ':' 기준)"""
+    return key.rsplit(":", 1)[0]
+
+class IdMap(Mapping):
+    def __init__(self, db_path: str, legacy_json: Optional[str] = None):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS id_map ("
+            " id INTEGER PRIMARY KEY, key TEXT NOT NULL, doc TEXT, dead INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v TEXT NOT NULL)")
+        self._migrate()
+        self._conn.execute("CREATE INDEX IF NOT EXISTS id_map_doc ON id_map (doc)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS id_map_dead ON id_map (dead) WHERE dead = 1")
+        self._conn.commit()
+        # 아직 커밋되지 않은 변경 (다음 스냅샷에서 commit): key=살아있음, None=삭제 표시
+        self.pending: Dict[int, Optional[str]] = {}
+        self.purged: Set[int] = set()  # 압축으로 인덱스에서 빠진 ID (행 삭제)
+        if legacy_json and Path(legacy_json).exists():
+            self._import_json(Path(legacy_json))
+
+    def _migrate(self):
+        cols = {r[1] for r in self._conn.execute("PRAGMA table_info(id_map)")}
+        if "doc" not in cols:
+            self._conn.execute("ALTER TABLE id_map ADD COLUMN doc TEXT")
+            self._conn.execute("ALTER TABLE id_map ADD COLUMN dead INTEGER NOT NULL DEFAULT 0")
+            rows = self._conn.execute("SELECT id, key FROM id_map").fetchall()
+            self._conn.executemany("UPDATE id_map SET doc = ? WHERE id = ?", [(doc_of(k), i) for i, k in rows])
+
+    def _import_json(self, path: Path):
+        try:
+            data = json.loads(path.read_text("utf-8"))
+            self.commit({int(k): v for k, v in data.items()})
+            path.replace(path.with_name(path.name + ".bak"))
+            print(f"[IdMap] Imported {len(data)} ID mappings from {path}.")
+        except Exception as e:
+            print(f"[IdMap ERROR] Failed to import {path}: {e}")
+
+    # ------------- 조회 -------------
+    def _select(self, sql: str, ids: List[int]):
+        out = []
+        for s in range(0, len(ids), _SQL_BATCH):
+            chunk = ids[s:s + _SQL_BATCH]
+            out.extend(self._conn.execute(sql % ",".join("?" * len(chunk)), chunk).fetchall())
+        return out
+
+    def get_many(self, ids: Iterable[int]) -> Dict[int, str]:
+        """살아있는 ID만 반환 (삭제 표시된 ID는 제외)"""
+        ids = [int(i) for i in ids]
+        found = {i: self.pending[i] for i in ids if self.pending.get(i) is not None}
+        rest = [i for i in ids if i not in self.pending]
+        with self._lock:
+            found.update(self._select("SELECT id, key FROM id_map WHERE dead = 0 AND id IN (%s)", rest))
+        return found
+
+    def ids_for_doc(self, doc_id: str) -> List[int]:
+        """문서의 현재(살아있는) ID 목록"""
+        with self._lock:
+            stored = [r[0] for r in self._conn.execute("SELECT id FROM id_map WHERE doc = ? AND dead = 0", (doc_id,))]
+        ids = {i for i in stored if i not in self.pending}
+        ids.update(i for i, k in self.pending.items() if k is not None and doc_of(k) == doc_id)
+        return sorted(ids)
+
+    def dead_ids(self) -> Set[int]:
+        """삭제 표시되었지만 아직 인덱스에서 압축되지 않은 ID"""
+        with self._lock:
+            dead = {r[0] for r in self._conn.execute("SELECT id FROM id_map WHERE dead = 1")}
+        dead.update(i for i, k in self.pending.items() if k is None)
+        dead.difference_update(i for i, k in self.pending.items() if k is not None)
+        return dead - self.purged
+
+    def get_meta(self, key: str, default: int = 0) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT v FROM meta WHERE k = ?", (key,)).fetchone()
+        return int(row[0]) if row else default
+
+    def __getitem__(self, faiss_id: int) -> str:
+        found = self.get_many([faiss_id])
+        if not found:
+            raise KeyError(faiss_id)
+        return found[int(faiss_id)]
+
+    def __iter__(self) -> Iterator[int]:
+        with self._lock:
+            stored = {r[0] for r in self._conn.execute("SELECT id FROM id_map WHERE dead = 0")}
+        stored.difference_update(self.pending)
+        stored.update(i for i, k in self.pending.items() if k is not None)
+        yield from sorted(stored)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    # ------------- 쓰기 -------------
+    def __setitem__(self, faiss_id: int, key: str):
+        self.pending[int(faiss_id)] = key
+
+    def mark_dead(self, ids: Iterable[int]):
+        for i in ids:
+            self.pending[int(i)] = None
+
+    def purge(self, ids: Iterable[int]):
+        self.purged.update(int(i) for i in ids)
+
+    def commit(self, rows: Dict[int, Optional[str]], purged: Iterable[int] = (), meta: Optional[Dict[str, int]] = None):
+        """rows/purged/meta를 한 트랜잭션으로 DB에 커밋 (스레드에서 호출 가능, pending은 건드리지 않음)"""
+        live = [(i, k, doc_of(k)) for i, k in rows.items() if k is not None]
+        dead = [(i,) for i, k in rows.items() if k is None]
+        purged = [(i,) for i in purged]
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO id_map (id, key, doc, dead) VALUES (?, ?, ?, 0)", live)
+                self._conn.executemany(
+                    "INSERT INTO id_map (id, key, doc, dead) VALUES (?, '', NULL, 1)"
+                    " ON CONFLICT(id) DO UPDATE SET dead = 1", dead)
+                self._conn.executemany("DELETE FROM id_map WHERE id = ?", purged)
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO meta (k, v) VALUES (?, ?)", [(k, str(v)) for k, v in (meta or {}).items()])
+
+    def forget(self, rows: Dict[int, Optional[str]], purged: Iterable[int] = ()):
+        """커밋된 항목 중 그 사이 바뀌지 않은 것을 pending/purged에서 제거 (루프 스레드)"""
+        for i, key in rows.items():
+            if i in self.pending and self.pending[i] == key:
+                del self.pending[i]
+        self.purged.difference_update(purged)
+
+    def flush(self, meta: Optional[Dict[str, int]] = None):
+        rows, purged = dict(self.pending), set(self.purged)
+        self.commit(rows, purged, meta)
+        self.forget(rows, purged)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,335 @@
+# app/memory/ingest.py
+# RAG 인제스트 파이프라인: 소스 리더 → 청커 → 배치 임베더 → 인덱스 기록
+# - 리더: notes 테이블 / data/files / data/mail(.eml) / data/rag/*.txt  (스레드에서 순회)
+# - 청커: app/memory/chunker.py (토큰 기준 겹침 분할), 내용 해시가 같으면 건너뜀 (INGEST_STATE_DB)
+# - 임베더: 여러 문서의 청크를 INGEST_BATCH개씩 묶어 get_embeddings(strict) 호출 (INGEST_EMBED_WORKERS개 동시)
+# - 기록: VectorStore.upsert_vectors (문서 단위 대체, BM25 역색인 포함), 상태 DB에 해시 기록
+# 단계 사이는 크기 제한 큐로 연결되어, 느린 단계(보통 임베딩)가 앞 단계를 자연스럽게 멈춥니다.
+# 일괄 백필: python scripts/rag_backfill.py
+
+import asyncio
+import email
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from email import policy as email_policy
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from app.memory.chunker import Chunk, chunk_text
+from app.router.model_runner import EMBED_BATCH_SIZE
+
+INGEST_STATE_DB = os.getenv("INGEST_STATE_DB", "data/embeddings/ingest_state.db")
+INGEST_QUEUE = int(os.getenv("INGEST_QUEUE", "256"))             # 청커 앞에 대기할 수 있는 문서 수
+INGEST_BATCH = int(os.getenv("INGEST_BATCH", str(EMBED_BATCH_SIZE)))
+INGEST_EMBED_WORKERS = int(os.getenv("INGEST_EMBED_WORKERS", "2"))
+
+METRICS_DB_PATH = os.getenv("METRICS_DB_PATH", "data/metrics.db")
+FILES_ROOT = Path(os.getenv("FILES_ROOT", "data/files"))
+MAIL_ROOT = Path(os.getenv("MAIL_ROOT", "data/mail"))
+RAG_DOC_ROOT = Path(os.getenv("RAG_DOC_ROOT", "data/rag"))
+FILE_SUFFIXES = (".txt", ".md", ".markdown", ".csv", ".json", ".log", ".html", ".htm", ".rst")
+MAX_FILE_BYTES = int(os.getenv("INGEST_MAX_FILE_BYTES", str(8 * 1024 * 1024)))
+
+SOURCES = ("notes", "files", "mail", "rag")
+
+@dataclass
+class SourceDoc:
+    doc_id: str      # 예: "note:12", "file:reports/q3.md", "mail:inbox/123", "rag:manual"
+    source: str
+    text: str
+
+# ------------- 리더 (동기 제너레이터, 스레드에서 실행) -------------
+def read_notes(db_path: str = METRICS_DB_PATH) -> Iterator[SourceDoc]:
+    if not Path(db_path).exists():
+        return
+    conn = sqlite3.connect(db_path)
+    try:
+        for note_id, title, body in conn.execute("SELECT id, title, body FROM notes ORDER BY id"):
+            yield SourceDoc(f"note:{note_id}", "notes", note_text(title, body))
+    except sqlite3.Error as e:
+        print(f"[Ingest ERROR] Failed to read notes: {e}")
+    finally:
+        conn.close()
+
+def note_text(title: Optional[str], body: Optional[str]) -> str:
+    return f"{title}\n\n{body or ''}" if title else (body or "")
+
+def _read_text(path: Path) -> Optional[str]:
+    try:
+        if path.stat().st_size > MAX_FILE_BYTES:
+            print(f"[Ingest WARN] Skipping {path} (> {MAX_FILE_BYTES} bytes)")
+            return None
+        return path.read_text("utf-8", errors="ignore")
+    except OSError as e:
+        print(f"[Ingest ERROR] Failed to read {path}: {e}")
+        return None
+
+def read_files(root: Path = FILES_ROOT) -> Iterator[SourceDoc]:
+    if not root.exists():
+        return
+    for path in sorted(root.rglob("*")):
+        if path.is_file() and path.suffix.lower() in FILE_SUFFIXES:
+            text = _read_text(path)
+            if text is not None:
+                yield SourceDoc(f"file:{path.relative_to(root).as_posix()}", "files", text)
+
+def mail_text(raw: bytes) -> str:
+    """헤더(제목/보낸이/받는이) + text/plain 본문"""
+    msg = email.message_from_bytes(raw, policy=email_policy.default)
+    parts = [f"Subject: {msg.get('Subject', '')}", f"From: {msg.get('From', '')}", f"To: {msg.get('To', '')}", ""]
+    try:
+        body = msg.get_body(preferencelist=("plain",))
+        if body is not None:
+            parts.append(body.get_content())
+    except (KeyError, LookupError):
+        pass
+    return "\n".join(parts)
+
+def read_mail(root: Path = MAIL_ROOT) -> Iterator[SourceDoc]:
+    for folder in ("inbox", "sent", "drafts"):
+        d = root / folder
+        if not d.exists():
+            continue
+        for path in sorted(d.glob("*.eml")):
+            try:
+                yield SourceDoc(f"mail:{folder}/{path.stem}", "mail", mail_text(path.read_bytes()))
+            except Exception as e:
+                print(f"[Ingest ERROR] Failed to parse {path}: {e}")
+
+def read_rag(root: Path = RAG_DOC_ROOT) -> Iterator[SourceDoc]:
+    if not root.exists():
+        return
+    for path in sorted(root.glob("*.txt")):
+        text = _read_text(path)
+        if text is not None:
+            yield SourceDoc(f"rag:{path.stem}", "rag", text)
+
+READERS: Dict[str, Callable[[], Iterator[SourceDoc]]] = {
+    "notes": read_notes, "files": read_files, "mail": read_mail, "rag": read_rag,
+}
+
+# ------------- 인제스트 상태 (문서별 내용 해시) -------------
+class IngestState:
+    def __init__(self, db_path: str = INGEST_STATE_DB):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ingest_docs ("
+            " doc_id TEXT PRIMARY KEY, source TEXT NOT NULL, sha TEXT NOT NULL,"
+            " chunks INTEGER NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def sha(self, doc_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT sha FROM ingest_docs WHERE doc_id = ?", (doc_id,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, doc_id: str, source: str, sha: str, chunks: int):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO ingest_docs VALUES (?, ?, ?, ?, ?)",
+                               (doc_id, source, sha, chunks, time.time()))
+            self._conn.commit()
+
+    def remove(self, doc_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM ingest_docs WHERE doc_id = ?", (doc_id,))
+            self._conn.commit()
+
+    def doc_ids(self, source: str) -> Set[str]:
+        with self._lock:
+            return {r[0] for r in self._conn.execute("SELECT doc_id FROM ingest_docs WHERE source = ?", (source,))}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def content_sha(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+# ------------- 파이프라인 -------------
+@dataclass
+class IngestStats:
+    started: float = field(default_factory=time.time)
+    docs: int = 0          # 읽은 문서
+    skipped: int = 0       # 내용 변경 없음
+    chunks: int = 0        # 임베딩 대상 청크
+    tokens: int = 0
+    written: int = 0       # 인덱스에 기록된 문서
+    removed: int = 0       # 비었거나 (prune) 사라진 문서
+    errors: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        elapsed = max(time.time() - self.started, 1e-9)
+        return {
+            "docs": self.docs, "skipped": self.skipped, "chunks": self.chunks, "tokens": self.tokens,
+            "written": self.written, "removed": self.removed, "errors": self.errors,
+            "elapsed_s": round(elapsed, 2),
+            "docs_per_s": round(self.docs / elapsed, 1),
+            "chunks_per_s": round(self.chunks / elapsed, 1),
+        }
+
+# 청크가 준비된 문서: (doc, sha, chunks)
+Prepared = Tuple[SourceDoc, str, List[Chunk]]
+_DONE = object()
+
+class IngestPipeline:
+    def __init__(self, store=None, state: Optional[IngestState] = None, queue_size: int = INGEST_QUEUE,
+                 batch_size: int = INGEST_BATCH, embed_workers: int = INGEST_EMBED_WORKERS, force: bool = False,
+                 progress: Optional[Callable[[Dict[str, Any]], None]] = None, progress_every: float = 2.0):
+        if store is None:
+            from app.memory.vectorstore import get_vectorstore
+            store = get_vectorstore()
+        self.store = store
+        self.state = state or IngestState()
+        self.queue_size = max(1, queue_size)
+        self.batch_size = max(1, batch_size)
+        self.embed_workers = max(1, embed_workers)
+        self.force = force
+        self.progress = progress
+        self.progress_every = progress_every
+        self.stats = IngestStats()
+        self._last_progress = 0.0
+
+    async def ingest(self, docs: List[SourceDoc]) -> Dict[str, Any]:
+        """이미 메모리에 있는 문서 몇 개 (예: 방금 저장된 노트)"""
+        return await self.run([("adhoc", iter(docs))])
+
+    async def run(self, readers: Iterable[Tuple[str, Iterator[SourceDoc]]], prune: bool = False) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        q_docs: asyncio.Queue = asyncio.Queue(self.queue_size)
+        q_embed: asyncio.Queue = asyncio.Queue(self.embed_workers * 2)
+        q_write: asyncio.Queue = asyncio.Queue(self.embed_workers * 2)
+        seen: Dict[str, Set[str]] = {}
+        stop = threading.Event()
+
+        def _read():
+            try:
+                for source, it in readers:
+                    ids = seen.setdefault(source, set())
+                    for doc in it:
+                        if stop.is_set():
+                            return
+                        ids.add(doc.doc_id)
+                        asyncio.run_coroutine_threadsafe(q_docs.put(doc), loop).result()
+            finally:
+                if not stop.is_set():
+                    asyncio.run_coroutine_threadsafe(q_docs.put(_DONE), loop).result()
+
+        reader = loop.run_in_executor(None, _read)
+        embedders = [asyncio.create_task(self._embed(q_embed, q_write)) for _ in range(self.embed_workers)]
+        writer = asyncio.create_task(self._write(q_write))
+        try:
+            await self._chunk(q_docs, q_embed)
+            for _ in embedders:
+                await q_embed.put(_DONE)
+            await asyncio.gather(*embedders)
+            await q_write.put(_DONE)
+            await writer
+            await reader
+        except BaseException:
+            # 리더 스레드가 가득 찬 큐에서 멈추지 않도록 비우고 종료시킴
+            stop.set()
+            for t in embedders + [writer]:
+                t.cancel()
+            while not q_docs.empty():
+                q_docs.get_nowait()
+            raise
+
+        if prune:
+            for source, ids in seen.items():
+                for doc_id in sorted(self.state.doc_ids(source) - ids):
+                    await self._remove(doc_id)
+        self._report(force=True)
+        return self.stats.as_dict()
+
+    # 청커: 변경된 문서만 청크로 나누고, 여러 문서를 batch_size 청크 단위로 묶어 임베더로
+    async def _chunk(self, q_docs: asyncio.Queue, q_embed: asyncio.Queue):
+        batch: List[Prepared] = []
+        pending = 0
+        while True:
+            doc = await q_docs.get()
+            if doc is _DONE:
+                break
+            self.stats.docs += 1
+            sha = content_sha(doc.text)
+            if not self.force and await asyncio.to_thread(self._unchanged, doc.doc_id, sha):
+                self.stats.skipped += 1
+                continue
+            chunks = await asyncio.to_thread(chunk_text, doc.text)
+            if not chunks:
+                await self._remove(doc.doc_id)
+                continue
+            batch.append((doc, sha, chunks))
+            pending += len(chunks)
+            if pending >= self.batch_size:
+                await q_embed.put(batch)
+                batch, pending = [], 0
+        if batch:
+            await q_embed.put(batch)
+
+    def _unchanged(self, doc_id: str, sha: str) -> bool:
+        # BM25 역색인이 생기기 전에 인덱싱된 문서는 내용이 같아도 다시 기록 (임베딩은 캐시에서)
+        lexical = getattr(self.store, "lexical", None)
+        return self.state.sha(doc_id) == sha and (lexical is None or lexical.has_doc(doc_id))
+
+    async def _embed(self, q_embed: asyncio.Queue, q_write: asyncio.Queue):
+        from app.memory.vectorstore import get_embeddings
+        while True:
+            batch = await q_embed.get()
+            if batch is _DONE:
+                return
+            texts = [c.text for _, _, chunks in batch for c in chunks]
+            try:
+                vectors = await get_embeddings(texts, strict=True, kind="passage")
+            except Exception as e:
+                # 상태를 기록하지 않으므로 다음 백필에서 다시 시도됩니다.
+                self.stats.errors += len(batch)
+                print(f"[Ingest ERROR] Embedding failed for {len(batch)} docs: {e}")
+                continue
+            await q_write.put((batch, vectors))
+
+    async def _write(self, q_write: asyncio.Queue):
+        while True:
+            item = await q_write.get()
+            if item is _DONE:
+                return
+            batch, vectors = item
+            offset = 0
+            for doc, sha, chunks in batch:
+                vecs = vectors[offset:offset + len(chunks)]
+                offset += len(chunks)
+                try:
+                    await self.store.upsert_vectors(doc.doc_id, vecs, texts=[c.text for c in chunks],
+                                                    spans=[(c.start, c.end) for c in chunks], log=False)
+                    await asyncio.to_thread(self.state.put, doc.doc_id, doc.source, sha, len(chunks))
+                except Exception as e:
+                    self.stats.errors += 1
+                    print(f"[Ingest ERROR] Failed to write {doc.doc_id}: {e}")
+                    continue
+                self.stats.written += 1
+                self.stats.chunks += len(chunks)
+                self.stats.tokens += sum(c.tokens for c in chunks)
+            self._report()
+
+    async def _remove(self, doc_id: str):
+        if await self.store.delete(doc_id):
+            self.stats.removed += 1
+        await asyncio.to_thread(self.state.remove, doc_id)
+
+    def _report(self, force: bool = False):
+        now = time.time()
+        if self.progress and (force or now - self._last_progress >= self.progress_every):
+            self._last_progress = now
+            self.progress(self.stats.as_dict())
+
+async def ingest_sources(sources: Iterable[str] = SOURCES, prune: bool = False, **kwargs) -> Dict[str, Any]:
+    """지정한 소스들을 모두 (변경분만) 인덱싱"""
+    readers = [(s, READERS[s]()) for s in sources]
+    return await IngestPipeline(**kwargs).run(readers, prune=prune)
@@ -0,0 +1,157 @@
+# app/memory/lexical_index.py
+# 청크 텍스트의 SQLite FTS5 (BM25) 역색인 — 벡터 인덱스와 같은 "doc_id:chunk_idx" 키를 사용
+# - '<index>.fts.db' 에 저장, VectorStore.upsert_vectors/delete 때 문서 단위로 함께 갱신됩니다.
+#   본문은 일반 테이블(chunk_text, doc 인덱스)에 두고 FTS5는 외부 콘텐츠 테이블로 색인만 (트리거로 동기화)
+# - 정확한 키워드(이름, 코드, 번호) 쿼리는 임베딩 호출 없이 여기서 바로 답합니다.
+# - 토크나이저: unicode61 (대소문자/발음 구별 기호 무시). 한글 어절은 조사가 붙어 있으므로
+#   ("회의를", "회의에서") 비ASCII 검색어는 접두 검색("회의"*)으로 찾습니다.
+# - 하이브리드 검색은 벡터 결과와 BM25 결과를 RRF(reciprocal rank fusion)로 합칩니다 (fuse_rrf).
+
+import os
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+RRF_K = int(os.getenv("RRF_K", "60"))  # RRF 상수: 1 / (RRF_K + 순위)
+_SQL_BATCH = 250  # 행 값 IN (...) 한 번에 넣는 키 수 (키마다 파라미터 2개)
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+Span = Tuple[int, int]
+
+def fts5_available() -> bool:
+    try:
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE VIRTUAL TABLE t USING fts5(x)")
+        conn.close()
+        return True
+    except sqlite3.Error:
+        return False
+
+def match_query(query: str) -> Optional[str]:
+    """
+    사용자 쿼리 → FTS5 MATCH 식 (FTS 문법 문자는 모두 인용해 무해하게)
+    - "..." 로 감싼 부분은 구문(phrase) 검색, 나머지 단어는 OR (BM25가 많이 맞는 청크를 위로)
+    - 비ASCII 단어는 접두 검색 (한국어 조사)
+    """
+    parts = []
+    for phrase in re.findall(r'"([^"]+)"', query):
+        terms = _TERM.findall(phrase)
+        if terms:
+            parts.append('"' + " ".join(terms) + '"' + ("" if terms[-1].isascii() else "*"))
+    for term in _TERM.findall(re.sub(r'"[^"]*"', " ", query)):
+        parts.append(f'"{term}"*' if not term.isascii() else f'"{term}"')
+    return " OR ".join(parts) if parts else None
+
+class LexicalIndex:
+    def __init__(self, db_path: str):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS chunk_text (
+                id INTEGER PRIMARY KEY, doc TEXT NOT NULL, chunk_idx INTEGER NOT NULL,
+                start_off INTEGER, end_off INTEGER, text TEXT NOT NULL, UNIQUE (doc, chunk_idx));
+            CREATE VIRTUAL TABLE IF NOT EXISTS chunks USING fts5(
+                text, content = 'chunk_text', content_rowid = 'id',
+                tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3');
+            CREATE TRIGGER IF NOT EXISTS chunk_text_ai AFTER INSERT ON chunk_text BEGIN
+                INSERT INTO chunks (rowid, text) VALUES (new.id, new.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS chunk_text_ad AFTER DELETE ON chunk_text BEGIN
+                INSERT INTO chunks (chunks, rowid, text) VALUES ('delete', old.id, old.text);
+            END;
+        """)
+        self._conn.commit()
+
+    # ------------- 쓰기 -------------
+    def replace(self, doc_id: str, texts: Sequence[str], spans: Optional[Sequence[Span]] = None):
+        """문서의 청크를 통째로 교체 (한 트랜잭션)"""
+        spans = spans or [(None, None)] * len(texts)
+        rows = [(t, doc_id, i, s, e) for i, (t, (s, e)) in enumerate(zip(texts, spans))]
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM chunk_text WHERE doc = ?", (doc_id,))
+                self._conn.executemany(
+                    "INSERT INTO chunk_text (text, doc, chunk_idx, start_off, end_off) VALUES (?, ?, ?, ?, ?)", rows)
+
+    def delete(self, doc_id: str):
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM chunk_text WHERE doc = ?", (doc_id,))
+
+    # ------------- 조회 -------------
+    def has_doc(self, doc_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM chunk_text WHERE doc = ? LIMIT 1", (doc_id,)).fetchone() is not None
+
+    def search(self, query: str, k: int = 5, doc_id: Optional[str] = None) -> List[Dict]:
+        """BM25 상위 k개 (score = bm25, 낮을수록 관련도 높음 — FAISS 거리와 같은 방향)"""
+        expr = match_query(query)
+        if not expr:
+            return []
+        sql = ("SELECT c.doc, c.chunk_idx, bm25(chunks), c.text, c.start_off, c.end_off"
+               " FROM chunks JOIN chunk_text c ON c.id = chunks.rowid WHERE chunks MATCH ?"
+               + (" AND c.doc = ?" if doc_id is not None else "") + " ORDER BY bm25(chunks) LIMIT ?")
+        params = (expr, doc_id, k) if doc_id is not None else (expr, k)
+        try:
+            with self._lock:
+                rows = self._conn.execute(sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            print(f"[LexicalIndex WARN] Query failed ({expr}): {e}")
+            return []
+        return [{"doc_id": d, "chunk_idx": int(i), "score": float(s), "text": t, "start": a, "end": b}
+                for d, i, s, t, a, b in rows]
+
+    def texts(self, keys: Iterable[Tuple[str, int]]) -> Dict[Tuple[str, int], str]:
+        """(doc_id, chunk_idx) → 청크 텍스트 (벡터 검색 결과에 본문을 붙일 때, 키 묶음마다 쿼리 한 번)"""
+        keys = list(dict.fromkeys((doc_id, int(chunk_idx)) for doc_id, chunk_idx in keys))
+        out: Dict[Tuple[str, int], str] = {}
+        with self._lock:
+            for s in range(0, len(keys), _SQL_BATCH):
+                chunk = keys[s:s + _SQL_BATCH]
+                sql = ("SELECT doc, chunk_idx, text FROM chunk_text WHERE (doc, chunk_idx) IN (VALUES %s)"
+                       % ",".join(["(?, ?)"] * len(chunk)))
+                for doc_id, chunk_idx, text in self._conn.execute(sql, [v for key in chunk for v in key]):
+                    out[(doc_id, int(chunk_idx))] = text
+        return out
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def fuse_rrf(ranked: Dict[str, List[Dict]], k: int, rrf_k: int = RRF_K) -> List[Dict]:
+    """
+    여러 순위 목록(예: {"vector": [...], "lexical": [...]})을 RRF로 합칩니다.
+    반환 항목: doc_id, chunk_idx, score(RRF, 높을수록 좋음), 목록별 원래 점수/순위 ("<name>_score", "<name>_rank")
+    그 밖의 필드(text, distance, bm25, start/end 등)는 먼저 나온 목록의 값을 그대로 가져옵니다.
+    """
+    fused: Dict[Tuple[str, int], Dict] = {}
+    for name, hits in ranked.items():
+        for rank, hit in enumerate(hits, start=1):
+            key = (hit["doc_id"], hit["chunk_idx"])
+            item = fused.setdefault(key, {"doc_id": key[0], "chunk_idx": key[1], "score": 0.0})
+            item["score"] += 1.0 / (rrf_k + rank)
+            item[f"{name}_score"] = hit["score"]
+            item[f"{name}_rank"] = rank
+            for field, value in hit.items():
+                if field != "score" and value is not None:
+                    item.setdefault(field, value)
+    return sorted(fused.values(), key=lambda h: -h["score"])[:k]
+
+_CODE = re.compile(r"\d|\w[-_#./]\w|^[A-Z]{2,}\w*$")
+
+def is_keyword_query(query: str) -> bool:
+    """
+    정확한 키워드 쿼리인지 추정: "구문" 인용, 또는 3단어 이하이면서 코드/번호/약어를 포함
+    (예: INV-2024-031, "project aurora", PR #42) → 하이브리드 모드에서 BM25 결과가 있으면 임베딩 생략
+    """
+    if '"' in query:
+        return True
+    tokens = query.split()
+    return 0 < len(tokens) <= 3 and any(_CODE.search(t) for t in tokens)
@@ -0,0 +1,192 @@
+# app/memory/local_embedder.py
+# 프로세스 내 CPU 임베딩 엔진 (model_router.json의 local://onnx/ 경로)
+# - ONNX Runtime 세션 하나를 프로세스 수명 동안 유지하고, 배치를 전용 스레드 풀에서 추론합니다.
+#   (onnxruntime는 추론 중 GIL을 놓으므로 배치들이 여러 코어에서 병렬로 실행됩니다)
+# - 모델/토크나이저: models/model_manifest.json의 "embedding" 항목 (e5-small.onnx + tokenizer.json)
+# - onnxruntime/tokenizers 또는 모델 파일이 없으면 결정적(deterministic) 해시 n-gram 임베더로 폴백합니다.
+#   (오프라인/테스트 환경용: 같은 텍스트 → 항상 같은 벡터, 글자 n-gram이 겹칠수록 가까움)
+# - HTTP 왕복이 없습니다. (model_runner._embed_backend → LocalEmbeddingEngine.embed)
+# - e5 모델은 입력 접두사가 필요합니다: 검색 쿼리 "query: ", 색인 문서/청크 "passage: " (kind로 지정)
+
+import asyncio
+import functools
+import hashlib
+import os
+import re
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+try:
+    from tokenizers import Tokenizer
+except ImportError:
+    Tokenizer = None
+
+EMBED_ONNX_PATH = os.getenv("EMBED_ONNX_PATH", "models/embedding/e5-small.onnx")
+EMBED_TOKENIZER_PATH = os.getenv("EMBED_TOKENIZER_PATH", "models/embedding/tokenizer.json")
+EMBED_LOCAL_THREADS = int(os.getenv("EMBED_LOCAL_THREADS", str(max(1, min(4, (os.cpu_count() or 2) // 2)))))
+EMBED_LOCAL_BATCH = int(os.getenv("EMBED_LOCAL_BATCH", "32"))   # 스레드 하나가 한 번에 추론하는 텍스트 수
+EMBED_MAX_TOKENS = int(os.getenv("EMBED_MAX_TOKENS", "512"))
+EMBED_DIM = 384  # e5-small-v2
+# e5 입력 접두사: auto = 모델 파일 이름에 'e5'가 있으면 사용, 1/0 = 강제 사용/끔
+EMBED_E5_PREFIX = os.getenv("EMBED_E5_PREFIX", "auto")
+E5_PREFIXES = {"query": "query: ", "passage": "passage: "}
+
+def e5_inputs(texts: Sequence[str], kind: Optional[str]) -> List[str]:
+    """e5 입력 접두사 적용 (kind가 query/passage가 아니면 그대로)"""
+    prefix = E5_PREFIXES.get(kind or "", "")
+    return [prefix + t for t in texts]
+
+def _l2_normalize(x: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    return x / np.maximum(norms, 1e-12)
+
+class HashedNgramEmbedder:
+    """
+    결정적 해시 n-gram 임베더 (폴백)
+    - 소문자/NFC 정규화 후 단어 경계를 포함한 글자 n-gram(기본 2~4)을 blake2b로 dim개 버킷에 해싱
+      (부호 해싱으로 충돌 편향 상쇄), 로그 TF 가중 후 L2 정규화
+    - 파이썬 hash()와 달리 프로세스/재시작과 무관하게 같은 벡터를 냅니다.
+    """
+    model_id = "hash-ngram-v1"
+    prefixes = False  # 접두사 n-gram은 모든 벡터에 같은 잡음만 더하므로 쓰지 않음
+
+    def __init__(self, dim: int = EMBED_DIM, ngram_range: Tuple[int, int] = (2, 4)):
+        self.dim = dim
+        self.ngram_range = ngram_range
+
+    def _features(self, text: str):
+        text = unicodedata.normalize("NFC", text).lower()
+        counts = {}
+        lo, hi = self.ngram_range
+        for word in re.findall(r"\w+", text):
+            w = f"<{word}>"
+            for n in range(lo, hi + 1):
+                for i in range(max(1, len(w) - n + 1)):
+                    g = w[i:i + n]
+                    counts[g] = counts.get(g, 0) + 1
+        return counts
+
+    def embed(self, texts: Sequence[str], kind: Optional[str] = None) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype="float32")
+        for row, text in enumerate(texts):
+            for gram, cnt in self._features(text).items():
+                h = int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest(), "little")
+                sign = 1.0 if (h >> 63) & 1 else -1.0
+                out[row, h % self.dim] += sign * (1.0 + np.log(cnt))
+        return _l2_normalize(out)
+
+class OnnxEmbedder:
+    """ONNX Runtime 문장 임베딩 (mean pooling + L2 정규화). 세션은 생성 시 한 번만 로드합니다."""
+    def __init__(self, model_path: str = EMBED_ONNX_PATH, tokenizer_path: str = EMBED_TOKENIZER_PATH,
+                 max_tokens: int = EMBED_MAX_TOKENS):
+        opts = ort.SessionOptions()
+        opts.intra_op_num_threads = 1  # 병렬성은 배치 단위 스레드 풀에서 확보
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, sess_options=opts, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.tokenizer.enable_truncation(max_length=max_tokens)
+        self.tokenizer.enable_padding()
+        self.model_id = f"onnx:{os.path.basename(model_path)}"
+        self.dim = int(self.session.get_outputs()[0].shape[-1] or EMBED_DIM)
+        self.prefixes = EMBED_E5_PREFIX == "1" or (
+            EMBED_E5_PREFIX == "auto" and "e5" in os.path.basename(model_path).lower())
+
+    def embed(self, texts: Sequence[str], kind: Optional[str] = None) -> np.ndarray:
+        """kind: query(검색 쿼리) / passage(색인 문서) / None(접두사 없음)"""
+        if self.prefixes:
+            texts = e5_inputs(texts, kind)
+        enc = self.tokenizer.encode_batch(list(texts))
+        ids = np.array([e.ids for e in enc], dtype="int64")
+        mask = np.array([e.attention_mask for e in enc], dtype="int64")
+        feeds = {"input_ids": ids, "attention_mask": mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.zeros_like(ids)
+        hidden = self.session.run(None, feeds)[0]  # (B, T, H)
+        m = mask[..., None].astype("float32")
+        pooled = (hidden * m).sum(axis=1) / np.maximum(m.sum(axis=1), 1e-9)
+        return _l2_normalize(pooled.astype("float32"))
+
+class LocalEmbeddingEngine:
+    """
+    장수명 임베딩 엔진: 백엔드 1개 + 전용 스레드 풀.
+    embed()는 입력을 EMBED_LOCAL_BATCH 단위로 나누어 스레드 풀에서 병렬로 추론합니다.
+    """
+    def __init__(self, backend=None, threads: int = EMBED_LOCAL_THREADS, batch_size: int = EMBED_LOCAL_BATCH):
+        self.backend = backend or self._load_backend()
+        self.batch_size = max(1, batch_size)
+        self._pool = ThreadPoolExecutor(max_workers=max(1, threads), thread_name_prefix="embed")
+        self.dim = self.backend.dim
+
+    @property
+    def model_id(self) -> str:
+        return self.backend.model_id
+
+    @property
+    def prefixes(self) -> bool:
+        """백엔드가 kind별 입력 접두사를 쓰는지 (쓰면 캐시 키에 kind를 포함해야 함)"""
+        return bool(getattr(self.backend, "prefixes", False))
+
+    @staticmethod
+    def _load_backend():
+        if ort is None or Tokenizer is None:
+            print("[LocalEmbedder WARN] 'onnxruntime'/'tokenizers' not installed. "
+                  "Using hashed n-gram embedder. (pip install onnxruntime tokenizers)")
+            return HashedNgramEmbedder()
+        if not (os.path.exists(EMBED_ONNX_PATH) and os.path.exists(EMBED_TOKENIZER_PATH)):
+            print(f"[LocalEmbedder WARN] Model files not found ({EMBED_ONNX_PATH}). Using hashed n-gram embedder.")
+            return HashedNgramEmbedder()
+        try:
+            backend = OnnxEmbedder()
+            print(f"[LocalEmbedder] Loaded {EMBED_ONNX_PATH} (dim={backend.dim})")
+            return backend
+        except Exception as e:
+            print(f"[LocalEmbedder ERROR] Failed to load ONNX model: {e}. Using hashed n-gram embedder.")
+            return HashedNgramEmbedder()
+
+    def embed_sync(self, texts: Sequence[str], kind: Optional[str] = None) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype="float32")
+        parts = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        fn = functools.partial(self.backend.embed, kind=kind) if kind else self.backend.embed
+        return np.concatenate(list(self._pool.map(fn, parts)), axis=0)
+
+    async def embed(self, texts: Sequence[str], kind: Optional[str] = None) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype="float32")
+        loop = asyncio.get_running_loop()
+        parts = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        fn = functools.partial(self.backend.embed, kind=kind) if kind else self.backend.embed
+        outs = await asyncio.gather(*[loop.run_in_executor(self._pool, fn, p) for p in parts])
+        return np.concatenate(outs, axis=0)
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+
+# --- 싱글톤 인스턴스 (프로세스당 세션 1개) ---
+_engine_instance: Optional[LocalEmbeddingEngine] = None
+_engine_lock = threading.Lock()
+
+def get_local_engine() -> LocalEmbeddingEngine:
+    """(동기) 첫 호출은 토크나이저/ONNX 세션을 로드하므로 루프에서는 load_local_engine()을 사용"""
+    global _engine_instance
+    if _engine_instance is None:
+        with _engine_lock:
+            if _engine_instance is None:
+                _engine_instance = LocalEmbeddingEngine()
+    return _engine_instance
+
+async def load_local_engine() -> LocalEmbeddingEngine:
+    """루프용: 모델 로드는 스레드에서 (이미 만들어졌으면 바로 반환)"""
+    if _engine_instance is not None:
+        return _engine_instance
+    return await asyncio.to_thread(get_local_engine)
@@ -0,0 +1,130 @@
+# app/memory/search_batcher.py
+# 동시 벡터 검색의 마이크로 배치 스케줄러
+# - search() 요청을 큐에 넣고, 첫 요청 뒤 window_ms 동안 도착한 요청들을 최대 max_batch개까지 모읍니다.
+# - 모인 쿼리는 한 번의 임베딩 배치 호출 + 한 번의 다중 행 FAISS 검색(워커 스레드)으로 처리한 뒤
+#   요청별 k만큼 잘라 각자의 Future로 돌려줍니다. (VectorStore.search_many)
+# - 동시 요청이 없으면 window_ms만큼만 지연됩니다. 배치 크기/대기/처리 시간은 metrics()로 노출됩니다.
+# - 배치는 최대 max_inflight개까지 겹쳐 실행됩니다 (FAISS 검색은 읽기 잠금으로 병렬).
+#   실행 슬롯이 모두 차 있으면 그동안 도착한 요청은 다음 배치로 쌓입니다.
+# 설정: VECTOR_SEARCH_BATCH_MS (0이면 배치 없이 바로 검색), VECTOR_SEARCH_MAX_BATCH
+
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from app.utils.metrics import LatencyStat
+
+VECTOR_SEARCH_BATCH_MS = float(os.getenv("VECTOR_SEARCH_BATCH_MS", "2"))
+VECTOR_SEARCH_MAX_BATCH = int(os.getenv("VECTOR_SEARCH_MAX_BATCH", "64"))
+
+# (쿼리 목록, 요청별 k) → 요청별 결과 목록
+SearchFn = Callable[[List[str], List[int]], Awaitable[List[List[Dict[str, Any]]]]]
+
+class SearchBatcher:
+    def __init__(self, search_many: SearchFn, window_ms: float = VECTOR_SEARCH_BATCH_MS,
+                 max_batch: int = VECTOR_SEARCH_MAX_BATCH, max_inflight: int = 1):
+        self.search_many = search_many
+        self.window_ms = window_ms
+        self.max_batch = max(1, max_batch)
+        self.max_inflight = max(1, max_inflight)
+        self._q: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._inflight: Set[asyncio.Task] = set()
+        self._pending: List[Tuple[str, int, asyncio.Future, float]] = []  # 큐에서 꺼냈지만 아직 배치로 넘기지 않은 요청
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.batch_stat = LatencyStat()  # 배치당 쿼리 수
+        self.wait_stat = LatencyStat()   # 큐 대기 ms
+        self.run_stat = LatencyStat()    # 배치 처리(임베딩 + 검색) ms
+
+    async def submit(self, query: str, k: int) -> List[Dict[str, Any]]:
+        self._ensure_started()
+        fut = asyncio.get_running_loop().create_future()
+        await self._q.put((query, k, fut, time.perf_counter()))
+        return await fut
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "window_ms": self.window_ms,
+            "max_batch": self.max_batch,
+            "max_inflight": self.max_inflight,
+            "queue_depth": self._q.qsize() if self._q else 0,
+            "inflight": len(self._inflight),
+            "batch_size": self.batch_stat.snapshot(),
+            "wait_ms": self.wait_stat.snapshot(),
+            "run_ms": self.run_stat.snapshot(),
+        }
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        # 배치 창에서 취소된 요청 + 큐에 남은 요청은 실패로 끝냄 (호출자가 영원히 기다리지 않도록)
+        left, self._pending = self._pending, []
+        while self._q is not None and not self._q.empty():
+            left.append(self._q.get_nowait())
+        for _, _, fut, _ in left:
+            if not fut.done():
+                fut.set_exception(RuntimeError("search batcher stopped"))
+
+    # ------------- internals -------------
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            # 큐는 실행 중인 루프에 묶이므로 (스크립트/테스트의 asyncio.run마다) 새로 만듭니다.
+            self._loop = loop
+            self._q = asyncio.Queue()
+            self._pending = []
+            self._slots = asyncio.Semaphore(self.max_inflight)
+            self._task = loop.create_task(self._run())
+
+    async def _next_batch(self) -> List[Tuple[str, int, asyncio.Future, float]]:
+        # 꺼낸 요청은 self._pending에 모음 → 배치 창 도중 취소돼도 stop()이 찾을 수 있음
+        self._pending.append(await self._q.get())
+        if self.window_ms > 0 and self._q.qsize() + 1 < self.max_batch:
+            # 배치 창: 몇 ms 동안 뒤따르는 쿼리를 모읍니다.
+            await asyncio.sleep(self.window_ms / 1000)
+        while len(self._pending) < self.max_batch and not self._q.empty():
+            self._pending.append(self._q.get_nowait())
+        batch, self._pending = self._pending, []
+        return batch
+
+    async def _run(self):
+        while True:
+            slots = self._slots
+            await slots.acquire()
+            batch = await self._next_batch()
+            # 이미 취소된 요청(클라이언트 연결 종료 등)은 빼고 검색
+            batch = [item for item in batch if not item[2].done()]
+            if not batch:
+                slots.release()
+                continue
+            task = asyncio.get_running_loop().create_task(self._dispatch(batch, slots))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: List[Tuple[str, int, asyncio.Future, float]], slots: asyncio.Semaphore):
+        start = time.perf_counter()
+        for *_, queued in batch:
+            self.wait_stat.observe((start - queued) * 1000)
+        try:
+            results = await self.search_many([q for q, *_ in batch], [k for _, k, *_ in batch])
+        except Exception as e:
+            for _, _, fut, _ in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        finally:
+            slots.release()
+            self.batch_stat.observe(len(batch))
+            self.run_stat.observe((time.perf_counter() - start) * 1000)
+        for (_, _, fut, _), hits in zip(batch, results):
+            if not fut.done():
+                fut.set_result(hits)
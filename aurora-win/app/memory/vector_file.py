@@ -0,0 +1,65 @@
+# app/memory/vector_file.py
+# 압축 인덱스의 재순위(re-rank)용 원본 float32 벡터 파일 ('<index>.vecs')
+# - FAISS ID i의 벡터를 오프셋 i * dim * 4에 고정 길이로 저장합니다 (ID는 재사용하지 않는 단조 증가).
+# - 읽기는 메모리 맵으로: 검색 후보 몇십 행만 페이지 캐시에서 읽으므로 프로세스 RSS에는 압축 코드만 남습니다.
+# - 쓰지 않은 행(파일 구멍)은 0 벡터 → 재순위에서 근사 거리를 그대로 사용합니다.
+# - 삭제/압축된 ID의 행은 비워 두지 않고 남습니다 (파일 크기 = 지금까지 할당된 ID 수 × dim × 4).
+# - 내구성: 스냅샷 때 sync(). 그 이후 쓴 행은 WAL 재생으로 다시 기록됩니다.
+
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+class VectorFile:
+    def __init__(self, path: str, dim: int):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.dim = dim
+        self.row_bytes = dim * 4
+        self._lock = threading.Lock()
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0))
+        self._mm: Optional[np.memmap] = None
+
+    @property
+    def rows(self) -> int:
+        return os.fstat(self._fd).st_size // self.row_bytes
+
+    def write(self, ids: np.ndarray, vectors: np.ndarray):
+        """ids의 행에 벡터 기록 (연속 ID 구간은 한 번에)"""
+        ids = np.asarray(ids, dtype="int64")
+        vectors = np.ascontiguousarray(vectors, dtype="float32")
+        if not len(ids):
+            return
+        order = np.argsort(ids)
+        ids, vectors = ids[order], vectors[order]
+        breaks = np.flatnonzero(np.diff(ids) != 1) + 1
+        with self._lock:
+            for run_ids, run_vecs in zip(np.split(ids, breaks), np.split(vectors, breaks)):
+                os.lseek(self._fd, int(run_ids[0]) * self.row_bytes, os.SEEK_SET)
+                os.write(self._fd, run_vecs.tobytes())
+
+    def read(self, ids: np.ndarray) -> np.ndarray:
+        """ids의 벡터 (파일 밖이거나 쓰지 않은 행은 0 벡터)"""
+        ids = np.asarray(ids, dtype="int64")
+        out = np.zeros((len(ids), self.dim), dtype="float32")
+        with self._lock:
+            rows = self.rows
+            if rows == 0:
+                return out
+            if self._mm is None or self._mm.shape[0] != rows:
+                self._mm = np.memmap(self.path, dtype="float32", mode="r", shape=(rows, self.dim))
+            ok = (ids >= 0) & (ids < rows)
+            out[ok] = self._mm[ids[ok]]
+        return out
+
+    def sync(self):
+        with self._lock:
+            os.fsync(self._fd)
+
+    def close(self):
+        with self._lock:
+            self._mm = None
+            os.close(self._fd)
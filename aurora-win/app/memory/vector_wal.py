@@ -0,0 +1,124 @@
+# app/memory/vector_wal.py
+# FAISS 인덱스 쓰기 전 로그(WAL)
+# - add()마다 인덱스 전체를 다시 쓰는 대신 (id, key, vector) 레코드만 '<index>.wal.<gen>'에 덧붙입니다.
+# - 스냅샷(인덱스 + ID 맵 저장)을 시작할 때 새 세대(gen)로 넘어가고,
+#   스냅샷이 디스크에 안전하게 쓰인 뒤 이전 세대 파일을 지웁니다.
+# - 시작 시 마지막 스냅샷이 기록한 세대(ID 맵의 wal_gen)부터 순서대로 재생합니다.
+#   (이미 인덱스에 있는 ID의 벡터는 다시 넣지 않음 → 재생은 멱등)
+# 레코드: [u32 payload 길이][u32 crc32][payload]
+#   payload = [i64 faiss id][u32 dim][u16 key 길이][key utf-8][float32 * dim]
+#   삭제: faiss id = DELETE_ID(-1), key = doc_id, dim = 0
+# 마지막 레코드가 잘렸거나 CRC가 맞지 않으면 (쓰기 중 크래시) 그 지점에서 파일을 잘라냅니다.
+
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+VECTOR_WAL_FSYNC = os.getenv("VECTOR_WAL_FSYNC", "0") == "1"  # 1이면 append마다 fsync (전원 손실 대비, 느림)
+
+_HEAD = struct.Struct("<II")
+_REC = struct.Struct("<qIH")
+
+WalRecord = Tuple[int, str, np.ndarray]
+DELETE_ID = -1
+
+def delete_record(doc_id: str) -> WalRecord:
+    return DELETE_ID, doc_id, np.zeros(0, dtype="float32")
+
+def encode_record(faiss_id: int, key: str, vec: np.ndarray) -> bytes:
+    kb = key.encode("utf-8")
+    vec = np.asarray(vec, dtype="float32").reshape(-1)
+    payload = _REC.pack(faiss_id, vec.shape[0], len(kb)) + kb + vec.tobytes()
+    return _HEAD.pack(len(payload), zlib.crc32(payload)) + payload
+
+def decode_payload(payload: bytes) -> WalRecord:
+    faiss_id, dim, klen = _REC.unpack_from(payload, 0)
+    off = _REC.size
+    key = payload[off:off + klen].decode("utf-8")
+    vec = np.frombuffer(payload, dtype="float32", count=dim, offset=off + klen).copy()
+    return faiss_id, key, vec
+
+class VectorWAL:
+    def __init__(self, index_path: str, start_gen: int = 1):
+        self.prefix = f"{index_path}.wal."
+        gens = self.generations()
+        self.gen = max(gens[-1] if gens else 1, start_gen)
+        self.pending = 0  # 현재 세대에 쓴 레코드 수
+        self._fh = None
+
+    # ------------- 세대 관리 -------------
+    def path(self, gen: int) -> Path:
+        return Path(f"{self.prefix}{gen:06d}")
+
+    def generations(self) -> List[int]:
+        parent = Path(self.prefix).parent
+        name = Path(self.prefix).name
+        gens = []
+        if parent.exists():
+            for p in parent.iterdir():
+                if p.name.startswith(name) and p.name[len(name):].isdigit():
+                    gens.append(int(p.name[len(name):]))
+        return sorted(gens)
+
+    def rotate(self) -> List[int]:
+        """새 세대로 전환하고 이전 세대 목록을 반환 (스냅샷이 저장된 뒤 drop()으로 삭제)"""
+        self.close()
+        old = [g for g in self.generations() if g <= self.gen]
+        self.gen += 1
+        self.pending = 0
+        self.path(self.gen).parent.mkdir(parents=True, exist_ok=True)
+        self.path(self.gen).touch()  # 재시작 시 현재 세대를 알 수 있도록
+        return old
+
+    def drop(self, gens: Sequence[int]):
+        for g in gens:
+            try:
+                self.path(g).unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"[VectorWAL ERROR] Failed to remove {self.path(g)}: {e}")
+
+    # ------------- 쓰기 -------------
+    def append(self, records: Sequence[WalRecord]):
+        if not records:
+            return
+        if self._fh is None:
+            self.path(self.gen).parent.mkdir(parents=True, exist_ok=True)
+            self._fh = open(self.path(self.gen), "ab")
+        self._fh.write(b"".join(encode_record(i, k, v) for i, k, v in records))
+        self._fh.flush()
+        if VECTOR_WAL_FSYNC:
+            os.fsync(self._fh.fileno())
+        self.pending += len(records)
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    # ------------- 재생 -------------
+    def replay(self, from_gen: int = 1) -> Iterator[WalRecord]:
+        for g in self.generations():
+            if g >= from_gen:
+                yield from self._read(self.path(g))
+
+    def _read(self, path: Path) -> Iterator[WalRecord]:
+        with open(path, "rb") as f:
+            data = f.read()
+        pos = 0
+        while pos + _HEAD.size <= len(data):
+            length, crc = _HEAD.unpack_from(data, pos)
+            payload = data[pos + _HEAD.size:pos + _HEAD.size + length]
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                break
+            yield decode_payload(payload)
+            pos += _HEAD.size + length
+        if pos < len(data):
+            print(f"[VectorWAL WARN] Torn record at {path}:{pos}. Truncating {len(data) - pos} bytes.")
+            with open(path, "r+b") as f:
+                f.truncate(pos)
@@ -1,8 +1,11 @@
 # app/memory/vectorstore.py (수정)
 # 'get_embedding' 스텁을 'model_runner.py'와 연동
 
+import asyncio
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
 import numpy as np
 
 try:
@@ -13,34 +16,114 @@ except ImportError:
 
 # model_runner에서 추론 함수 임포트
 try:
-    from app.router.model_runner import run_inference
+    from app.router.model_runner import embed_batch, embedding_model_uri, run_inference
 except ImportError:
     print("[ERROR] vectorstore.py: Failed to import 'run_inference'.")
+    embed_batch = None
+    embedding_model_uri = None
     run_inference = None
 
-async def get_embedding(text: str, task: str = "embedding") -> np.ndarray:
+from app.memory.embedding_cache import cache_key, get_embedding_cache
+from app.memory.ann_index import (
+    VECTOR_ANN_THRESHOLD, VECTOR_COMPRESSION, VECTOR_INDEX, build_index, compression_of, id_vectors,
+    index_kind, merge_results, promotion_target, rerank, search_params, set_search_params,
+    should_promote, with_ids,
+)
+from app.memory.id_map import IdMap
+from app.memory.vector_file import VectorFile
+from app.memory.search_batcher import VECTOR_SEARCH_BATCH_MS, SearchBatcher
+from app.memory.lexical_index import LexicalIndex, fts5_available, fuse_rrf, is_keyword_query
+from app.memory.vector_wal import DELETE_ID, VectorWAL, delete_record
+from app.utils.rwlock import RWLock
+
+VECTOR_WAL = os.getenv("VECTOR_WAL", "1") != "0"
+VECTOR_SNAPSHOT_SECONDS = float(os.getenv("VECTOR_SNAPSHOT_SECONDS", "30"))  # 마지막 add 후 스냅샷까지 대기
+VECTOR_SNAPSHOT_ADDS = int(os.getenv("VECTOR_SNAPSHOT_ADDS", "500"))          # 이만큼 쌓이면 즉시 스냅샷
+# 스냅샷을 메모리 매핑으로 열기: 시작이 빠르고, 워커들이 페이지 캐시를 공유합니다.
+# (매핑된 스냅샷은 읽기 전용: 새 벡터는 작은 메모리 델타 인덱스에 쌓였다가 다음 스냅샷에 합쳐지고, 저장한 파일을 다시 매핑)
+VECTOR_MMAP = os.getenv("VECTOR_MMAP", "1") != "0"
+# 삭제 표시가 ntotal의 이 비율(그리고 최소 개수)을 넘으면 백그라운드 압축
+VECTOR_COMPACT_RATIO = float(os.getenv("VECTOR_COMPACT_RATIO", "0.2"))
+VECTOR_COMPACT_MIN = int(os.getenv("VECTOR_COMPACT_MIN", "1000"))
+# 검색 모드: vector(FAISS만) / lexical(FTS5 BM25만) / hybrid(둘을 RRF로 결합, 키워드 쿼리는 BM25만)
+RAG_SEARCH_MODE = os.getenv("RAG_SEARCH_MODE", "hybrid")
+# 압축 인덱스(VECTOR_COMPRESSION)의 재순위: k * VECTOR_RERANK개 후보를 원본 벡터('<index>.vecs')로 다시 정렬 (0 = 끔)
+VECTOR_RERANK = int(os.getenv("VECTOR_RERANK", "4"))
+RAG_HYBRID_CANDIDATES = int(os.getenv("RAG_HYBRID_CANDIDATES", "20"))  # 결합 전 목록별 후보 수
+# FAISS 전용 실행기 스레드 수: 검색은 읽기 잠금으로 병렬, add/인덱스 교체는 쓰기 잠금으로 직렬 (루프는 FAISS를 직접 호출하지 않음)
+VECTOR_FAISS_THREADS = int(os.getenv("VECTOR_FAISS_THREADS", "0")) or max(2, min(8, os.cpu_count() or 1))
+# 검색 하나당 FAISS(OpenMP) 스레드 수 (0 = FAISS 기본값). 동시 검색이 많으면 1로 두어 코어 과구독을 피합니다.
+VECTOR_FAISS_OMP_THREADS = int(os.getenv("VECTOR_FAISS_OMP_THREADS", "0"))
+
+async def get_embedding(text: str, task: str = "embedding", kind: Optional[str] = None) -> np.ndarray:
     """
-    model_runner를 호출하여 임베딩 벡터를 가져옵니다.
+    model_runner를 호출하여 임베딩 벡터를 가져옵니다. 반환: (1, dim)
     (model_router.json [cite: vivleon/aurora/AURORA-main/aurora-win/app/router/model_router.json]의 "local_embed" 규칙이 사용됩니다)
     """
+    return await get_embeddings([text], task=task, kind=kind)
+
+async def get_embeddings(texts: List[str], task: str = "embedding", strict: bool = False,
+                         kind: Optional[str] = None) -> np.ndarray:
+    """
+    여러 텍스트를 model_runner.embed_batch로 한 번에 임베딩합니다. 반환: (N, dim) float32
+    (배치 크기/동시성: EMBED_BATCH_SIZE / EMBED_CONCURRENCY)
+    - 임베딩 캐시(app/memory/embedding_cache.py)를 먼저 조회하고, 없는 텍스트만 (중복 제거 후) 임베딩합니다.
+    - strict=True면 실패한 텍스트가 있을 때 랜덤 벡터 대신 RuntimeError (성공분은 캐시됨)
+    - kind: query(검색 쿼리) / passage(색인 문서·청크) → e5 입력 접두사 (캐시 키에도 포함)
+    """
     dim = 384 # e5-small-v2
-    
-    if not run_inference:
-        print(f"[Vectorstore WARN] Fallback stub embedding generated for: {text[:20]}...")
-        return np.random.rand(1, dim).astype('float32')
-
-    result = await run_inference(
-        task=task,
-        prompt=text,
-        risk="low" # 임베딩은 항상 low-risk
-    )
-    
-    if "vector" in result and result["vector"]:
-        # (N, dim) 형태의 2D 배열로 반환
-        return np.array([result["vector"]]).astype('float32')
-    else:
-        print(f"[Vectorstore ERROR] Failed to get embedding for: {text[:20]}... Error: {result.get('error')}")
-        return np.random.rand(1, dim).astype('float32') # 오류 시 랜덤 벡터 반환
+
+    if not embed_batch:
+        if strict:
+            raise RuntimeError("model_runner is unavailable")
+        print(f"[Vectorstore WARN] Fallback stub embeddings generated for {len(texts)} texts.")
+        return np.random.rand(len(texts), dim).astype('float32')
+
+    out = np.empty((len(texts), dim), dtype='float32')
+    model = await embedding_model_uri(task, kind)
+    cache = get_embedding_cache()
+    cached = await asyncio.to_thread(cache.get_many, model, texts) if cache else [None] * len(texts)
+
+    # 캐시에 없는 텍스트: 같은 내용은 한 번만 임베딩
+    pending: Dict[bytes, List[int]] = {}
+    for i, vec in enumerate(cached):
+        if vec is not None and len(vec) == dim:
+            out[i] = vec
+        else:
+            pending.setdefault(cache_key(model, texts[i]), []).append(i)
+    if not pending:
+        return out
+
+    todo = [texts[rows[0]] for rows in pending.values()]
+    result = await embed_batch(todo, task=task, kind=kind)
+    fresh_texts, fresh_vecs = [], []
+    failed = 0
+    for rows, text, vec in zip(pending.values(), todo, result["vectors"]):
+        if vec is not None and len(vec) == dim:
+            out[rows] = vec
+            fresh_texts.append(text)
+            fresh_vecs.append(out[rows[0]])
+        else:
+            out[rows] = np.random.rand(dim) # 오류 시 랜덤 벡터 (캐시하지 않음)
+            failed += len(rows)
+    if failed:
+        print(f"[Vectorstore ERROR] Failed to get {failed}/{len(texts)} embeddings. Errors: {result.get('errors')}")
+    if cache and fresh_texts:
+        await asyncio.to_thread(cache.put_many, model, fresh_texts, fresh_vecs)
+    if failed and strict:
+        raise RuntimeError(f"{failed}/{len(texts)} embeddings failed: {result.get('errors')}")
+    return out
+
+_faiss_executor: Optional[ThreadPoolExecutor] = None
+
+def get_faiss_executor() -> ThreadPoolExecutor:
+    """모든 VectorStore가 공유하는 FAISS 전용 실행기 (기본 to_thread 풀의 임베딩/SQLite 작업과 분리)"""
+    global _faiss_executor
+    if _faiss_executor is None:
+        if faiss and VECTOR_FAISS_OMP_THREADS > 0:
+            faiss.omp_set_num_threads(VECTOR_FAISS_OMP_THREADS)
+        _faiss_executor = ThreadPoolExecutor(max_workers=VECTOR_FAISS_THREADS, thread_name_prefix="faiss")
+    return _faiss_executor
 
 class VectorStore:
     def __init__(self, index_path: str = "data/embeddings/aurora.index", dim: int = 384):
@@ -49,10 +132,48 @@ class VectorStore:
             
         self.index_path = Path(index_path)
         self.dim = dim
+        self._mmapped = False
         self.index = self._load_index()
-        # FAISS 인덱스는 ID 매핑을 별도로 관리해야 함
-        self.doc_id_map: Dict[int, str] = {} # FAISS index ID -> "doc_id:chunk_idx"
-        self._load_map()
+        # 매핑된 스냅샷 이후 추가된 벡터 (메모리, 검색 때 함께 조회, 스냅샷 때 합쳐 저장 후 다시 매핑)
+        self.delta: Optional[faiss.Index] = None
+        self._rebuild_task: Optional[asyncio.Task] = None
+        # FAISS 호출은 전용 실행기에서만: 검색/직렬화는 읽기 잠금(병렬), add/분리/교체는 쓰기 잠금(직렬)
+        self._rw = RWLock()
+        self._writes: Set[asyncio.Future] = set()  # 실행 중인 인덱스 add (스냅샷 직렬화 전에 기다림)
+        # 동시 검색은 몇 ms 동안 모아 한 번의 임베딩 배치 + 다중 행 FAISS 검색으로 처리 (배치끼리는 병렬)
+        self._batcher: Optional[SearchBatcher] = SearchBatcher(self.search_many, max_inflight=VECTOR_FAISS_THREADS) \
+            if VECTOR_SEARCH_BATCH_MS > 0 else None
+        # FAISS 인덱스는 ID 매핑을 별도로 관리해야 함 (SQLite, 검색 결과 ID만 조회)
+        self.doc_id_map = IdMap(str(self._map_db_path()), legacy_json=str(self._map_path())) # FAISS index ID -> "doc_id:chunk_idx"
+        # 삭제 표시된 ID (검색에서 제외, 압축 때 인덱스에서 제거)
+        self._dead = self.doc_id_map.dead_ids()
+        self._exclude: Optional[np.ndarray] = None
+        ids = faiss.vector_to_array(self.index.id_map)
+        self._next_id = max(self.doc_id_map.get_meta("next_id"), int(ids.max()) + 1 if len(ids) else 0)
+        # 압축 인덱스의 재순위용 원본 벡터 (메모리 맵, 압축을 쓸 때만)
+        self._vectors: Optional[VectorFile] = None
+        if VECTOR_RERANK > 0 and (VECTOR_COMPRESSION != "none" or compression_of(self.index) != "none"):
+            self._vectors = VectorFile(str(self._vectors_path()), self.dim)
+        # 쓰기 전 로그: add는 WAL에만 덧붙이고, 스냅샷은 타이머/누적 개수/종료 시에 저장
+        wal_gen = self.doc_id_map.get_meta("wal_gen", 1)
+        self._wal: Optional[VectorWAL] = VectorWAL(str(self.index_path), start_gen=wal_gen) if VECTOR_WAL else None
+        self._snapshot_timer: Optional[asyncio.TimerHandle] = None
+        self._snapshot_task: Optional[asyncio.Task] = None
+        if self._wal:
+            self._replay_wal(wal_gen, ids)
+        # 청크 텍스트의 BM25 역색인 (하이브리드 검색, 키워드 쿼리는 임베딩 없이)
+        self.lexical: Optional[LexicalIndex] = None
+        if fts5_available():
+            self.lexical = LexicalIndex(str(self._fts_path()))
+            # 역색인 쓰기 전용 스레드 하나: 루프를 막지 않으면서 같은 문서의 upsert/delete가 호출 순서대로 적용
+            self._lexical_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lexical")
+        else:
+            print("[Vectorstore WARN] SQLite FTS5 is not available. Lexical/hybrid search disabled.")
+        # WAL 재생 후 삭제 표시가 이미 임계를 넘었으면 압축 (루프 밖에서 만들어졌으면 첫 upsert/delete 때)
+        try:
+            asyncio.get_running_loop().call_soon(self._maybe_compact)
+        except RuntimeError:
+            pass
 
     def _ensure_dir(self):
         self.index_path.parent.mkdir(parents=True, exist_ok=True)
@@ -62,112 +183,583 @@ class VectorStore:
         if self.index_path.exists():
             try:
                 print(f"[Vectorstore] Loading index from {self.index_path}")
-                return faiss.read_index(str(self.index_path))
+                if self._can_mmap():
+                    index = self._read_mmapped()
+                    self._mmapped = True
+                else:
+                    index = faiss.read_index(str(self.index_path))
+                if not hasattr(index, "id_map"):
+                    index = with_ids(index)  # 이전 형식 (순번 ID) → IndexIDMap2, 메모리 사본
+                    self._mmapped = False
+                return set_search_params(index)
             except Exception as e:
                 print(f"[Vectorstore ERROR] Failed to load index: {e}. Creating new one.")
+                self._mmapped = False
         
-        print("[Vectorstore] Initializing new FAISS IndexFlatL2")
-        return faiss.IndexFlatL2(self.dim)
+        print("[Vectorstore] Initializing new FAISS IndexIDMap2(IndexFlatL2)")
+        return faiss.IndexIDMap2(faiss.IndexFlatL2(self.dim))
     
+    @staticmethod
+    def _can_mmap() -> bool:
+        return VECTOR_MMAP and hasattr(faiss, "IO_FLAG_MMAP_IFC")
+
+    def _read_mmapped(self):
+        flags = faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY
+        return faiss.read_index(str(self.index_path), flags)
+
+    @property
+    def ntotal(self) -> int:
+        """매핑된 스냅샷(또는 메모리 인덱스) + 델타의 벡터 수"""
+        return self.index.ntotal + (self.delta.ntotal if self.delta is not None else 0)
+
+    def _insert(self, vectors: np.ndarray, faiss_ids: np.ndarray):
+        """
+        (쓰기 잠금 안에서) 매핑된 스냅샷은 읽기 전용이므로 메모리 델타(flat)에 추가합니다.
+        스냅샷 전체를 메모리로 복사하지 않으므로 RSS는 마지막 스냅샷 이후 추가분만큼만 늘어납니다.
+        """
+        if not self._mmapped:
+            self.index.add_with_ids(vectors, faiss_ids)
+            return
+        if self.delta is None:
+            self.delta = faiss.IndexIDMap2(faiss.IndexFlatL2(self.dim))
+        self.delta.add_with_ids(vectors, faiss_ids)
+
+    # ------------- FAISS 실행기 -------------
+    def _run_faiss(self, fn, *args) -> asyncio.Future:
+        return asyncio.get_running_loop().run_in_executor(get_faiss_executor(), fn, *args)
+
+    def _run_lexical(self, fn, *args) -> asyncio.Future:
+        return asyncio.get_running_loop().run_in_executor(self._lexical_writer, fn, *args)
+
+    def _add(self, faiss_ids: np.ndarray, vectors: np.ndarray):
+        """(FAISS 실행기) 인덱스는 잠금 안에서 읽음 → 재빌드/재매핑 교체 직후에도 현재 인덱스(또는 델타)에 추가"""
+        if self._vectors is not None:
+            self._vectors.write(faiss_ids, vectors)  # 검색이 새 ID를 보기 전에 재순위용 원본부터
+        with self._rw.write():
+            self._insert(vectors, faiss_ids)
+
+    def _serialize(self):
+        """
+        (FAISS 실행기) 스냅샷 바이트와 직렬화 시점 (인덱스, 인덱스 크기, 델타 크기)
+        델타가 있으면 매핑된 스냅샷의 사본에 합쳐 직렬화합니다 (사본은 이 호출 동안만 메모리에 있음).
+        """
+        with self._rw.read():
+            index, delta = self.index, self.delta
+            captured = (index, index.ntotal, delta.ntotal if delta is not None else 0)
+            if not captured[2]:
+                return faiss.serialize_index(index), captured
+            ids, vectors = id_vectors(delta)
+        # 매핑된 스냅샷은 바뀌지 않으므로 복사/병합은 잠금 밖에서 (그동안 add는 델타에 계속)
+        merged = faiss.deserialize_index(faiss.serialize_index(index))
+        merged.add_with_ids(vectors, ids)
+        return faiss.serialize_index(merged), captured
+
+    def _remap(self, captured) -> bool:
+        """
+        (FAISS 실행기) 방금 저장한 스냅샷 파일을 다시 매핑하고, 그 파일에 들어간 델타/메모리 인덱스를 내려놓습니다.
+        직렬화 뒤 인덱스가 바뀌었으면(재빌드 교체, 메모리 인덱스에 add) 다음 스냅샷으로 미룹니다.
+        """
+        index, index_n, delta_n = captured
+        if not self._can_mmap() or self.index is not index:
+            return False
+        try:
+            mapped = set_search_params(self._read_mmapped())
+        except Exception as e:
+            print(f"[Vectorstore WARN] Failed to memory-map snapshot: {e}")
+            return False
+        with self._rw.write():
+            if self.index is not index or index.ntotal != index_n:
+                return False
+            delta = self.delta
+            self.index, self.delta, self._mmapped = mapped, None, True
+            if delta is not None and delta.ntotal > delta_n:
+                rest_ids, rest_vectors = id_vectors(delta, start=delta_n)  # 직렬화 뒤에 들어온 add
+                self._insert(rest_vectors, rest_ids)
+        return True
+
+    async def _drain_writes(self):
+        while self._writes:
+            await asyncio.wait(list(self._writes))
+
     def _map_path(self) -> Path:
-        return self.index_path.with_suffix(".map.json")
+        return self.index_path.with_suffix(".map.json")  # 이전 형식 (IdMap이 한 번 가져옴)
 
-    def _load_map(self):
-        map_path = self._map_path()
-        if map_path.exists():
-            try:
-                import json
-                map_data = json.loads(map_path.read_text('utf-8'))
-                # JSON 키는 문자열이므로 다시 int로 변환
-                self.doc_id_map = {int(k): v for k, v in map_data.items()}
-                print(f"[Vectorstore] Loaded {len(self.doc_id_map)} ID mappings.")
-            except Exception as e:
-                print(f"[Vectorstore ERROR] Failed to load ID map: {e}")
+    def _fts_path(self) -> Path:
+        return self.index_path.with_suffix(".fts.db")
 
-    def save_index(self):
+    def _vectors_path(self) -> Path:
+        return self.index_path.with_suffix(".vecs")
+
+    def _map_db_path(self) -> Path:
+        return self.index_path.with_suffix(".map.db")
+
+    def _replay_wal(self, wal_gen: int, index_ids: np.ndarray):
+        """마지막 스냅샷(wal_gen) 이후 WAL 레코드를 ID 맵/인덱스에 순서대로 다시 적용"""
+        add_ids, vecs, applied = [], [], 0
+        for faiss_id, key, vec in self._wal.replay(wal_gen):
+            applied += 1
+            if faiss_id == DELETE_ID:
+                self._mark_dead(self.doc_id_map.ids_for_doc(key))
+                continue
+            if vec.shape[0] != self.dim:
+                print(f"[Vectorstore ERROR] WAL record {faiss_id} has dim {vec.shape[0]}. Stopping replay.")
+                break
+            self.doc_id_map[faiss_id] = key
+            self._next_id = max(self._next_id, faiss_id + 1)
+            add_ids.append(faiss_id)
+            vecs.append(vec)
+        if add_ids:
+            add_ids = np.array(add_ids, dtype="int64")
+            if self._vectors is not None:
+                self._vectors.write(add_ids, np.stack(vecs))  # 마지막 sync 이후 행은 유실됐을 수 있음
+            fresh = ~np.isin(add_ids, index_ids)  # 크래시 전에 스냅샷된 벡터는 다시 넣지 않음
+            if fresh.any():
+                self._insert(np.stack(vecs)[fresh], add_ids[fresh])  # 매핑된 스냅샷이면 델타로
+        if applied:
+            print(f"[Vectorstore] WAL replay: records={applied} ntotal={self.ntotal} dead={len(self._dead)}")
+
+    # ------------- 스냅샷 -------------
+    def _capture_meta(self):
+        """루프 스레드에서 맵/메타를 일관된 시점으로 잡고 WAL 세대를 넘깁니다."""
+        map_rows = dict(self.doc_id_map.pending)
+        purged = set(self.doc_id_map.purged)
+        old_gens = self._wal.rotate() if self._wal else []
+        meta = {"next_id": self._next_id}
+        if self._wal:
+            meta["wal_gen"] = self._wal.gen
+        return map_rows, purged, meta, old_gens
+
+    async def _capture(self):
+        """
+        맵/메타를 잡고 WAL 세대를 넘긴 뒤, 그 시점에 실행 중이던 add(= 이전 세대 레코드)가 끝나길 기다려
+        인덱스를 FAISS 실행기에서 읽기 잠금으로 직렬화합니다 (그동안 검색/새 add 계속 가능).
+        세대를 넘긴 뒤의 add는 직렬화에 포함될 수도 있지만 새 세대 WAL에 있으므로 재생 때 건너뛰거나 다시 적용됩니다.
+        """
+        map_rows, purged, meta, old_gens = self._capture_meta()
+        inflight = list(self._writes)
+        if inflight:
+            await asyncio.wait(inflight)
+        data, captured = await self._run_faiss(self._serialize)
+        return data, captured, map_rows, purged, meta, old_gens
+
+    def _persist(self, data: np.ndarray, map_rows: Dict[int, Optional[str]], purged, meta: Dict[str, int]):
+        """
+        인덱스를 임시 파일에 쓴 뒤 교체하고 (쓰는 도중 크래시해도 이전 스냅샷이 남음),
+        ID 맵과 wal_gen을 한 트랜잭션으로 커밋합니다.
+        그 사이 크래시하면 맵은 이전 wal_gen을 가리키므로 WAL이 다시 재생됩니다 (이미 있는 벡터는 건너뜀).
+        """
         self._ensure_dir()
+        if self._vectors is not None:
+            self._vectors.sync()  # 이 스냅샷 이전 WAL 세대가 지워지기 전에
+        tmp = self.index_path.with_name(self.index_path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(data.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.index_path)
+        self.doc_id_map.commit(map_rows, purged, meta)
+
+    def save_index(self):
+        """동기 스냅샷 (스크립트/종료 경로용). 서버에서는 snapshot()이 디바운스되어 호출됩니다."""
         try:
             print(f"[Vectorstore] Saving index to {self.index_path}")
-            faiss.write_index(self.index, str(self.index_path))
-            
-            import json
-            map_path = self._map_path()
-            map_path.write_text(json.dumps(self.doc_id_map), 'utf-8')
-            print(f"[Vectorstore] Saved {len(self.doc_id_map)} ID mappings.")
+            map_rows, purged, meta, old_gens = self._capture_meta()
+            data, captured = self._serialize()
+            self._persist(data, map_rows, purged, meta)
+            self.doc_id_map.forget(map_rows, purged)
+            if self._wal:
+                self._wal.drop(old_gens)
+            if not self._rebuilding():
+                self._remap(captured)
+            print(f"[Vectorstore] Saved {self.ntotal} vectors ({len(self._dead)} marked deleted).")
         except Exception as e:
             print(f"[Vectorstore ERROR] Failed to save index or map: {e}")
 
-    async def add(self, doc_id: str, chunks: List[str]):
+    async def snapshot(self):
+        """비동기 스냅샷: 직렬화는 FAISS 실행기에서, 디스크 쓰기는 스레드에서 (그동안 add/search 계속 가능)"""
+        if self._snapshot_timer is not None:
+            self._snapshot_timer.cancel()
+            self._snapshot_timer = None
+        try:
+            data, captured, map_rows, purged, meta, old_gens = await self._capture()
+            await asyncio.to_thread(self._persist, data, map_rows, purged, meta)
+            del data
+            self.doc_id_map.forget(map_rows, purged)
+            if self._wal:
+                self._wal.drop(old_gens)
+            # 재빌드 중에는 교체 대상 인덱스를 바꾸지 않음 (교체 후 스냅샷에서 매핑)
+            if not self._rebuilding():
+                await self._run_faiss(self._remap, captured)
+            print(f"[Vectorstore] Snapshot saved (ntotal={self.ntotal}).")
+        except Exception as e:
+            # 이전 세대 WAL은 남아 있으므로 다음 시작 시 재생됩니다.
+            print(f"[Vectorstore ERROR] Snapshot failed: {e}")
+
+    def _schedule_snapshot(self, now: bool = False):
+        if self._wal is None:
+            return
+        running = self._snapshot_task is not None and not self._snapshot_task.done()
+        if (now or self._wal.pending >= VECTOR_SNAPSHOT_ADDS) and not running:
+            self._snapshot_task = asyncio.create_task(self.snapshot())
+        elif self._snapshot_timer is None:
+            loop = asyncio.get_running_loop()
+            self._snapshot_timer = loop.call_later(VECTOR_SNAPSHOT_SECONDS, self._on_snapshot_timer)
+
+    def _on_snapshot_timer(self):
+        self._snapshot_timer = None
+        if self._wal and self._wal.pending:
+            self._schedule_snapshot(now=True)
+
+    async def close(self):
+        """종료 시 호출: 진행 중 재빌드/스냅샷을 기다리고, 남은 변경을 스냅샷으로 저장"""
+        if self._batcher is not None:
+            await self._batcher.stop()
+        if self._rebuild_task is not None and not self._rebuild_task.done():
+            await self._rebuild_task
+        if self._snapshot_task is not None and not self._snapshot_task.done():
+            await self._snapshot_task
+        await self._drain_writes()
+        if self._wal is not None:
+            if self._wal.pending:
+                await self.snapshot()
+            elif self._snapshot_timer is not None:
+                self._snapshot_timer.cancel()
+                self._snapshot_timer = None
+            self._wal.close()
+        else:
+            self.save_index()
+        self.doc_id_map.close()
+        if self._vectors is not None:
+            self._vectors.close()
+        if self.lexical is not None:
+            self._lexical_writer.shutdown(wait=True)
+            self.lexical.close()
+
+    # ------------- 쓰기 (문서 단위) -------------
+    def _mark_dead(self, ids: List[int]):
+        if ids:
+            self.doc_id_map.mark_dead(ids)
+            self._dead.update(ids)
+            self._exclude = None
+
+    async def upsert(self, doc_id: str, chunks: List[str]) -> Dict[str, Any]:
         """
-        문서 청크를 임베딩하고 인덱스에 추가합니다.
+        문서의 청크를 임베딩해 새 ID로 추가하고, 같은 doc_id의 이전 청크는 삭제 표시합니다.
+        (다시 저장된 노트가 중복되지 않음. 삭제 표시된 벡터는 검색에서 제외되고 압축 때 제거)
         """
         if not chunks:
-            return
+            return {"doc_id": doc_id, "added": 0, "removed": await self.delete(doc_id)}
             
-        print(f"[Vectorstore] Adding {len(chunks)} chunks for doc: {doc_id}")
-        
-        # 1. 청크 임베딩 (배치 처리가 더 효율적)
-        vectors = []
-        for chunk_text in chunks:
-            vec = await get_embedding(chunk_text)
-            vectors.append(vec)
+        print(f"[Vectorstore] Upserting {len(chunks)} chunks for doc: {doc_id}")
         
-        if not vectors:
-            return
-            
-        batch_vectors = np.concatenate(vectors, axis=0).astype('float32')
-        
-        # 2. FAISS ID 매핑
-        start_id = self.index.ntotal
-        faiss_ids = list(range(start_id, start_id + len(chunks)))
-        
-        for i, chunk_idx in enumerate(chunks):
-            faiss_id = faiss_ids[i]
-            map_key = f"{doc_id}:{i}" # 예: "my_doc:0", "my_doc:1"
+        # 1. 청크 임베딩 (배치 API: 청크마다 왕복하지 않음)
+        # strict: 임베딩이 실패하면 이전 청크를 삭제 표시하기 전에 예외 (랜덤 벡터로 멀쩡한 문서를 대체하지 않음)
+        batch_vectors = await get_embeddings(chunks, kind="passage", strict=True)
+        return await self.upsert_vectors(doc_id, batch_vectors, texts=chunks)
+
+    async def upsert_vectors(self, doc_id: str, batch_vectors: np.ndarray, texts: Optional[List[str]] = None,
+                             spans: Optional[List[Tuple[int, int]]] = None, log: bool = True) -> Dict[str, Any]:
+        """
+        이미 임베딩된 청크 벡터(청크 순서)로 upsert (인제스트 파이프라인의 인덱스 기록 단계)
+        texts(와 원문 오프셋 spans)가 있으면 BM25 역색인도 함께 교체합니다.
+        """
+        batch_vectors = np.ascontiguousarray(batch_vectors, dtype="float32")
+        n = len(batch_vectors)
+
+        # 2. FAISS ID 할당 (재사용하지 않는 단조 증가 ID)
+        old_ids = self.doc_id_map.ids_for_doc(doc_id)
+        faiss_ids = np.arange(self._next_id, self._next_id + n, dtype="int64")
+        self._next_id += n
+        keys = [f"{doc_id}:{i}" for i in range(n)] # 예: "my_doc:0", "my_doc:1"
+
+        # 3. WAL에 먼저 기록 (인덱스 전체를 다시 쓰지 않음)
+        if self._wal:
+            records = [delete_record(doc_id)] if old_ids else []
+            records += list(zip(faiss_ids.tolist(), keys, batch_vectors))
+            self._wal.append(records)
+        self._mark_dead(old_ids)
+        for faiss_id, map_key in zip(faiss_ids.tolist(), keys):
             self.doc_id_map[faiss_id] = map_key
-            
-        # 3. 인덱스에 추가
-        self.index.add(batch_vectors)
-        print(f"[Vectorstore] Index ntotal: {self.index.ntotal}")
+
+        # 역색인 교체는 첫 await 전에 제출 → 같은 문서의 연속 upsert 순서대로 (전용 스레드)
+        lexical = None
+        if texts is not None and self.lexical is not None:
+            lexical = self._run_lexical(self.lexical.replace, doc_id, texts, spans)
+
+        # 4. 인덱스에 추가 (FAISS 실행기, 쓰기 잠금)
+        # 호출자가 취소돼도 add는 끝까지 실행 → WAL/ID 맵과 인덱스가 어긋나지 않음
+        write = self._run_faiss(self._add, faiss_ids, batch_vectors)
+        self._writes.add(write)
+        write.add_done_callback(self._writes.discard)
+        await asyncio.shield(write)
+        if lexical is not None:
+            await asyncio.shield(lexical)
+        if log:
+            print(f"[Vectorstore] Index ntotal: {self.ntotal} (dead: {len(self._dead)})")
+        self._maybe_promote()
+        self._maybe_compact()
+        self._schedule_snapshot()
+        return {"doc_id": doc_id, "added": n, "removed": len(old_ids)}
+
+    async def add(self, doc_id: str, chunks: List[str]):
+        """문서 청크를 임베딩하고 인덱스에 추가합니다. (upsert와 같음: 같은 doc_id의 이전 청크는 대체)"""
+        return await self.upsert(doc_id, chunks)
+
+    async def delete(self, doc_id: str) -> int:
+        """문서의 모든 청크를 삭제 표시합니다. 반환: 삭제된 청크 수"""
+        old_ids = self.doc_id_map.ids_for_doc(doc_id)
+        lexical = self._run_lexical(self.lexical.delete, doc_id) if self.lexical is not None else None
+        if old_ids:
+            if self._wal:
+                self._wal.append([delete_record(doc_id)])
+            self._mark_dead(old_ids)
+            print(f"[Vectorstore] Deleted {len(old_ids)} chunks for doc: {doc_id}")
+            self._maybe_compact()
+            self._schedule_snapshot()
+        if lexical is not None:
+            await lexical
+        return len(old_ids)
+
+    # ------------- ANN 승격 / 압축 (재빌드) -------------
+    def _rebuilding(self) -> bool:
+        return self._rebuild_task is not None and not self._rebuild_task.done()
+
+    def _maybe_promote(self):
+        """
+        ntotal이 VECTOR_ANN_THRESHOLD를 넘으면 백그라운드에서 flat → VECTOR_INDEX 재빌드
+        (저장 형식이 VECTOR_COMPRESSION과 다르면 같은 종류로 다시 빌드)
+        """
+        if self._rebuilding():
+            return
+        # 매핑된 스냅샷의 델타는 다음 스냅샷에서 합쳐져 다시 매핑된 뒤 개수에 반영됩니다.
+        if should_promote(self.index):
+            target = promotion_target(self.index, compression=VECTOR_COMPRESSION) or VECTOR_INDEX
+            print(f"[Vectorstore] ntotal={self.ntotal} >= {VECTOR_ANN_THRESHOLD}. "
+                  f"Rebuilding '{index_kind(self.index)}/{compression_of(self.index)}' index as "
+                  f"'{target}/{VECTOR_COMPRESSION}' in background.")
+            self._rebuild_task = asyncio.create_task(self.rebuild(target))
+
+    def _maybe_compact(self):
+        """삭제 표시가 VECTOR_COMPACT_RATIO를 넘으면 백그라운드에서 살아있는 벡터만으로 재빌드"""
+        if self._rebuilding():
+            return
+        dead = len(self._dead)
+        if dead >= VECTOR_COMPACT_MIN and dead > VECTOR_COMPACT_RATIO * self.ntotal:
+            print(f"[Vectorstore] {dead}/{self.ntotal} vectors marked deleted. Compacting in background.")
+            self._rebuild_task = asyncio.create_task(self.rebuild(index_kind(self.index)))
+
+    async def compact(self) -> str:
+        """삭제 표시된 벡터를 지금 제거 (현재 인덱스 종류 유지)"""
+        if self._rebuilding():
+            await self._rebuild_task
+        return await self.rebuild(index_kind(self.index))
+
+    async def rebuild(self, kind: str = VECTOR_INDEX) -> str:
+        """
+        살아있는 벡터만으로 kind 인덱스를 새로 만들어 교체합니다 (승격 + 압축).
+        복사/학습/추가는 FAISS 실행기에서 실행되고, 그동안 검색/upsert/delete는 기존 인덱스를 계속 사용합니다.
+        빌드 중 추가된 벡터는 쓰기 잠금 안에서 새 인덱스에 따라 넣고 교체하며, 빌드 중 삭제된 ID는 삭제 표시로 남습니다.
+        """
+        old, delta, base, ids, vectors = await self._run_faiss(self._read_vectors)
+        dropped = ids[np.isin(ids, np.fromiter(self._dead, dtype="int64", count=len(self._dead)))]
+        keep = ~np.isin(ids, dropped)
+        try:
+            new = await self._run_faiss(self._build, kind, ids[keep], vectors[keep], compression_of(old))
+            swapped = await self._run_faiss(self._swap, old, delta, base, new)
+        except Exception as e:
+            print(f"[Vectorstore ERROR] Failed to build '{kind}' index: {e}")
+            return index_kind(self.index)
+        if not swapped:
+            print("[Vectorstore WARN] Index replaced during rebuild. Discarding rebuilt index.")
+            return index_kind(self.index)
+        self._dead.difference_update(dropped.tolist())
+        self._exclude = None
+        self.doc_id_map.purge(dropped.tolist())
+        print(f"[Vectorstore] Switched to '{index_kind(new)}' index "
+              f"(ntotal={new.ntotal}, removed={len(dropped)}).")
+        self._schedule_snapshot(now=True)  # 재시작 시 다시 학습하지 않도록
+        # 빌드 중 쌓인 삭제 표시는 그대로 남으므로 다시 확인 (이 작업이 끝난 뒤 실행되도록 call_soon)
+        asyncio.get_running_loop().call_soon(self._maybe_compact)
+        return index_kind(new)
+
+    def _exact_vectors(self, ids: np.ndarray, vectors: np.ndarray, stored: str) -> np.ndarray:
+        """
+        인덱스에서 복원한 벡터(stored 형식)를 원본 벡터 파일의 값으로 교체
+        파일에 없는 행은 복원값을 쓰고, 복원값이 원본(stored == none)이면 파일에도 채워 둡니다.
+        """
+        if self._vectors is None or not len(ids):
+            return vectors
+        exact = self._vectors.read(ids)
+        have = exact.any(axis=1)
+        vectors = vectors.copy()
+        vectors[have] = exact[have]
+        if stored == "none" and not have.all():
+            self._vectors.write(ids[~have], vectors[~have])
+        return vectors
+
+    def _read_vectors(self):
+        """(FAISS 실행기) 재빌드 원본: (인덱스, 델타, (인덱스 크기, 델타 크기), ids, vectors) — 스냅샷 + 델타"""
+        with self._rw.read():
+            index, delta = self.index, self.delta
+            ids, vectors = id_vectors(index)
+            base = (index.ntotal, delta.ntotal if delta is not None else 0)
+            if base[1]:
+                delta_ids, delta_vectors = id_vectors(delta)
+                ids, vectors = np.concatenate([ids, delta_ids]), np.concatenate([vectors, delta_vectors])
+        return index, delta, base, ids, vectors
+
+    def _build(self, kind: str, ids: np.ndarray, vectors: np.ndarray, stored: str):
+        """(FAISS 실행기) 재빌드: 가능하면 원본 벡터로 학습/추가해 압축 오차가 누적되지 않도록"""
+        return build_index(kind, self._exact_vectors(ids, vectors, stored), ids, compression=VECTOR_COMPRESSION)
+
+    def _swap(self, old, delta, base: Tuple[int, int], new) -> bool:
+        """(FAISS 실행기) 쓰기 잠금 안에서 빌드 중 old(또는 델타)에 추가된 벡터를 new에 따라 넣고 교체"""
+        with self._rw.write():
+            if self.index is not old:
+                return False
+            tails = []
+            if old.ntotal > base[0]:
+                tails.append(id_vectors(old, start=base[0]) + (compression_of(old),))
+            if self.delta is not None:
+                start = base[1] if self.delta is delta else 0  # 빌드 중 처음 만들어진 델타는 전부
+                if self.delta.ntotal > start:
+                    tails.append(id_vectors(self.delta, start=start) + ("none",))
+            for new_ids, new_vecs, stored in tails:
+                new.add_with_ids(self._exact_vectors(new_ids, new_vecs, stored), new_ids)
+            self.index, self.delta = new, None
+            self._mmapped = False
+        return True
 
     async def search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
         """
         쿼리를 임베딩하고 인덱스에서 K개의 유사한 청크를 검색합니다.
+        (동시에 들어온 검색은 SearchBatcher가 모아 search_many 한 번으로 처리)
         """
-        if not self.index.ntotal:
+        if not self.ntotal:
             return [] # 인덱스가 비어있음
-            
-        # 1. 쿼리 임베딩
-        query_vector = await get_embedding(query)
-        
-        # 2. FAISS 검색
-        # D = distances, I = indices
-        distances, indices = self.index.search(query_vector, k)
-        
-        results = []
-        for i in range(k):
-            faiss_id = int(indices[0][i])
-            if faiss_id < 0:
-                continue # 유효하지 않은 인덱스
-                
-            map_key = self.doc_id_map.get(faiss_id)
-            if not map_key:
-                print(f"[Vectorstore WARN] No ID mapping found for FAISS ID: {faiss_id}")
-                continue
-                
-            try:
-                doc_id, chunk_idx_str = map_key.split(":", 1)
-            except ValueError:
-                print(f"[Vectorstore WARN] Invalid map key format: {map_key}")
-                continue
-            
-            results.append({
-                "doc_id": doc_id,
-                "chunk_idx": int(chunk_idx_str),
-                "score": float(distances[0][i])
-            })
-            
-        return results
+        if self._batcher is not None:
+            return await self._batcher.submit(query, k)
+        return (await self.search_many([query], [k]))[0]
+
+    def _search_index(self, query_vectors: np.ndarray, k: int, exclude: Optional[np.ndarray]):
+        """(FAISS 실행기) 읽기 잠금: 검색끼리는 병렬, add/교체와는 겹치지 않음. 델타가 있으면 함께 검색해 합침"""
+        with self._rw.read():
+            index, delta = self.index, self.delta
+            # 압축 인덱스: k * VECTOR_RERANK개 후보를 뽑아 원본 벡터로 정확한 거리 재계산 후 상위 k
+            fetch_k = k
+            if self._vectors is not None and VECTOR_RERANK > 1 and compression_of(index) != "none":
+                fetch_k = k * VECTOR_RERANK
+            distances, indices = index.search(query_vectors, fetch_k, params=search_params(index, exclude))
+            if delta is not None and delta.ntotal:
+                more_d, more_i = delta.search(query_vectors, fetch_k, params=search_params(delta, exclude))
+                distances, indices = merge_results(distances, indices, more_d, more_i, fetch_k)
+        if fetch_k > k:
+            distances, indices = rerank(query_vectors, distances, indices, self._vectors.read, k)
+        return distances, indices
+
+    async def search_many(self, queries: List[str], ks: List[int]) -> List[List[Dict[str, Any]]]:
+        """여러 쿼리를 한 번에: 배치 임베딩 → 다중 행 FAISS 검색(FAISS 실행기) → ID 맵 조회 한 번"""
+        if not self.ntotal:
+            return [[] for _ in queries]
+
+        # 1. 쿼리 임베딩 (한 번의 배치 호출)
+        query_vectors = await get_embeddings(queries, kind="query")
+
+        # 2. FAISS 검색 (삭제 표시된 ID는 검색 중에 제외 → top-k를 낭비하지 않음)
+        # D = distances, I = indices (행마다 요청별 k 중 최대값으로 검색 후 자름)
+        k_max = max(ks)
+        for _ in range(2):
+            if self._exclude is None and self._dead:
+                self._exclude = np.fromiter(self._dead, dtype="int64", count=len(self._dead))
+            index = self.index
+            distances, indices = await self._run_faiss(self._search_index, query_vectors, k_max, self._exclude)
+            found = {int(i) for row in indices for i in row if i >= 0}
+            # 검색 도중 삭제 표시됐거나 재빌드로 제거된 ID가 섞였으면 새 제외 목록으로 한 번 더 (top-k 채우기)
+            if self.index is index and self._dead.isdisjoint(found):
+                break
+        swapped = self.index is not index
+
+        # 3. 결과 ID만 ID 맵에서 조회
+        keys = self.doc_id_map.get_many(found)
+
+        out = []
+        for row, k in enumerate(ks):
+            results = []
+            for i in range(k):
+                faiss_id = int(indices[row][i])
+                if faiss_id < 0:
+                    continue # 유효하지 않은 인덱스
+
+                map_key = keys.get(faiss_id)
+                if not map_key:
+                    # 그 사이 삭제 표시/압축된 ID는 매핑 오류가 아님 (조용히 거름)
+                    if faiss_id not in self._dead and not swapped:
+                        print(f"[Vectorstore WARN] No ID mapping found for FAISS ID: {faiss_id}")
+                    continue
+
+                try:
+                    # doc_id 자체에 ':'가 있으므로 ("note:12:0") 마지막 ':' 기준으로 분리
+                    doc_id, chunk_idx_str = map_key.rsplit(":", 1)
+                    chunk_idx = int(chunk_idx_str)
+                except ValueError:
+                    print(f"[Vectorstore WARN] Invalid map key format: {map_key}")
+                    continue
+
+                results.append({
+                    "doc_id": doc_id,
+                    "chunk_idx": chunk_idx,
+                    "score": float(distances[row][i])
+                })
+            out.append(results)
+        return out
+
+    async def search_lexical(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
+        """FTS5 BM25 검색 (임베딩 호출 없음). score = bm25 (낮을수록 관련도 높음)"""
+        if self.lexical is None:
+            return []
+        return await asyncio.to_thread(self.lexical.search, query, k)
+
+    async def hybrid_search(self, query: str, k: int = 5, mode: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        mode: vector / lexical / hybrid (기본 RAG_SEARCH_MODE)
+        - hybrid: 벡터/BM25 후보를 각각 RAG_HYBRID_CANDIDATES개씩 뽑아 RRF로 결합
+        - 정확한 키워드 쿼리(코드, 번호, "구문")는 BM25 결과가 있으면 임베딩 없이 그대로 반환
+        - 결과에는 가능하면 청크 본문(text)이 포함됩니다.
+        score는 모드와 관계없이 높을수록 관련도 높음 (척도는 모드마다 다름). 원래 값은 별도 키에:
+          distance (L2, 벡터) / bm25 (FTS5, 낮을수록 좋음, start/end 포함) / rrf (결합, score와 같음)
+        """
+        mode = mode or RAG_SEARCH_MODE
+        if mode == "lexical":
+            return _bm25_hits(await self.search_lexical(query, k))
+        if mode != "hybrid" or self.lexical is None:
+            return await self._with_text(_distance_hits(await self.search(query, k)))
+
+        depth = max(k, RAG_HYBRID_CANDIDATES)
+        lexical = _bm25_hits(await self.search_lexical(query, depth))
+        if lexical and is_keyword_query(query):
+            return lexical[:k]
+        vector = _distance_hits(await self.search(query, depth))
+        fused = fuse_rrf({"vector": vector, "lexical": lexical}, k)
+        for h in fused:
+            h["rrf"] = h["score"]
+        return await self._with_text(fused)
+
+    async def _with_text(self, hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        missing = [(h["doc_id"], h["chunk_idx"]) for h in hits if h.get("text") is None]
+        if self.lexical is not None and missing:
+            texts = await asyncio.to_thread(self.lexical.texts, missing)
+            for h in hits:
+                if h.get("text") is None and (h["doc_id"], h["chunk_idx"]) in texts:
+                    h["text"] = texts[(h["doc_id"], h["chunk_idx"])]
+        return hits
+
+def _distance_hits(hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """벡터 검색 결과: distance = L2 거리, score = 1 / (1 + distance) (높을수록 좋음)"""
+    return [dict(h, distance=h["score"], score=1.0 / (1.0 + max(h["score"], 0.0))) for h in hits]
+
+def _bm25_hits(hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """BM25 결과: bm25 = FTS5 원래 값 (음수, 낮을수록 좋음), score = -bm25 (높을수록 좋음)"""
+    return [dict(h, bm25=h["score"], score=-h["score"]) for h in hits]
 
 # --- 싱글톤 인스턴스 ---
 # (RAG 프리뷰 라우터 등에서 이 인스턴스를 공유하여 사용)
@@ -177,4 +769,18 @@ def get_vectorstore():
     global _vectorstore_instance
     if _vectorstore_instance is None:
         _vectorstore_instance = VectorStore()
-    return _vectorstore_instance
\ No newline at end of file
+    return _vectorstore_instance
+
+def vector_search_metrics() -> Dict[str, Any]:
+    """검색 배치/FAISS 잠금 지표 (GET /dash/pipeline). 저장소가 아직 없으면 {}"""
+    inst = _vectorstore_instance
+    if inst is None:
+        return {}
+    out = inst._batcher.metrics() if inst._batcher is not None else {}
+    out["faiss"] = {"threads": VECTOR_FAISS_THREADS, "pending_writes": len(inst._writes), **inst._rw.snapshot()}
+    return out
+
+async def close_vectorstore():
+    """앱 종료 훅: 생성된 경우에만 마지막 스냅샷 저장"""
+    if _vectorstore_instance is not None:
+        await _vectorstore_instance.close()
\ No newline at end of file
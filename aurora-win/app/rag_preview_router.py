@@ -2,6 +2,7 @@
 RAG Document Preview Router
 - /docs/{doc_id} 엔드포인트를 제공하여 RAG 문서의 스니펫(snippet)을 반환합니다.
 - /docs/search 엔드포인트를 제공하여 문서 내 용어(term)를 검색합니다.
+  (벡터 저장소의 FTS5 역색인을 사용, doc 없이 호출하면 전체 문서에서 BM25 검색)
 - 저장소: data/rag/{doc_id}.txt (UTF-8)
 """
 from __future__ import annotations
@@ -41,6 +42,41 @@ def _load_text(doc_id: str) -> str:
         raise HTTPException(500, detail=f"Failed to read document: {e}")
 
 
+def _lexical():
+    """벡터 저장소의 BM25 역색인 (FAISS/FTS5가 없으면 None)"""
+    try:
+        from app.memory.vectorstore import get_vectorstore
+        return get_vectorstore().lexical
+    except Exception as e:
+        print(f"[RAGPreview WARN] Lexical index unavailable: {e}")
+        return None
+
+
+def _whole_tokens_only(text_l: str, term_l: str) -> bool:
+    """용어가 단일 토큰이고, 원문의 모든 등장 위치가 단어 경계와 맞는지 (역색인 구간으로 대신할 수 있는지)"""
+    if not re.fullmatch(r"\w+", term_l):
+        return False
+    t = re.escape(term_l)
+    return re.search(rf"\w{t}|{t}\w", text_l) is None
+
+
+def _find_chunks(text: str, term_l: str, size: int, limit: int, spans=None) -> List[int]:
+    """spans(원문 오프셋 구간) 안에서만 용어를 찾아 미리보기 청크 번호 목록을 반환 (None이면 전체)"""
+    hits: List[int] = []
+    text_l = text.lower()
+    for lo, hi in (spans or [(0, len(text_l))]):
+        pos = lo
+        while len(hits) < limit:
+            idx = text_l.find(term_l, pos, hi)
+            if idx < 0:
+                break # 용어 없음
+            chunk_id = idx // size
+            if chunk_id not in hits:
+                hits.append(chunk_id)
+            pos = (chunk_id + 1) * size # 다음 청크의 시작으로 이동 (중복 방지)
+    return sorted(hits)
+
+
 def _slice(text: str, chunk: int, size: int) -> (int, int, str):
     """텍스트를 청크 크기(size)로 자릅니다."""
     start = max(0, chunk * size)
@@ -62,6 +98,44 @@ def _highlight(s: str, terms: List[str]) -> List[Dict]:
             pass # 잘못된 정규식 용어 무시
     return res
 
+# /docs/{doc_id} 보다 먼저 등록해야 "search"가 doc_id로 잡히지 않음
+@preview_router.get("/docs/search")
+def search_chunks(
+    term: str, 
+    doc: Optional[str] = None, 
+    size: int = Query(800, ge=100, le=5000), 
+    limit: int = Query(20, ge=1, le=50)
+):
+    """
+    문서 내에서 특정 용어가 포함된 청크 ID 목록을 검색합니다.
+    (webui_RagPreview.tsx [cite: vivleon/aurora/AURORA-main/aurora-win/aurora-win/webui/webui_RagPreview.tsx]가 호출)
+    - doc 지정: 역색인으로 용어가 있는 인제스트 청크를 찾고, 그 구간 안에서만 위치를 확인 (색인 전 문서나 단어 일부로 등장하는 용어는 전체 스캔)
+    - doc 생략: 모든 인제스트 문서에서 BM25 상위 청크 (임베딩 호출 없음, score는 높을수록 관련)
+    """
+    term_l = term.lower()
+    lexical = _lexical()
+
+    if doc is None:
+        if not (lexical and term_l):
+            return {"term": term, "hits": []}
+        from app.memory.vectorstore import _bm25_hits
+        # hybrid_search와 같은 방향: score = -bm25 (높을수록 관련), bm25 = FTS5 원래 값
+        return {"term": term, "hits": _bm25_hits(lexical.search(term, limit))}
+
+    text = _load_text(doc)
+    if not term_l:
+        return {"doc_id": doc, "term": term, "chunks": []}
+
+    spans = None
+    # 단어 일부로도 등장하면(예: "cat" ⊂ "categories") 역색인 구간으로는 놓치므로 전체 스캔
+    if lexical is not None and lexical.has_doc(f"rag:{doc}") and _whole_tokens_only(text.lower(), term_l):
+        found = lexical.search(f'"{term}"', 1000, doc_id=f"rag:{doc}")
+        spans = sorted((h["start"], h["end"]) for h in found if h["start"] is not None)
+        if not spans or len(spans) < len(found):
+            spans = None # 오프셋 없는 청크는 색인으로 찾을 수 없으므로 전체 스캔
+
+    return {"doc_id": doc, "term": term, "chunks": _find_chunks(text, term_l, size, limit, spans)}
+
 @preview_router.get("/docs/{doc_id}")
 def get_chunk(
     doc_id: str, 
@@ -85,44 +159,3 @@ def get_chunk(
         "text": snip,
         "highlights": hl,
     }
-
-@preview_router.get("/docs/search")
-def search_chunks(
-    doc: str, 
-    term: str, 
-    size: int = Query(800, ge=100, le=5000), 
-    limit: int = Query(20, ge=1, le=50)
-):
-    """
-    문서 내에서 특정 용어가 포함된 청크 ID 목록을 검색합니다.
-    (webui_RagPreview.tsx [cite: vivleon/aurora/AURORA-main/aurora-win/aurora-win/webui/webui_RagPreview.tsx]가 호출)
-    """
-    text = _load_text(doc)
-    hits = []
-    pos = 0
-    term_l = term.lower()
-    
-    if not term_l:
-        return {"doc_id": doc, "term": term, "chunks": []}
-        
-    text_l = text.lower()
-    
-    while len(hits) < limit:
-        try:
-            # 다음 위치에서 용어 검색
-            idx = text_l.find(term_l, pos)
-        except Exception:
-            break # 검색 오류
-            
-        if idx < 0: 
-            break # 용어 없음
-            
-        chunk_id = idx // size
-        if chunk_id not in hits:
-            hits.append(chunk_id)
-            
-        pos = (chunk_id + 1) * size # 다음 청크의 시작으로 이동 (중복 방지)
-        if pos >= len(text_l):
-            break
-        
-    return {"doc_id": doc, "term": term, "chunks": hits}
\ No newline at end of file
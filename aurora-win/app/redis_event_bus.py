@@ -1,20 +1,23 @@
 """
 Redis Pub/Sub Adapter for Multi-Worker SSE
 - 수평 확장된 uvicorn/gunicorn 워커들이 이벤트를 팬아웃(fan-out)할 수 있도록 합니다.
-- 채널 스키마: aurora.events (JSON lines)
+- 채널 스키마: aurora.events (EVENT_CODEC: JSON 또는 msgpack, app/event_codec.py)
+- 이벤트는 발행 시 한 번 인코딩되고, 구독 측은 디코드 없이 EncodedEvent(raw bytes)를 전달합니다.
 
 Usage:
     bus = RedisEventBus(url="redis://localhost:6379/0", channel="aurora.events")
     await bus.publish({"type": "tool", ...})
-    async for ev in bus.subscribe():
-        yield ev
+    async for ev in bus.subscribe():   # EncodedEvent
+        yield event_frame(ev)
 """
 from __future__ import annotations
 import asyncio
-import json
 import os
 from typing import AsyncGenerator, Dict, Any, List
 
+from app.event_bus import BaseEventBus
+from app.event_codec import EncodedEvent, EventCodec, get_codec
+
 try:
     from redis.asyncio import Redis
     from redis.exceptions import ConnectionError as RedisConnectionError
@@ -23,19 +26,24 @@ except ImportError:
     Redis = None
     RedisConnectionError = None
 
-class RedisEventBus:
-    def __init__(self, url: str = "redis://localhost:6379/0", channel: str = "aurora.events"):
+class RedisEventBus(BaseEventBus):
+    name = "redis"
+
+    def __init__(self, url: str = "redis://localhost:6379/0", channel: str = "aurora.events",
+                 codec: EventCodec | None = None):
         if Redis is None:
             raise ImportError("'redis' package is required for RedisEventBus.")
         self.url = url
         self.channel = channel
+        self.codec = codec or get_codec()
         self._redis: Redis | None = None
         self._pubsub = None
 
     async def _client(self) -> Redis:
         if self._redis is None or not self._redis.is_connected():
             try:
-                self._redis = Redis.from_url(self.url, decode_responses=True)
+                # 바이너리 페이로드(msgpack)와 바이트 패스스루를 위해 응답을 디코드하지 않습니다.
+                self._redis = Redis.from_url(self.url, decode_responses=False)
                 await self._redis.ping()
                 print(f"[RedisEventBus] Connected to {self.url}")
             except RedisConnectionError as e:
@@ -44,10 +52,36 @@ class RedisEventBus:
                 raise
         return self._redis
 
+    async def ping(self, timeout: float = 0.5) -> bool:
+        """
+        Redis 가용성을 짧은 타임아웃으로 확인합니다. (예외를 던지지 않음)
+        - app/event_bus_select.py의 auto 모드가 시작 시 한 번 호출합니다.
+        """
+        probe = Redis.from_url(self.url, decode_responses=True,
+                               socket_connect_timeout=timeout, socket_timeout=timeout)
+        try:
+            return bool(await asyncio.wait_for(probe.ping(), timeout))
+        except Exception as e:
+            print(f"[RedisEventBus WARN] Probe failed for {self.url}: {e}")
+            return False
+        finally:
+            try:
+                await probe.close()
+            except Exception:
+                pass
+
+    async def close(self):
+        if self._redis is not None:
+            try:
+                await self._redis.close()
+            except Exception:
+                pass
+            self._redis = None
+
     async def publish(self, event: Dict[str, Any]):
         try:
             r = await self._client()
-            await r.publish(self.channel, json.dumps(event, separators=(",", ":")))
+            await r.publish(self.channel, self.codec.encode(event))
         except RedisConnectionError as e:
             print(f"[RedisEventBus ERROR] Publish failed: {e}")
             self._redis = None # 연결 재생성 유도
@@ -59,13 +93,13 @@ class RedisEventBus:
             r = await self._client()
             pipe = r.pipeline()
             for e in events:
-                pipe.publish(self.channel, json.dumps(e, separators=(",", ":")))
+                pipe.publish(self.channel, self.codec.encode(e))
             await pipe.execute()
         except RedisConnectionError as e:
             print(f"[RedisEventBus ERROR] Publish batch failed: {e}")
             self._redis = None
 
-    async def subscribe(self) -> AsyncGenerator[Dict[str, Any], None]:
+    async def subscribe(self) -> AsyncGenerator[EncodedEvent, None]:
         while True:
             try:
                 r = await self._client()
@@ -73,12 +107,12 @@ class RedisEventBus:
                 await self._pubsub.subscribe(self.channel)
                 print(f"[RedisEventBus] Subscribed to channel '{self.channel}'")
                 async for msg in self._pubsub.listen():
-                    if msg and msg.get("type") == "message":
+                    if msg and msg.get("type") in ("message", b"message"):
                         data = msg.get("data")
-                        try:
-                            yield json.loads(data)
-                        except (json.JSONDecodeError, TypeError):
-                            print(f"[RedisEventBus WARN] Failed to decode JSON from message: {data}")
+                        if isinstance(data, (bytes, bytearray)):
+                            yield EncodedEvent(bytes(data), self.codec)
+                        else:
+                            print(f"[RedisEventBus WARN] Unexpected message payload: {data!r}")
             except RedisConnectionError as e:
                 print(f"[RedisEventBus ERROR] Subscription connection lost: {e}. Reconnecting in 5s...")
                 self._redis = None # 연결 초기화
@@ -99,6 +133,7 @@ class RedisEventBus:
 _redis_bus: RedisEventBus | None = None
 
 def get_redis_bus(url: str = "redis://localhost:6379/0", channel: str = "aurora.events") -> RedisEventBus:
+    # 코덱은 EVENT_CODEC 환경 변수로 결정됩니다 (모든 워커가 같은 값을 사용해야 함)
     global _redis_bus
     if _redis_bus is None:
         _redis_bus = RedisEventBus(url=url, channel=channel)
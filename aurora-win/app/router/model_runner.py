@@ -1,8 +1,9 @@
 # app/router/model_runner.py
+import asyncio
 import json
 import os
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 # httpx는 requirements.txt에 추가해야 합니다.
 # (또는 python-dotenv와 rich처럼 기본 설치)
@@ -21,6 +22,11 @@ LLAMA_CPP_PORT_MAP = {
 
 MODEL_ROUTER_PATH = Path(os.getenv("MODEL_ROUTER_PATH", "app/router/model_router.json"))
 
+# 배치 임베딩 (embed_batch): 한 번의 호출로 여러 청크를 임베딩합니다.
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))     # 백엔드 호출당 텍스트 수
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "2"))    # 동시에 진행하는 배치 수
+EMBED_DIM = 384  # e5-small-v2
+
 class ModelRouter:
     """
     model_router.json을 로드하고 태스크에 적합한 모델을 결정합니다.
@@ -91,8 +97,13 @@ async def run_inference(
 
     # 2. 추론 실행
     try:
-        # A) 로컬 llama.cpp 서버
-        if model_uri.startswith("local://"):
+        # A) 로컬 ONNX (임베딩 등) — 'local://' 보다 먼저 검사해야 llama.cpp로 잘못 라우팅되지 않습니다.
+        if model_uri.startswith("local://onnx/"):
+            vector = (await (await _local_engine()).embed([prompt]))[0]
+            return {"vector": vector.tolist(), "model": model_uri}
+
+        # B) 로컬 llama.cpp 서버
+        elif model_uri.startswith("local://"):
             # 예: "local://phi3-mini-gguf" -> 'phi3-mini-gguf' (manifest 키)
             model_key_from_uri = model_uri.split("://")[-1]
             
@@ -121,12 +132,6 @@ async def run_inference(
                 content = response.json().get("content", "")
                 return {"text": content, "model": model_uri}
 
-        # B) 로컬 ONNX (임베딩 등)
-        elif model_uri.startswith("local://onnx/"):
-            # TODO: app/memory/vectorstore.py 내부의 ONNX 로직 호출
-            print("[ModelRunner] ONNX embedding (not implemented)")
-            return {"vector": [0.0] * 384, "model": model_uri}
-            
         # C) 클라우드 (폴백)
         elif model_uri.startswith("cloud://"):
             # TODO: OpenAI/Anthropic/Gemini API 호출
@@ -138,4 +143,103 @@ async def run_inference(
             
     except Exception as e:
         print(f"[ModelRunner ERROR] Inference failed for {model_uri}: {e}")
-        return {"text": None, "error": str(e), "model": model_uri}
\ No newline at end of file
+        return {"text": None, "error": str(e), "model": model_uri}
+
+
+async def _local_engine():
+    # 지연 임포트: 임베딩을 쓰지 않는 경로에서는 모델을 로드하지 않습니다. (첫 로드는 스레드에서, 루프 비차단)
+    from app.memory.local_embedder import load_local_engine
+    return await load_local_engine()
+
+def _route_embedding(task: str) -> str:
+    return _router_instance.get_model_for_task(task, "low", 0).get("uri", "local://onnx/e5-small")
+
+async def embedding_model_uri(task: str = "embedding", kind: Optional[str] = None) -> str:
+    """
+    임베딩 태스크가 라우팅되는 모델 식별자 (임베딩 캐시 키의 일부)
+    로컬 ONNX는 실제 로드된 백엔드(ONNX 모델 또는 해시 n-gram 폴백)까지 포함하고,
+    e5 접두사를 쓰는 백엔드면 kind(query/passage)도 붙입니다 (접두사가 다른 벡터가 캐시에서 섞이지 않도록).
+    """
+    uri = _route_embedding(task)
+    if uri.startswith("local://onnx/"):
+        engine = await _local_engine()
+        tag = f"{uri}#{engine.model_id}"
+        return f"{tag}#{kind}" if kind and engine.prefixes else tag
+    return uri
+
+async def _embed_backend(
+    model_uri: str,
+    texts: List[str],
+    client: Optional["httpx.AsyncClient"] = None,
+    kind: Optional[str] = None,
+) -> List[List[float]]:
+    """
+    배치 하나를 임베딩합니다. 반환: 텍스트별 벡터 (입력과 같은 순서)
+    kind: query/passage (로컬 ONNX e5의 입력 접두사)
+    """
+    # A) 로컬 ONNX: 프로세스 내 엔진 (HTTP 왕복 없음, 스레드 풀 배치 추론)
+    if model_uri.startswith("local://onnx/"):
+        return (await (await _local_engine()).embed(texts, kind=kind)).tolist()
+
+    # B) 로컬 llama.cpp 서버 (OpenAI 호환 /v1/embeddings, input 배열로 한 번에 요청)
+    if model_uri.startswith("local://"):
+        if client is None:
+            raise ImportError("httpx is required for llama.cpp server calls")
+        model_key_from_uri = model_uri.split("://")[-1]
+        port = LLAMA_CPP_PORT_MAP.get("main", 8081)
+        if "intent" in model_key_from_uri:
+            port = LLAMA_CPP_PORT_MAP.get("intent", 8082)
+        url = f"http://127.0.0.1:{port}/v1/embeddings"
+        response = await client.post(url, json={"input": texts, "model": model_key_from_uri})
+        response.raise_for_status()
+        data = sorted(response.json().get("data", []), key=lambda d: d.get("index", 0))
+        if len(data) != len(texts):
+            raise ValueError(f"embedding server returned {len(data)} vectors for {len(texts)} inputs")
+        return [d["embedding"] for d in data]
+
+    raise ValueError(f"Embedding not supported for model URI: {model_uri}")
+
+async def embed_batch(
+    texts: List[str],
+    task: str = "embedding",
+    batch_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    kind: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    여러 텍스트를 배치로 임베딩합니다. (kind: query = 검색 쿼리, passage = 색인할 문서/청크)
+    - 라우팅은 한 번만 수행하고, batch_size개씩 나누어 최대 concurrency개 배치를 동시에 요청합니다.
+    - HTTP 클라이언트(커넥션 풀)는 호출 전체에서 하나를 공유합니다.
+    반환: {"vectors": [벡터 또는 실패 시 None, ...], "model": uri, "errors": [...]}
+    """
+    batch_size = max(1, batch_size or EMBED_BATCH_SIZE)
+    concurrency = max(1, concurrency or EMBED_CONCURRENCY)
+    model_uri = _route_embedding(task)
+    vectors: List[Optional[List[float]]] = [None] * len(texts)
+    errors: List[str] = []
+    if not texts:
+        return {"vectors": vectors, "model": model_uri, "errors": errors}
+
+    print(f"[ModelRunner] Embedding {len(texts)} texts with {model_uri} "
+          f"(batch={batch_size}, concurrency={concurrency})")
+    sem = asyncio.Semaphore(concurrency)
+
+    async def _one(start: int, client):
+        batch = texts[start:start + batch_size]
+        async with sem:
+            try:
+                out = await _embed_backend(model_uri, batch, client, kind=kind)
+                vectors[start:start + len(out)] = out
+            except Exception as e:
+                errors.append(f"batch@{start}: {e}")
+
+    starts = range(0, len(texts), batch_size)
+    if model_uri.startswith("local://onnx/") or httpx is None:
+        await asyncio.gather(*[_one(i, None) for i in starts])
+    elif httpx is not None:
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            await asyncio.gather(*[_one(i, client) for i in starts])
+
+    if errors:
+        print(f"[ModelRunner ERROR] Embedding failed for {len(errors)} batches: {errors[0]}")
+    return {"vectors": vectors, "model": model_uri, "errors": errors}
@@ -0,0 +1,299 @@
+"""
+Aurora Audit Chains (per-worker)
+- 여러 uvicorn 워커가 같은 'data/audit.log'에 append 하면, 프로세스마다 메모리에 든 체인 헤드가 달라
+  체인이 갈라지고 줄이 섞입니다. 워커 모드에서는 프로세스마다 자기 체인 파일에 기록합니다.
+  - 'data/audit.log' → 'data/audit-w0.log', 'data/audit-w1.log', ... (워커 슬롯)
+  - 슬롯은 '<체인>.lock' 파일의 배타 잠금으로 정해지며 프로세스 수명 동안 유지됩니다.
+    (기록마다 프로세스 간 잠금을 잡지 않으므로 처리량이 워커 수에 비례)
+  - 회전/Merkle/시간 인덱스는 체인 파일마다 독립적으로 동작합니다.
+- 앵커: 각 워커는 주기적으로(AUDIT_ANCHOR_SECONDS) 다른 체인들의 현재 헤드를 담은
+  "AUDIT:ANCHOR" 항목을 자기 체인에 기록합니다. 한 체인을 다시 쓰면 다른 체인의 앵커와 어긋나므로 탐지됩니다.
+- verify_chains(): 체인별 해시체인 검증 + 세그먼트 연결 + 앵커가 가리키는 헤드의 존재 확인.
+  (앵커도 증분: 각 체인의 '.verify.json' 오프셋 이후 항목만 보고, 확인된 헤드는 그 체크포인트에 저장)
+- AUDIT_CHAINS=single|worker|auto (auto: WEB_CONCURRENCY > 1 이면 worker)
+"""
+from __future__ import annotations
+import glob
+import heapq
+import json
+import os
+import re
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from app.security import audit_segments
+from app.security.hashlog import GENESIS_HASH, read_last_hash
+
+CHAIN_MODE = os.getenv("AUDIT_CHAINS", "auto")
+ANCHOR_SECONDS = float(os.getenv("AUDIT_ANCHOR_SECONDS", "60"))
+MAX_SLOTS = 256
+ANCHOR_ACTION = "AUDIT:ANCHOR"
+
+def resolve_chain_mode(mode: str = CHAIN_MODE) -> str:
+    if mode == "auto":
+        try:
+            return "worker" if int(os.getenv("WEB_CONCURRENCY", "1")) > 1 else "single"
+        except ValueError:
+            return "single"
+    if mode not in ("single", "worker"):
+        print(f"[AuditChains WARN] Unknown AUDIT_CHAINS '{mode}'. Using 'single'.")
+        return "single"
+    return mode
+
+def worker_log_path(log_path: str, slot: int) -> str:
+    root, ext = os.path.splitext(log_path)
+    return f"{root}-w{slot}{ext or '.log'}"
+
+def chain_paths(log_path: str, archive_dir: Optional[str] = audit_segments.ARCHIVE_DIR) -> List[str]:
+    """기본 로그(비어 있지 않거나 회전 이력이 있으면)와 워커 체인 파일 목록"""
+    root, ext = os.path.splitext(log_path)
+    pattern = re.compile(re.escape(os.path.basename(root)) + r"-w(\d+)" + re.escape(ext or ".log") + "$")
+    workers = []
+    for path in glob.glob(f"{glob.escape(root)}-w*{ext or '.log'}"):
+        m = pattern.match(os.path.basename(path))
+        if m:
+            workers.append((int(m.group(1)), path))
+    paths = [p for _, p in sorted(workers)]
+    base_used = (os.path.exists(log_path) and os.path.getsize(log_path) > 0) \
+        or bool(audit_segments.load_manifest(log_path, archive_dir))
+    return ([log_path] if base_used else []) + paths
+
+# ------------------------- slot lock -------------------------
+
+def _try_lock(fh) -> bool:
+    try:
+        if os.name == "nt":
+            import msvcrt
+            msvcrt.locking(fh.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+def acquire_slot(log_path: str, max_slots: int = MAX_SLOTS):
+    """
+    비어 있는 워커 슬롯을 잡습니다. 반환: (슬롯 번호, 잠금 파일 핸들) — 핸들은 프로세스 종료까지 유지해야 합니다.
+    프로세스가 죽으면 OS가 잠금을 풀어주므로 재시작한 워커가 같은 슬롯(같은 체인)을 이어씁니다.
+    """
+    for slot in range(max_slots):
+        path = worker_log_path(log_path, slot) + ".lock"
+        fh = open(path, "a+b")
+        if _try_lock(fh):
+            return slot, fh
+        fh.close()
+    raise RuntimeError(f"no free audit chain slot for {log_path} (max {max_slots})")
+
+def release_slot(fh):
+    try:
+        fh.close()  # 닫으면 잠금도 해제됩니다.
+    except OSError:
+        pass
+
+# ------------------------- anchors -------------------------
+
+def current_head(chain_path: str, archive_dir: Optional[str] = audit_segments.ARCHIVE_DIR) -> str:
+    head = read_last_hash(chain_path)
+    if head == GENESIS_HASH:
+        head = audit_segments.chain_start(chain_path, archive_dir)
+    return head
+
+def make_anchor(log_path: str, own_path: str,
+                archive_dir: Optional[str] = audit_segments.ARCHIVE_DIR) -> Optional[Dict[str, Any]]:
+    """다른 체인들의 현재 헤드를 담은 앵커 항목 (다른 체인이 없으면 None). (동기)"""
+    peers = {}
+    for path in chain_paths(log_path, archive_dir):
+        if os.path.abspath(path) == os.path.abspath(own_path):
+            continue
+        head = current_head(path, archive_dir)
+        if head != GENESIS_HASH:
+            peers[os.path.basename(path)] = head
+    if not peers:
+        return None
+    return {"ts": time.time(), "actor": "audit", "action": ANCHOR_ACTION,
+            "payload": {"chain": os.path.basename(own_path), "peers": peers}}
+
+# ------------------------- reading / verification -------------------------
+
+def iter_chain(
+    chain_path: str,
+    archive_dir: Optional[str] = audit_segments.ARCHIVE_DIR,
+    start: int = 0,
+    end: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    체인의 항목 (아카이브 세그먼트 → 활성 파일 순서, 스트리밍)
+    start > 0이면 아카이브는 건너뛰고 활성 파일의 [start, end) 바이트 구간만 읽습니다.
+    """
+    files = []
+    if start <= 0:
+        out_dir = audit_segments.archive_dir_for(chain_path, archive_dir)
+        files = [audit_segments.segment_file(out_dir, rec["segment"])
+                 for rec in audit_segments.load_manifest(chain_path, archive_dir)]
+    files.append(chain_path if os.path.exists(chain_path) else None)
+    for path in files:
+        if path is None:
+            continue
+        active = path == chain_path
+        with audit_segments.open_segment(path) as f:
+            pos = 0
+            if active and start > 0:
+                f.seek(start)
+                pos = start
+            for raw in f:
+                pos += len(raw)
+                if active and end is not None and pos > end:
+                    break
+                if not raw.strip():
+                    continue
+                try:
+                    yield json.loads(raw)
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    continue
+
+def check_anchors(
+    log_path: str,
+    archive_dir: Optional[str] = audit_segments.ARCHIVE_DIR,
+    since: Optional[Dict[str, Dict[str, Any]]] = None,
+    ends: Optional[Dict[str, int]] = None,
+) -> Dict[str, Any]:
+    """
+    앵커가 가리키는 다른 체인의 헤드가 실제로 그 체인에 존재하는지 확인합니다.
+    (1차: 앵커 수집, 2차: 참조된 해시만 찾기 → 메모리는 앵커 수에 비례)
+    - since: 체인 이름 → 이전 검증 체크포인트 ({"offset", "head", "anchors": {"heads"}}).
+      주어지면 각 체인의 offset 이후 항목만 읽고, 참조된 헤드는 새 구간 / 이전 체크포인트의 헤드 /
+      이전에 확인된 앵커 헤드에서 찾습니다. 그래도 못 찾은 헤드만 해당 체인 전체를 다시 훑습니다.
+    - ends: 체인 이름 → 활성 파일에서 읽을 끝 오프셋 (검증된 구간과 맞춤)
+    반환의 heads: 체인별로 그 체인의 앵커가 가리킨 (확인된) 다른 체인의 마지막 헤드
+    """
+    since = since or {}
+    ends = ends or {}
+    paths = {os.path.basename(p): p for p in chain_paths(log_path, archive_dir)}
+    starts = {name: int((since.get(name) or {}).get("offset") or 0) for name in paths}
+    known: Dict[str, Set[str]] = {name: set() for name in paths}
+    heads: Dict[str, Dict[str, str]] = {name: {} for name in paths}
+    for name, cp in since.items():
+        if cp.get("head"):
+            known.setdefault(name, set()).add(cp["head"])
+        for peer, head in ((cp.get("anchors") or {}).get("heads") or {}).items():
+            known.setdefault(peer, set()).add(head)
+            if name in heads:
+                heads[name][peer] = head
+
+    def _entries(name: str):
+        return iter_chain(paths[name], archive_dir, start=starts[name], end=ends.get(name))
+
+    wanted: Dict[str, Set[str]] = {name: set() for name in paths}
+    anchors = []
+    counts = {name: 0 for name in paths}
+    for name in paths:
+        for e in _entries(name):
+            if e.get("action") == ANCHOR_ACTION:
+                counts[name] += 1
+                for peer, head in (e.get("payload") or {}).get("peers", {}).items():
+                    anchors.append((name, peer, head))
+                    if head not in known.get(peer, set()):
+                        wanted.setdefault(peer, set()).add(head)
+    found: Dict[str, Set[str]] = {name: set(h) for name, h in known.items()}
+    for name, want in wanted.items():
+        if not want or name not in paths:
+            continue
+        hits = {e.get("hash") for e in _entries(name) if e.get("hash") in want}
+        if want - hits:
+            # 읽은 구간 밖의 헤드 (체인을 차례로 검증하는 사이에 기록/확인된 항목) → 체인 전체에서 한 번 더
+            rest = want - hits
+            hits |= {e.get("hash") for e in iter_chain(paths[name], archive_dir) if e.get("hash") in rest}
+        found[name] |= hits
+    missing = []
+    for src, peer, head in anchors:
+        if head in found.get(peer, set()):
+            heads[src][peer] = head
+        else:
+            missing.append({"chain": src, "peer": peer, "head": head})
+    return {"anchors": sum(counts.values()), "counts": counts, "missing": missing[:200], "ok": not missing,
+            "heads": heads}
+
+def verify_anchors(
+    log_path: str,
+    results: Dict[str, Dict[str, Any]],
+    previous: Dict[str, Optional[Dict[str, Any]]],
+    full: bool = False,
+    archive_dir: Optional[str] = audit_segments.ARCHIVE_DIR,
+) -> Dict[str, Any]:
+    """
+    verify_log 결과(results)와 그 직전 체크포인트(previous)로 앵커를 검증하고, 체인별 앵커 상태를
+    각 체인의 '.verify.json'에 저장합니다 (누적 앵커 수, 못 찾은 앵커, 확인된 헤드).
+    모든 체인이 체크포인트에서 재개된 경우에만 증분으로, 아니면 (전체 검증, 회전/교체된 체인, 새 체인) 전체를 봅니다.
+    """
+    from app.security.audit_verify import update_verify_checkpoint
+
+    paths = {os.path.basename(p): p for p in chain_paths(log_path, archive_dir)}
+    incremental = not full and all(
+        name in results and results[name]["resumed"] and previous.get(name) for name in paths)
+    since = {name: previous[name] for name in paths} if incremental else None
+    ends = {name: r["end_offset"] for name, r in results.items()}
+    report = check_anchors(log_path, archive_dir, since=since, ends=ends)
+
+    total, missing = 0, []
+    for name, path in paths.items():
+        prev_state = ((previous.get(name) or {}).get("anchors") or {}) if incremental else {}
+        state = {
+            "count": prev_state.get("count", 0) + report["counts"].get(name, 0),
+            "missing": (prev_state.get("missing", []) + [m for m in report["missing"] if m["chain"] == name])[:200],
+            "heads": report["heads"].get(name, {}),
+        }
+        total += state["count"]
+        missing += state["missing"]
+        if name in results:
+            update_verify_checkpoint(path, {"anchors": state})
+    return {"anchors": total, "checked": report["anchors"], "incremental": incremental,
+            "missing": missing[:200], "ok": not missing}
+
+def verify_chains(
+    log_path: str,
+    full: bool = False,
+    workers: int = 1,
+    progress: Optional[Callable[[int, int], None]] = None,
+    archive_dir: Optional[str] = audit_segments.ARCHIVE_DIR,
+) -> Dict[str, Any]:
+    """모든 체인을 검증합니다. (체인별 verify_log + 세그먼트 연결 + 앵커, 모두 증분)"""
+    from app.security.audit_verify import load_verify_checkpoint, verify_log
+
+    paths = chain_paths(log_path, archive_dir) or [log_path]
+    previous = {os.path.basename(p): load_verify_checkpoint(p) for p in paths}
+    chains = {}
+    for i, path in enumerate(paths):
+        def _progress(done, total, i=i):
+            if progress:
+                progress(i * 1000 + (int(done * 1000 / total) if total else 1000), len(paths) * 1000)
+        if os.path.exists(path):
+            chains[os.path.basename(path)] = verify_log(path, full=full, workers=workers, progress=_progress,
+                                                        archive_dir=archive_dir)
+            chains[os.path.basename(path)]["segments_links"] = audit_segments.check_manifest_links(path, archive_dir)
+    anchors = verify_anchors(log_path, chains, previous, full, archive_dir) if len(paths) > 1 \
+        else {"anchors": 0, "missing": [], "ok": True}
+    ok = anchors["ok"] and all(r["ok"] and not r["segments_links"] for r in chains.values())
+    return {"ok": ok, "chains": chains, "anchors": anchors}
+
+def iter_range_chains(
+    log_path: str,
+    t_from: Optional[float] = None,
+    t_to: Optional[float] = None,
+    action: Optional[str] = None,
+    archive_dir: Optional[str] = audit_segments.ARCHIVE_DIR,
+) -> Iterator[bytes]:
+    """모든 체인의 범위 조회 결과를 ts 순서로 병합합니다. (체인마다 시간 인덱스 사용)"""
+    from app.security.audit_index import iter_range
+
+    paths = chain_paths(log_path, archive_dir) or [log_path]
+    if len(paths) == 1:
+        yield from iter_range(paths[0], t_from, t_to, action, archive_dir=archive_dir)
+        return
+
+    def _keyed(path) -> Iterator[Tuple[float, bytes]]:
+        for raw in iter_range(path, t_from, t_to, action, archive_dir=archive_dir):
+            yield json.loads(raw).get("ts", 0), raw
+
+    for _, raw in heapq.merge(*[_keyed(p) for p in paths], key=lambda x: x[0]):
+        yield raw
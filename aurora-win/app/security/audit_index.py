@@ -0,0 +1,172 @@
+"""
+Aurora Audit Time Index
+- 감사 로그 세그먼트마다 시간 버킷 → 바이트 오프셋 사이드카('<log>.tidx', JSONL: {"b": 버킷, "o": 오프셋})를
+  유지합니다. AuditWriter가 기록 시 새 버킷이 처음 나타날 때 한 줄을 append 합니다.
+- 범위 조회는 매니페스트(ts 범위)로 세그먼트를 고르고, 인덱스로 시작 위치까지 seek 한 뒤
+  필요한 구간만 순차로 읽어 조건에 맞는 항목을 스트리밍합니다. (압축된 세그먼트는 gzip 스트림에서 seek)
+- 감사 항목의 ts는 요청 시작 시각이므로 파일 내 순서가 약간 어긋날 수 있습니다.
+  오차를 버킷 하나(AUDIT_INDEX_BUCKET초) 이내로 가정하고 앞뒤로 한 버킷씩 여유를 두고 읽습니다.
+"""
+from __future__ import annotations
+import json
+import os
+from typing import Iterator, List, Optional, Tuple
+
+from app.security import audit_segments
+
+BUCKET_SECONDS = int(os.getenv("AUDIT_INDEX_BUCKET", "60"))
+
+def index_path(log_path: str) -> str:
+    return f"{log_path}.tidx"
+
+def load_index(log_path: str) -> List[Tuple[int, int]]:
+    """[(버킷, 오프셋), ...] (버킷 오름차순)"""
+    records = []
+    try:
+        with open(index_path(log_path), "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    r = json.loads(line)
+                    records.append((r["b"], r["o"]))
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    break  # 잘린 꼬리
+    except FileNotFoundError:
+        pass
+    return records
+
+class TimeIndexer:
+    """
+    AuditWriter용 증분 시간 인덱서 (동기, 기록 스레드에서 호출)
+    - recover(): 마지막 인덱스 레코드 이후의 로그 꼬리만 스캔하여 상태를 복원
+    - observe(): 기록된 라인의 ts가 새 버킷(지금까지의 최대 버킷보다 큰)이면 오프셋을 기록
+    """
+    def __init__(self, log_path: str, bucket_seconds: int = BUCKET_SECONDS):
+        self.log_path = log_path
+        self.bucket_seconds = max(1, bucket_seconds)
+        self._offset = 0
+        self._last_bucket: Optional[int] = None
+        self._pending: List[Tuple[int, int]] = []
+
+    def recover(self):
+        records = load_index(self.log_path)
+        # 잘린 꼬리가 있었다면 유효한 레코드만으로 다시 씁니다.
+        self._rewrite(records)
+        start = 0
+        if records:
+            self._last_bucket, start = records[-1]
+        self._offset = start
+        try:
+            with open(self.log_path, "rb") as f:
+                f.seek(start)
+                for raw in f:
+                    self.observe(raw, _line_ts(raw))
+        except FileNotFoundError:
+            pass
+        self.flush()
+
+    def observe(self, raw_line: bytes, ts: Optional[float]):
+        start = self._offset
+        self._offset += len(raw_line)
+        if ts is None:
+            return
+        bucket = int(ts // self.bucket_seconds)
+        if self._last_bucket is None or bucket > self._last_bucket:
+            self._pending.append((bucket, start))
+            self._last_bucket = bucket
+
+    def flush(self):
+        if not self._pending:
+            return
+        data = "".join(json.dumps({"b": b, "o": o}) + "\n" for b, o in self._pending)
+        with open(index_path(self.log_path), "a", encoding="utf-8") as f:
+            f.write(data)
+        self._pending = []
+
+    def _rewrite(self, records: List[Tuple[int, int]]):
+        path = index_path(self.log_path)
+        try:
+            with open(path, "rb") as f:
+                n = sum(1 for l in f if l.strip())
+        except FileNotFoundError:
+            return
+        if n != len(records):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("".join(json.dumps({"b": b, "o": o}) + "\n" for b, o in records))
+
+def _line_ts(raw: bytes) -> Optional[float]:
+    try:
+        return json.loads(raw).get("ts")
+    except (UnicodeDecodeError, json.JSONDecodeError, AttributeError):
+        return None
+
+def seek_offset(index: List[Tuple[int, int]], t_from: Optional[float], bucket_seconds: int = BUCKET_SECONDS) -> int:
+    """t_from 이전 버킷(오차 여유 1버킷)의 시작 오프셋. 인덱스가 없으면 0."""
+    if t_from is None or not index:
+        return 0
+    target = int(t_from // bucket_seconds) - 1
+    offset = 0
+    for bucket, off in index:  # 인덱스는 작으므로 선형 탐색 (세그먼트당 수천 줄 이하)
+        if bucket > target:
+            break
+        offset = off
+    return offset
+
+def _scan_file(
+    path: str,
+    log_path: str,
+    t_from: Optional[float],
+    t_to: Optional[float],
+    action: Optional[str],
+    bucket_seconds: int,
+) -> Iterator[bytes]:
+    offset = seek_offset(load_index(log_path), t_from, bucket_seconds)
+    stop_after = None if t_to is None else t_to + bucket_seconds
+    with audit_segments.open_segment(path) as f:
+        f.seek(offset)
+        for raw in f:
+            if not raw.strip():
+                continue
+            try:
+                entry = json.loads(raw)
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                continue
+            ts = entry.get("ts")
+            if ts is None:
+                continue
+            if stop_after is not None and ts > stop_after:
+                break
+            if t_from is not None and ts < t_from:
+                continue
+            if t_to is not None and ts > t_to:
+                continue
+            if action and not str(entry.get("action", "")).startswith(action):
+                continue
+            yield raw.rstrip(b"\r\n")
+
+def iter_range(
+    log_path: str,
+    t_from: Optional[float] = None,
+    t_to: Optional[float] = None,
+    action: Optional[str] = None,
+    archive_dir: Optional[str] = audit_segments.ARCHIVE_DIR,
+    bucket_seconds: int = BUCKET_SECONDS,
+) -> Iterator[bytes]:
+    """
+    [t_from, t_to] 범위(및 action 접두어)에 해당하는 항목의 원본 JSON 라인을 시간 순서(파일 순서)로 반환합니다.
+    아카이브 세그먼트 → 활성 로그 순서로, 범위와 겹치는 파일만 읽습니다.
+    """
+    out_dir = audit_segments.archive_dir_for(log_path, archive_dir)
+    margin = bucket_seconds
+    for rec in audit_segments.load_manifest(log_path, archive_dir):
+        if t_from is not None and rec.get("last_ts") is not None and rec["last_ts"] + margin < t_from:
+            continue
+        if t_to is not None and rec.get("first_ts") is not None and rec["first_ts"] - margin > t_to:
+            continue
+        path = audit_segments.segment_file(out_dir, rec["segment"])
+        if path is None:
+            continue
+        # 사이드카는 압축 전 파일명 기준 ('<segment>.log.tidx')
+        yield from _scan_file(path, os.path.join(out_dir, rec["segment"] + ".log"),
+                              t_from, t_to, action, bucket_seconds)
+    if os.path.exists(log_path):
+        yield from _scan_file(log_path, log_path, t_from, t_to, action, bucket_seconds)
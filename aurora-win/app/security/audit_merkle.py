@@ -0,0 +1,374 @@
+"""
+Aurora Audit Merkle Checkpoints
+- 감사 로그를 고정 크기 블록(AUDIT_MERKLE_BLOCK 줄)으로 나누고, 블록마다 Merkle 루트 체크포인트를
+  사이드카 파일('<log>.merkle', JSONL)에 기록합니다. (AuditWriter가 기록 시 갱신)
+- 리프 = sha256(0x00 || 라인 원본 바이트), 노드 = sha256(0x01 || L || R)
+  (리프/노드 접두사는 RFC 6962와 같지만, 홀수 노드는 짝 없이 다음 레벨로 승격하므로 RFC 6962 트리 해시와는 루트가 다름)
+- 체크포인트는 이전 체크포인트의 루트(prev_root)를 포함하고, AUDIT_SIGNING_KEY(Ed25519 시드, hex)가
+  설정되어 있으면 서명됩니다 (pynacl 필요, 없으면 sig=null).
+- 단일 항목은 해당 블록의 포함 증명(O(log B) 해시) + 서명된 루트로, 시간 범위는 겹치는 블록만으로 검증합니다.
+  블록들은 서로 독립적이므로 프로세스 풀에서 병렬 검증할 수 있습니다.
+"""
+from __future__ import annotations
+import gzip
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from nacl.signing import SigningKey, VerifyKey
+    from nacl.exceptions import BadSignatureError
+except ImportError:
+    SigningKey = None
+    VerifyKey = None
+    BadSignatureError = Exception
+
+BLOCK_SIZE = int(os.getenv("AUDIT_MERKLE_BLOCK", "1024"))
+SIGNING_KEY_PATH = os.getenv("AUDIT_SIGNING_KEY")   # Ed25519 시드(32바이트 hex) 파일 경로
+VERIFY_KEY_HEX = os.getenv("AUDIT_VERIFY_KEY")      # 검증 전용 공개키 (hex)
+
+EMPTY_ROOT = "0" * 64
+
+# ------------------------- merkle primitives -------------------------
+
+def leaf_hash(line: bytes) -> bytes:
+    return hashlib.sha256(b"\x00" + line).digest()
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+def merkle_root(leaves: List[bytes]) -> bytes:
+    if not leaves:
+        return bytes.fromhex(EMPTY_ROOT)
+    level = list(leaves)
+    while len(level) > 1:
+        nxt = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            nxt.append(level[-1])
+        level = nxt
+    return level[0]
+
+def merkle_proof(leaves: List[bytes], index: int) -> List[Tuple[str, str]]:
+    """index 리프의 포함 증명. [(형제 위치 'L'|'R', 형제 해시 hex), ...]"""
+    proof = []
+    level = list(leaves)
+    while len(level) > 1:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append(("L" if sibling < index else "R", level[sibling].hex()))
+        nxt = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            nxt.append(level[-1])
+        level = nxt
+        index //= 2
+    return proof
+
+def verify_proof(leaf: bytes, proof: List[Tuple[str, str]], root_hex: str) -> bool:
+    h = leaf
+    for side, sibling_hex in proof:
+        sibling = bytes.fromhex(sibling_hex)
+        h = node_hash(sibling, h) if side == "L" else node_hash(h, sibling)
+    return h.hex() == root_hex
+
+def _strip_eol(raw: bytes) -> bytes:
+    return raw.rstrip(b"\r\n")
+
+# ------------------------- signing -------------------------
+
+def _canonical(record: Dict[str, Any]) -> bytes:
+    body = {k: v for k, v in record.items() if k not in ("sig", "key_id")}
+    return json.dumps(body, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+class CheckpointSigner:
+    """Ed25519 체크포인트 서명기 (키/pynacl이 없으면 서명 없이 동작)"""
+    def __init__(self, key_path: Optional[str] = SIGNING_KEY_PATH):
+        self._key = None
+        if not key_path:
+            return
+        if SigningKey is None:
+            print("[AuditMerkle WARN] 'pynacl' not installed. Checkpoints will be unsigned. (pip install pynacl)")
+            return
+        try:
+            with open(key_path, "r", encoding="utf-8") as f:
+                self._key = SigningKey(bytes.fromhex(f.read().strip()))
+        except (IOError, ValueError) as e:
+            print(f"[AuditMerkle ERROR] Failed to load signing key {key_path}: {e}")
+
+    @property
+    def verify_key_hex(self) -> Optional[str]:
+        return self._key.verify_key.encode().hex() if self._key else None
+
+    def sign(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        if self._key is None:
+            record["sig"] = None
+            record["key_id"] = None
+            return record
+        record["sig"] = self._key.sign(_canonical(record)).signature.hex()
+        record["key_id"] = self.verify_key_hex[:16]
+        return record
+
+def verify_signature(record: Dict[str, Any], verify_key_hex: Optional[str] = VERIFY_KEY_HEX) -> Optional[bool]:
+    """True/False = 서명 검증 결과, None = 서명 없음 또는 검증 키/pynacl 없음"""
+    if not record.get("sig") or not verify_key_hex or VerifyKey is None:
+        return None
+    try:
+        VerifyKey(bytes.fromhex(verify_key_hex)).verify(_canonical(record), bytes.fromhex(record["sig"]))
+        return True
+    except (BadSignatureError, ValueError):
+        return False
+
+# ------------------------- sidecar -------------------------
+
+def sidecar_path(log_path: str) -> str:
+    return f"{log_path}.merkle"
+
+def load_checkpoints(log_path: str) -> List[Dict[str, Any]]:
+    path = sidecar_path(log_path)
+    cps = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    try:
+                        cps.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        break  # 잘린 꼬리 (다음 recover에서 재생성)
+    except FileNotFoundError:
+        pass
+    return cps
+
+def _line_ts(raw: bytes) -> Optional[float]:
+    try:
+        return json.loads(raw.decode("utf-8")).get("ts")
+    except (UnicodeDecodeError, json.JSONDecodeError, AttributeError):
+        return None
+
+class MerkleCheckpointer:
+    """
+    AuditWriter용 증분 체크포인터 (동기, 기록 스레드에서 호출)
+    - recover(): 마지막 체크포인트 이후의 로그 꼬리만 스캔하여 미완성 블록을 복원
+    - observe(): 기록된 라인을 누적하고, 블록이 차면 체크포인트를 사이드카에 append
+    - seal(): 남은 미완성 블록을 (짧은) 체크포인트로 마감 (세그먼트 회전/종료 시)
+    """
+    def __init__(self, log_path: str, block_size: int = BLOCK_SIZE, signer: Optional[CheckpointSigner] = None):
+        self.log_path = log_path
+        self.block_size = max(1, block_size)
+        self.signer = signer or CheckpointSigner()
+        self._next_block = 0
+        self._next_seq = 0
+        self._block_offset = 0   # 미완성 블록의 시작 바이트 오프셋
+        self._offset = 0         # 현재 로그 끝 오프셋
+        self._prev_root = EMPTY_ROOT
+        self._leaves: List[bytes] = []
+        self._tss: List[Optional[float]] = []
+        self._ends: List[int] = []   # 리프별 라인 끝 바이트 오프셋
+
+    @property
+    def blocks(self) -> int:
+        """기록된 체크포인트 블록 수"""
+        return self._next_block
+
+    def recover(self):
+        cps = load_checkpoints(self.log_path)
+        # 잘린 꼬리가 있었다면 유효한 레코드만으로 사이드카를 다시 씁니다.
+        self._rewrite_sidecar_if_torn(cps)
+        if cps:
+            last = cps[-1]
+            self._next_block = last["block"] + 1
+            self._next_seq = last["seq_start"] + last["count"]
+            self._block_offset = last["offset"] + last["length"]
+            self._prev_root = last["root"]
+        self._offset = self._block_offset
+        self._leaves, self._tss, self._ends = [], [], []
+        try:
+            with open(self.log_path, "rb") as f:
+                f.seek(self._block_offset)
+                for raw in f:
+                    self.observe(raw, _line_ts(raw))
+        except FileNotFoundError:
+            pass
+        self.flush()
+
+    def observe(self, raw_line: bytes, ts: Optional[float]):
+        self._offset += len(raw_line)
+        line = _strip_eol(raw_line)
+        if not line.strip():
+            return
+        self._leaves.append(leaf_hash(line))
+        self._tss.append(ts)
+        self._ends.append(self._offset)
+
+    def flush(self):
+        """가득 찬 블록들의 체크포인트를 기록합니다."""
+        records = []
+        while len(self._leaves) >= self.block_size:
+            records.append(self._cut(self.block_size))
+        self._append(records)
+
+    def seal(self):
+        records = []
+        while self._leaves:
+            records.append(self._cut(min(self.block_size, len(self._leaves))))
+        self._append(records)
+
+    def _cut(self, n: int) -> Dict[str, Any]:
+        leaves, self._leaves = self._leaves[:n], self._leaves[n:]
+        tss, self._tss = self._tss[:n], self._tss[n:]
+        end = self._ends[n - 1] if self._leaves else self._offset
+        self._ends = self._ends[n:]
+        known = [t for t in tss if t is not None]
+        record = {
+            "block": self._next_block,
+            "seq_start": self._next_seq,
+            "count": n,
+            "offset": self._block_offset,
+            "length": end - self._block_offset,
+            "first_ts": min(known) if known else None,
+            "last_ts": max(known) if known else None,
+            "root": merkle_root(leaves).hex(),
+            "prev_root": self._prev_root,
+        }
+        self.signer.sign(record)
+        self._next_block += 1
+        self._next_seq += n
+        self._block_offset = end
+        self._prev_root = record["root"]
+        return record
+
+    def _append(self, records: List[Dict[str, Any]]):
+        if not records:
+            return
+        data = "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records)
+        with open(sidecar_path(self.log_path), "a", encoding="utf-8") as f:
+            f.write(data)
+
+    def _rewrite_sidecar_if_torn(self, cps: List[Dict[str, Any]]):
+        path = sidecar_path(self.log_path)
+        try:
+            with open(path, "rb") as f:
+                lines = [l for l in f.read().splitlines() if l.strip()]
+        except FileNotFoundError:
+            return
+        if len(lines) != len(cps):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("".join(json.dumps(r, separators=(",", ":")) + "\n" for r in cps))
+
+# ------------------------- verification -------------------------
+
+def _open_log(log_path: str):
+    # 회전 후 gzip으로 봉인된 세그먼트('<segment>.log.gz')도 같은 오프셋으로 읽습니다.
+    if not os.path.exists(log_path) and os.path.exists(log_path + ".gz"):
+        return gzip.open(log_path + ".gz", "rb")
+    return open(log_path, "rb")
+
+def _read_block_lines(log_path: str, cp: Dict[str, Any]) -> List[bytes]:
+    with _open_log(log_path) as f:
+        f.seek(cp["offset"])
+        data = f.read(cp["length"])
+    return [l for l in (_strip_eol(x) for x in data.split(b"\n")) if l.strip()]
+
+def verify_block(log_path: str, cp: Dict[str, Any], verify_key_hex: Optional[str] = VERIFY_KEY_HEX) -> Dict[str, Any]:
+    """블록 하나를 검증합니다: 라인 수, Merkle 루트, (가능하면) 서명"""
+    try:
+        lines = _read_block_lines(log_path, cp)
+    except (IOError, FileNotFoundError) as e:
+        return {"block": cp["block"], "ok": False, "reason": f"read failed: {e}"}
+    if len(lines) != cp["count"]:
+        return {"block": cp["block"], "ok": False, "reason": f"line count {len(lines)} != {cp['count']}"}
+    root = merkle_root([leaf_hash(l) for l in lines]).hex()
+    if root != cp["root"]:
+        return {"block": cp["block"], "ok": False, "reason": "root mismatch"}
+    sig = verify_signature(cp, verify_key_hex)
+    if sig is False:
+        return {"block": cp["block"], "ok": False, "reason": "bad signature"}
+    return {"block": cp["block"], "ok": True, "signed": bool(sig)}
+
+def _verify_block_worker(args: Tuple[str, Dict[str, Any], Optional[str]]) -> Dict[str, Any]:
+    return verify_block(*args)
+
+def verify_checkpoint_links(cps: List[Dict[str, Any]]) -> List[int]:
+    """prev_root 연결이 끊긴 블록 번호 목록 (체크포인트 삭제/재정렬 탐지)"""
+    broken = []
+    prev = EMPTY_ROOT
+    for cp in cps:
+        if cp.get("prev_root") != prev:
+            broken.append(cp["block"])
+        prev = cp["root"]
+    return broken
+
+def blocks_in_range(cps: List[Dict[str, Any]], t_from: Optional[float], t_to: Optional[float]) -> List[Dict[str, Any]]:
+    out = []
+    for cp in cps:
+        if cp.get("first_ts") is None or cp.get("last_ts") is None:
+            out.append(cp)  # 시간 정보가 없으면 보수적으로 포함
+            continue
+        if t_from is not None and cp["last_ts"] < t_from:
+            continue
+        if t_to is not None and cp["first_ts"] > t_to:
+            continue
+        out.append(cp)
+    return out
+
+def verify_blocks(
+    log_path: str,
+    cps: Optional[List[Dict[str, Any]]] = None,
+    workers: int = 1,
+    verify_key_hex: Optional[str] = VERIFY_KEY_HEX,
+) -> Dict[str, Any]:
+    """체크포인트 블록들을 (선택적으로 병렬) 검증합니다."""
+    all_cps = load_checkpoints(log_path)
+    targets = all_cps if cps is None else cps
+    jobs = [(log_path, cp, verify_key_hex) for cp in targets]
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_verify_block_worker, jobs, chunksize=8))
+    else:
+        results = [_verify_block_worker(j) for j in jobs]
+    failed = [r for r in results if not r["ok"]]
+    return {
+        "blocks": len(results),
+        "failed": failed,
+        "broken_links": verify_checkpoint_links(all_cps),
+        "signed": sum(1 for r in results if r.get("signed")),
+        "ok": not failed and not verify_checkpoint_links(all_cps),
+    }
+
+def prove_entry(log_path: str, seq: int) -> Dict[str, Any]:
+    """seq번째(0부터) 항목의 포함 증명을 만듭니다."""
+    for cp in load_checkpoints(log_path):
+        if cp["seq_start"] <= seq < cp["seq_start"] + cp["count"]:
+            lines = _read_block_lines(log_path, cp)
+            leaves = [leaf_hash(l) for l in lines]
+            idx = seq - cp["seq_start"]
+            return {
+                "seq": seq,
+                "line": lines[idx].decode("utf-8", errors="replace"),
+                "proof": merkle_proof(leaves, idx),
+                "checkpoint": cp,
+            }
+    raise KeyError(f"seq {seq} is not covered by a checkpoint yet")
+
+def verify_entry_proof(proof: Dict[str, Any], verify_key_hex: Optional[str] = VERIFY_KEY_HEX,
+                       log_path: Optional[str] = None) -> bool:
+    """
+    포함 증명 검증: 리프 → 루트 경로가 맞고, 그 루트를 신뢰할 수 있어야 합니다.
+    - 서명된 체크포인트: 검증 키로 서명이 확인되어야 함
+    - 서명이 없거나 검증 키/pynacl이 없으면: log_path의 로컬 사이드카에 같은 블록/루트 체크포인트가 있어야 함
+      (log_path도 없으면 False — 자체적으로만 일관된 증명은 누구나 만들 수 있음)
+    """
+    cp = proof["checkpoint"]
+    leaf = leaf_hash(proof["line"].encode("utf-8"))
+    if not verify_proof(leaf, [tuple(p) for p in proof["proof"]], cp["root"]):
+        return False
+    signed = verify_signature(cp, verify_key_hex)
+    if signed is not None:
+        return signed
+    if log_path is None:
+        return False
+    return any(
+        c.get("block") == cp.get("block") and c.get("seq_start") == cp.get("seq_start")
+        and c.get("count") == cp.get("count") and c.get("root") == cp["root"]
+        for c in load_checkpoints(log_path)
+    )
@@ -0,0 +1,152 @@
+"""
+Aurora Audit Segments (rotation / sealing)
+- 활성 로그('data/audit.log')가 크기/시간 기준을 넘으면 AuditWriter가 세그먼트로 회전합니다.
+  1) 활성 파일과 사이드카('.merkle', '.verify.json', '.tidx')를 아카이브 디렉터리로 rename
+  2) 매니페스트('<archive>/<stem>.manifest.jsonl')에 세그먼트 기록 (first_prev, head, bytes, ts 범위)
+  3) 백그라운드에서 gzip 스트리밍 압축 ('<segment>.log' → '<segment>.log.gz', 메모리 사용량 일정)
+- 해시체인은 재설정(reseed)하지 않습니다. 새 활성 파일의 첫 항목 prev = 직전 세그먼트의 head.
+  → 아카이브 + 활성 로그가 하나의 연속된 체인이 되며, 세그먼트 간 연결은 매니페스트로 확인합니다.
+"""
+from __future__ import annotations
+import gzip
+import json
+import os
+import shutil
+import time
+from typing import Any, Dict, List, Optional
+
+from app.security.hashlog import GENESIS_HASH
+
+ARCHIVE_DIR = os.getenv("AUDIT_ARCHIVE_DIR")  # 기본값: <로그 디렉터리>/archive
+SIDECAR_SUFFIXES = (".merkle", ".verify.json", ".tidx")
+COPY_CHUNK = 1024 * 1024
+
+def archive_dir_for(log_path: str, archive_dir: Optional[str] = ARCHIVE_DIR) -> str:
+    return archive_dir or os.path.join(os.path.dirname(os.path.abspath(log_path)), "archive")
+
+def _stem(log_path: str) -> str:
+    return os.path.splitext(os.path.basename(log_path))[0]
+
+def manifest_path(log_path: str, archive_dir: Optional[str] = ARCHIVE_DIR) -> str:
+    return os.path.join(archive_dir_for(log_path, archive_dir), f"{_stem(log_path)}.manifest.jsonl")
+
+def load_manifest(log_path: str, archive_dir: Optional[str] = ARCHIVE_DIR) -> List[Dict[str, Any]]:
+    records = []
+    try:
+        with open(manifest_path(log_path, archive_dir), "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue
+    except FileNotFoundError:
+        pass
+    return records
+
+def chain_start(log_path: str, archive_dir: Optional[str] = ARCHIVE_DIR) -> str:
+    """활성 로그 첫 항목이 이어야 할 prev (마지막 세그먼트의 head, 없으면 제네시스)"""
+    manifest = load_manifest(log_path, archive_dir)
+    return manifest[-1]["head"] if manifest else GENESIS_HASH
+
+def segment_file(archive_dir: str, segment: str) -> Optional[str]:
+    """세그먼트의 실제 파일 경로 (.log.gz 우선, 압축 전이면 .log)"""
+    for ext in (".log.gz", ".log"):
+        path = os.path.join(archive_dir, segment + ext)
+        if os.path.exists(path):
+            return path
+    return None
+
+def open_segment(path: str):
+    """세그먼트를 바이너리 스트림으로 엽니다 (gzip이면 스트리밍 해제)"""
+    return gzip.open(path, "rb") if path.endswith(".gz") else open(path, "rb")
+
+def read_first_entry(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "rb") as f:
+            for raw in f:
+                if raw.strip():
+                    try:
+                        return json.loads(raw)
+                    except (UnicodeDecodeError, json.JSONDecodeError):
+                        continue
+    except FileNotFoundError:
+        pass
+    return None
+
+def rotate_segment(
+    log_path: str,
+    head: str,
+    last_ts: Optional[float] = None,
+    archive_dir: Optional[str] = ARCHIVE_DIR,
+) -> Optional[str]:
+    """
+    (닫힌) 활성 로그를 아카이브 세그먼트로 rename하고 매니페스트에 기록합니다. (동기, 빠름)
+    반환: 압축 대기 중인 세그먼트 파일 경로 (빈 로그면 None)
+    """
+    if not os.path.exists(log_path) or os.path.getsize(log_path) == 0:
+        return None
+    out_dir = archive_dir_for(log_path, archive_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = load_manifest(log_path, archive_dir)
+    first = read_first_entry(log_path) or {}
+    segment = f"{_stem(log_path)}-{time.strftime('%Y%m%d-%H%M%S')}-{len(manifest) + 1:06d}"
+    dest = os.path.join(out_dir, segment + ".log")
+    record = {
+        "segment": segment,
+        "first_prev": first.get("prev", GENESIS_HASH),
+        "head": head,
+        "bytes": os.path.getsize(log_path),
+        "first_ts": first.get("ts"),
+        "last_ts": last_ts,
+        "rotated_at": time.time(),
+    }
+    os.replace(log_path, dest)
+    for suffix in SIDECAR_SUFFIXES:
+        if os.path.exists(log_path + suffix):
+            os.replace(log_path + suffix, dest + suffix)
+    with open(manifest_path(log_path, archive_dir), "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    print(f"[AuditSegments] Rotated {log_path} -> {dest} ({record['bytes']:,} bytes)")
+    return dest
+
+def seal_segment(path: str) -> str:
+    """'<segment>.log'를 스트리밍으로 gzip 압축하고 원본을 삭제합니다. (동기, 메모리 일정)"""
+    gz_path = path + ".gz"
+    tmp = gz_path + ".tmp"
+    with open(path, "rb") as src, open(tmp, "wb") as raw:
+        with gzip.GzipFile(filename=os.path.basename(path), mode="wb", fileobj=raw) as gz:
+            shutil.copyfileobj(src, gz, COPY_CHUNK)
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp, gz_path)
+    os.remove(path)
+    return gz_path
+
+def pending_segments(log_path: str, archive_dir: Optional[str] = ARCHIVE_DIR) -> List[str]:
+    """회전되었지만 아직 압축되지 않은 세그먼트 파일 (비정상 종료 후 복구용)"""
+    out_dir = archive_dir_for(log_path, archive_dir)
+    paths = []
+    for rec in load_manifest(log_path, archive_dir):
+        raw = os.path.join(out_dir, rec["segment"] + ".log")
+        if os.path.exists(raw):
+            paths.append(raw)
+    return paths
+
+def check_manifest_links(log_path: str, archive_dir: Optional[str] = ARCHIVE_DIR) -> List[Dict[str, Any]]:
+    """세그먼트 간 체인 연결(first_prev == 직전 head)과 파일 존재 여부를 확인합니다."""
+    out_dir = archive_dir_for(log_path, archive_dir)
+    problems = []
+    prev_head = None
+    for rec in load_manifest(log_path, archive_dir):
+        if prev_head is not None and rec["first_prev"] != prev_head:
+            problems.append({"segment": rec["segment"], "problem": "chain broken between segments"})
+        if segment_file(out_dir, rec["segment"]) is None:
+            problems.append({"segment": rec["segment"], "problem": "segment file missing"})
+        prev_head = rec["head"]
+    first = read_first_entry(log_path)
+    if prev_head is not None and first is not None and first.get("prev") != prev_head:
+        problems.append({"segment": os.path.basename(log_path), "problem": "active log does not continue the last segment"})
+    return problems
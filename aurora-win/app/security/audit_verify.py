@@ -0,0 +1,318 @@
+"""
+Aurora Audit Verifier (incremental / parallel)
+- 검증 결과를 체크포인트('<log>.verify.json': 바이트 오프셋 + 헤드 해시 + 누적 결과)로 저장하고,
+  다음 실행에서는 그 이후에 추가된 항목만 검증합니다.
+  (재개 전, 오프셋 직전 항목의 해시가 저장된 헤드와 같은지 확인 → 파일이 교체/절단되었으면 전체 재검증)
+- 전체 검증은 로그를 라인 경계의 세그먼트로 나누어 프로세스 풀에서 JSON 파싱 + sha256 재계산을 하고,
+  세그먼트 경계의 prev 연결만 메인에서 순차로 확인합니다.
+- 아직 개행으로 끝나지 않은 마지막 줄(기록 중)은 검증하지 않고 다음 실행으로 넘깁니다.
+- 대시보드용 비동기 작업 API: AuditVerifyJobs (진행률 조회, 워커별 체인 전체를 검증)
+"""
+from __future__ import annotations
+import asyncio
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.security.audit_segments import ARCHIVE_DIR, chain_start
+from app.security.hashlog import compute_hash
+
+SEGMENT_BYTES = int(os.getenv("AUDIT_VERIFY_SEGMENT_BYTES", str(4 * 1024 * 1024)))
+VERIFY_WORKERS = int(os.getenv("AUDIT_VERIFY_WORKERS", str(os.cpu_count() or 1)))
+MAX_ISSUES = 200  # 결과에 포함할 문제 라인 샘플 수
+
+ProgressFn = Callable[[int, int], None]
+
+def checkpoint_path(log_path: str) -> str:
+    return f"{log_path}.verify.json"
+
+def load_verify_checkpoint(log_path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(checkpoint_path(log_path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def _save_checkpoint(log_path: str, cp: Dict[str, Any]):
+    tmp = checkpoint_path(log_path) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cp, f)
+    os.replace(tmp, checkpoint_path(log_path))
+
+def update_verify_checkpoint(log_path: str, fields: Dict[str, Any]):
+    """체크포인트에 필드를 덧붙입니다 (체인 간 앵커 상태 등). 체크포인트가 없으면 아무것도 하지 않음"""
+    cp = load_verify_checkpoint(log_path)
+    if cp is None:
+        return
+    cp.update(fields)
+    try:
+        _save_checkpoint(log_path, cp)
+    except OSError as e:
+        print(f"[AuditVerify WARN] Failed to save checkpoint: {e}")
+
+def _hash_ending_at(log_path: str, offset: int, tail_bytes: int = 8192) -> Optional[str]:
+    """offset 직전에 끝나는 마지막 유효 항목의 해시 (체크포인트 재개 전 확인용)"""
+    with open(log_path, "rb") as f:
+        f.seek(max(0, offset - tail_bytes))
+        data = f.read(offset - max(0, offset - tail_bytes))
+    for raw in reversed(data.splitlines()):
+        if not raw.strip():
+            continue
+        try:
+            return json.loads(raw.decode("utf-8")).get("hash")
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            continue
+    return None
+
+def _complete_end(log_path: str) -> int:
+    """마지막 개행 다음 위치 (기록 중인 마지막 줄 제외)"""
+    with open(log_path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        while pos > 0:
+            step = min(4096, pos)
+            f.seek(pos - step)
+            chunk = f.read(step)
+            idx = chunk.rfind(b"\n")
+            if idx >= 0:
+                return pos - step + idx + 1
+            pos -= step
+    return 0
+
+def _segment_bounds(log_path: str, start: int, end: int, segment_bytes: int) -> List[Tuple[int, int]]:
+    bounds = []
+    with open(log_path, "rb") as f:
+        pos = start
+        while pos < end:
+            cut = pos + segment_bytes
+            if cut >= end:
+                bounds.append((pos, end))
+                break
+            f.seek(cut)
+            f.readline()  # 다음 라인 경계까지 이동
+            nxt = min(f.tell(), end)
+            bounds.append((pos, nxt))
+            pos = nxt
+    return bounds
+
+def verify_segment(log_path: str, start: int, end: int) -> Dict[str, Any]:
+    """
+    [start, end) 구간의 각 항목을 파싱하고 해시를 재계산합니다. (프로세스 풀 워커)
+    구간 내부의 prev 연결도 확인하며, 구간 첫 항목의 prev는 호출자가 이전 구간과 연결합니다.
+    """
+    lines = 0
+    entries = 0
+    first_prev = None
+    first_line = None
+    expected = None
+    issues: List[Tuple[int, str]] = []
+    with open(log_path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    for raw in data.splitlines():
+        lines += 1
+        if not raw.strip():
+            continue
+        try:
+            entry = json.loads(raw)
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            issues.append((lines, "malformed"))
+            continue
+        if not isinstance(entry, dict) or "hash" not in entry or "prev" not in entry:
+            issues.append((lines, "malformed"))
+            continue
+        entries += 1
+        if expected is None:
+            first_prev, first_line = entry["prev"], lines
+        elif entry["prev"] != expected:
+            issues.append((lines, "broken"))
+        if entry["hash"] != compute_hash(entry):
+            issues.append((lines, "tampered"))
+        # 끊긴 경우에도 현재 해시로 이어서 이후 항목을 계속 검사합니다.
+        expected = entry["hash"]
+    return {
+        "start": start, "end": end, "lines": lines, "entries": entries,
+        "first_prev": first_prev, "first_line": first_line, "last_hash": expected,
+        "issues": issues,
+    }
+
+def _verify_segment_worker(args: Tuple[str, int, int]) -> Dict[str, Any]:
+    return verify_segment(*args)
+
+def verify_log(
+    log_path: str,
+    full: bool = False,
+    workers: int = VERIFY_WORKERS,
+    segment_bytes: int = SEGMENT_BYTES,
+    progress: Optional[ProgressFn] = None,
+    save: bool = True,
+    archive_dir: Optional[str] = ARCHIVE_DIR,
+) -> Dict[str, Any]:
+    """
+    해시체인을 검증합니다. full=False면 체크포인트 이후만 검증합니다.
+    반환: ok, entries/lines(누적), checked(이번 실행), tampered/broken/malformed(누적 수), issues(샘플)
+    """
+    t0 = time.perf_counter()
+    cp = None if full else load_verify_checkpoint(log_path)
+    resumed = False
+    if cp is not None and cp.get("offset"):
+        try:
+            resumed = (os.path.getsize(log_path) >= cp["offset"]
+                       and _hash_ending_at(log_path, cp["offset"]) == cp["head"])
+        except (OSError, KeyError):
+            resumed = False
+        if not resumed:
+            print(f"[AuditVerify WARN] Checkpoint does not match {log_path}. Running full verification.")
+    if not resumed:
+        # 회전된 로그라면 첫 항목의 prev는 직전 세그먼트의 head입니다. (app/security/audit_segments.py)
+        cp = {"offset": 0, "head": chain_start(log_path, archive_dir), "lines": 0, "entries": 0,
+              "tampered": 0, "broken": 0, "malformed": 0}
+
+    start = cp["offset"]
+    end = _complete_end(log_path)
+    bounds = _segment_bounds(log_path, start, end, max(1, segment_bytes))
+    total = end - start
+    done = 0
+    if progress:
+        progress(0, total)
+
+    results: Dict[int, Dict[str, Any]] = {}
+    if workers > 1 and len(bounds) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futs = {pool.submit(_verify_segment_worker, (log_path, s, e)): s for s, e in bounds}
+            for fut in as_completed(futs):
+                r = fut.result()
+                results[r["start"]] = r
+                done += r["end"] - r["start"]
+                if progress:
+                    progress(done, total)
+    else:
+        for s, e in bounds:
+            r = verify_segment(log_path, s, e)
+            results[s] = r
+            done += e - s
+            if progress:
+                progress(done, total)
+
+    # 순차 패스: 세그먼트 경계의 prev 연결 + 라인 번호 보정
+    head = cp["head"]
+    base_line = cp["lines"]
+    counts = {k: cp[k] for k in ("tampered", "broken", "malformed")}
+    issues: List[Dict[str, Any]] = []
+    checked = 0
+    for s, _ in bounds:
+        r = results[s]
+        seg_issues = list(r["issues"])
+        if r["first_prev"] is not None and r["first_prev"] != head:
+            seg_issues.append((r["first_line"], "broken"))
+        for rel, kind in sorted(seg_issues):
+            counts[kind] += 1
+            if len(issues) < MAX_ISSUES:
+                issues.append({"line": base_line + rel, "kind": kind})
+        if r["last_hash"] is not None:
+            head = r["last_hash"]
+        base_line += r["lines"]
+        checked += r["entries"]
+
+    new_cp = {
+        "offset": end, "head": head, "lines": base_line, "entries": cp["entries"] + checked,
+        **counts, "verified_at": time.time(),
+    }
+    if resumed and "anchors" in cp:
+        new_cp["anchors"] = cp["anchors"]  # 체인 간 앵커 상태는 verify_anchors가 갱신
+    if save:
+        try:
+            _save_checkpoint(log_path, new_cp)
+        except OSError as e:
+            print(f"[AuditVerify WARN] Failed to save checkpoint: {e}")
+    return {
+        "ok": not any(counts.values()),
+        "path": log_path,
+        "resumed": resumed,
+        "start_offset": start,
+        "end_offset": end,
+        "pending_bytes": os.path.getsize(log_path) - end,
+        "segments": len(bounds),
+        "checked": checked,
+        "entries": new_cp["entries"],
+        "lines": base_line,
+        "head": head,
+        **counts,
+        "issues": issues,
+        "elapsed_ms": int((time.perf_counter() - t0) * 1000),
+    }
+
+# ------------------------- async job API -------------------------
+
+class AuditVerifyJobs:
+    """
+    대시보드용 검증 작업 관리자. 검증은 워커 스레드(+프로세스 풀)에서 실행되고,
+    HTTP 요청은 작업 ID를 즉시 받아 진행률을 조회합니다. 같은 로그에 대한 작업은 하나만 실행됩니다.
+    """
+    def __init__(self, max_jobs: int = 20):
+        self.max_jobs = max_jobs
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def start(self, log_path: str, full: bool = False, workers: int = VERIFY_WORKERS,
+              archive_dir: Optional[str] = ARCHIVE_DIR) -> Dict[str, Any]:
+        for job in self._jobs.values():
+            if job["path"] == log_path and job["status"] in ("queued", "running"):
+                return job
+        job_id = uuid.uuid4().hex[:12]
+        job = {"id": job_id, "path": log_path, "full": full, "status": "queued",
+               "done_bytes": 0, "total_bytes": 0, "progress": 0.0,
+               "started_at": time.time(), "finished_at": None, "result": None, "error": None}
+        self._jobs[job_id] = job
+        self._tasks[job_id] = asyncio.create_task(self._run(job, workers, archive_dir))
+        self._evict()
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self._jobs.get(job_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        return sorted(self._jobs.values(), key=lambda j: j["started_at"], reverse=True)
+
+    async def wait(self, job_id: str) -> Dict[str, Any]:
+        task = self._tasks.get(job_id)
+        if task is not None:
+            await task
+        return self._jobs[job_id]
+
+    async def _run(self, job: Dict[str, Any], workers: int, archive_dir: Optional[str]):
+        def _progress(done: int, total: int):
+            # 워커 스레드에서 호출 (단순 대입만 수행)
+            job["done_bytes"], job["total_bytes"] = done, total
+            job["progress"] = round(done / total, 4) if total else 1.0
+
+        job["status"] = "running"
+        try:
+            from app.security.audit_chains import chain_paths, verify_chains
+            if not os.path.exists(job["path"]) and not chain_paths(job["path"], archive_dir):
+                raise FileNotFoundError(f"audit log not found: {job['path']}")
+            job["result"] = await asyncio.to_thread(
+                verify_chains, job["path"], job["full"], workers, _progress, archive_dir)
+            job["status"] = "done"
+        except Exception as e:
+            print(f"[AuditVerify ERROR] Job {job['id']} failed: {e}")
+            job["status"], job["error"] = "failed", str(e)
+        finally:
+            job["finished_at"] = time.time()
+            self._tasks.pop(job["id"], None)
+
+    def _evict(self):
+        finished = [j for j in self.list() if j["status"] in ("done", "failed")]
+        for job in finished[self.max_jobs:]:
+            self._jobs.pop(job["id"], None)
+
+_jobs: Optional[AuditVerifyJobs] = None
+
+def get_verify_jobs() -> AuditVerifyJobs:
+    global _jobs
+    if _jobs is None:
+        _jobs = AuditVerifyJobs()
+    return _jobs
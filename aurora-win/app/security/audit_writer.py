@@ -0,0 +1,342 @@
+"""
+Aurora Audit Writer (single writer per process, group commit)
+- 프로세스당 하나의 기록 태스크가 큐를 통해 감사 항목을 직렬화하여 append 합니다.
+- 체인 헤드(마지막 해시)는 시작 시 파일 끝에서 한 번 읽고, 이후 메모리에서 유지합니다.
+  → 요청마다 파일 꼬리를 다시 읽지 않으며, 동시 요청이 같은 prev를 읽어 체인이 갈라지지 않습니다.
+- 그룹 커밋: group_commit_ms 안에 모인 항목들을 체인으로 묶어 한 번의 write()로 기록하고,
+  fsync 정책에 따라 동기화합니다.
+  - AUDIT_FSYNC=batch    : 매 배치마다 fsync (가장 강한 내구성)
+  - AUDIT_FSYNC=interval : 최소 fsync_interval_ms 간격으로 fsync (기본값)
+  - AUDIT_FSYNC=never    : OS 버퍼에 맡김 (최대 처리량)
+- AuditMiddleware는 submit()으로 큐에 넣기만 합니다. 배치 크기/쓰기/fsync 지연은 metrics()로 노출됩니다.
+- Merkle 체크포인트: merkle_block(AUDIT_MERKLE_BLOCK)개 항목마다 블록 루트를 '<log>.merkle'에 기록합니다.
+  (app/security/audit_merkle.py, 0이면 비활성)
+- 세그먼트 회전: 활성 로그가 rotate_bytes(AUDIT_ROTATE_BYTES) 또는 rotate_seconds(AUDIT_ROTATE_SECONDS)를
+  넘으면 아카이브로 회전하고 백그라운드에서 gzip 압축합니다. 체인 헤드는 다음 세그먼트로 이어집니다.
+  (app/security/audit_segments.py)
+- 시간 인덱스: 세그먼트마다 시간 버킷 → 바이트 오프셋 사이드카('<log>.tidx')를 갱신합니다.
+  (app/security/audit_index.py, 범위 조회는 GET /dash/audit)
+- 워커별 체인: chains=worker(AUDIT_CHAINS)면 프로세스마다 'audit-w<slot>.log'에 기록하고,
+  주기적으로 다른 체인들의 헤드를 앵커 항목으로 남깁니다. (app/security/audit_chains.py)
+"""
+from __future__ import annotations
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO, Dict, List, Optional
+
+from app.security import audit_chains, audit_segments
+from app.security.audit_index import TimeIndexer
+from app.security.audit_merkle import MerkleCheckpointer
+from app.security.hashlog import GENESIS_HASH, chain_entry, read_last_hash, serialize_entry
+from app.utils.metrics import LatencyStat
+
+FSYNC_POLICIES = ("batch", "interval", "never")
+
+@dataclass
+class AuditWriterConfig:
+    queue_size: int = field(default_factory=lambda: int(os.getenv("AUDIT_QUEUE_SIZE", "10000")))
+    group_commit_ms: float = field(default_factory=lambda: float(os.getenv("AUDIT_GROUP_COMMIT_MS", "2")))
+    max_batch: int = field(default_factory=lambda: int(os.getenv("AUDIT_MAX_BATCH", "512")))
+    fsync: str = field(default_factory=lambda: os.getenv("AUDIT_FSYNC", "interval"))
+    fsync_interval_ms: float = field(default_factory=lambda: float(os.getenv("AUDIT_FSYNC_INTERVAL_MS", "1000")))
+    merkle_block: int = field(default_factory=lambda: int(os.getenv("AUDIT_MERKLE_BLOCK", "1024")))
+    rotate_bytes: int = field(default_factory=lambda: int(os.getenv("AUDIT_ROTATE_BYTES", str(64 * 1024 * 1024))))
+    rotate_seconds: float = field(default_factory=lambda: float(os.getenv("AUDIT_ROTATE_SECONDS", "0")))  # 0 = 시간 기준 회전 안 함
+    index_bucket: int = field(default_factory=lambda: int(os.getenv("AUDIT_INDEX_BUCKET", "60")))  # 0 = 비활성
+    chains: str = field(default_factory=lambda: audit_chains.CHAIN_MODE)
+    anchor_seconds: float = field(default_factory=lambda: audit_chains.ANCHOR_SECONDS)
+    archive_dir: Optional[str] = field(default_factory=lambda: audit_segments.ARCHIVE_DIR)
+
+class AuditWriter:
+    def __init__(self, log_path: str = "data/audit.log", cfg: Optional[AuditWriterConfig] = None):
+        self.log_path = log_path
+        self.chain_base = log_path   # 워커 모드에서 log_path는 시작 시 'audit-w<slot>.log'로 바뀝니다.
+        self.cfg = cfg or AuditWriterConfig()
+        self.chain_mode = audit_chains.resolve_chain_mode(self.cfg.chains)
+        self._slot_fh = None
+        self._anchor_task: Optional[asyncio.Task] = None
+        if self.cfg.fsync not in FSYNC_POLICIES:
+            print(f"[AuditWriter WARN] Unknown AUDIT_FSYNC '{self.cfg.fsync}'. Using 'interval'.")
+            self.cfg.fsync = "interval"
+        self._q: asyncio.Queue = asyncio.Queue(maxsize=self.cfg.queue_size)
+        self._task: Optional[asyncio.Task] = None
+        self._fh: Optional[BinaryIO] = None
+        self._merkle: Optional[MerkleCheckpointer] = None
+        self._tindex: Optional[TimeIndexer] = None
+        self._size = 0                         # 활성 세그먼트 크기 (bytes)
+        self._segment_ts: Optional[float] = None  # 활성 세그먼트 첫 항목 ts
+        self._last_ts: Optional[float] = None
+        self._seal_task: Optional[asyncio.Task] = None
+        self.rotations = 0
+        self._dirty = False        # write 후 아직 fsync 되지 않은 데이터 존재
+        self._last_fsync = 0.0
+        self.head_hash: Optional[str] = None
+        self.written = 0
+        self.batch_stat = LatencyStat()  # 배치당 항목 수
+        self.write_stat = LatencyStat()  # write() ms
+        self.fsync_stat = LatencyStat()  # fsync() ms
+        log_dir = os.path.dirname(log_path)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+
+    # ------------- public API -------------
+    async def submit(self, entry_data: Dict[str, Any]):
+        """
+        감사 항목을 큐에 넣습니다. 큐가 가득 차면 (항목을 버리지 않고) 자리가 날 때까지 기다립니다.
+        """
+        self._ensure_started()
+        try:
+            self._q.put_nowait(entry_data)
+        except asyncio.QueueFull:
+            await self._q.put(entry_data)
+
+    async def start(self):
+        self._ensure_started()
+
+    async def stop(self, timeout: float = 5.0):
+        """남은 항목을 기록하고 fsync한 뒤 기록 태스크를 정지합니다."""
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._q.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f"[AuditWriter WARN] Stopping with {self._q.qsize()} unwritten entries.")
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._anchor_task is not None:
+            self._anchor_task.cancel()
+            self._anchor_task = None
+        await asyncio.to_thread(self._close)
+        if self._seal_task is not None:
+            await self._seal_task
+        print(f"[AuditWriter] Stopped. Head: {(self.head_hash or '')[:12]}...")
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "log_path": self.log_path,
+            "chain_mode": self.chain_mode,
+            "fsync_policy": self.cfg.fsync,
+            "queue_depth": self._q.qsize(),
+            "written": self.written,
+            "batch_size": self.batch_stat.snapshot(),
+            "write_ms": self.write_stat.snapshot(),
+            "fsync_ms": self.fsync_stat.snapshot(),
+            "merkle_blocks": self._merkle.blocks if self._merkle else None,
+            "segment_bytes": self._size,
+            "rotations": self.rotations,
+        }
+
+    # ------------- internals -------------
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        if self.chain_mode == "worker" and self.cfg.anchor_seconds > 0 \
+                and (self._anchor_task is None or self._anchor_task.done()):
+            self._anchor_task = asyncio.create_task(self._anchor_loop())
+
+    def _open(self) -> str:
+        """파일을 append 모드로 열고 체인 헤드를 읽습니다. (동기)"""
+        if self.chain_mode == "worker" and self._slot_fh is None:
+            slot, self._slot_fh = audit_chains.acquire_slot(self.chain_base)
+            self.log_path = audit_chains.worker_log_path(self.chain_base, slot)
+        # 비정상 종료로 마지막 줄에 개행이 없으면, 새 항목이 그 줄에 이어 붙지 않도록 개행을 보충합니다.
+        try:
+            with open(self.log_path, "rb+") as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        f.write(b"\n")
+        except FileNotFoundError:
+            pass
+        head = read_last_hash(self.log_path)
+        if head == GENESIS_HASH:
+            # 회전 직후의 빈 활성 로그: 직전 세그먼트의 head에서 체인을 이어갑니다.
+            head = audit_segments.chain_start(self.log_path, self.cfg.archive_dir)
+        first = audit_segments.read_first_entry(self.log_path)
+        self._segment_ts = first.get("ts") if first else None
+        self._open_segment()
+        return head
+
+    def _open_segment(self):
+        if self.cfg.merkle_block > 0:
+            # 마지막 체크포인트 이후의 꼬리만 스캔하여 미완성 블록을 복원합니다.
+            self._merkle = MerkleCheckpointer(self.log_path, block_size=self.cfg.merkle_block)
+            self._merkle.recover()
+        if self.cfg.index_bucket > 0:
+            self._tindex = TimeIndexer(self.log_path, bucket_seconds=self.cfg.index_bucket)
+            self._tindex.recover()
+        self._fh = open(self.log_path, "ab")
+        self._size = self._fh.tell()
+
+    def _should_rotate(self) -> bool:
+        if self.cfg.rotate_bytes > 0 and self._size >= self.cfg.rotate_bytes:
+            return True
+        if self.cfg.rotate_seconds > 0 and self._segment_ts is not None:
+            return time.time() - self._segment_ts >= self.cfg.rotate_seconds
+        return False
+
+    def _rotate(self) -> Optional[str]:
+        """활성 세그먼트를 마감하고 아카이브로 회전한 뒤 새 파일을 엽니다. (동기, 압축은 하지 않음)"""
+        if self._merkle is not None:
+            self._merkle.seal()
+        self._fsync()
+        self._fh.close()
+        self._fh = None
+        segment = audit_segments.rotate_segment(self.log_path, self.head_hash, self._last_ts, self.cfg.archive_dir)
+        self._segment_ts = None
+        self._open_segment()
+        self.rotations += 1
+        return segment
+
+    def _close(self):
+        if self._fh is None:
+            return
+        try:
+            if self._dirty:
+                self._fsync()
+            self._fh.close()
+        except OSError as e:
+            print(f"[AuditWriter ERROR] Failed to close audit log: {e}")
+        self._fh = None
+        if self._slot_fh is not None:
+            audit_chains.release_slot(self._slot_fh)
+            self._slot_fh = None
+
+    def _fsync(self):
+        t0 = time.perf_counter()
+        os.fsync(self._fh.fileno())
+        self.fsync_stat.observe((time.perf_counter() - t0) * 1000)
+        self._dirty = False
+        self._last_fsync = time.monotonic()
+
+    def _write_batch(self, lines: List[bytes], tss: List[Optional[float]]):
+        """배치를 한 번의 write()로 기록하고 정책에 따라 fsync 합니다. (동기)"""
+        t0 = time.perf_counter()
+        data = b"".join(lines)
+        self._fh.write(data)
+        self._fh.flush()
+        self.write_stat.observe((time.perf_counter() - t0) * 1000)
+        self._size += len(data)
+        known = [t for t in tss if t is not None]
+        if known:
+            if self._segment_ts is None:
+                self._segment_ts = known[0]
+            self._last_ts = known[-1]
+        for sidecar in (self._merkle, self._tindex):
+            if sidecar is None:
+                continue
+            try:
+                for line, ts in zip(lines, tss):
+                    sidecar.observe(line, ts)
+                sidecar.flush()
+            except OSError as e:
+                # 사이드카 실패는 기록을 막지 않습니다 (다음 시작 시 recover()로 재생성)
+                print(f"[AuditWriter WARN] Failed to update {type(sidecar).__name__} sidecar: {e}")
+        self._dirty = True
+        if self.cfg.fsync == "batch":
+            self._fsync()
+        elif self.cfg.fsync == "interval":
+            if (time.monotonic() - self._last_fsync) * 1000 >= self.cfg.fsync_interval_ms:
+                self._fsync()
+
+    async def _next_batch(self) -> List[Dict[str, Any]]:
+        # interval 정책에서 쓰기가 멈추면 남은 데이터를 주기적으로 fsync 합니다.
+        if self._dirty and self.cfg.fsync == "interval":
+            try:
+                first = await asyncio.wait_for(self._q.get(), self.cfg.fsync_interval_ms / 1000)
+            except asyncio.TimeoutError:
+                await asyncio.to_thread(self._fsync)
+                first = await self._q.get()
+        else:
+            first = await self._q.get()
+        batch = [first]
+        if self.cfg.group_commit_ms > 0 and len(batch) < self.cfg.max_batch:
+            # 그룹 커밋 창: 몇 ms 동안 뒤따르는 항목을 모읍니다.
+            await asyncio.sleep(self.cfg.group_commit_ms / 1000)
+        while len(batch) < self.cfg.max_batch and not self._q.empty():
+            batch.append(self._q.get_nowait())
+        return batch
+
+    async def _run(self):
+        if self.head_hash is None or self._fh is None:
+            self.head_hash = await asyncio.to_thread(self._open)
+            print(f"[AuditWriter] Started. Log: {self.log_path}, head: {self.head_hash[:12]}..., "
+                  f"fsync: {self.cfg.fsync}, group commit: {self.cfg.group_commit_ms}ms")
+        while True:
+            batch = await self._next_batch()
+            try:
+                head = self.head_hash
+                lines, tss = [], []
+                for entry_data in batch:
+                    entry = chain_entry(entry_data, head)
+                    lines.append(serialize_entry(entry).encode("utf-8"))
+                    tss.append(entry.get("ts"))
+                    head = entry["hash"]
+                await asyncio.to_thread(self._write_batch, lines, tss)
+                # 디스크에 기록된 경우에만 헤드를 전진시킵니다.
+                self.head_hash = head
+                self.written += len(batch)
+                self.batch_stat.observe(len(batch))
+                if self._should_rotate():
+                    # task_done 전에 회전하여 stop()이 회전 도중의 파일을 닫지 않도록 합니다.
+                    await self._rotate_async()
+            except Exception as e:
+                print(f"[AuditWriter ERROR] Failed to write {len(batch)} audit entries: {e}")
+            finally:
+                for _ in batch:
+                    self._q.task_done()
+
+    async def _rotate_async(self):
+        try:
+            segment = await asyncio.to_thread(self._rotate)
+        except Exception as e:
+            print(f"[AuditWriter ERROR] Failed to rotate audit log: {e}")
+            if self._fh is None:
+                # 회전 중 실패해도 같은 경로에 계속 기록합니다.
+                await asyncio.to_thread(self._open_segment)
+            return
+        if segment:
+            self._schedule_seal(segment)
+
+    async def _anchor_loop(self):
+        """다른 워커 체인들의 헤드를 주기적으로 자기 체인에 앵커로 기록합니다."""
+        while True:
+            await asyncio.sleep(self.cfg.anchor_seconds)
+            try:
+                anchor = await asyncio.to_thread(audit_chains.make_anchor, self.chain_base, self.log_path,
+                                                 self.cfg.archive_dir)
+                if anchor:
+                    await self.submit(anchor)
+            except Exception as e:
+                print(f"[AuditWriter WARN] Failed to write chain anchor: {e}")
+
+    def _schedule_seal(self, segment: str):
+        """회전된 세그먼트를 백그라운드에서 압축합니다. (기록 태스크를 막지 않음, 한 번에 하나씩)"""
+        prev = self._seal_task
+
+        async def _seal():
+            if prev is not None:
+                await prev
+            try:
+                await asyncio.to_thread(audit_segments.seal_segment, segment)
+            except OSError as e:
+                # 압축 실패 시 원본 세그먼트는 남아있으며, audit_compact_weekly.py가 다시 시도합니다.
+                print(f"[AuditWriter WARN] Failed to compress segment {segment}: {e}")
+
+        self._seal_task = asyncio.create_task(_seal())
+
+# --- 프로세스당 싱글톤 (로그 경로별) ---
+_writers: Dict[str, AuditWriter] = {}
+
+def get_audit_writer(log_path: str = "data/audit.log") -> AuditWriter:
+    key = os.path.abspath(log_path)
+    if key not in _writers:
+        _writers[key] = AuditWriter(log_path)
+    return _writers[key]
@@ -0,0 +1,53 @@
+"""
+Aurora Audit Hash Chain (공통 포맷)
+- audit.log 한 줄 = JSON 객체 + "prev"(이전 항목 해시) + "hash"
+- hash = sha256( json.dumps({...entry, "prev": prev}, sort_keys=True) )  ('hash' 필드 제외, 'prev' 포함)
+- AuditWriter(기록)와 scripts/audit_verify.py(검증)가 이 모듈을 공유하여 포맷이 어긋나지 않게 합니다.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+from typing import Any, Dict
+
+GENESIS_HASH = "0" * 64
+
+def compute_hash(entry: Dict[str, Any]) -> str:
+    """'hash' 필드를 제외한 항목(‘prev’ 포함)의 sha256"""
+    body = {k: v for k, v in entry.items() if k != "hash"}
+    raw = json.dumps(body, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+def chain_entry(entry_data: Dict[str, Any], prev_hash: str) -> Dict[str, Any]:
+    """prev/hash를 채운 최종 항목을 반환합니다. (입력 dict는 변경하지 않음)"""
+    entry = dict(entry_data)
+    entry["prev"] = prev_hash
+    entry["hash"] = compute_hash(entry)
+    return entry
+
+def serialize_entry(entry: Dict[str, Any]) -> str:
+    """JSONL 한 줄 (개행 포함)"""
+    return json.dumps(entry, ensure_ascii=False) + "\n"
+
+def read_last_hash(log_path: str, tail_bytes: int = 4096) -> str:
+    """
+    로그 파일 끝에서 마지막 유효 항목의 해시를 읽습니다. 없으면 제네시스 해시.
+    (프로세스 시작 시 한 번만 호출됩니다. 이후 헤드는 메모리에서 유지)
+    """
+    try:
+        with open(log_path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - tail_bytes))
+            lines = f.read().splitlines()
+    except (IOError, FileNotFoundError):
+        return GENESIS_HASH
+    for raw in reversed(lines):
+        if not raw.strip():
+            continue
+        try:
+            return json.loads(raw.decode("utf-8")).get("hash", GENESIS_HASH)
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            # 잘린 마지막 줄(비정상 종료)은 건너뜁니다.
+            continue
+    return GENESIS_HASH
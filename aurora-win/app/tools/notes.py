@@ -5,11 +5,13 @@ import time
 import asyncio # [신규] 백그라운드 작업을 위해 임포트
 from app.memory.store import DB
 from app.memory.vectorstore import get_vectorstore # [신규] RAG 벡터저장소 임포트
+from app.memory.chunker import chunk_text
+from app.memory.ingest import note_text
 
 async def _ingest_to_vectorstore(doc_id: str, body: str):
     """
     [신규] RAG 인제스트를 위한 백그라운드 작업
-    노트 본문을 청크(여기서는 단일 청크)로 나누고 벡터 저장소에 추가합니다.
+    노트(제목 + 본문)를 토큰 기준 겹침 청크로 나누고 벡터 저장소에 upsert합니다.
     (vectorstore.py의 add -> get_embedding -> model_runner.py 호출)
     """
     if not body or len(body.strip()) < 20: # 너무 짧은 텍스트는 RAG 인덱싱 무시
@@ -19,15 +21,13 @@ async def _ingest_to_vectorstore(doc_id: str, body: str):
     try:
         vstore = get_vectorstore()
         
-        # 간단히 본문 전체를 단일 청크(chunk)로 사용
-        chunks = [body] 
+        # 토큰 기준 겹침 청크 (CHUNK_TOKENS / CHUNK_OVERLAP, app/memory/chunker.py)
+        chunks = [c.text for c in await asyncio.to_thread(chunk_text, body)]
         
         # doc_id 예시: "note:123" (DB의 note.id 사용)
-        await vstore.add(doc_id=doc_id, chunks=chunks)
-        
-        # (중요) FAISS 인덱스를 디스크에 즉시 저장
-        # (프로덕션에서는 주기적으로 저장하는 것이 효율적)
-        await asyncio.to_thread(vstore.save_index) 
+        # 추가는 WAL에 기록되고, 인덱스 스냅샷은 vectorstore가 디바운스하여 저장합니다.
+        # (VECTOR_SNAPSHOT_SECONDS / VECTOR_SNAPSHOT_ADDS / 종료 시)
+        await vstore.upsert(doc_id=doc_id, chunks=chunks)
         
         print(f"[RAG] Successfully ingested {doc_id} into vectorstore.")
     except Exception as e:
@@ -69,7 +69,7 @@ async def save(args, policy, db: DB):
         # 백그라운드에서 벡터화를 수행합니다.
         if note_id and body:
             doc_id = f"note:{note_id}"
-            asyncio.create_task(_ingest_to_vectorstore(doc_id, body))
+            asyncio.create_task(_ingest_to_vectorstore(doc_id, note_text(title, body)))
             
         return {"saved": True, "note_id": note_id, "title": title, "pin": pin}
         
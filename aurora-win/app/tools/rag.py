@@ -45,20 +45,23 @@ async def search(args: Dict[str, Any], policy, db: DB):
     [업그레이드]
     사용자의 쿼리로 RAG 검색을 수행하고,
     성공 시 _log_hits_background를 호출하여 대시보드용 로그를 저장합니다.
+    - mode: vector / lexical / hybrid (기본 RAG_SEARCH_MODE, vectorstore.hybrid_search 참고)
+    - results[].score: 모드와 관계없이 높을수록 관련도 높음 (원래 값은 distance / bm25 / rrf 키)
     """
     query = args.get("query")
     k = args.get("k", 3) # 상위 3개 검색
+    mode = args.get("mode") # None이면 RAG_SEARCH_MODE
     
     if not query:
         raise ValueError("RAG search 'query' is required")
 
-    print(f"[Tool.RAG] Searching vectorstore for: '{query[:30]}...' (k={k})")
+    print(f"[Tool.RAG] Searching vectorstore for: '{query[:30]}...' (k={k}, mode={mode or 'default'})")
     
     try:
         vstore = get_vectorstore()
         
-        # vectorstore.py의 search 함수 호출
-        search_results = await vstore.search(query=query, k=k)
+        # 벡터 + BM25 결합 검색 (키워드 쿼리는 임베딩 없이 BM25만)
+        search_results = await vstore.hybrid_search(query=query, k=k, mode=mode)
         
         # [신규] 대시보드 로깅 (Fire-and-Forget)
         if search_results:
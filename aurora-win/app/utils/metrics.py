@@ -0,0 +1,48 @@
+"""
+Aurora In-Process Metrics
+- 파이프라인 단계별 지연/크기를 가볍게 집계합니다 (외부 의존성 없음).
+- 최근 window개 샘플로 p95를 계산하고, 누적 count/avg/max를 유지합니다.
+- /dash/pipeline 등에서 snapshot()을 그대로 JSON으로 반환합니다.
+"""
+from __future__ import annotations
+import threading
+from collections import deque
+from typing import Any, Dict
+
+class LatencyStat:
+    """
+    단일 측정값(ms 또는 크기) 집계기. 스레드 안전 (to_thread 작업에서도 기록 가능).
+    """
+    def __init__(self, window: int = 512):
+        self._lock = threading.Lock()
+        self._recent: deque = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def observe(self, value: float):
+        with self._lock:
+            self.count += 1
+            self.total += value
+            self.last = value
+            if value > self.max:
+                self.max = value
+            self._recent.append(value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            recent = sorted(self._recent)
+            count, total, mx, last = self.count, self.total, self.max, self.last
+        if recent:
+            idx = max(0, min(int(0.95 * len(recent)) - 1, len(recent) - 1))
+            p95 = recent[idx]
+        else:
+            p95 = 0.0
+        return {
+            "count": count,
+            "avg": round(total / count, 3) if count else 0.0,
+            "p95": round(p95, 3),
+            "max": round(mx, 3),
+            "last": round(last, 3),
+        }
@@ -0,0 +1,52 @@
+"""
+Aurora Reader/Writer Lock
+- 여러 읽기(FAISS 검색/직렬화)는 동시에, 쓰기(add/인덱스 교체)는 단독으로 실행합니다.
+- 쓰기 우선: 쓰기가 기다리는 동안 새 읽기는 들어오지 못하므로 검색이 몰려도 add가 굶지 않습니다.
+- 스레드용 (asyncio 루프에서 직접 잡지 말 것 → 실행기 작업 안에서 사용). 재진입 불가.
+"""
+from __future__ import annotations
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+class RWLock:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        with self._cond:
+            while self._writer or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        with self._cond:
+            self._waiting_writers += 1
+            try:
+                while self._writer or self._readers:
+                    self._cond.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            return {"readers": self._readers, "writer": self._writer, "waiting_writers": self._waiting_writers}
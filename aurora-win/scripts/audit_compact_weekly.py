@@ -1,94 +1,69 @@
 import os
 import sys
-import gzip
-import shutil
 import time
 import argparse
-import json # (audit_verify.py 수정에 맞게 JSON 임포트 추가)
 from pathlib import Path # (Path 객체 사용)
-from datetime import datetime, timedelta
 
-def compact_log(log_path: str, archive_dir: str):
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from app.security import audit_segments
+from app.security.hashlog import read_last_hash
+
+def compact_log(log_path: str, archive_dir: str, rotate_days: float = 7, rotate: bool = False):
     """
-    오래된(예: 7일 이상) audit.log 항목을 압축(.gz)하고,
-    최신 로그만 남기되 해시체인을 재설정(reseed)합니다.
+    회전된 감사 로그 세그먼트를 압축(.gz)하고 세그먼트 간 해시체인 연결을 확인합니다.
     (schedule_audit_weekly.xml [cite: vivleon/aurora/AURORA-main/aurora-win/scripts/schedule_audit_weekly.xml]이 호출)
+    - 회전은 실행 중인 AuditWriter가 크기/시간 기준으로 수행합니다 (AUDIT_ROTATE_BYTES / AUDIT_ROTATE_SECONDS).
+      이 스크립트는 비정상 종료 등으로 압축되지 않고 남은 세그먼트를 마저 압축합니다.
+    - 모든 처리는 스트리밍(청크 단위)이므로 로그 크기와 관계없이 메모리 사용량이 일정합니다.
+    - 체인은 재설정(reseed)하지 않습니다. 새 세그먼트는 직전 세그먼트의 head에서 이어집니다.
+    - --rotate: 서버가 정지된 상태에서만 사용하세요. 활성 로그의 첫 항목이 rotate_days보다 오래되었으면
+      활성 로그를 세그먼트로 회전합니다. (실행 중인 AuditWriter는 파일을 열어두고 있음)
     """
     inp = Path(log_path)
     out_dir = Path(archive_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    if not inp.exists() or inp.stat().st_size == 0:
-        print(f"Log file '{inp}' is empty or does not exist. Nothing to compact.")
-        return
-
-    print(f"Compacting log: {inp}")
-    
-    lines = []
-    try:
-        lines = [json.loads(l) for l in inp.read_text("utf-8").splitlines() if l.strip()]
-    except (json.JSONDecodeError, IOError) as e:
-        print(f"[ERROR] Failed to read log file: {e}. Aborting compaction.")
-        return
-
-    cutoff_ts = (datetime.utcnow() - timedelta(days=7)).timestamp()
-
-    old_lines = [l for l in lines if l.get("ts", 0) < cutoff_ts]
-    new_lines = [l for l in lines if l.get("ts", 0) >= cutoff_ts]
+    # 1. (선택) 오래된 활성 로그 회전
+    if rotate:
+        first = audit_segments.read_first_entry(str(inp))
+        cutoff_ts = time.time() - rotate_days * 86400
+        if first is not None and first.get("ts", 0) < cutoff_ts:
+            head = read_last_hash(str(inp))
+            try:
+                audit_segments.rotate_segment(str(inp), head, archive_dir=str(out_dir))
+            except OSError as e:
+                print(f"[ERROR] Failed to rotate {inp} (is the server running?): {e}")
+        else:
+            print(f"Active log '{inp}' is newer than {rotate_days} days. Nothing to rotate.")
 
-    # 1. 오래된 로그 아카이브
-    if old_lines:
-        timestamp = time.strftime("%Y%m%d-%H%M%S")
-        archive_name = f"audit-{timestamp}_(compacted).log.gz"
-        archive_path = out_dir / archive_name
-        
+    # 2. 압축되지 않은 세그먼트 압축 (스트리밍)
+    pending = audit_segments.pending_segments(str(inp), str(out_dir))
+    for path in pending:
         try:
-            with gzip.open(archive_path, "wt", encoding="utf-8") as gz:
-                for l in old_lines:
-                    gz.write(json.dumps(l, ensure_ascii=False) + "\n")
-            print(f"Archived {len(old_lines)} old records to {archive_path}")
-        except IOError as e:
-            print(f"[ERROR] Failed to write archive: {e}")
+            gz_path = audit_segments.seal_segment(path)
+            print(f"Compressed {path} -> {gz_path}")
+        except OSError as e:
+            print(f"[ERROR] Failed to compress segment {path}: {e}")
+    if not pending:
+        print("No uncompressed segments.")
 
-    # 2. 새 로그 파일 재작성 (해시체인 재설정)
-    print(f"Reseeding hash chain for {len(new_lines)} recent records...")
-    
-    expected_prev_hash = "0" * 64 # 제네시스 해시
-    regenerated_lines = []
-    
-    for entry in new_lines:
-        # 'hash'와 'prev'를 제외한 모든 것을 직렬화
-        entry_data_to_hash = entry.copy()
-        entry_data_to_hash.pop('hash', None)
-        entry_data_to_hash.pop('prev', None)
-        
-        raw = json.dumps(entry_data_to_hash, sort_keys=True).encode('utf-8')
-        recalculated_hash = hashlib.sha256(raw).hexdigest()
-        
-        # 새 체인 적용
-        entry['prev'] = expected_prev_hash
-        entry['hash'] = recalculated_hash
-        
-        regenerated_lines.append(json.dumps(entry, ensure_ascii=False))
-        expected_prev_hash = recalculated_hash # 다음 루프를 위해 해시 업데이트
-
-    try:
-        # 원본 로그 파일 덮어쓰기
-        with open(log_path, 'w', encoding='utf-8') as f:
-            if regenerated_lines:
-                f.write("\n".join(regenerated_lines) + "\n")
-            else:
-                f.write("") # 비움
-        print(f"Original log file '{log_path}' has been compacted and re-chained.")
-    except IOError as e:
-        print(f"[ERROR] Failed to write compacted log: {e}")
+    # 3. 세그먼트 간 체인 연결 확인
+    problems = audit_segments.check_manifest_links(str(inp), str(out_dir))
+    for p in problems:
+        print(f"[FAIL] {p['segment']}: {p['problem']}")
+    segments = audit_segments.load_manifest(str(inp), str(out_dir))
+    print(f"{len(segments)} archived segments, chain links {'OK' if not problems else 'BROKEN'}.")
+    return not problems
 
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Compact and re-chain audit log file.")
+    parser = argparse.ArgumentParser(description="Compress rotated audit log segments and check chain continuity.")
     parser.add_argument("--in", dest="input_log", default="data/audit.log", help="Path to the audit.log file (default: data/audit.log)")
     parser.add_argument("--out", dest="output_dir", default="data/archive", help="Directory to save compressed archives (default: data/archive)")
-    
+    parser.add_argument("--rotate", action="store_true", help="Rotate the active log if it is older than --days (server must be stopped)")
+    parser.add_argument("--days", type=float, default=7, help="Age threshold for --rotate (default: 7)")
+
     args = parser.parse_args()
-    
-    compact_log(args.input_log, args.output_dir)
\ No newline at end of file
+
+    if not compact_log(args.input_log, args.output_dir, rotate_days=args.days, rotate=args.rotate):
+        sys.exit(1)
\ No newline at end of file
@@ -0,0 +1,99 @@
+"""
+Aurora Audit Merkle CLI
+- 감사 로그의 Merkle 체크포인트('<log>.merkle')를 이용한 블록 검증/포함 증명/시간 범위 검증.
+  (전체 체인을 처음부터 다시 해시하지 않고, 필요한 블록만 검증합니다)
+
+Usage examples:
+  python scripts/audit_merkle.py rebuild --log data/audit.log
+  python scripts/audit_merkle.py verify  --log data/audit.log --workers 4
+  python scripts/audit_merkle.py prove   --log data/audit.log --seq 1234 > proof.json
+  python scripts/audit_merkle.py check   --proof proof.json [--log data/audit.log]
+  python scripts/audit_merkle.py range   --log data/audit.log --from 1730000000 --to 1730086400
+  python scripts/audit_merkle.py keygen  --out data/audit_signing.key
+"""
+from __future__ import annotations
+import argparse, json, os, sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.security.audit_merkle import (
+    BLOCK_SIZE, MerkleCheckpointer, SigningKey, blocks_in_range, load_checkpoints,
+    prove_entry, sidecar_path, verify_blocks, verify_entry_proof,
+)
+
+
+def _print_report(report):
+    for r in report["failed"]:
+        print(f"[FAIL] block {r['block']}: {r['reason']}")
+    for b in report["broken_links"]:
+        print(f"[FAIL] block {b}: prev_root does not match previous checkpoint")
+    status = "SUCCESS" if report["ok"] else "FAILURE"
+    print(f"[{status}] {report['blocks']} blocks checked, {report['signed']} signed.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merkle checkpoints for the audit log.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("rebuild", help="체크포인트 사이드카를 처음부터 다시 생성")
+    p.add_argument("--log", default="data/audit.log")
+    p.add_argument("--block", type=int, default=BLOCK_SIZE)
+
+    p = sub.add_parser("verify", help="모든 블록 검증 (병렬)")
+    p.add_argument("--log", default="data/audit.log")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+
+    p = sub.add_parser("range", help="시간 범위와 겹치는 블록만 검증")
+    p.add_argument("--log", default="data/audit.log")
+    p.add_argument("--from", dest="t_from", type=float)
+    p.add_argument("--to", dest="t_to", type=float)
+    p.add_argument("--workers", type=int, default=1)
+
+    p = sub.add_parser("prove", help="항목 하나의 포함 증명 출력 (JSON)")
+    p.add_argument("--log", default="data/audit.log")
+    p.add_argument("--seq", type=int, required=True)
+
+    p = sub.add_parser("check", help="포함 증명 파일 검증")
+    p.add_argument("--proof", required=True)
+    p.add_argument("--log", help="서명되지 않은 체크포인트는 이 로그의 사이드카 루트와 대조")
+
+    p = sub.add_parser("keygen", help="Ed25519 서명 키 생성 (AUDIT_SIGNING_KEY)")
+    p.add_argument("--out", required=True)
+
+    args = parser.parse_args()
+
+    if args.cmd == "rebuild":
+        if os.path.exists(sidecar_path(args.log)):
+            os.remove(sidecar_path(args.log))
+        cp = MerkleCheckpointer(args.log, block_size=args.block)
+        cp.recover()
+        print(f"[AuditMerkle] {cp.blocks} checkpoints written to {sidecar_path(args.log)}")
+    elif args.cmd == "verify":
+        report = verify_blocks(args.log, workers=args.workers)
+        _print_report(report)
+        sys.exit(0 if report["ok"] else 1)
+    elif args.cmd == "range":
+        cps = blocks_in_range(load_checkpoints(args.log), args.t_from, args.t_to)
+        report = verify_blocks(args.log, cps, workers=args.workers)
+        _print_report(report)
+        sys.exit(0 if report["ok"] else 1)
+    elif args.cmd == "prove":
+        print(json.dumps(prove_entry(args.log, args.seq), ensure_ascii=False, indent=2))
+    elif args.cmd == "check":
+        with open(args.proof, "r", encoding="utf-8") as f:
+            ok = verify_entry_proof(json.load(f), log_path=args.log)
+        print("[SUCCESS] Proof is valid." if ok else "[FAILURE] Proof is invalid.")
+        sys.exit(0 if ok else 1)
+    elif args.cmd == "keygen":
+        if SigningKey is None:
+            sys.exit("pynacl is required: pip install pynacl")
+        key = SigningKey.generate()
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(key.encode().hex())
+        print(f"[AuditMerkle] Signing key written to {args.out}")
+        print(f"AUDIT_VERIFY_KEY={key.verify_key.encode().hex()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,97 +1,77 @@
-import json
-import hashlib
+import argparse
 import sys
 import os
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from app.security.audit_chains import chain_paths, verify_anchors
+from app.security.audit_verify import VERIFY_WORKERS, load_verify_checkpoint, verify_log
+
 # (scripts/schedule_audit_weekly.xml [cite: vivleon/aurora/AURORA-main/aurora-win/scripts/schedule_audit_weekly.xml]가 이 스크립트를 호출)
 
-def verify_hash_chain(log_path: str):
+def verify_hash_chain(log_path: str, full: bool = False, workers: int = VERIFY_WORKERS):
     """
     data/audit.log 파일의 해시체인 무결성을 검증합니다.
-    (AuditMiddleware의 로그 포맷을 기준으로 검증)
+    (AuditMiddleware의 로그 포맷을 기준으로 검증, 구현은 app/security/audit_verify.py)
+    - 기본: '<log>.verify.json' 체크포인트 이후에 추가된 항목만 검증 (증분)
+    - full=True: 처음부터 전체 검증 (세그먼트 단위 병렬 해시)
+    반환: verify_log 결과 (파일이 없거나 읽지 못하면 None)
     """
     if not os.path.exists(log_path):
         print(f"Error: Log file not found at {log_path}")
-        return False
+        return None
 
     print(f"Verifying hash chain for: {log_path}...")
-    
-    expected_prev_hash = "0" * 64 # 제네시스 해시
-    line_number = 0
-    is_valid = True
-
-    try:
-        with open(log_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line_number += 1
-                if not line.strip():
-                    continue
-                
-                try:
-                    entry = json.loads(line)
-                except json.JSONDecodeError:
-                    print(f"[FAIL] Line {line_number}: Failed to decode JSON.")
-                    is_valid = False
-                    continue
-
-                # 1. 'hash' 필드와 'prev' 필드 존재 여부 검사
-                if 'hash' not in entry or 'prev' not in entry:
-                    print(f"[FAIL] Line {line_number}: Missing 'hash' or 'prev' field.")
-                    is_valid = False
-                    continue
-                
-                current_hash = entry['hash']
-                prev_hash = entry['prev']
-
-                # 2. 이전 해시 일치 여부 검사
-                if prev_hash != expected_prev_hash:
-                    print(f"[FAIL] Line {line_number}: Chain broken!")
-                    print(f"  Expected prev_hash: {expected_prev_hash[:12]}...")
-                    print(f"  Got prev_hash:      {prev_hash[:12]}...")
-                    is_valid = False
-                    # 강제로 체인을 이어가서 추가 오류 검사
-                    expected_prev_hash = current_hash
-                    continue
-
-                # 3. 현재 해시 무결성 검사
-                # AuditMiddleware 포맷: 'hash'와 'prev'를 제외한 모든 것을 직렬화
-                entry_data_to_hash = entry.copy()
-                del entry_data_to_hash['hash']
-                del entry_data_to_hash['prev'] # 'prev'도 해시 계산에서 제외
-                
-                raw = json.dumps(entry_data_to_hash, sort_keys=True).encode('utf-8')
-                recalculated_hash = hashlib.sha256(raw).hexdigest()
-
-                if current_hash != recalculated_hash:
-                    print(f"[FAIL] Line {line_number}: Data tampered! Hash mismatch.")
-                    print(f"  Recorded hash:    {current_hash[:12]}...")
-                    print(f"  Recalculated hash: {recalculated_hash[:12]}...")
-                    is_valid = False
 
-                # 다음 라인을 위해 예상 해시 업데이트
-                expected_prev_hash = current_hash
+    def _progress(done, total):
+        if total:
+            print(f"\r  {done / total:6.1%} ({done:,}/{total:,} bytes)", end="", flush=True)
 
+    try:
+        result = verify_log(log_path, full=full, workers=workers, progress=_progress)
     except IOError as e:
         print(f"Error reading file: {e}")
-        return False
-    except EOFError:
-        pass # 파일 끝
+        return None
+    print()
+
+    for issue in result["issues"]:
+        label = {"broken": "Chain broken!", "tampered": "Data tampered! Hash mismatch.",
+                 "malformed": "Failed to decode JSON or missing 'hash'/'prev'."}[issue["kind"]]
+        print(f"[FAIL] Line {issue['line']}: {label}")
+    mode = "incremental" if result["resumed"] else "full"
+    print(f"  mode: {mode}, checked: {result['checked']} new entries in {result['segments']} segments, "
+          f"{result['elapsed_ms']} ms")
 
-    if is_valid:
-        print(f"\n[SUCCESS] Verification complete. All {line_number} entries are valid.")
+    if result["ok"]:
+        print(f"\n[SUCCESS] Verification complete. All {result['entries']} entries are valid.")
     else:
-        print(f"\n[FAILURE] Verification failed. Integrity compromised.")
-        
-    return is_valid
+        print(f"\n[FAILURE] Verification failed. Integrity compromised. "
+              f"(broken: {result['broken']}, tampered: {result['tampered']}, malformed: {result['malformed']})")
+
+    return result
 
 if __name__ == "__main__":
     default_log = Path(__file__).parent.parent / "data" / "audit.log"
-    
-    if len(sys.argv) < 2:
-        log_file_path = default_log
-    else:
-        log_file_path = Path(sys.argv[1])
-        
-    if not verify_hash_chain(str(log_file_path)):
-        sys.exit(1)
\ No newline at end of file
+
+    parser = argparse.ArgumentParser(description="Verify the audit log hash chain.")
+    parser.add_argument("log", nargs="?", default=str(default_log))
+    parser.add_argument("--full", action="store_true", help="체크포인트를 무시하고 처음부터 검증")
+    parser.add_argument("--workers", type=int, default=VERIFY_WORKERS)
+    args = parser.parse_args()
+
+    # 워커별 체인('audit-w<slot>.log')이 있으면 모든 체인과 체인 간 앵커를 검증합니다.
+    # 앵커도 증분: 각 체인의 체크포인트 오프셋 이후 앵커만 확인 (체크포인트는 검증 전에 읽어 둠)
+    paths = chain_paths(args.log) or [args.log]
+    previous = {os.path.basename(p): load_verify_checkpoint(p) for p in paths}
+    results = {os.path.basename(p): verify_hash_chain(p, full=args.full, workers=args.workers) for p in paths}
+    ok = all(r is not None and r["ok"] for r in results.values())
+    if len(paths) > 1:
+        anchors = verify_anchors(args.log, {k: r for k, r in results.items() if r}, previous, full=args.full)
+        for m in anchors["missing"]:
+            print(f"[FAIL] Anchor in {m['chain']} references unknown head {m['head'][:12]}... of {m['peer']}")
+        mode = "incremental" if anchors["incremental"] else "full"
+        print(f"\nAnchors: {anchors['anchors']} across {len(paths)} chains ({anchors['checked']} new, {mode}), "
+              f"{'OK' if anchors['ok'] else 'BROKEN'}.")
+        ok = ok and anchors["ok"]
+    if not ok:
+        sys.exit(1)
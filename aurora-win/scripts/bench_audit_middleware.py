@@ -0,0 +1,133 @@
+"""
+Aurora Audit Middleware Benchmark
+- 감사 미들웨어 구현별 처리량을 비교합니다 (in-process ASGI, 네트워크 없음).
+  - none     : 미들웨어 없음 (기준선)
+  - basehttp : 이전 구현 방식 (Starlette BaseHTTPMiddleware + AuditWriter)
+  - asgi     : 현재 구현 (app/security/audit_middleware.py, 순수 ASGI)
+- 측정 항목
+  - POST /aurora/plan 동시 요청 req/s (LLM 호출을 배제하기 위해 고정 플랜을 반환하는 스텁 핸들러)
+  - GET /events/stream SSE 프레임 처리량 frames/s
+- 감사 로그는 임시 디렉터리에 기록됩니다. (AUDIT_FSYNC=never 권장: 미들웨어 비용만 비교)
+
+Usage examples:
+  python scripts/bench_audit_middleware.py --requests 2000 --concurrency 32 --frames 20000
+"""
+from __future__ import annotations
+import argparse, asyncio, os, sys, tempfile, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.security.audit_middleware import AuditMiddleware
+from app.security.audit_writer import get_audit_writer
+
+PLAN = {"steps": [{"tool": "nlp", "op": "summarize", "args": {"text": "bench"}}]}
+FRAME = b'data: {"type":"tool","tool":"nlp","outcome":"success","latency_ms":12}\n\n'
+
+
+class BaseHTTPAuditMiddleware(BaseHTTPMiddleware):
+    """비교용: 이전 BaseHTTPMiddleware 방식 (기록 경로는 동일한 AuditWriter)"""
+    def __init__(self, app, log_path: str):
+        super().__init__(app)
+        self.writer = get_audit_writer(log_path)
+
+    async def dispatch(self, request, call_next):
+        start_time = time.time()
+        entry = {
+            "ts": start_time,
+            "actor": request.client.host if request.client else "unknown",
+            "action": f"API:{request.method}:{request.url.path}",
+            "payload": {"query_params": str(request.query_params)},
+        }
+        response = await call_next(request)
+        entry["status_code"] = response.status_code
+        entry["latency_ms"] = int((time.time() - start_time) * 1000)
+        await self.writer.submit(entry)
+        return response
+
+
+def build_app(variant: str, log_path: str, frames: int) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/aurora/plan")
+    async def plan_endpoint(req: dict):
+        return {"plan": PLAN}
+
+    @app.get("/events/stream")
+    def stream():
+        async def _gen():
+            for _ in range(frames):
+                yield FRAME
+        return StreamingResponse(_gen(), media_type="text/event-stream")
+
+    if variant == "basehttp":
+        app.add_middleware(BaseHTTPAuditMiddleware, log_path=log_path)
+    elif variant == "asgi":
+        app.add_middleware(AuditMiddleware, log_path=log_path)
+    return app
+
+
+async def bench_plan(client: httpx.AsyncClient, n: int, concurrency: int) -> float:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def _one():
+        async with sem:
+            r = await client.post("/aurora/plan", json={"input": "bench"})
+            r.raise_for_status()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*[_one() for _ in range(n)])
+    return n / (time.perf_counter() - t0)
+
+
+async def bench_sse(client: httpx.AsyncClient, frames: int) -> float:
+    t0 = time.perf_counter()
+    async with client.stream("GET", "/events/stream") as r:
+        received = 0
+        async for chunk in r.aiter_bytes():
+            received += chunk.count(b"\n\n")
+    assert received == frames, received
+    return frames / (time.perf_counter() - t0)
+
+
+async def run_variant(variant: str, args, tmp: str):
+    log_path = os.path.join(tmp, f"audit-{variant}.log")
+    app = build_app(variant, log_path, args.frames)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await bench_plan(client, min(200, args.requests), args.concurrency)  # warm-up
+        rps = await bench_plan(client, args.requests, args.concurrency)
+        fps = await bench_sse(client, args.frames)
+    if variant != "none":
+        await get_audit_writer(log_path).stop()
+    print(f"{variant:<9} /aurora/plan {rps:10,.0f} req/s   /events/stream {fps:12,.0f} frames/s")
+    return rps, fps
+
+
+async def main_async(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for variant in ("none", "basehttp", "asgi"):
+            results[variant] = await run_variant(variant, args, tmp)
+    base_rps, base_fps = results["basehttp"]
+    asgi_rps, asgi_fps = results["asgi"]
+    print(f"asgi vs basehttp: plan x{asgi_rps / base_rps:.2f}, sse x{asgi_fps / base_fps:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark audit middleware implementations.")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--frames", type=int, default=20000)
+    args = parser.parse_args()
+    os.environ.setdefault("AUDIT_FSYNC", "never")
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Aurora Event Codec Benchmark
+- 버스 페이로드 직렬화 비용을 CPU 시간 기준 events/s per core로 비교합니다 (Redis 불필요, 순수 CPU).
+  - before : 발행 시 json.dumps, 구독마다 json.loads, SSE 클라이언트마다 json.dumps (클라이언트당 Redis 구독)
+  - json   : 발행 시 1회 인코딩, 워커 허브에서 바이트 패스스루, 클라이언트는 같은 프레임 공유
+  - msgpack: 발행 시 1회 msgpack 인코딩, 워커 허브에서 1회 디코드+JSON 재인코딩 (msgpack 설치 시)
+
+Usage examples:
+  python scripts/bench_event_codec.py --events 20000 --workers 4 --clients 8
+"""
+from __future__ import annotations
+import argparse, json, sys, time
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.event_codec import EncodedEvent, event_frame, get_codec, orjson, msgpack
+
+
+def _events(n: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "ts": 1762819454.85 + i,
+            "type": "tool",
+            "tool": "nlp",
+            "intent": f"요약 요청 #{i}",
+            "outcome": "success",
+            "risk": "low",
+            "latency_ms": i % 500,
+        }
+        for i in range(n)
+    ]
+
+
+def bench_before(events, workers: int, clients: int) -> int:
+    sink = 0
+    for e in events:
+        wire = json.dumps(e, separators=(",", ":"))
+        for _ in range(workers * clients):
+            ev = json.loads(wire)
+            sink += len(f"data: {json.dumps(ev, separators=(',',':'))}\n\n")
+    return sink
+
+
+def bench_codec(events, workers: int, clients: int, codec_name: str) -> int:
+    codec = get_codec(codec_name)
+    sink = 0
+    for e in events:
+        wire = codec.encode(e)
+        for _ in range(workers):
+            frame = event_frame(EncodedEvent(wire, codec))
+            for _ in range(clients):
+                sink += len(frame)
+    return sink
+
+
+def run(label: str, fn, events, *args) -> float:
+    t0 = time.process_time()
+    fn(events, *args)
+    cpu = time.process_time() - t0
+    rate = len(events) / cpu if cpu > 0 else float("inf")
+    print(f"{label:<10} cpu={cpu:8.3f}s  events/s/core={rate:12,.0f}")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark event bus payload serialization.")
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=4, help="subscribing worker processes (hubs)")
+    parser.add_argument("--clients", type=int, default=8, help="SSE clients per worker")
+    args = parser.parse_args()
+
+    events = _events(args.events)
+    print(f"events={args.events} workers={args.workers} clients/worker={args.clients} "
+          f"orjson={'yes' if orjson else 'no'} msgpack={'yes' if msgpack else 'no'}")
+
+    base = run("before", bench_before, events, args.workers, args.clients)
+    after = run("json", bench_codec, events, args.workers, args.clients, "json")
+    print(f"{'speedup':<10} x{after / base:.1f} (json)")
+    if msgpack is not None:
+        mp = run("msgpack", bench_codec, events, args.workers, args.clients, "msgpack")
+        print(f"{'speedup':<10} x{mp / base:.1f} (msgpack)")
+
+
+if __name__ == "__main__":
+    main()
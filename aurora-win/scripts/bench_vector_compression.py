@@ -0,0 +1,96 @@
+"""
+Aurora Vector Compression Benchmark
+- 합성 코퍼스(군집 구조의 정규화 벡터)로 저장 형식별 메모리 / recall@k / 재순위 효과 / 지연을 비교합니다.
+  (VECTOR_COMPRESSION = none | fp16 | sq8 | pq, VECTOR_RERANK, app/memory/ann_index.py)
+- 메모리는 직렬화된 인덱스 크기(IDMap 포함)로 재고, --project 개수(기본 100만 청크)로 환산해 보여줍니다.
+  재순위용 원본 벡터('<index>.vecs')는 디스크/페이지 캐시에 있으므로 프로세스 메모리에 포함하지 않습니다.
+
+Usage examples:
+  python scripts/bench_vector_compression.py --n 100000 --kind flat,ivf
+  python scripts/bench_vector_compression.py --compression sq8,pq --rerank 4,8 --project 1000000
+"""
+from __future__ import annotations
+import argparse, sys, time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.memory.ann_index import build_index, compression_of, faiss, rerank
+
+
+def _synthetic(n: int, dim: int, clusters: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype("float32")
+    x = centers[rng.integers(0, clusters, n)] + rng.normal(size=(n, dim)).astype("float32")
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+def _recall(found: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(set(f[f >= 0]) & set(t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def _p50_ms(fn, queries: np.ndarray) -> float:
+    times = []
+    for q in queries[:200]:
+        t0 = time.perf_counter()
+        fn(q[None, :])
+        times.append((time.perf_counter() - t0) * 1000)
+    return float(np.percentile(times, 50))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark memory/recall of compressed FAISS indexes.")
+    ap.add_argument("--n", type=int, default=50000)
+    ap.add_argument("--dim", type=int, default=384)
+    ap.add_argument("--clusters", type=int, default=200)
+    ap.add_argument("--queries", type=int, default=500)
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--kind", default="flat", help="flat,ivf,hnsw")
+    ap.add_argument("--compression", default="none,fp16,sq8,pq")
+    ap.add_argument("--rerank", default="4", help="후보 배수 목록 (k * rerank개를 원본 벡터로 재정렬)")
+    ap.add_argument("--project", type=int, default=1_000_000, help="메모리 환산 기준 청크 수")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    if faiss is None:
+        sys.exit("[ERROR] faiss-cpu is not installed.")
+
+    data = _synthetic(args.n + args.queries, args.dim, args.clusters, args.seed)
+    queries, base = data[:args.queries], data[args.queries:]
+    ids = np.arange(len(base), dtype="int64")
+    flat = faiss.IndexFlatL2(args.dim)
+    flat.add(base)
+    _, truth = flat.search(queries, args.k)
+    factors = [int(r) for r in args.rerank.split(",") if r]
+    print(f"vectors={len(base)} dim={args.dim} queries={len(queries)} k={args.k} "
+          f"(memory projected to {args.project:,} chunks)")
+
+    for kind in args.kind.split(","):
+        for comp in args.compression.split(","):
+            t0 = time.perf_counter()
+            index = build_index(kind, base, ids, compression=comp)
+            build_s = time.perf_counter() - t0
+            per_vec = faiss.serialize_index(index).nbytes / len(base)
+            _, found = index.search(queries, args.k)
+            line = (f"{kind:<5} {compression_of(index):<5} build={build_s:6.1f}s  "
+                    f"{per_vec:7.1f} B/vec  ~{per_vec * args.project / 2**20:7.0f} MB  "
+                    f"recall@{args.k}={_recall(found, truth):.3f}  "
+                    f"p50={_p50_ms(lambda q: index.search(q, args.k), queries):6.2f}ms")
+            if comp != "none":
+                for f in factors:
+                    d, cand = index.search(queries, args.k * f)
+                    _, rfound = rerank(queries, d, cand, lambda i: base[i], args.k)
+
+                    def _search_rerank(q, f=f):
+                        qd, qi = index.search(q, args.k * f)
+                        return rerank(q, qd, qi, lambda i: base[i], args.k)
+                    line += (f"  | rerank x{f}: recall={_recall(rfound, truth):.3f} "
+                             f"p50={_p50_ms(_search_rerank, queries):6.2f}ms")
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
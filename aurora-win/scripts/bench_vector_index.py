@@ -0,0 +1,100 @@
+"""
+Aurora Vector Index Benchmark
+- flat(정확) 결과를 정답으로 두고 IVF/HNSW 설정별 recall@k 와 단일 쿼리 지연(p50/p95)을 비교합니다.
+  VECTOR_INDEX / VECTOR_ANN_THRESHOLD / VECTOR_IVF_NPROBE / VECTOR_HNSW_EF_SEARCH 값을 정할 때 사용하세요.
+- 기본은 군집 구조를 가진 합성 정규화 벡터, --index 로 실제 인덱스 파일(data/embeddings/aurora.index)도 사용 가능
+
+Usage examples:
+  python scripts/bench_vector_index.py --n 50000 --queries 500
+  python scripts/bench_vector_index.py --index data/embeddings/aurora.index --nprobe 8,16,32 --ef 32,64,128
+"""
+from __future__ import annotations
+import argparse, sys, time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.memory import ann_index
+from app.memory.ann_index import all_vectors, build_index, faiss, set_search_params
+
+
+def _synthetic(n: int, dim: int, clusters: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype("float32")
+    x = centers[rng.integers(0, clusters, n)] + rng.normal(size=(n, dim)).astype("float32")
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+def _recall(found: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(set(f[f >= 0]) & set(t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def _latency(index, queries: np.ndarray, k: int):
+    times = []
+    for q in queries:
+        t0 = time.perf_counter()
+        index.search(q[None, :], k)
+        times.append((time.perf_counter() - t0) * 1000)
+    return float(np.percentile(times, 50)), float(np.percentile(times, 95))
+
+
+def run(label: str, index, queries, truth, k: int, build_s: float):
+    _, found = index.search(queries, k)
+    p50, p95 = _latency(index, queries, k)
+    print(f"{label:<18} build={build_s:7.2f}s  recall@{k}={_recall(found, truth):.3f}  "
+          f"p50={p50:7.3f}ms  p95={p95:7.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark recall/latency of FAISS index types.")
+    parser.add_argument("--index", help="existing FAISS index file to take vectors from")
+    parser.add_argument("--n", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", default=f"4,{ann_index.VECTOR_IVF_NPROBE},64")
+    parser.add_argument("--ef", default=f"16,{ann_index.VECTOR_HNSW_EF_SEARCH},256")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if faiss is None:
+        sys.exit("[ERROR] faiss-cpu is not installed.")
+
+    if args.index:
+        data = all_vectors(faiss.read_index(args.index))
+    else:
+        data = _synthetic(args.n + args.queries, args.dim, args.clusters, args.seed)
+    rng = np.random.default_rng(args.seed)
+    pick = rng.choice(len(data), min(args.queries, len(data)), replace=False)
+    queries = data[pick] + 0.05 * rng.normal(size=(len(pick), data.shape[1])).astype("float32")
+    base = data if args.index else np.delete(data, pick, axis=0)
+    print(f"vectors={len(base)} dim={base.shape[1]} queries={len(queries)} k={args.k}")
+
+    t0 = time.perf_counter()
+    flat = build_index("flat", base)
+    flat_s = time.perf_counter() - t0
+    _, truth = flat.search(queries, args.k)
+    run("flat", flat, queries, truth, args.k, flat_s)
+
+    t0 = time.perf_counter()
+    ivf = build_index("ivf", base)
+    ivf_s = time.perf_counter() - t0
+    nlist = faiss.extract_index_ivf(ivf).nlist
+    for nprobe in [int(v) for v in args.nprobe.split(",") if v]:
+        set_search_params(ivf, nprobe=nprobe)
+        run(f"ivf{nlist} np={nprobe}", ivf, queries, truth, args.k, ivf_s)
+
+    t0 = time.perf_counter()
+    hnsw = build_index("hnsw", base)
+    hnsw_s = time.perf_counter() - t0
+    for ef in [int(v) for v in args.ef.split(",") if v]:
+        set_search_params(hnsw, ef_search=ef)
+        run(f"hnsw{ann_index.VECTOR_HNSW_M} ef={ef}", hnsw, queries, truth, args.k, hnsw_s)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Aurora Vector Search Concurrency Benchmark
+- 합성 벡터로 임시 VectorStore를 만들고, 동시 검색 요청 수(--concurrency)별 처리량(QPS)과 지연(p50/p95)을
+  마이크로 배치 끔(window=0) / 켬(--window-ms) 으로 비교합니다. (app/memory/search_batcher.py)
+- 쿼리 임베딩은 실제 경로(get_embeddings → model_runner → local://onnx 엔진)를 사용하며,
+  캐시 효과를 빼기 위해 임베딩 캐시는 끕니다 (EMBED_CACHE=0).
+
+Usage examples:
+  python scripts/bench_vector_search.py --n 100000 --concurrency 1,8,32,64
+  python scripts/bench_vector_search.py --window-ms 1,2,5 --max-batch 64
+"""
+from __future__ import annotations
+import argparse, asyncio, os, sys, tempfile, time
+from pathlib import Path
+
+import numpy as np
+
+os.environ.setdefault("EMBED_CACHE", "0")
+os.environ.setdefault("VECTOR_WAL", "0")
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.memory import vectorstore
+from app.memory.search_batcher import SearchBatcher
+
+
+async def _load(store, n: int, dim: int, seed: int, chunk: int = 10000):
+    rng = np.random.default_rng(seed)
+    for s in range(0, n, chunk):
+        x = rng.normal(size=(min(chunk, n - s), dim)).astype("float32")
+        await store.upsert_vectors(f"bench:{s}", x / np.linalg.norm(x, axis=1, keepdims=True), log=False)
+
+
+async def _round(store, queries, concurrency: int, k: int):
+    lat = []
+    it = iter(queries)
+
+    async def _client():
+        for q in it:
+            t0 = time.perf_counter()
+            await store.search(q, k)
+            lat.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(_client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+    return len(queries) / elapsed, float(np.percentile(lat, 50)), float(np.percentile(lat, 95))
+
+
+async def _main(args):
+    if vectorstore.faiss is None:
+        sys.exit("[ERROR] faiss-cpu is not installed.")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = vectorstore.VectorStore(index_path=str(Path(tmp) / "bench.index"), dim=args.dim)
+        await _load(store, args.n, args.dim, args.seed)
+        print(f"vectors={store.ntotal} dim={args.dim} queries={args.queries} k={args.k} "
+              f"index={type(store.index.index).__name__}")
+        queries = [f"benchmark query number {i} about topic {i % 97}" for i in range(args.queries)]
+        await vectorstore.get_embeddings(queries[:8], kind="query")  # 엔진 워밍업
+
+        for window in [0.0] + [float(w) for w in args.window_ms.split(",")]:
+            store._batcher = SearchBatcher(store.search_many, window_ms=window, max_batch=args.max_batch,
+                                           max_inflight=vectorstore.VECTOR_FAISS_THREADS) \
+                if window > 0 else None
+            for c in [int(c) for c in args.concurrency.split(",")]:
+                qps, p50, p95 = await _round(store, queries, c, args.k)
+                batch = store._batcher.metrics()["batch_size"]["avg"] if store._batcher else 1.0
+                print(f"window={window:4.1f}ms  concurrency={c:<4d} qps={qps:9.1f}  "
+                      f"p50={p50:8.2f}ms  p95={p95:8.2f}ms  avg_batch={batch:6.1f}")
+            if store._batcher:
+                await store._batcher.stop()
+        store._batcher = None
+        await store.close()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Benchmark batched vs unbatched concurrent vector search.")
+    ap.add_argument("--n", type=int, default=50000)
+    ap.add_argument("--dim", type=int, default=384)
+    ap.add_argument("--queries", type=int, default=512)
+    ap.add_argument("--k", type=int, default=5)
+    ap.add_argument("--concurrency", default="1,8,32")
+    ap.add_argument("--window-ms", default="2")
+    ap.add_argument("--max-batch", type=int, default=64)
+    ap.add_argument("--seed", type=int, default=7)
+    asyncio.run(_main(ap.parse_args()))
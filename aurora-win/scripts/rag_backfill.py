@@ -0,0 +1,77 @@
+"""
+Aurora RAG Backfill
+- notes 테이블 / data/files / data/mail / data/rag 를 읽어 벡터 인덱스에 일괄 인덱싱합니다.
+  (app/memory/ingest.py 파이프라인: 리더 → 청커 → 배치 임베더 → 인덱스 기록)
+- 내용 해시가 지난 실행과 같은 문서는 건너뜁니다 (--force 로 전체 재인덱싱)
+- --prune: 소스에서 사라진 문서를 인덱스에서 삭제
+
+Usage examples:
+  python scripts/rag_backfill.py
+  python scripts/rag_backfill.py --sources rag,files --batch 64 --workers 4
+  python scripts/rag_backfill.py --force --prune
+"""
+from __future__ import annotations
+import argparse, asyncio, sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.memory import ingest
+from app.memory.ingest import (INGEST_BATCH, INGEST_EMBED_WORKERS, INGEST_QUEUE, INGEST_STATE_DB, SOURCES,
+                               IngestPipeline, IngestState)
+
+
+def _progress(stats: dict):
+    print(f"  docs {stats['docs']} (skipped {stats['skipped']}) | chunks {stats['chunks']} | "
+          f"{stats['docs_per_s']} docs/s, {stats['chunks_per_s']} chunks/s | errors {stats['errors']}", flush=True)
+
+
+async def _main(args) -> int:
+    from app.memory.vectorstore import VectorStore
+
+    sources = [s.strip() for s in args.sources.split(",") if s.strip()]
+    unknown = [s for s in sources if s not in SOURCES]
+    if unknown:
+        print(f"Unknown sources: {', '.join(unknown)} (choose from {', '.join(SOURCES)})")
+        return 2
+    readers = {
+        "notes": lambda: ingest.read_notes(args.notes_db),
+        "files": lambda: ingest.read_files(Path(args.files_root)),
+        "mail": lambda: ingest.read_mail(Path(args.mail_root)),
+        "rag": lambda: ingest.read_rag(Path(args.rag_root)),
+    }
+
+    store = VectorStore(index_path=args.index)
+    state = IngestState(args.state_db)
+    pipeline = IngestPipeline(store, state, queue_size=args.queue, batch_size=args.batch,
+                              embed_workers=args.workers, force=args.force, progress=_progress)
+    print(f"Backfilling {', '.join(sources)} into {args.index} "
+          f"(batch={args.batch}, workers={args.workers}, queue={args.queue})")
+    try:
+        stats = await pipeline.run([(s, readers[s]()) for s in sources], prune=args.prune)
+    finally:
+        await store.close()
+        state.close()
+
+    print("\n=== Backfill summary ===")
+    for k, v in stats.items():
+        print(f"  {k:<13} {v}")
+    print(f"  index ntotal  {store.ntotal}")
+    return 1 if stats["errors"] else 0
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Bulk-index notes, files, mail and RAG docs into the vector store.")
+    ap.add_argument("--sources", default=",".join(SOURCES), help="쉼표로 구분 (notes,files,mail,rag)")
+    ap.add_argument("--force", action="store_true", help="내용이 같아도 다시 임베딩")
+    ap.add_argument("--prune", action="store_true", help="소스에서 사라진 문서를 인덱스에서 삭제")
+    ap.add_argument("--batch", type=int, default=INGEST_BATCH, help="임베딩 호출당 청크 수")
+    ap.add_argument("--workers", type=int, default=INGEST_EMBED_WORKERS, help="동시 임베딩 배치 수")
+    ap.add_argument("--queue", type=int, default=INGEST_QUEUE, help="청커 앞 문서 큐 크기")
+    ap.add_argument("--index", default="data/embeddings/aurora.index")
+    ap.add_argument("--state-db", default=INGEST_STATE_DB)
+    ap.add_argument("--notes-db", default=ingest.METRICS_DB_PATH)
+    ap.add_argument("--files-root", default=str(ingest.FILES_ROOT))
+    ap.add_argument("--mail-root", default=str(ingest.MAIL_ROOT))
+    ap.add_argument("--rag-root", default=str(ingest.RAG_DOC_ROOT))
+    sys.exit(asyncio.run(_main(ap.parse_args())))
@@ -0,0 +1,32 @@
+# tests/unit/conftest.py
+# 공용 픽스처: 벡터 저장소 테스트의 가짜 임베딩 / 저장소 생성
+# Usage: pytest (테스트 파일에서 pytestmark = pytest.mark.usefixtures("fake_embeddings"))
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.memory import vectorstore
+
+DIM = 8
+
+
+@pytest.fixture
+def fake_embeddings(monkeypatch):
+    """텍스트 "2.5" → [2.5] * DIM (임베딩 백엔드 없이), 스냅샷 타이머는 테스트 동안 사실상 끔"""
+    async def _embed(texts, task="embedding", strict=False, kind=None):
+        return np.array([[float(t)] * DIM for t in texts], dtype="float32")
+    monkeypatch.setattr(vectorstore, "get_embeddings", _embed)
+    monkeypatch.setattr(vectorstore, "VECTOR_SNAPSHOT_SECONDS", 3600)
+
+
+@pytest.fixture
+def make_store():
+    """make_store(path) → VectorStore(index_path=path, dim=DIM)"""
+    def _store(path):
+        return vectorstore.VectorStore(index_path=str(path), dim=DIM)
+    return _store
@@ -0,0 +1,60 @@
+# tests/unit/test_ann_index.py
+# ANN 인덱스: IVF/HNSW 빌드 / flat → ANN 백그라운드 승격 (순번 ID 유지) 테스트
+# Usage: pytest
+
+import sys
+import asyncio
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.memory import ann_index, vectorstore
+
+if ann_index.faiss is None:
+    pytest.skip("faiss not installed", allow_module_level=True)
+
+
+def _vectors(n, dim=32, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=(n, dim)).astype("float32")
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize("kind", ["ivf", "hnsw"])
+def test_build_index_finds_exact_neighbors(kind):
+    data = _vectors(2000)
+    index = ann_index.build_index(kind, data)
+    assert ann_index.index_kind(index) == kind and index.ntotal == 2000
+    _, found = index.search(data[:50], 1)
+    assert (found[:, 0] == np.arange(50)).mean() >= 0.9
+    assert np.allclose(ann_index.all_vectors(index)[:5], data[:5])
+
+
+def test_store_promotes_in_background_and_keeps_ids(monkeypatch, tmp_path):
+    data = _vectors(1200)
+
+    async def _fake_embeddings(texts, task="embedding", strict=False, kind=None):
+        return data[[int(t) for t in texts]]
+
+    monkeypatch.setattr(vectorstore, "get_embeddings", _fake_embeddings)
+    monkeypatch.setattr(vectorstore, "should_promote",
+                        lambda index: ann_index.should_promote(index, "ivf", 1000))
+
+    async def _run():
+        store = vectorstore.VectorStore(index_path=str(tmp_path / "aurora.index"), dim=32)
+        await store.add("a", [str(i) for i in range(1000)])
+        assert store._rebuild_task is not None
+        # 빌드 중 추가: 기존 flat 인덱스가 계속 받고, 교체 시 따라잡습니다.
+        await store.add("b", [str(i) for i in range(1000, 1200)])
+        await store._rebuild_task
+        return store
+
+    store = asyncio.run(_run())
+    assert ann_index.index_kind(store.index) == "ivf"
+    assert store.index.ntotal == 1200
+    _, found = store.index.search(data[[5, 1100]], 1)
+    assert store.doc_id_map[int(found[0][0])] == "a:5"
+    assert store.doc_id_map[int(found[1][0])] == "b:100"
@@ -0,0 +1,192 @@
+# tests/unit/test_audit_chains.py
+# 워커별 감사 체인: 슬롯 할당 / 앵커 / 다중 체인 검증 / 병합 조회 테스트
+# Usage: pytest
+
+import sys
+import asyncio
+import json
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.security import audit_chains, audit_segments
+from app.security.audit_writer import AuditWriter, AuditWriterConfig
+from app.security.hashlog import GENESIS_HASH, chain_entry, read_last_hash, serialize_entry
+
+
+def _cfg(tmp_path):
+    return AuditWriterConfig(fsync="never", merkle_block=0, rotate_bytes=0, chains="worker",
+                             anchor_seconds=0.02, archive_dir=str(tmp_path / "archive"))
+
+
+T0 = time.time()
+
+
+def _has_peer_anchor(path) -> bool:
+    try:
+        lines = Path(path).read_text("utf-8").splitlines()
+    except OSError:
+        return False
+    return any(json.loads(l).get("action") == audit_chains.ANCHOR_ACTION for l in lines if l.strip())
+
+
+def _run_workers(tmp_path, log, n_workers=2, n=60):
+    async def _run():
+        # 같은 프로세스에서도 잠금 파일 핸들이 다르면 서로 다른 슬롯을 잡습니다 (워커 프로세스 흉내)
+        writers = [AuditWriter(str(log), cfg=_cfg(tmp_path)) for _ in range(n_workers)]
+
+        async def _traffic(k, w):
+            for i in range(n):
+                await w.submit({"ts": T0 + i / 100 + k / 1000, "action": f"API:GET:/w{k}/{i}"})
+                await asyncio.sleep(0.001)
+
+        await asyncio.gather(*[_traffic(k, w) for k, w in enumerate(writers)])
+        await asyncio.sleep(0.05)  # 마지막 앵커
+        # 부하로 앵커 타이머가 밀려도 각 체인에 다른 체인 헤드를 담은 앵커가 하나는 기록될 때까지
+        deadline = time.time() + 2
+        while time.time() < deadline and not all(_has_peer_anchor(w.log_path) for w in writers):
+            await asyncio.sleep(0.01)
+        for w in writers:
+            await w.stop()
+        return writers
+    return asyncio.run(_run())
+
+
+def test_workers_write_separate_chains_with_anchors(tmp_path):
+    log = tmp_path / "audit.log"
+    writers = _run_workers(tmp_path, log)
+    paths = audit_chains.chain_paths(str(log))
+    assert [Path(p).name for p in paths] == ["audit-w0.log", "audit-w1.log"]
+    assert sorted(w.log_path for w in writers) == sorted(paths)
+
+    result = audit_chains.verify_chains(str(log))
+    assert result["ok"], result
+    assert result["anchors"]["anchors"] > 0
+    assert sum(r["entries"] for r in result["chains"].values()) >= 120
+
+    merged = [json.loads(r) for r in audit_chains.iter_range_chains(str(log), T0 + 0.095, T0 + 0.205, "API:GET")]
+    assert len(merged) == 22
+    assert [e["ts"] for e in merged] == sorted(e["ts"] for e in merged)
+
+
+def test_rewritten_chain_is_caught_by_peer_anchors(tmp_path):
+    log = tmp_path / "audit.log"
+    _run_workers(tmp_path, log)
+    # w1 체인을 통째로 다시 써서 (내부적으로는 일관된) 다른 체인을 만듭니다.
+    w1 = tmp_path / "audit-w1.log"
+    prev = GENESIS_HASH
+    lines = []
+    for raw in w1.read_text("utf-8").splitlines():
+        e = json.loads(raw)
+        data = {k: v for k, v in e.items() if k not in ("prev", "hash")}
+        data["action"] = data["action"].replace("/w1/", "/forged/")
+        data["forged"] = True  # 앵커 항목까지 모두 바뀌도록 (첫 항목이 앵커여도 해시가 같아지지 않음)
+        e = chain_entry(data, prev)
+        lines.append(serialize_entry(e))
+        prev = e["hash"]
+    w1.write_text("".join(lines), "utf-8")
+
+    result = audit_chains.verify_chains(str(log), full=True)
+    assert result["chains"]["audit-w1.log"]["ok"]  # 체인 자체는 유효
+    assert not result["anchors"]["ok"] and not result["ok"]
+    assert {m["peer"] for m in result["anchors"]["missing"]} == {"audit-w1.log"}
+
+
+def test_slot_is_reused_after_release(tmp_path):
+    log = tmp_path / "audit.log"
+    slot, fh = audit_chains.acquire_slot(str(log))
+    slot2, fh2 = audit_chains.acquire_slot(str(log))
+    assert (slot, slot2) == (0, 1)
+    audit_chains.release_slot(fh)
+    slot3, fh3 = audit_chains.acquire_slot(str(log))
+    assert slot3 == 0
+    audit_chains.release_slot(fh2)
+    audit_chains.release_slot(fh3)
+
+
+def test_incremental_verify_reads_only_new_anchors(tmp_path):
+    log = tmp_path / "audit.log"
+    _run_workers(tmp_path, log, n=30)
+    first = audit_chains.verify_chains(str(log))
+    assert first["ok"] and not first["anchors"]["incremental"]
+
+    _run_workers(tmp_path, log, n=30)  # 같은 슬롯으로 재시작해 이어서 기록
+    second = audit_chains.verify_chains(str(log))
+    assert second["ok"], second
+    assert second["anchors"]["incremental"]
+    assert 0 < second["anchors"]["checked"] < second["anchors"]["anchors"]
+    assert all(r["resumed"] for r in second["chains"].values())
+
+    # 다시 쓴 체인은 체크포인트에서 재개되지 않으므로 앵커도 전체 검증으로 돌아가 탐지됩니다.
+    w1 = tmp_path / "audit-w1.log"
+    prev, lines = GENESIS_HASH, []
+    for raw in w1.read_text("utf-8").splitlines():
+        data = {k: v for k, v in json.loads(raw).items() if k not in ("prev", "hash")}
+        e = chain_entry(dict(data, action=data["action"].replace("/w1/", "/forged/")), prev)
+        lines.append(serialize_entry(e))
+        prev = e["hash"]
+    w1.write_text("".join(lines), "utf-8")
+    third = audit_chains.verify_chains(str(log))
+    assert not third["anchors"]["incremental"] and not third["ok"]
+
+
+def test_custom_archive_dir_is_used_for_anchors(tmp_path):
+    log = tmp_path / "logs" / "audit.log"
+    log.parent.mkdir()
+    archive = tmp_path / "elsewhere"
+
+    async def _run():
+        cfg = dict(fsync="never", merkle_block=0, rotate_bytes=2048, chains="worker",
+                   anchor_seconds=0.02, archive_dir=str(archive))
+        writers = [AuditWriter(str(log), cfg=AuditWriterConfig(**cfg)) for _ in range(2)]
+
+        async def _traffic(k, w):
+            for i in range(60):
+                await w.submit({"ts": T0 + i / 100 + k / 1000, "action": f"API:GET:/w{k}/{i}"})
+                await asyncio.sleep(0.001)
+
+        await asyncio.gather(*[_traffic(k, w) for k, w in enumerate(writers)])
+        await asyncio.sleep(0.05)
+        for w in writers:
+            await w.stop()
+    asyncio.run(_run())
+
+    assert list(archive.glob("*.manifest.jsonl"))
+    result = audit_chains.verify_chains(str(log), archive_dir=str(archive))
+    assert result["ok"], result
+    assert result["anchors"]["anchors"] > 0
+
+
+def test_rotated_base_log_in_custom_archive_dir_is_kept(tmp_path):
+    log = tmp_path / "logs" / "audit.log"
+    log.parent.mkdir()
+    archive = tmp_path / "elsewhere"
+    cfg = dict(fsync="never", merkle_block=0, rotate_bytes=0, anchor_seconds=0.02, archive_dir=str(archive))
+
+    async def _single():
+        w = AuditWriter(str(log), cfg=AuditWriterConfig(chains="single", **cfg))
+        for i in range(20):
+            await w.submit({"ts": T0 - 1 + i / 100, "action": f"API:GET:/base/{i}"})
+        await w.stop()
+    asyncio.run(_single())
+    # 워커 체인으로 바꾸기 전에 기본 로그를 모두 아카이브로 회전 (활성 파일 없음)
+    audit_segments.rotate_segment(str(log), read_last_hash(str(log)), None, str(archive))
+    assert not log.exists()
+
+    async def _workers():
+        writers = [AuditWriter(str(log), cfg=AuditWriterConfig(chains="worker", **cfg)) for _ in range(2)]
+        for k, w in enumerate(writers):
+            for i in range(10):
+                await w.submit({"ts": T0 + i / 100 + k / 1000, "action": f"API:GET:/w{k}/{i}"})
+        await asyncio.sleep(0.05)
+        for w in writers:
+            await w.stop()
+        return writers
+    writers = asyncio.run(_workers())
+
+    merged = [json.loads(r) for r in audit_chains.iter_range_chains(str(log), action="API:GET",
+                                                                   archive_dir=str(archive))]
+    assert len(merged) == 40 and merged[0]["action"] == "API:GET:/base/0"
+    anchor = audit_chains.make_anchor(str(log), writers[0].log_path, str(archive))
+    assert "audit.log" in anchor["payload"]["peers"]
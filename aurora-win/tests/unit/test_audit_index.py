@@ -0,0 +1,97 @@
+# tests/unit/test_audit_index.py
+# 감사 로그 시간 인덱스: 버킷 → 오프셋 사이드카 / 범위 조회 / GET /dash/audit 스트리밍 테스트
+# Usage: pytest
+
+import sys
+import asyncio
+import json
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.security import audit_index
+from app.security.audit_writer import AuditWriter, AuditWriterConfig
+
+
+def _cfg(tmp_path, **kw):
+    base = dict(fsync="never", merkle_block=0, rotate_bytes=6000, index_bucket=10,
+                archive_dir=str(tmp_path / "archive"))
+    base.update(kw)
+    return AuditWriterConfig(**base)
+
+
+def _write(log, cfg, n):
+    async def _run():
+        writer = AuditWriter(str(log), cfg=cfg)
+        for i in range(n):
+            # 요청 시작 시각 기준이므로 ts가 약간 뒤섞여 기록되는 상황을 흉내냅니다.
+            ts = 1000.0 + i - (3 if i % 7 == 0 else 0)
+            action = "API:POST:/aurora/plan" if i % 3 == 0 else "API:GET:/dash/kpi"
+            await writer.submit({"ts": ts, "action": action})
+            if i % 20 == 0:
+                await asyncio.sleep(0.005)
+        await writer.stop()
+        return writer
+    return asyncio.run(_run())
+
+
+def _brute(tmp_path, log, t_from, t_to, action=None):
+    # 범위 없이 조회하면 인덱스를 쓰지 않고 처음부터 읽습니다.
+    everything = audit_index.iter_range(str(log), archive_dir=str(tmp_path / "archive"), bucket_seconds=10)
+    return [
+        raw for raw in everything
+        if t_from <= json.loads(raw)["ts"] <= t_to
+        and (action is None or json.loads(raw)["action"].startswith(action))
+    ]
+
+
+def test_index_range_matches_full_scan_across_segments(tmp_path):
+    log = tmp_path / "audit.log"
+    writer = _write(log, _cfg(tmp_path), 300)
+    assert writer.rotations >= 2
+
+    index = audit_index.load_index(str(log))
+    assert index and all(a[0] < b[0] and a[1] < b[1] for a, b in zip(index, index[1:]))
+
+    for t_from, t_to, action in [(1100, 1105, None), (1000, 1299, "API:POST"), (1150.5, 1190, "API:GET")]:
+        got = list(audit_index.iter_range(str(log), t_from, t_to, action,
+                                          archive_dir=str(tmp_path / "archive"), bucket_seconds=10))
+        assert got == _brute(tmp_path, log, t_from, t_to, action)
+        assert got
+
+
+def test_seek_skips_earlier_bytes_and_recovers_index(tmp_path):
+    log = tmp_path / "audit.log"
+    _write(log, _cfg(tmp_path, rotate_bytes=0), 120)
+    index = audit_index.load_index(str(log))
+    assert audit_index.seek_offset(index, 1100.0, 10) > 0
+
+    # 인덱스가 잘려도 recover()가 로그 꼬리에서 다시 만듭니다.
+    Path(audit_index.index_path(str(log))).write_text(
+        "\n".join(json.dumps({"b": b, "o": o}) for b, o in index[:3]) + '\n{"b": 1', "utf-8")
+    indexer = audit_index.TimeIndexer(str(log), bucket_seconds=10)
+    indexer.recover()
+    assert audit_index.load_index(str(log)) == index
+
+
+def test_dash_audit_endpoint_streams_ndjson(tmp_path):
+    import httpx
+    from fastapi import FastAPI
+    from app.aurora_dashboard_api_stub import dash_router
+
+    log = tmp_path / "audit.log"
+    writer = _write(log, _cfg(tmp_path), 300)
+    app = FastAPI()
+    app.include_router(dash_router, prefix="/dash")
+    app.state.audit_writer = writer
+
+    async def _get():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+            return await client.get("/dash/audit", params={"from": 1200, "to": 1210, "action": "API:POST"})
+
+    r = asyncio.run(_get())
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(l) for l in r.text.splitlines()]
+    assert rows and all(1200 <= e["ts"] <= 1210 and e["action"].startswith("API:POST") for e in rows)
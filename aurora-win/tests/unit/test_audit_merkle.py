@@ -0,0 +1,87 @@
+# tests/unit/test_audit_merkle.py
+# 감사 로그 Merkle 체크포인트: 블록 루트, 포함 증명, 서명, 복구 테스트
+# Usage: pytest
+
+import sys
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.security import audit_merkle as am
+from app.security.audit_writer import AuditWriter, AuditWriterConfig
+
+
+def _write(log, n, offset=0, block=8):
+    async def _run():
+        writer = AuditWriter(str(log), cfg=AuditWriterConfig(merkle_block=block, fsync="never"))
+        for i in range(n):
+            await writer.submit({"ts": float(offset + i), "action": f"API:GET:/m/{offset + i}"})
+        await writer.stop()
+    asyncio.run(_run())
+
+
+def test_proof_roundtrip_for_every_leaf_count():
+    for n in range(1, 12):
+        leaves = [am.leaf_hash(f"line-{i}".encode()) for i in range(n)]
+        root = am.merkle_root(leaves).hex()
+        for i in range(n):
+            assert am.verify_proof(leaves[i], am.merkle_proof(leaves, i), root)
+        assert not am.verify_proof(am.leaf_hash(b"other"), am.merkle_proof(leaves, 0), root)
+
+
+def test_writer_checkpoints_blocks_and_resumes_partial_block(tmp_path):
+    log = tmp_path / "audit.log"
+    _write(log, 13)          # 블록 1개 + 미완성 5개
+    assert len(am.load_checkpoints(str(log))) == 1
+    _write(log, 5, offset=13)  # 재시작 후 미완성 블록을 이어서 채움
+    cps = am.load_checkpoints(str(log))
+    assert [c["seq_start"] for c in cps] == [0, 8]
+    assert cps[1]["prev_root"] == cps[0]["root"]
+    report = am.verify_blocks(str(log))
+    assert report["ok"] and report["blocks"] == 2
+
+    proof = am.prove_entry(str(log), 10)
+    assert json.loads(proof["line"])["action"] == "API:GET:/m/10"
+    proof = json.loads(json.dumps(proof))
+    assert am.verify_entry_proof(proof, log_path=str(log))
+    assert not am.verify_entry_proof(proof, verify_key_hex=None)  # 서명도 사이드카도 없으면 신뢰하지 않음
+
+    # 기록된 적 없는 라인으로 자체 일관된 (서명 없는) 증명을 만들어도 통과하지 않음
+    fake_line = json.dumps({"ts": 10.0, "action": "API:GET:/forged"})
+    fake_leaf = am.leaf_hash(fake_line.encode("utf-8"))
+    forged = {"seq": 10, "line": fake_line, "proof": [],
+              "checkpoint": dict(proof["checkpoint"], root=fake_leaf.hex(), sig=None)}
+    assert not am.verify_entry_proof(forged, log_path=str(log))
+
+
+def test_tampering_is_localized_to_one_block(tmp_path):
+    log = tmp_path / "audit.log"
+    _write(log, 24)
+    data = log.read_bytes().replace(b"/m/12", b"/m/99")
+    log.write_bytes(data)
+    report = am.verify_blocks(str(log), workers=2)
+    assert [r["block"] for r in report["failed"]] == [1]
+    assert len(am.blocks_in_range(am.load_checkpoints(str(log)), 0.0, 7.0)) == 1
+
+
+def test_signed_checkpoints(tmp_path):
+    if am.SigningKey is None:
+        pytest.skip("pynacl not installed")
+    key = am.SigningKey.generate()
+    key_file = tmp_path / "audit.key"
+    key_file.write_text(key.encode().hex())
+    vk = key.verify_key.encode().hex()
+
+    log = tmp_path / "audit.log"
+    log.write_bytes("".join(json.dumps({"ts": i, "n": i}) + "\n" for i in range(4)).encode())
+    cp = am.MerkleCheckpointer(str(log), block_size=2, signer=am.CheckpointSigner(str(key_file)))
+    cp.recover()
+    cps = am.load_checkpoints(str(log))
+    assert all(am.verify_signature(c, vk) for c in cps)
+
+    forged = dict(cps[0], root="00" * 32)
+    assert am.verify_signature(forged, vk) is False
@@ -0,0 +1,93 @@
+# tests/unit/test_audit_segments.py
+# 감사 로그 세그먼트 회전: 체인 연속성 / gzip 압축 / 재시작 후 이어쓰기 테스트
+# Usage: pytest
+
+import sys
+import asyncio
+import gzip
+import json
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.security import audit_segments
+from app.security.audit_verify import verify_log
+from app.security.audit_writer import AuditWriter, AuditWriterConfig
+from app.security.hashlog import GENESIS_HASH, compute_hash
+
+
+def _cfg(tmp_path, **kw):
+    base = dict(fsync="never", merkle_block=0, rotate_bytes=4096, archive_dir=str(tmp_path / "archive"))
+    base.update(kw)
+    return AuditWriterConfig(**base)
+
+
+def _write(log, cfg, n, offset=0):
+    async def _run():
+        writer = AuditWriter(str(log), cfg=cfg)
+        for i in range(n):
+            await writer.submit({"ts": float(offset + i), "action": f"API:GET:/s/{offset + i}", "pad": "x" * 100})
+            if i % 10 == 0:
+                await asyncio.sleep(0.005)  # 여러 배치로 나누어 회전 기회를 만듦
+        await writer.stop()
+        return writer
+    return asyncio.run(_run())
+
+
+def _all_entries(log, archive):
+    entries = []
+    for rec in audit_segments.load_manifest(str(log), str(archive)):
+        path = audit_segments.segment_file(str(archive), rec["segment"])
+        with audit_segments.open_segment(path) as f:
+            entries += [json.loads(l) for l in f if l.strip()]
+    entries += [json.loads(l) for l in Path(log).read_text("utf-8").splitlines() if l.strip()]
+    return entries
+
+
+def test_rotation_carries_head_and_compresses_segments(tmp_path):
+    log = tmp_path / "audit.log"
+    cfg = _cfg(tmp_path)
+    writer = _write(log, cfg, 200)
+    archive = tmp_path / "archive"
+
+    manifest = audit_segments.load_manifest(str(log), str(archive))
+    assert writer.rotations == len(manifest) >= 3
+    assert list(archive.glob("*.log")) == []  # 모두 gzip으로 봉인됨
+    assert len(list(archive.glob("*.log.gz"))) == len(manifest)
+
+    entries = _all_entries(log, archive)
+    assert [e["ts"] for e in entries] == [float(i) for i in range(200)]
+    prev = GENESIS_HASH
+    for e in entries:  # 아카이브 + 활성 로그 전체가 하나의 체인
+        assert e["prev"] == prev and e["hash"] == compute_hash(e)
+        prev = e["hash"]
+    assert audit_segments.check_manifest_links(str(log), str(archive)) == []
+
+
+def test_restart_after_rotation_continues_chain(tmp_path):
+    log = tmp_path / "audit.log"
+    cfg = _cfg(tmp_path, rotate_bytes=1)  # 매 배치 후 회전 → 활성 로그는 비어 있음
+    _write(log, cfg, 3)
+    assert log.read_bytes() == b""
+    _write(log, _cfg(tmp_path, rotate_bytes=0), 2, offset=3)
+
+    archive = tmp_path / "archive"
+    assert audit_segments.check_manifest_links(str(log), str(archive)) == []
+    result = verify_log(str(log), workers=1, save=False)  # 활성 로그는 직전 세그먼트 head에서 시작
+    assert result["ok"] and result["entries"] == 2
+
+
+def test_compaction_seals_leftover_segments(tmp_path):
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent / "scripts"))
+    from audit_compact_weekly import compact_log
+
+    log = tmp_path / "audit.log"
+    archive = tmp_path / "archive"
+    _write(log, _cfg(tmp_path, rotate_bytes=0), 5)
+    # 비정상 종료로 압축 전 세그먼트가 남은 상황
+    raw = audit_segments.rotate_segment(str(log), "x" * 64, archive_dir=str(archive))
+    assert raw.endswith(".log")
+    assert compact_log(str(log), str(archive))
+    assert audit_segments.pending_segments(str(log), str(archive)) == []
+    with gzip.open(raw + ".gz", "rt", encoding="utf-8") as f:
+        assert len([l for l in f if l.strip()]) == 5
@@ -0,0 +1,84 @@
+# tests/unit/test_audit_verify.py
+# 감사 로그 검증기: 증분(체크포인트) / 병렬 세그먼트 / 비동기 작업 API 테스트
+# Usage: pytest
+
+import sys
+import asyncio
+import json
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.security.audit_verify import AuditVerifyJobs, verify_log
+from app.security.hashlog import GENESIS_HASH, chain_entry, serialize_entry
+
+
+def _append(log, n, start=0, prev=None):
+    prev = prev or GENESIS_HASH
+    with open(log, "a", encoding="utf-8") as f:
+        for i in range(start, start + n):
+            e = chain_entry({"ts": float(i), "action": f"API:GET:/v/{i}"}, prev)
+            f.write(serialize_entry(e))
+            prev = e["hash"]
+    return prev
+
+
+def test_incremental_run_checks_only_new_entries(tmp_path):
+    log = tmp_path / "audit.log"
+    head = _append(log, 50)
+    r1 = verify_log(str(log), workers=1)
+    assert r1["ok"] and r1["checked"] == 50 and not r1["resumed"]
+
+    _append(log, 10, start=50, prev=head)
+    with open(log, "a", encoding="utf-8") as f:
+        f.write('{"ts": 60, "act')  # 기록 중인 마지막 줄은 다음 실행으로 넘어감
+    r2 = verify_log(str(log), workers=1)
+    assert r2["ok"] and r2["resumed"]
+    assert r2["checked"] == 10 and r2["entries"] == 60
+    assert r2["pending_bytes"] == len('{"ts": 60, "act')
+
+
+def test_parallel_segments_match_sequential_and_find_issues(tmp_path):
+    log = tmp_path / "audit.log"
+    head = _append(log, 200)
+    _append(log, 100, start=200)  # 201번째 줄에서 체인 분기 (prev=GENESIS)
+    data = log.read_bytes().replace(b"/v/42\"", b"/v/4X\"")
+    log.write_bytes(data)
+
+    seq = verify_log(str(log), full=True, workers=1, save=False)
+    par = verify_log(str(log), full=True, workers=3, segment_bytes=2048, save=False)
+    assert par["segments"] > 3
+    assert seq["issues"] == par["issues"]
+    assert par["issues"] == [{"line": 43, "kind": "tampered"}, {"line": 201, "kind": "broken"}]
+    assert not par["ok"]
+
+
+def test_rewritten_log_invalidates_checkpoint(tmp_path):
+    log = tmp_path / "audit.log"
+    _append(log, 20)
+    verify_log(str(log), workers=1)
+    log.unlink()
+    _append(log, 30, start=100)  # 다른 내용으로 교체
+    r = verify_log(str(log), workers=1)
+    assert not r["resumed"] and r["ok"] and r["entries"] == 30
+
+
+def test_verify_job_reports_progress(tmp_path):
+    log = tmp_path / "audit.log"
+    _append(log, 30)
+
+    async def _run():
+        jobs = AuditVerifyJobs()
+        job = jobs.start(str(log), workers=1)
+        # 실행 중인 같은 로그의 작업은 재사용
+        assert jobs.start(str(log))["id"] == job["id"]
+        done = await jobs.wait(job["id"])
+        missing = jobs.start(str(tmp_path / "nope.log"))
+        await jobs.wait(missing["id"])
+        return done, missing
+
+    done, missing = asyncio.run(_run())
+    assert done["status"] == "done" and done["progress"] == 1.0
+    assert done["result"]["ok"] and done["result"]["chains"]["audit.log"]["entries"] == 30
+    assert json.dumps(done)  # API 응답으로 직렬화 가능
+    assert missing["status"] == "failed"
@@ -0,0 +1,120 @@
+# tests/unit/test_audit_writer.py
+# AuditWriter: 단일 기록 태스크 + 메모리 체인 헤드 테스트
+# Usage: pytest
+
+import sys
+import asyncio
+import json
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.security.audit_writer import AuditWriter, AuditWriterConfig
+from app.security.hashlog import GENESIS_HASH, compute_hash
+
+
+def _read(path):
+    return [json.loads(l) for l in Path(path).read_text("utf-8").splitlines() if l.strip()]
+
+
+def _assert_linear(entries, first_prev=GENESIS_HASH):
+    prev = first_prev
+    for e in entries:
+        assert e["prev"] == prev
+        assert e["hash"] == compute_hash(e)
+        prev = e["hash"]
+
+
+def test_concurrent_submits_keep_chain_linear(tmp_path):
+    log = tmp_path / "audit.log"
+
+    async def _run():
+        writer = AuditWriter(str(log))
+
+        async def _request(i):
+            await asyncio.sleep(0)
+            await writer.submit({"ts": float(i), "action": f"API:GET:/r/{i}"})
+
+        await asyncio.gather(*[_request(i) for i in range(200)])
+        await writer.stop()
+        return writer
+
+    writer = asyncio.run(_run())
+    entries = _read(log)
+    assert len(entries) == 200
+    _assert_linear(entries)
+    assert writer.head_hash == entries[-1]["hash"]
+
+
+def test_new_writer_resumes_from_file_head(tmp_path):
+    log = tmp_path / "audit.log"
+
+    async def _write(n, offset):
+        writer = AuditWriter(str(log))
+        for i in range(n):
+            await writer.submit({"ts": float(offset + i), "action": "API:GET:/x"})
+        await writer.stop()
+
+    asyncio.run(_write(3, 0))
+    # 비정상 종료로 잘린 마지막 줄을 흉내냅니다.
+    with open(log, "a", encoding="utf-8") as f:
+        f.write('{"ts": 99, "act')
+    asyncio.run(_write(2, 3))
+
+    lines = Path(log).read_text("utf-8").splitlines()
+    assert lines[3] == '{"ts": 99, "act'
+    entries = [json.loads(l) for i, l in enumerate(lines) if i != 3]
+    _assert_linear(entries)
+
+
+def test_group_commit_batches_and_fsync_policy(tmp_path):
+    log = tmp_path / "audit.log"
+    cfg = AuditWriterConfig(group_commit_ms=20, max_batch=64, fsync="batch")
+
+    async def _run():
+        writer = AuditWriter(str(log), cfg=cfg)
+        await asyncio.gather(*[writer.submit({"ts": float(i), "action": "API:GET:/g"}) for i in range(100)])
+        await writer.stop()
+        return writer
+
+    writer = asyncio.run(_run())
+    _assert_linear(_read(log))
+    m = writer.metrics()
+    assert m["written"] == 100
+    # 100개가 max_batch(64) 단위로 묶여 2번의 write로 기록됨
+    assert m["batch_size"]["count"] == 2
+    assert m["batch_size"]["max"] == 64
+    assert m["fsync_ms"]["count"] == 2
+
+
+def test_asgi_middleware_records_status_at_response_start(tmp_path):
+    from app.security.audit_middleware import AuditMiddleware
+
+    log = tmp_path / "audit.log"
+    body_chunks = [b"data: 1\n\n", b"data: 2\n\n"]
+
+    async def _app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 201, "headers": []})
+        for i, chunk in enumerate(body_chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": i < len(body_chunks) - 1})
+
+    async def _run():
+        mw = AuditMiddleware(_app, log_path=str(log))
+        sent = []
+
+        async def _send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "method": "GET", "path": "/events/stream",
+                 "query_string": b"replay=false&q=%ed%9a%8c%EC%9D%98&x=%41", "client": ("127.0.0.1", 5000)}
+        await mw(scope, None, _send)
+        await mw.writer.stop()
+        return sent
+
+    sent = asyncio.run(_run())
+    # 본문 메시지는 변경 없이 그대로 전달
+    assert [m.get("body") for m in sent[1:]] == body_chunks
+    (entry,) = _read(log)
+    assert entry["action"] == "API:GET:/events/stream"
+    assert entry["status_code"] == 201
+    assert entry["payload"] == {"query_params": "replay=false&q=%ED%9A%8C%EC%9D%98&x=A"}  # str(request.query_params)와 같은 형식
@@ -0,0 +1,46 @@
+# tests/unit/test_chunker.py
+# 토큰 기준 겹침 청크: 토큰 한도 / 겹침 / 원문 오프셋 / 문장 경계 테스트
+# Usage: pytest
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.memory import chunker
+from app.memory.chunker import chunk_text
+
+
+def _text(n):
+    return " ".join(f"w{i}" for i in range(n))
+
+
+def test_short_text_is_single_chunk():
+    chunks = chunk_text("  짧은 노트 본문입니다.  ", max_tokens=64)
+    assert len(chunks) == 1
+    assert chunks[0].text == "짧은 노트 본문입니다."
+    assert chunk_text("   ") == []
+
+
+def test_chunks_respect_limit_and_overlap():
+    text = _text(100)
+    chunks = chunk_text(text, max_tokens=32, overlap=8)
+    assert len(chunks) > 3
+    assert all(c.tokens <= 32 for c in chunks)
+    assert [c.idx for c in chunks] == list(range(len(chunks)))
+    for c in chunks:
+        assert text[c.start:c.end].strip() == c.text
+    for a, b in zip(chunks, chunks[1:]):
+        # 다음 청크는 이전 청크의 마지막 8개 토큰에서 시작
+        assert b.text.split()[:8] == a.text.split()[-8:]
+    assert chunks[-1].text.endswith("w99")
+
+
+def test_chunks_snap_to_sentence_boundary():
+    sentence = "이 문장은 정확히 열 개의 토큰 으로 이루어져 있다."
+    text = " ".join([sentence] * 6)
+    spans = chunker.token_spans(text)
+    assert len(spans) == 60
+    chunks = chunk_text(text, max_tokens=25, overlap=0)
+    assert all(c.text.endswith(".") for c in chunks)
+    assert chunks[0].tokens == 20
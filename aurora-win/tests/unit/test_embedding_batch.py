@@ -0,0 +1,65 @@
+# tests/unit/test_embedding_batch.py
+# 배치 임베딩: model_runner.embed_batch 배치 분할/동시성, VectorStore.add 배치 사용 테스트
+# Usage: pytest
+
+import sys
+import asyncio
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.router import model_runner
+from app.memory import vectorstore
+
+
+class _FakeBackend:
+    def __init__(self, fail_at=None):
+        self.batches = []
+        self.active = 0
+        self.max_active = 0
+        self.fail_at = fail_at
+
+    async def __call__(self, model_uri, texts, client=None, kind=None):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(0.01)
+            self.batches.append(list(texts))
+            if self.fail_at is not None and texts[0] == self.fail_at:
+                raise RuntimeError("server down")
+            return [[float(t.split("-")[1])] * model_runner.EMBED_DIM for t in texts]
+        finally:
+            self.active -= 1
+
+
+def test_embed_batch_splits_and_limits_concurrency(monkeypatch):
+    fake = _FakeBackend(fail_at="t-64")
+    monkeypatch.setattr(model_runner, "_embed_backend", fake)
+    texts = [f"t-{i}" for i in range(150)]
+
+    result = asyncio.run(model_runner.embed_batch(texts, batch_size=32, concurrency=2))
+    assert sorted(len(b) for b in fake.batches) == [22, 32, 32, 32, 32]
+    assert fake.max_active == 2
+    # 실패한 배치만 None, 나머지는 입력 순서대로
+    assert result["vectors"][64:96] == [None] * 32
+    assert [v[0] for v in result["vectors"][:64]] == [float(i) for i in range(64)]
+    assert len(result["errors"]) == 1
+
+
+def test_vectorstore_add_uses_one_batch_call(monkeypatch, tmp_path):
+    if vectorstore.faiss is None:
+        import pytest
+        pytest.skip("faiss not installed")
+    fake = _FakeBackend()
+    monkeypatch.setattr(model_runner, "_embed_backend", fake)
+    monkeypatch.setattr(vectorstore, "get_embedding_cache", lambda: None)
+    store = vectorstore.VectorStore(index_path=str(tmp_path / "aurora.index"))
+
+    asyncio.run(store.add("note:1", [f"c-{i}" for i in range(10)]))
+    assert len(fake.batches) == 1 and len(fake.batches[0]) == 10
+    assert store.index.ntotal == 10
+    assert store.doc_id_map[9] == "note:1:9"
+    got = store.index.reconstruct(3)
+    assert np.allclose(got, 3.0)
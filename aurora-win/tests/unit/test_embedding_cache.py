@@ -0,0 +1,61 @@
+# tests/unit/test_embedding_cache.py
+# 임베딩 캐시: (모델, 정규화 텍스트 해시) 키 / LRU + SQLite 계층 / get_embeddings 연동 테스트
+# Usage: pytest
+
+import sys
+import asyncio
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.memory import vectorstore
+from app.memory.embedding_cache import EmbeddingCache, cache_key
+from app.router import model_runner
+
+
+def test_key_normalizes_whitespace_and_separates_models():
+    assert cache_key("m", "hello   world\n") == cache_key("m", " hello world")
+    assert cache_key("m", "hello") != cache_key("other", "hello")
+
+
+def test_lru_and_disk_tiers(tmp_path):
+    db = str(tmp_path / "cache.db")
+    cache = EmbeddingCache(db, lru_size=2)
+    vecs = [np.full(4, i, dtype="float32") for i in range(3)]
+    cache.put_many("m", ["a", "b", "c"], vecs)
+    assert cache.metrics()["lru_entries"] == 2  # "a"는 메모리에서 밀려남
+
+    got = cache.get_many("m", ["a", "c", "zzz"])
+    assert np.array_equal(got[0], vecs[0]) and np.array_equal(got[1], vecs[2]) and got[2] is None
+    m = cache.metrics()
+    assert (m["hits_disk"], m["hits_mem"], m["misses"]) == (1, 1, 1)
+    cache.close()
+
+    # 재시작 후에도 디스크 계층에서 조회
+    cache2 = EmbeddingCache(db)
+    assert np.array_equal(cache2.get_many("m", ["b"])[0], vecs[1])
+    cache2.close()
+
+
+def test_get_embeddings_embeds_only_unique_misses(monkeypatch, tmp_path):
+    calls = []
+
+    async def _backend(model_uri, texts, client=None, kind=None):
+        calls.append(list(texts))
+        return [[float(len(t))] * model_runner.EMBED_DIM for t in texts]
+
+    cache = EmbeddingCache(str(tmp_path / "cache.db"))
+    monkeypatch.setattr(model_runner, "_embed_backend", _backend)
+    monkeypatch.setattr(vectorstore, "get_embedding_cache", lambda: cache)
+
+    texts = ["same body", "same  body", "other", "x"]
+    first = asyncio.run(vectorstore.get_embeddings(texts))
+    assert calls == [["same body", "other", "x"]]
+    assert np.array_equal(first[0], first[1])
+
+    second = asyncio.run(vectorstore.get_embeddings(["other", "new text"]))
+    assert calls[1] == ["new text"]
+    assert np.allclose(second[0], 5.0)
+    assert cache.metrics()["hit_rate"] > 0
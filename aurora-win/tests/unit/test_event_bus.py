@@ -0,0 +1,66 @@
+# tests/unit/test_event_bus.py
+# 이벤트 버스 선택(auto/redis/inproc)과 in-proc 팬아웃 동작 테스트
+# Usage: pytest
+
+import sys
+import asyncio
+from pathlib import Path
+
+# 프로젝트 루트를 sys.path에 추가 (app 임포트를 위해)
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app import event_bus_select
+from app.event_bus import BaseEventBus, InProcEventBus, EventBus
+
+
+class _FakeRedisBus(BaseEventBus):
+    name = "redis"
+
+    def __init__(self, healthy: bool):
+        self.healthy = healthy
+
+    async def ping(self, timeout: float = 0.5) -> bool:
+        return self.healthy
+
+
+def test_inproc_mode_returns_singleton():
+    bus = asyncio.run(event_bus_select.select_event_bus("inproc"))
+    assert bus is EventBus
+
+
+def test_auto_mode_falls_back_when_probe_fails(monkeypatch):
+    monkeypatch.setattr(event_bus_select, "_make_redis_bus", lambda url, ch: _FakeRedisBus(False))
+    bus = asyncio.run(event_bus_select.select_event_bus("auto"))
+    assert bus is EventBus
+
+
+def test_auto_mode_uses_redis_when_probe_ok(monkeypatch):
+    fake = _FakeRedisBus(True)
+    monkeypatch.setattr(event_bus_select, "_make_redis_bus", lambda url, ch: fake)
+    bus = asyncio.run(event_bus_select.select_event_bus("auto"))
+    assert bus is fake
+
+
+def test_auto_mode_falls_back_without_redis_package(monkeypatch):
+    def _missing(url, ch):
+        raise ImportError("'redis' package is required for RedisEventBus.")
+    monkeypatch.setattr(event_bus_select, "_make_redis_bus", _missing)
+    bus = asyncio.run(event_bus_select.select_event_bus("auto"))
+    assert bus is EventBus
+
+
+def test_inproc_bus_fans_out_to_all_subscribers():
+    async def _run():
+        bus = InProcEventBus()
+        subs = [bus.subscribe() for _ in range(3)]
+        # 구독 등록을 위해 각 제너레이터를 한 번 진행시킵니다.
+        pending = [asyncio.ensure_future(s.__anext__()) for s in subs]
+        await asyncio.sleep(0)
+        await bus.publish_batch([{"type": "tool", "tool": "nlp"}])
+        got = await asyncio.gather(*pending)
+        for s in subs:
+            await s.aclose()
+        return got
+
+    got = asyncio.run(_run())
+    assert [g["tool"] for g in got] == ["nlp", "nlp", "nlp"]
@@ -0,0 +1,37 @@
+# tests/unit/test_event_codec.py
+# 버스 페이로드 코덱: 한 번 인코딩 후 SSE 프레임 패스스루 테스트
+# Usage: pytest
+
+import sys
+import json
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.event_codec import EncodedEvent, EventCodec, event_frame, get_codec
+
+EVENT = {"ts": 1762819454.85, "type": "tool", "tool": "nlp", "intent": "요약", "outcome": "success", "latency_ms": 12}
+
+
+def test_json_wire_bytes_pass_through_unchanged():
+    codec = EventCodec()
+    raw = codec.encode(EVENT)
+    ev = EncodedEvent(raw, codec)
+    assert event_frame(ev) == b"data: " + raw + b"\n\n"
+    # 패스스루 경로에서는 디코드가 일어나지 않아야 함
+    assert ev._event is None
+
+
+def test_dict_and_encoded_frames_are_equivalent():
+    codec = EventCodec()
+    from_dict = event_frame(EVENT)
+    from_wire = event_frame(EncodedEvent(codec.encode(EVENT), codec))
+    assert json.loads(from_dict[len(b"data: "):]) == json.loads(from_wire[len(b"data: "):]) == EVENT
+
+
+def test_unknown_or_missing_codec_falls_back_to_json():
+    assert get_codec("nope").name == "json"
+    codec = get_codec("msgpack")
+    # msgpack 미설치 환경에서도 JSON으로 동작해야 함
+    assert codec.decode(codec.encode(EVENT)) == EVENT
+    assert json.loads(EncodedEvent(codec.encode(EVENT), codec).json_bytes()) == EVENT
@@ -0,0 +1,60 @@
+# tests/unit/test_event_collector_bus.py
+# EventCollectorWithBus: 플러셔(SQLite 커밋)와 퍼블리셔 태스크 분리 테스트
+# Usage: pytest
+
+import sys
+import asyncio
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.event_bus import InProcEventBus
+from app.event_collector_bus_patch import EventCollectorWithBus
+
+
+@pytest.fixture
+def metrics_db(tmp_path):
+    db_path = tmp_path / "metrics.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript((ROOT / "schema.sql").read_text("utf-8"))
+    conn.close()
+    return db_path
+
+
+async def _collect(collector, bus, n):
+    sub = bus.subscribe()
+    first = asyncio.ensure_future(sub.__anext__())
+    await asyncio.sleep(0)
+    await collector.start()
+    for i in range(n):
+        await collector.enqueue({"type": "tool", "tool": f"t{i}", "outcome": "success", "latency_ms": i})
+    got = [await asyncio.wait_for(first, 5.0)]
+    while len(got) < n:
+        got.append(await asyncio.wait_for(sub.__anext__(), 5.0))
+    await collector.stop()
+    await sub.aclose()
+    return got
+
+
+@pytest.mark.parametrize("before_commit", [False, True])
+def test_events_are_committed_and_published(metrics_db, before_commit):
+    bus = InProcEventBus()
+    collector = EventCollectorWithBus(metrics_db, bus=bus, publish_before_commit=before_commit)
+    collector.cfg.flush_interval = 0.05
+
+    got = asyncio.run(_collect(collector, bus, 5))
+
+    assert [e["tool"] for e in got] == [f"t{i}" for i in range(5)]
+    conn = sqlite3.connect(metrics_db)
+    assert conn.execute("SELECT COUNT(*) FROM events_raw").fetchone()[0] == 5
+    conn.close()
+
+    m = collector.metrics()
+    assert m["bus"] == "inproc"
+    assert m["commit_ms"]["count"] >= 1
+    assert m["publish_ms"]["count"] >= 1
+    assert m["publish_dropped"] == 0
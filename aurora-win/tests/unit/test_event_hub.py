@@ -0,0 +1,102 @@
+# tests/unit/test_event_hub.py
+# 공유 SQLite 체인지 피드 + EventHub 팬아웃 테스트
+# Usage: pytest
+
+import sys
+import asyncio
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.event_hub import EventHub, REPLAY_END_FRAME
+from app.event_change_feed import SQLiteChangeFeed
+
+
+@pytest.fixture
+def metrics_db(tmp_path):
+    db_path = tmp_path / "metrics.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript((ROOT / "schema.sql").read_text("utf-8"))
+    # 피드 시작 이전 행은 전달되지 않아야 함
+    conn.execute("INSERT INTO events_raw (ts, type, tool) VALUES (?, 'tool', 'old')", (time.time(),))
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def _insert(db_path, tools):
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO events_raw (ts, type, tool, outcome) VALUES (?, 'tool', ?, 'success')",
+        [(time.time(), t) for t in tools],
+    )
+    conn.commit()
+    conn.close()
+
+
+def _tool(frame):
+    assert frame.startswith(b"data: ") and frame.endswith(b"\n\n")
+    return json.loads(frame[len(b"data: "):])["tool"]
+
+
+def test_change_feed_fans_out_one_poll_to_all_clients(metrics_db):
+    feed = SQLiteChangeFeed(db_path=metrics_db, interval=0.02, limit=2)
+    hub = EventHub(feed.tail, name="test")
+
+    async def _run():
+        subs = [hub.subscribe(replay=False) for _ in range(3)]
+        firsts = [asyncio.ensure_future(s.__anext__()) for s in subs]
+        await asyncio.sleep(0.1)  # 피드가 head id를 잡고 유휴 폴링을 몇 번 건너뛰도록
+        skipped_idle = feed.skipped
+        await asyncio.to_thread(_insert, metrics_db, ["a", "b", "c"])
+        results = []
+        for s, f in zip(subs, firsts):
+            got = [await asyncio.wait_for(f, 5.0)]
+            while len(got) < 3:
+                got.append(await asyncio.wait_for(s.__anext__(), 5.0))
+            results.append([_tool(f) for f in got])
+        for s in subs:
+            await s.aclose()
+        return results, skipped_idle
+
+    results, skipped_idle = asyncio.run(_run())
+    assert results == [["a", "b", "c"]] * 3
+    assert skipped_idle >= 1
+    # limit=2 이므로 3행은 2번의 SELECT로 읽히며, 클라이언트 수(3)와 무관
+    assert feed.polls == 2
+    assert hub.subscriber_count == 0
+
+
+def test_late_joiner_gets_replay_burst_without_upstream_query():
+    async def _source():
+        for i in range(5):
+            yield {"tool": f"t{i}"}
+        await asyncio.Event().wait()
+
+    hub = EventHub(_source, name="replay", replay_size=3, replay_seconds=60)
+
+    async def _run():
+        hub.start()
+        await asyncio.sleep(0.05)  # 구독자 없이도 링 버퍼가 채워져야 함
+        sub = hub.subscribe()
+        frames = [await asyncio.wait_for(sub.__anext__(), 1.0) for _ in range(4)]
+        await sub.aclose()
+        await hub.stop()
+        return frames
+
+    frames = asyncio.run(_run())
+    assert [_tool(f) for f in frames[:3]] == ["t2", "t3", "t4"]
+    assert frames[3] == REPLAY_END_FRAME
+
+
+def test_replay_window_expires_old_frames():
+    hub = EventHub(lambda: None, name="ttl", replay_size=10, replay_seconds=0.0)
+    hub._broadcast({"tool": "stale"})
+    time.sleep(0.01)
+    assert hub.replay_frames() == []
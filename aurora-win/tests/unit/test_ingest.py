@@ -0,0 +1,125 @@
+# tests/unit/test_ingest.py
+# 인제스트 파이프라인: 소스 리더 / 배치 임베딩 / 변경 없는 문서 건너뛰기 / prune / 임베딩 실패 재시도 테스트
+# Usage: pytest
+
+import sys
+import asyncio
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.memory import chunker, ingest, vectorstore
+from app.memory.ingest import IngestPipeline, IngestState
+from app.memory.local_embedder import HashedNgramEmbedder
+
+if vectorstore.faiss is None:
+    pytest.skip("faiss not installed", allow_module_level=True)
+
+DIM = 64
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    seen = []
+    emb = HashedNgramEmbedder(dim=DIM)
+
+    async def _embed(texts, task="embedding", strict=False, kind=None):
+        if strict:  # 파이프라인 호출만 기록 (검색 쿼리 임베딩 제외)
+            seen.append(len(texts))
+        if any("FAIL" in t for t in texts):
+            raise RuntimeError("backend down")
+        return emb.embed(texts)
+    monkeypatch.setattr(vectorstore, "get_embeddings", _embed)
+    monkeypatch.setattr(vectorstore, "VECTOR_SNAPSHOT_SECONDS", 3600)
+    monkeypatch.setattr(ingest, "chunk_text", lambda text: chunker.chunk_text(text, max_tokens=16, overlap=4))
+    return seen
+
+
+def _corpus(tmp_path):
+    rag = tmp_path / "rag"
+    rag.mkdir()
+    (rag / "manual.txt").write_text(" ".join(f"step{i}" for i in range(40)), "utf-8")
+    (rag / "faq.txt").write_text("자주 묻는 질문과 답변", "utf-8")
+    files = tmp_path / "files" / "reports"
+    files.mkdir(parents=True)
+    (files / "q3.md").write_text("# Q3 report\n\nrevenue grew", "utf-8")
+    (files / "image.png").write_bytes(b"\x89PNG")
+    inbox = tmp_path / "mail" / "inbox"
+    inbox.mkdir(parents=True)
+    (inbox / "1.eml").write_text("Subject: Lunch\nFrom: a@x\nTo: b@x\n\nPizza at noon?\n", "utf-8")
+    db = tmp_path / "metrics.db"
+    conn = sqlite3.connect(db)
+    conn.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, title TEXT, body TEXT)")
+    conn.execute("INSERT INTO notes VALUES (7, 'Groceries', 'milk eggs bread')")
+    conn.commit()
+    conn.close()
+    return {
+        "notes": lambda: ingest.read_notes(str(db)),
+        "files": lambda: ingest.read_files(tmp_path / "files"),
+        "mail": lambda: ingest.read_mail(tmp_path / "mail"),
+        "rag": lambda: ingest.read_rag(rag),
+    }
+
+
+def _run(store, state, readers, **kwargs):
+    prune = kwargs.pop("prune", False)
+    pipe = IngestPipeline(store, state, batch_size=8, embed_workers=2, queue_size=2, **kwargs)
+    return asyncio.run(pipe.run([(s, r()) for s, r in readers.items()], prune=prune))
+
+
+def test_readers_produce_doc_ids(tmp_path):
+    readers = _corpus(tmp_path)
+    docs = {d.doc_id: d for r in readers.values() for d in r()}
+    assert set(docs) == {"note:7", "file:reports/q3.md", "mail:inbox/1", "rag:manual", "rag:faq"}
+    assert docs["note:7"].text == "Groceries\n\nmilk eggs bread"
+    assert "Subject: Lunch" in docs["mail:inbox/1"].text and "Pizza at noon?" in docs["mail:inbox/1"].text
+
+
+def test_pipeline_indexes_skips_and_prunes(tmp_path, calls):
+    readers = _corpus(tmp_path)
+    store = vectorstore.VectorStore(index_path=str(tmp_path / "aurora.index"), dim=DIM)
+    state = IngestState(str(tmp_path / "state.db"))
+
+    stats = _run(store, state, readers)
+    assert stats["docs"] == 5 and stats["written"] == 5 and stats["errors"] == 0
+    manual = store.doc_id_map.ids_for_doc("rag:manual")
+    assert len(manual) == 3  # 40 토큰, 16 토큰 창, 4 토큰 겹침
+    assert store.index.ntotal == stats["chunks"]
+    assert calls and max(calls) <= 8 + 16  # 배치는 문서 경계에서 끊김 (strict 호출만 사용)
+
+    # 변경 없음 → 임베딩 호출 없이 건너뜀
+    calls.clear()
+    stats = _run(store, state, readers)
+    assert stats["skipped"] == 5 and stats["written"] == 0 and calls == []
+
+    # 문서 하나 수정, 하나 삭제 → 수정분만 다시 임베딩, prune으로 삭제 반영
+    (tmp_path / "rag" / "faq.txt").write_text("개정된 질문과 답변", "utf-8")
+    (tmp_path / "files" / "reports" / "q3.md").unlink()
+    stats = _run(store, state, readers, prune=True)
+    assert stats["written"] == 1 and stats["removed"] == 1
+    assert store.doc_id_map.ids_for_doc("file:reports/q3.md") == []
+    assert state.doc_ids("files") == set()
+    hits = asyncio.run(store.search("개정된 질문과 답변", k=1))
+    assert hits[0]["doc_id"] == "rag:faq"
+    state.close()
+
+
+def test_failed_batch_is_retried_next_run(tmp_path, calls):
+    rag = tmp_path / "rag"
+    rag.mkdir()
+    (rag / "bad.txt").write_text("FAIL this one", "utf-8")
+    readers = {"rag": lambda: ingest.read_rag(rag)}
+    store = vectorstore.VectorStore(index_path=str(tmp_path / "aurora.index"), dim=DIM)
+    state = IngestState(str(tmp_path / "state.db"))
+
+    stats = _run(store, state, readers)
+    assert stats["errors"] == 1 and store.index.ntotal == 0
+    assert state.sha("rag:bad") is None
+
+    (rag / "bad.txt").write_text("fixed now", "utf-8")
+    stats = _run(store, state, readers)
+    assert stats["written"] == 1 and state.sha("rag:bad") is not None
+    state.close()
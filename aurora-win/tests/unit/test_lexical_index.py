@@ -0,0 +1,148 @@
+# tests/unit/test_lexical_index.py
+# FTS5 BM25 역색인: 문서 단위 교체 / 한국어 접두 검색 / RRF 결합 / 키워드 쿼리 임베딩 생략 / 미리보기 검색 테스트
+# Usage: pytest
+
+import sys
+import asyncio
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.memory import vectorstore
+from app.memory.lexical_index import LexicalIndex, fts5_available, fuse_rrf, is_keyword_query, match_query
+
+if not fts5_available():
+    pytest.skip("SQLite FTS5 not available", allow_module_level=True)
+
+DIM = 8
+
+
+def test_match_query_quotes_syntax_and_prefixes_korean():
+    assert match_query('budget AND NOT "q3 plan"') == '"q3 plan" OR "budget" OR "AND" OR "NOT"'
+    assert match_query("회의 일정") == '"회의"* OR "일정"*'
+    assert match_query("  ()*: ") is None
+
+
+def test_replace_search_delete(tmp_path):
+    lex = LexicalIndex(str(tmp_path / "x.fts.db"))
+    lex.replace("note:1", ["invoice INV-2024-031 for Aurora", "내일 회의를 준비합니다"], [(0, 30), (31, 44)])
+    lex.replace("note:2", ["aurora aurora roadmap"])
+    hits = lex.search("aurora", k=5)
+    assert [(h["doc_id"], h["chunk_idx"]) for h in hits] == [("note:2", 0), ("note:1", 0)]
+    assert hits[0]["score"] < hits[1]["score"]  # bm25: 낮을수록 관련도 높음
+    assert [h["doc_id"] for h in lex.search("INV-2024-031")] == ["note:1"]
+    ko = lex.search("회의")
+    assert (ko[0]["doc_id"], ko[0]["chunk_idx"], ko[0]["start"]) == ("note:1", 1, 31)
+
+    lex.replace("note:1", ["replaced body"])  # 이전 청크는 사라짐
+    assert lex.search("invoice") == [] and lex.has_doc("note:1")
+    assert lex.texts([("note:1", 0), ("note:1", 1)]) == {("note:1", 0): "replaced body"}
+    lex.delete("note:2")
+    assert lex.search("aurora") == [] and not lex.has_doc("note:2")
+    lex.close()
+
+
+def test_texts_uses_one_query_per_batch(tmp_path):
+    lex = LexicalIndex(str(tmp_path / "x.fts.db"))
+    lex.replace("note:1", [f"chunk {i}" for i in range(300)])
+    selects = []
+    lex._conn.set_trace_callback(lambda sql: selects.append(sql) if sql.startswith("SELECT") else None)
+    keys = [("note:1", i) for i in range(0, 300, 2)] + [("note:1", 2), ("note:2", 0)]
+    got = lex.texts(keys)
+    assert len(selects) == 1
+    assert len(got) == 150 and got[("note:1", 298)] == "chunk 298" and ("note:2", 0) not in got
+    selects.clear()
+    assert len(lex.texts([("note:1", i) for i in range(300)])) == 300
+    assert len(selects) == 2  # 키 250개씩
+    lex.close()
+
+
+def test_fuse_rrf_rewards_agreement():
+    vector = [{"doc_id": "a", "chunk_idx": 0, "score": 0.1}, {"doc_id": "b", "chunk_idx": 0, "score": 0.2}]
+    lexical = [{"doc_id": "b", "chunk_idx": 0, "score": -3.0}, {"doc_id": "c", "chunk_idx": 0, "score": -1.0}]
+    fused = fuse_rrf({"vector": vector, "lexical": lexical}, k=3)
+    assert [h["doc_id"] for h in fused] == ["b", "a", "c"]
+    assert fused[0]["vector_rank"] == 2 and fused[0]["lexical_rank"] == 1
+
+
+def test_keyword_queries():
+    assert is_keyword_query("INV-2024-031")
+    assert is_keyword_query('"project aurora"')
+    assert is_keyword_query("PR #42")
+    assert not is_keyword_query("what did we decide about the budget")
+    assert not is_keyword_query("회의 일정")
+
+
+@pytest.mark.skipif(vectorstore.faiss is None, reason="faiss not installed")
+def test_hybrid_search_and_keyword_shortcut(monkeypatch, tmp_path):
+    calls = []
+
+    async def _embed(texts, task="embedding", strict=False, kind=None):
+        calls.append(list(texts))
+        return np.array([[float(len(t))] * DIM for t in texts], dtype="float32")
+    monkeypatch.setattr(vectorstore, "get_embeddings", _embed)
+    monkeypatch.setattr(vectorstore, "VECTOR_SNAPSHOT_SECONDS", 3600)
+
+    async def _run():
+        store = vectorstore.VectorStore(index_path=str(tmp_path / "aurora.index"), dim=DIM)
+        await store.upsert("mail:inbox/1", ["invoice INV-2024-031 is overdue"])
+        await store.upsert("note:2", ["lunch plans with the design team"])
+        calls.clear()
+
+        hits = await store.hybrid_search("INV-2024-031", k=3)
+        assert [h["doc_id"] for h in hits] == ["mail:inbox/1"] and calls == []  # 임베딩 없음
+        # score는 모드와 관계없이 높을수록 좋음, 원래 값은 모드별 키에
+        assert hits[0]["bm25"] < 0 and hits[0]["score"] == -hits[0]["bm25"]
+
+        hits = await store.hybrid_search("design lunch", k=2)
+        assert hits[0]["doc_id"] == "note:2" and hits[0]["text"].startswith("lunch")
+        assert "lexical_rank" in hits[0] and len(calls) == 1
+        assert hits[0]["rrf"] == hits[0]["score"] >= hits[1]["score"] and "distance" in hits[0]
+
+        vec = await store.hybrid_search("design lunch", k=2, mode="vector")
+        assert {h["doc_id"] for h in vec} == {"note:2", "mail:inbox/1"} and all("text" in h for h in vec)
+        assert vec[0]["score"] == 1.0 / (1.0 + vec[0]["distance"]) and vec[0]["score"] >= vec[1]["score"]
+
+        await store.delete("mail:inbox/1")
+        assert await store.search_lexical("invoice") == []
+        await store.close()
+    asyncio.run(_run())
+
+
+def test_preview_search_uses_index(monkeypatch, tmp_path):
+    from app import rag_preview_router as preview
+
+    text = "intro " * 200 + "the aurora keyword " + "filler " * 200 + "aurora again"
+    (tmp_path / "manual.txt").write_text(text, "utf-8")
+    lex = LexicalIndex(str(tmp_path / "x.fts.db"))
+    half = len(text) // 2
+    lex.replace("rag:manual", [text[:half], text[half:]], [(0, half), (half, len(text))])
+    monkeypatch.setattr(preview, "DOC_ROOT", tmp_path)
+    monkeypatch.setattr(preview, "_lexical", lambda: lex)
+
+    expected = sorted({text.find("aurora") // 800, text.rfind("aurora") // 800})
+    assert preview.search_chunks(term="Aurora", doc="manual", size=800, limit=20)["chunks"] == expected
+    # 역색인에 없는 부분 문자열은 전체 스캔
+    assert preview.search_chunks(term="ror", doc="manual", size=800, limit=20)["chunks"] == expected
+    hits = preview.search_chunks(term="aurora", doc=None, size=800, limit=5)["hits"]
+    assert {h["doc_id"] for h in hits} == {"rag:manual"}
+    assert all(h["score"] == -h["bm25"] > 0 for h in hits)  # hybrid_search처럼 높을수록 관련
+    lex.close()
+
+
+def test_preview_search_finds_substrings_outside_token_matches(monkeypatch, tmp_path):
+    from app import rag_preview_router as preview
+
+    text = "cat " + "x" * 100 + " categories " + "y" * 100 + " cats"
+    (tmp_path / "pets.txt").write_text(text, "utf-8")
+    lex = LexicalIndex(str(tmp_path / "x.fts.db"))
+    lex.replace("rag:pets", [text[:100], text[100:]], [(0, 100), (100, len(text))])
+    monkeypatch.setattr(preview, "DOC_ROOT", tmp_path)
+    monkeypatch.setattr(preview, "_lexical", lambda: lex)
+
+    # "cat" 토큰은 청크 0에만 있지만 "categories"(1)와 "cats"(2)에도 부분 문자열로 등장
+    assert preview.search_chunks(term="cat", doc="pets", size=100, limit=20)["chunks"] == [0, 1, 2]
+    lex.close()
@@ -0,0 +1,118 @@
+# tests/unit/test_local_embedder.py
+# 프로세스 내 임베딩 엔진: 해시 n-gram 폴백 / 스레드 풀 배치 / local://onnx/ 라우팅 테스트
+# Usage: pytest
+
+import sys
+import asyncio
+import threading
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.memory import local_embedder, vectorstore
+from app.memory.local_embedder import HashedNgramEmbedder, LocalEmbeddingEngine
+from app.router import model_runner
+
+
+def test_hashed_embedder_is_deterministic_and_normalized():
+    emb = HashedNgramEmbedder()
+    a = emb.embed(["회의 일정 정리", "meeting notes"])
+    b = HashedNgramEmbedder().embed(["회의 일정 정리", "meeting notes"])
+    assert a.shape == (2, local_embedder.EMBED_DIM)
+    assert np.array_equal(a, b)
+    assert np.allclose(np.linalg.norm(a, axis=1), 1.0)
+
+
+def test_hashed_embedder_ranks_similar_text_closer():
+    q, near, far = HashedNgramEmbedder().embed(
+        ["quarterly budget review", "budget review for the quarter", "cat photos from vacation"])
+    assert float(q @ near) > float(q @ far)
+
+
+def test_engine_splits_batches_and_keeps_order():
+    engine = LocalEmbeddingEngine(backend=HashedNgramEmbedder(), threads=3, batch_size=4)
+    texts = [f"document number {i}" for i in range(11)]
+    got = asyncio.run(engine.embed(texts))
+    assert got.shape == (11, local_embedder.EMBED_DIM)
+    assert np.array_equal(got, engine.embed_sync(texts))
+    assert np.array_equal(got[7], HashedNgramEmbedder().embed([texts[7]])[0])
+    engine.close()
+
+
+def test_onnx_route_runs_in_process(monkeypatch):
+    engine = LocalEmbeddingEngine(backend=HashedNgramEmbedder(), threads=2)
+    monkeypatch.setattr(local_embedder, "_engine_instance", engine)
+    monkeypatch.setattr(vectorstore, "get_embedding_cache", lambda: None)
+    monkeypatch.setattr(model_runner, "httpx", None)  # HTTP 경로를 타면 실패
+
+    result = asyncio.run(model_runner.run_inference("embedding", "hello world"))
+    assert result["model"].startswith("local://onnx/")
+    assert len(result["vector"]) == local_embedder.EMBED_DIM and any(result["vector"])
+
+    # 캐시 키는 실제 백엔드를 구분합니다 (ONNX ↔ 해시 폴백 벡터가 섞이지 않도록)
+    assert asyncio.run(model_runner.embedding_model_uri()).endswith("#hash-ngram-v1")
+
+    vecs = asyncio.run(vectorstore.get_embeddings(["hello world", "other text"]))
+    assert np.allclose(vecs[0], result["vector"], atol=1e-6)
+    engine.close()
+
+
+class _PrefixedBackend(HashedNgramEmbedder):
+    """e5처럼 kind별 접두사를 쓰는 백엔드 (입력 기록)"""
+    model_id = "e5-stub"
+    prefixes = True
+
+    def __init__(self):
+        super().__init__()
+        self.seen = []
+
+    def embed(self, texts, kind=None):
+        texts = local_embedder.e5_inputs(texts, kind)
+        self.seen.extend(texts)
+        return super().embed(texts)
+
+
+def test_e5_prefixes_follow_kind_and_split_cache_keys(monkeypatch):
+    assert local_embedder.e5_inputs(["a"], "query") == ["query: a"]
+    assert local_embedder.e5_inputs(["a"], "passage") == ["passage: a"]
+    assert local_embedder.e5_inputs(["a"], None) == ["a"]
+
+    backend = _PrefixedBackend()
+    engine = LocalEmbeddingEngine(backend=backend, threads=2, batch_size=2)
+    monkeypatch.setattr(local_embedder, "_engine_instance", engine)
+    monkeypatch.setattr(vectorstore, "get_embedding_cache", lambda: None)
+
+    q = asyncio.run(vectorstore.get_embeddings(["budget review"], kind="query"))
+    p = asyncio.run(vectorstore.get_embeddings(["budget review"], kind="passage"))
+    assert backend.seen == ["query: budget review", "passage: budget review"]
+    assert not np.array_equal(q, p)
+
+    # 접두사를 쓰는 백엔드면 kind마다 캐시 키가 다르고, 해시 폴백은 kind와 무관
+    assert asyncio.run(model_runner.embedding_model_uri(kind="query")).endswith("#e5-stub#query")
+    assert asyncio.run(model_runner.embedding_model_uri(kind="passage")).endswith("#e5-stub#passage")
+    engine.close()
+    plain = LocalEmbeddingEngine(backend=HashedNgramEmbedder(), threads=1)
+    monkeypatch.setattr(local_embedder, "_engine_instance", plain)
+    assert asyncio.run(model_runner.embedding_model_uri(kind="query")).endswith("#hash-ngram-v1")
+    plain.close()
+
+
+def test_engine_is_built_off_the_event_loop(monkeypatch):
+    built = []
+
+    def _engine():
+        built.append(threading.current_thread())
+        return LocalEmbeddingEngine(backend=HashedNgramEmbedder(), threads=1)
+    monkeypatch.setattr(local_embedder, "_engine_instance", None)
+    monkeypatch.setattr(local_embedder, "LocalEmbeddingEngine", _engine)
+
+    async def _run():
+        uris = await asyncio.gather(*(model_runner.embedding_model_uri() for _ in range(3)))
+        return uris, threading.current_thread()
+
+    uris, loop_thread = asyncio.run(_run())
+    assert len(built) == 1 and built[0] is not loop_thread  # 모델 로드는 스레드에서 한 번만
+    assert all(u.endswith("#hash-ngram-v1") for u in uris)
+    local_embedder._engine_instance.close()
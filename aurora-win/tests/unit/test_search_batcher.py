@@ -0,0 +1,101 @@
+# tests/unit/test_search_batcher.py
+# 검색 마이크로 배치: 동시 요청 묶음 / 요청별 k / 오류 전파 / VectorStore 다중 행 검색 테스트
+# Usage: pytest
+
+import sys
+import asyncio
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.memory import vectorstore
+from app.memory.search_batcher import SearchBatcher
+
+DIM = 8
+
+
+def test_concurrent_submits_share_one_batch():
+    batches = []
+
+    async def _many(queries, ks):
+        batches.append(list(queries))
+        return [[{"q": q, "k": k}] * k for q, k in zip(queries, ks)]
+
+    async def _run():
+        batcher = SearchBatcher(_many, window_ms=5, max_batch=16)
+        got = await asyncio.gather(*(batcher.submit(f"q{i}", 1 + i % 3) for i in range(10)))
+        await batcher.stop()
+        return batcher, got
+
+    batcher, got = asyncio.run(_run())
+    assert batches == [[f"q{i}" for i in range(10)]]
+    assert [len(g) for g in got] == [1 + i % 3 for i in range(10)]
+    assert got[4][0]["q"] == "q4"
+    assert batcher.metrics()["batch_size"]["max"] == 10
+
+
+def test_max_batch_and_errors():
+    batches = []
+
+    async def _many(queries, ks):
+        batches.append(len(queries))
+        if "bad" in queries:
+            raise RuntimeError("embedding backend down")
+        return [[] for _ in queries]
+
+    async def _run():
+        batcher = SearchBatcher(_many, window_ms=5, max_batch=4)
+        ok = await asyncio.gather(*(batcher.submit(f"q{i}", 1) for i in range(9)))
+        with pytest.raises(RuntimeError):
+            await batcher.submit("bad", 1)
+        await batcher.stop()
+        return ok
+
+    assert asyncio.run(_run()) == [[]] * 9
+    assert batches[:3] == [4, 4, 1] and batches[-1] == 1
+
+
+
+def test_stop_during_window_fails_dequeued_requests():
+    async def _many(queries, ks):
+        return [[] for _ in queries]
+
+    async def _run():
+        batcher = SearchBatcher(_many, window_ms=500, max_batch=16)
+        pending = asyncio.ensure_future(batcher.submit("q", 1))
+        await asyncio.sleep(0.05)  # 요청이 큐에서 꺼내져 배치 창에서 대기 중
+        await batcher.stop()
+        with pytest.raises(RuntimeError, match="stopped"):
+            await asyncio.wait_for(pending, 1)
+
+    asyncio.run(_run())
+
+
+@pytest.mark.skipif(vectorstore.faiss is None, reason="faiss not installed")
+def test_vectorstore_batches_concurrent_searches(monkeypatch, tmp_path):
+    calls = []
+
+    async def _embed(texts, task="embedding", strict=False, kind=None):
+        calls.append(len(texts))
+        return np.array([[float(t)] * DIM for t in texts], dtype="float32")
+    monkeypatch.setattr(vectorstore, "get_embeddings", _embed)
+    monkeypatch.setattr(vectorstore, "VECTOR_SNAPSHOT_SECONDS", 3600)
+
+    async def _run():
+        store = vectorstore.VectorStore(index_path=str(tmp_path / "aurora.index"), dim=DIM)
+        for i in range(20):
+            await store.upsert(f"doc:{i}", [str(i)])
+        await store.delete("doc:5")
+        calls.clear()
+        got = await asyncio.gather(*(store.search(str(i), k=1 + i % 2) for i in range(20)))
+        await store.close()
+        return got
+
+    got = asyncio.run(_run())
+    assert calls == [20]  # 20개 쿼리가 한 번의 임베딩 배치로
+    assert [h["doc_id"] for h in got[7]] == ["doc:7", "doc:6"] or [h["doc_id"] for h in got[7]] == ["doc:7", "doc:8"]
+    assert [h["doc_id"] for h in got[4]] == ["doc:4"]
+    assert got[5][0]["doc_id"] in ("doc:4", "doc:6")  # 삭제된 문서는 제외
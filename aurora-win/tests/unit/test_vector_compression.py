@@ -0,0 +1,122 @@
+# tests/unit/test_vector_compression.py
+# 압축 인덱스: fp16/sq8/pq 빌드 / 크기 / 원본 벡터 재순위 / 재시작 후 유지 테스트
+# Usage: pytest
+
+import sys
+import asyncio
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.memory import ann_index, vectorstore
+from app.memory.vector_file import VectorFile
+
+if ann_index.faiss is None:
+    pytest.skip("faiss not installed", allow_module_level=True)
+
+faiss = ann_index.faiss
+DIM = 32
+
+
+def _vectors(n, dim=DIM, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=(n, dim)).astype("float32")
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize("kind", ["flat", "ivf", "hnsw"])
+@pytest.mark.parametrize("compression", ["fp16", "sq8", "pq"])
+def test_compressed_indexes_build_and_shrink(kind, compression):
+    data = _vectors(2000)
+    index = ann_index.build_index(kind, data, ids=np.arange(2000), compression=compression)
+    assert ann_index.index_kind(index) == kind
+    assert ann_index.compression_of(index) == compression
+    plain = ann_index.build_index(kind, data, ids=np.arange(2000))
+    assert ann_index.compression_of(plain) == "none"
+    assert faiss.serialize_index(index).nbytes < faiss.serialize_index(plain).nbytes
+    _, found = index.search(data[:50], 10)
+    assert (found == np.arange(50)[:, None]).any(axis=1).mean() >= 0.8
+
+
+def test_pq_falls_back_to_sq8_when_too_small():
+    index = ann_index.build_index("flat", _vectors(100), compression="pq")
+    assert ann_index.compression_of(index) == "sq8"
+
+
+def test_promotion_target_on_compression_change():
+    index = ann_index.build_index("ivf", _vectors(500), ids=np.arange(500))
+    assert ann_index.promotion_target(index, "ivf", 100, "none") is None
+    assert ann_index.promotion_target(index, "ivf", 100, "sq8") == "ivf"
+    assert ann_index.promotion_target(index, "ivf", 1000, "sq8") is None
+
+
+def test_rerank_restores_exact_order():
+    data = _vectors(1000)
+    queries = _vectors(100, seed=1)
+    pq = ann_index.build_index("flat", data, ids=np.arange(1000), compression="pq")
+    flat = faiss.IndexFlatL2(DIM)
+    flat.add(data)
+    _, truth = flat.search(queries, 1)
+    _, approx = pq.search(queries, 1)
+    d, cand = pq.search(queries, 10)
+    rd, ri = ann_index.rerank(queries, d, cand, lambda ids: data[ids], 1)
+    assert (ri[:, 0] == truth[:, 0]).mean() > (approx[:, 0] == truth[:, 0]).mean()
+    assert (ri[:, 0] == truth[:, 0]).mean() >= 0.8
+    assert np.allclose(rd[:, 0], ((data[ri[:, 0]] - queries) ** 2).sum(axis=1), atol=1e-5)
+
+
+def test_vector_file_rows(tmp_path):
+    vf = VectorFile(str(tmp_path / "x.vecs"), DIM)
+    data = _vectors(10)
+    vf.write(np.array([0, 1, 2, 7]), data[:4])
+    got = vf.read(np.array([2, 7, 5, 100, -1]))
+    assert np.array_equal(got[0], data[2]) and np.array_equal(got[1], data[3])
+    assert not got[2:].any()
+    vf.write(np.array([12]), data[4:5])  # 파일 확장 후 다시 매핑
+    assert np.array_equal(vf.read(np.array([12]))[0], data[4])
+    vf.close()
+
+
+def test_store_rebuilds_compressed_and_reranks(monkeypatch, tmp_path):
+    data = _vectors(600)
+    queries = _vectors(100, seed=1)
+    flat = faiss.IndexFlatL2(DIM)
+    flat.add(data)
+    _, truth = flat.search(queries, 1)
+
+    async def _embed(texts, task="embedding", strict=False, kind=None):
+        return queries[[int(t) for t in texts]]
+
+    monkeypatch.setattr(vectorstore, "get_embeddings", _embed)
+    monkeypatch.setattr(vectorstore, "VECTOR_COMPRESSION", "pq")
+    monkeypatch.setattr(vectorstore, "VECTOR_RERANK", 10)
+    monkeypatch.setattr(vectorstore, "VECTOR_SNAPSHOT_SECONDS", 3600)
+    path = tmp_path / "aurora.index"
+
+    async def _recall(store):
+        got = await asyncio.gather(*(store.search(str(i), k=1) for i in range(len(queries))))
+        return np.mean([g[0]["doc_id"] == f"d{t}" for g, t in zip(got, truth[:, 0])])
+
+    async def _run():
+        store = vectorstore.VectorStore(index_path=str(path), dim=DIM)
+        for i in range(600):
+            await store.upsert_vectors(f"d{i}", data[i:i + 1], log=False)
+        assert await store.rebuild("flat") == "flat"
+        assert ann_index.compression_of(store.index) == "pq"
+        reranked = await _recall(store)
+        monkeypatch.setattr(vectorstore, "VECTOR_RERANK", 0)
+        approx = await _recall(store)
+        monkeypatch.setattr(vectorstore, "VECTOR_RERANK", 10)
+        await store.close()
+        return reranked, approx
+
+    reranked, approx = asyncio.run(_run())
+    assert reranked >= 0.8 and reranked > approx + 0.2
+    assert (tmp_path / "aurora.vecs").stat().st_size == 600 * DIM * 4
+
+    reopened = vectorstore.VectorStore(index_path=str(path), dim=DIM)
+    assert ann_index.compression_of(reopened.index) == "pq" and reopened._vectors is not None
+    assert asyncio.run(_recall(reopened)) == reranked
@@ -0,0 +1,148 @@
+# tests/unit/test_vector_concurrency.py
+# 읽기/쓰기 잠금 + FAISS 전용 실행기: 읽기 병렬 / 쓰기 단독 / 루프 비차단 / 동시 upsert·검색·스냅샷 일관성 테스트
+# Usage: pytest
+
+import sys
+import asyncio
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.memory import vectorstore
+from app.utils.rwlock import RWLock
+
+DIM = 8
+
+
+def test_rwlock_readers_share_writers_exclusive():
+    lock = RWLock()
+    both_reading = threading.Barrier(2, timeout=2)
+    order = []
+
+    def _reader(name):
+        with lock.read():
+            both_reading.wait()  # 두 읽기가 동시에 잠금 안에 있어야 통과
+            order.append(name)
+
+    readers = [threading.Thread(target=_reader, args=(f"r{i}",)) for i in range(2)]
+    for t in readers:
+        t.start()
+    for t in readers:
+        t.join(3)
+    assert sorted(order) == ["r0", "r1"]
+
+    # 쓰기가 기다리는 동안 새 읽기는 들어오지 못함 (쓰기 우선)
+    order.clear()
+    done_writing = threading.Event()
+
+    def _writer():
+        with lock.write():
+            order.append("w")
+            done_writing.wait(2)
+
+    def _late_reader():
+        with lock.read():
+            order.append("r")
+
+    with lock.read():
+        writer = threading.Thread(target=_writer)
+        writer.start()
+        while not lock.snapshot()["waiting_writers"]:
+            time.sleep(0.001)
+        late = threading.Thread(target=_late_reader)
+        late.start()
+        time.sleep(0.05)
+        assert order == []
+    while not order:
+        time.sleep(0.001)
+    time.sleep(0.05)
+    assert order == ["w"]  # 쓰기가 끝나기 전까지 늦은 읽기는 대기
+    done_writing.set()
+    writer.join(2)
+    late.join(2)
+    assert order == ["w", "r"]
+
+
+@pytest.mark.skipif(vectorstore.faiss is None, reason="faiss not installed")
+def test_search_waits_for_writer_without_blocking_loop(monkeypatch, tmp_path):
+    async def _embed(texts, task="embedding", strict=False, kind=None):
+        return np.array([[float(t)] * DIM for t in texts], dtype="float32")
+    monkeypatch.setattr(vectorstore, "get_embeddings", _embed)
+    monkeypatch.setattr(vectorstore, "VECTOR_SNAPSHOT_SECONDS", 3600)
+
+    async def _run():
+        store = vectorstore.VectorStore(index_path=str(tmp_path / "aurora.index"), dim=DIM)
+        await store.upsert("doc:1", ["1"])
+        release = threading.Event()
+        holding = threading.Event()
+
+        def _hold():
+            with store._rw.write():
+                holding.set()
+                release.wait(2)
+        holder = threading.Thread(target=_hold)
+        holder.start()
+        holding.wait(2)
+
+        search = asyncio.create_task(store.search("1", k=1))
+        ticks = 0
+        for _ in range(10):  # 검색이 잠금을 기다리는 동안에도 루프는 계속 돈다
+            await asyncio.sleep(0.01)
+            ticks += 1
+        assert not search.done()
+        release.set()
+        hits = await search
+        holder.join(2)
+        await store.close()
+        return ticks, hits
+
+    ticks, hits = asyncio.run(_run())
+    assert ticks == 10
+    assert hits[0]["doc_id"] == "doc:1"
+
+
+@pytest.mark.skipif(vectorstore.faiss is None, reason="faiss not installed")
+def test_concurrent_upserts_searches_and_snapshot(monkeypatch, tmp_path):
+    async def _embed(texts, task="embedding", strict=False, kind=None):
+        return np.array([[float(t)] * DIM for t in texts], dtype="float32")
+    monkeypatch.setattr(vectorstore, "get_embeddings", _embed)
+    monkeypatch.setattr(vectorstore, "VECTOR_SNAPSHOT_SECONDS", 3600)
+    path = tmp_path / "aurora.index"
+
+    async def _run():
+        store = vectorstore.VectorStore(index_path=str(path), dim=DIM)
+        await store.upsert("doc:0", ["0"])
+
+        async def _writer(start):
+            for i in range(start, 200, 4):
+                await store.upsert(f"doc:{i}", [str(i)])
+
+        async def _reader():
+            for i in range(50):
+                hits = await store.search(str(i), k=1)
+                assert hits and hits[0]["doc_id"].startswith("doc:")
+
+        # 쓰기 네 갈래 + 검색 + 쓰기 도중 스냅샷
+        await asyncio.gather(*(_writer(s) for s in range(1, 5)), _reader(), _reader(), store.snapshot())
+        await store.upsert("doc:7", ["7.25"])  # 같은 문서 재저장 → 이전 청크는 삭제 표시
+        ntotal = store.ntotal
+        await store.close()
+        return ntotal
+
+    assert asyncio.run(_run()) == 201
+
+    async def _reopen():
+        store = vectorstore.VectorStore(index_path=str(path), dim=DIM)
+        got = await asyncio.gather(*(store.search(str(i), k=1) for i in (3, 7.25, 150, 199)))
+        ntotal = store.ntotal
+        await store.close()
+        return got, ntotal
+
+    got, ntotal = asyncio.run(_reopen())
+    assert ntotal == 201
+    assert [g[0]["doc_id"] for g in got] == ["doc:3", "doc:7", "doc:150", "doc:199"]
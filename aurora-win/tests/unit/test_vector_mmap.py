@@ -0,0 +1,70 @@
+# tests/unit/test_vector_mmap.py
+# 메모리 매핑 인덱스 로드 / SQLite ID 맵 (map.json 이전, 필요 시 조회) 테스트
+# Usage: pytest
+
+import sys
+import asyncio
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.memory import vectorstore
+
+if vectorstore.faiss is None:
+    pytest.skip("faiss not installed", allow_module_level=True)
+
+faiss = vectorstore.faiss
+DIM = 8
+pytestmark = pytest.mark.usefixtures("fake_embeddings")
+
+
+def test_legacy_json_map_is_imported_once(tmp_path, make_store):
+    path = tmp_path / "aurora.index"
+    index = faiss.IndexFlatL2(DIM)
+    index.add(np.ones((2, DIM), dtype="float32"))
+    faiss.write_index(index, str(path))
+    (tmp_path / "aurora.map.json").write_text(json.dumps({"0": "note:1:0", "1": "note:2:0"}), "utf-8")
+
+    store = make_store(path)
+    assert store.doc_id_map[1] == "note:2:0" and len(store.doc_id_map) == 2
+    assert not (tmp_path / "aurora.map.json").exists()
+    assert (tmp_path / "aurora.map.db").exists()
+
+
+def test_mmapped_index_keeps_snapshot_mapped_and_adds_to_delta(tmp_path, make_store):
+    path = tmp_path / "aurora.index"
+
+    async def _seed():
+        store = make_store(path)
+        await store.add("note:1", ["1", "2"])
+        await store.close()
+    asyncio.run(_seed())
+
+    async def _reopen():
+        store = make_store(path)
+        mmapped = store._mmapped
+        hits = await store.search("2", k=1)
+        await store.add("note:2", ["5"])
+        state = (store._mmapped, store.index.ntotal, store.ntotal)
+        hits2 = await store.search("5", k=2)
+        await store.snapshot()
+        merged = (store._mmapped, store.index.ntotal, store.delta)
+        await store.close()
+        return mmapped, hits, state, hits2, merged
+
+    mmapped, hits, state, hits2, merged = asyncio.run(_reopen())
+    assert mmapped == hasattr(faiss, "IO_FLAG_MMAP_IFC")
+    assert hits == [{"doc_id": "note:1", "chunk_idx": 1, "score": 0.0}]
+    if mmapped:
+        # 매핑된 스냅샷은 그대로, 새 벡터는 델타에 → 스냅샷 후 합쳐진 파일을 다시 매핑
+        assert state == (True, 2, 3)
+        assert merged == (True, 3, None)
+    assert [h["doc_id"] for h in hits2] == ["note:2", "note:1"]
+
+    reopened = make_store(path)
+    assert reopened.ntotal == 3
+    assert reopened.doc_id_map.get_many([0, 2, 99]) == {0: "note:1:0", 2: "note:2:0"}
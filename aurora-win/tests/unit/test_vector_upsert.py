@@ -0,0 +1,203 @@
+# tests/unit/test_vector_upsert.py
+# 문서 단위 upsert/delete: 이전 청크 제외 검색 / WAL 재생 / 압축 / 이전 형식 인덱스 변환 테스트
+# Usage: pytest
+
+import sys
+import asyncio
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.memory import vectorstore
+
+if vectorstore.faiss is None:
+    pytest.skip("faiss not installed", allow_module_level=True)
+
+faiss = vectorstore.faiss
+DIM = 8
+pytestmark = pytest.mark.usefixtures("fake_embeddings")
+_real_get_embeddings = vectorstore.get_embeddings
+
+
+async def _docs(store, query, k=3):
+    return [(h["doc_id"], h["chunk_idx"]) for h in await store.search(query, k=k)]
+
+
+def test_upsert_replaces_and_delete_hides(tmp_path, make_store):
+    async def _run():
+        store = make_store(tmp_path / "aurora.index")
+        await store.upsert("note:1", ["1", "2"])
+        await store.upsert("note:2", ["10"])
+        result = await store.upsert("note:1", ["3"])  # 노트 수정
+        assert result == {"doc_id": "note:1", "added": 1, "removed": 2}
+        # 이전 청크(1, 2)가 top-k를 차지하지 않음
+        assert await _docs(store, "1") == [("note:1", 0), ("note:2", 0)]
+        assert await store.delete("note:2") == 1
+        assert await store.delete("note:2") == 0
+        assert await _docs(store, "10") == [("note:1", 0)]
+        return store
+
+    store = asyncio.run(_run())
+    assert store.index.ntotal == 4 and store._dead == {0, 1, 2}
+    assert list(store.doc_id_map) == [3]
+
+
+def test_failed_embedding_keeps_previous_chunks(monkeypatch, tmp_path, make_store):
+    async def _batch(texts, task="embedding", kind=None):
+        return {"vectors": [None] * len(texts), "errors": ["backend down"]}
+
+    async def _uri(task="embedding", kind=None):
+        return "test://embed"
+
+    async def _run():
+        store = make_store(tmp_path / "aurora.index")
+        await store.upsert("note:1", ["1", "2"])
+        monkeypatch.setattr(vectorstore, "get_embeddings", _real_get_embeddings)
+        monkeypatch.setattr(vectorstore, "embed_batch", _batch)
+        monkeypatch.setattr(vectorstore, "embedding_model_uri", _uri)
+        monkeypatch.setattr(vectorstore, "get_embedding_cache", lambda: None)
+        with pytest.raises(RuntimeError):
+            await store.upsert("note:1", ["edited"])  # 임베딩 실패 → 이전 청크는 그대로
+        return store
+
+    store = asyncio.run(_run())
+    assert store.doc_id_map.ids_for_doc("note:1") == [0, 1] and not store._dead
+    assert store.ntotal == 2 and store._next_id == 2
+
+
+def test_replay_restores_upserts_and_deletes(tmp_path, make_store):
+    path = tmp_path / "aurora.index"
+
+    async def _run():
+        store = make_store(path)
+        await store.upsert("a", ["1"])
+        await store.upsert("b", ["2"])
+        store.save_index()
+        await store.upsert("a", ["5", "6"])
+        await store.delete("b")
+    asyncio.run(_run())
+
+    store = make_store(path)
+    assert store._dead == {0, 1}
+    assert store.doc_id_map.ids_for_doc("a") == [2, 3] and store.doc_id_map.ids_for_doc("b") == []
+    assert asyncio.run(_docs(store, "2")) == [("a", 0), ("a", 1)]
+    assert store._next_id == 4
+
+
+def test_compaction_drops_dead_vectors(monkeypatch, tmp_path, make_store):
+    monkeypatch.setattr(vectorstore, "VECTOR_COMPACT_MIN", 3)
+    path = tmp_path / "aurora.index"
+
+    async def _run():
+        store = make_store(path)
+        for v in ["1", "2", "3", "4"]:
+            await store.upsert("doc", [v])
+        await store._rebuild_task
+        await store.close()
+        return store
+
+    store = asyncio.run(_run())
+    assert store.index.ntotal == 1 and not store._dead
+
+    reopened = make_store(path)
+    assert reopened.index.ntotal == 1 and not reopened._dead
+    assert reopened.doc_id_map.get_many([0, 1, 2, 3]) == {3: "doc:0"}
+    assert np.allclose(reopened.index.reconstruct(3), 4.0)
+    assert reopened._next_id == 4  # ID는 재사용하지 않음
+
+
+async def _settle(store):
+    await asyncio.sleep(0)
+    while store._rebuilding():
+        await store._rebuild_task
+        await asyncio.sleep(0)
+
+
+def test_compaction_rechecks_after_rebuild_and_at_startup(monkeypatch, tmp_path, make_store):
+    monkeypatch.setattr(vectorstore, "VECTOR_COMPACT_MIN", 3)
+    path = tmp_path / "aurora.index"
+
+    async def _run():
+        store = make_store(path)
+        build = store._build
+
+        def _slow_build(*args):
+            time.sleep(0.1)
+            return build(*args)
+        store._build = _slow_build
+        for v in ["1", "2", "3", "4"]:
+            await store.upsert("doc", [v])
+        assert store._rebuilding()
+        await asyncio.sleep(0.05)  # 재빌드가 벡터를 읽고 빌드 중
+        for v in ["5", "6", "7"]:  # 빌드 중 삭제 표시 → 교체 후 다시 압축
+            await store.upsert("doc", [v])
+        await _settle(store)
+        assert store.ntotal == 1 and not store._dead
+        await store.close()
+    asyncio.run(_run())
+
+    # 압축 전에 종료돼 삭제 표시만 남은 경우: 시작 시(WAL 재생 후) 압축
+    monkeypatch.setattr(vectorstore, "VECTOR_COMPACT_MIN", 100)
+
+    async def _leave_dead():
+        store = make_store(path)
+        for v in ["8", "9", "10"]:
+            await store.upsert("doc", [v])
+        await store.close()
+    asyncio.run(_leave_dead())
+    monkeypatch.setattr(vectorstore, "VECTOR_COMPACT_MIN", 3)
+
+    async def _reopen():
+        store = make_store(path)
+        assert len(store._dead) == 3
+        await _settle(store)
+        await store.close()
+        return store
+
+    store = asyncio.run(_reopen())
+    assert store.ntotal == 1 and not store._dead
+
+
+def test_ids_deleted_mid_search_are_refetched_quietly(tmp_path, capsys, make_store):
+    async def _run():
+        store = make_store(tmp_path / "aurora.index")
+        for doc, v in [("a", "1"), ("b", "2"), ("c", "3")]:
+            await store.upsert(doc, [v])
+        search, calls, gate = store._search_index, [], threading.Event()
+
+        def _gated(*args):
+            calls.append(args[2])
+            if len(calls) == 1:
+                gate.wait(2)  # 첫 검색이 실행기에서 도는 동안 삭제
+            return search(*args)
+        store._search_index = _gated
+        task = asyncio.create_task(store.search_many(["1"], [2]))
+        while not calls:
+            await asyncio.sleep(0.001)
+        await store.delete("a")
+        gate.set()
+        hits = await task
+        await store.close()
+        return hits, calls
+
+    hits, calls = asyncio.run(_run())
+    assert [(h["doc_id"], h["chunk_idx"]) for h in hits[0]] == [("b", 0), ("c", 0)]
+    assert len(calls) == 2 and calls[0] is None and list(calls[1]) == [0]
+    assert "No ID mapping" not in capsys.readouterr().out
+
+
+def test_legacy_sequential_index_is_wrapped(tmp_path, make_store):
+    path = tmp_path / "aurora.index"
+    legacy = faiss.IndexFlatL2(DIM)
+    legacy.add(np.array([[1.0] * DIM, [2.0] * DIM], dtype="float32"))
+    faiss.write_index(legacy, str(path))
+
+    store = make_store(path)
+    assert hasattr(store.index, "id_map") and store.index.ntotal == 2
+    store.doc_id_map[0], store.doc_id_map[1] = "x:0", "y:0"
+    assert asyncio.run(_docs(store, "2", k=1)) == [("y", 0)]
@@ -0,0 +1,84 @@
+# tests/unit/test_vector_wal.py
+# FAISS WAL: 재시작 재생 / N개 누적 스냅샷 / 잘린 레코드 / 멱등 재생 테스트
+# Usage: pytest
+
+import sys
+import asyncio
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.memory import vectorstore
+from app.memory.vector_wal import VectorWAL
+
+if vectorstore.faiss is None:
+    pytest.skip("faiss not installed", allow_module_level=True)
+
+DIM = 8
+pytestmark = pytest.mark.usefixtures("fake_embeddings")
+
+
+def test_adds_survive_restart_without_snapshot(tmp_path, make_store):
+    path = tmp_path / "aurora.index"
+
+    async def _run():
+        store = make_store(path)
+        await store.add("note:1", ["1", "2"])
+        await store.add("note:2", ["3"])
+    asyncio.run(_run())
+    assert not path.exists()  # 노트마다 인덱스 전체를 쓰지 않음
+
+    store = make_store(path)
+    assert store.index.ntotal == 3
+    assert store.doc_id_map == {0: "note:1:0", 1: "note:1:1", 2: "note:2:0"}
+    assert np.allclose(store.index.reconstruct(2), 3.0)
+
+
+def test_snapshot_after_n_adds_drops_old_wal(monkeypatch, tmp_path, make_store):
+    monkeypatch.setattr(vectorstore, "VECTOR_SNAPSHOT_ADDS", 4)
+    path = tmp_path / "aurora.index"
+
+    async def _run():
+        store = make_store(path)
+        await store.add("a", ["1", "2", "3", "4"])
+        await store._snapshot_task
+        await store.add("b", ["5"])
+        return store
+    store = asyncio.run(_run())
+    assert path.exists()
+    assert store._wal.generations() == [2]  # 스냅샷 이전 세대는 삭제됨
+
+    reopened = make_store(path)
+    assert reopened.ntotal == 5 and reopened.doc_id_map[4] == "b:0"
+
+
+def test_close_writes_final_snapshot(tmp_path, make_store):
+    path = tmp_path / "aurora.index"
+
+    async def _run():
+        store = make_store(path)
+        await store.add("a", ["1"])
+        await store.close()
+    asyncio.run(_run())
+    assert path.exists()
+    assert not [p for p in tmp_path.iterdir() if ".wal." in p.name and p.stat().st_size]
+
+
+def test_replay_is_idempotent_and_stops_at_torn_record(tmp_path, make_store):
+    path = tmp_path / "aurora.index"
+    store = make_store(path)
+    asyncio.run(store.add("a", ["1", "2"]))
+    store.save_index()  # 스냅샷 후 (크래시로) 이전 WAL이 남았다고 가정
+    wal = VectorWAL(str(path))
+    wal.append([(0, "a:0", np.ones(DIM)), (1, "a:1", np.ones(DIM) * 2), (2, "c:0", np.ones(DIM) * 7)])
+    wal.close()
+    with open(wal.path(wal.gen), "ab") as f:
+        f.write(b"\x30\x00\x00\x00garbage")
+
+    reopened = make_store(path)
+    assert reopened.ntotal == 3
+    assert reopened.doc_id_map[2] == "c:0"
+    assert len(list(VectorWAL(str(path)).replay())) == 3